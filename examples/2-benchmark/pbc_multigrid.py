@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+'''
+Timing of the multigrid XC integration against the regular numerical
+integration (pbc.dft.numint) for LDA, GGA and meta-GGA functionals.
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf.pbc import gto, dft
+from pyscf.pbc.dft import multigrid
+
+cell = gto.M(
+    verbose = 4,
+    a = numpy.eye(3)*3.5668,
+    atom = '''C     0.      0.      0.    
+              C     0.8917  0.8917  0.8917
+              C     1.7834  1.7834  0.    
+              C     2.6751  2.6751  0.8917
+              C     1.7834  0.      1.7834
+              C     2.6751  0.8917  2.6751
+              C     0.      1.7834  1.7834
+              C     0.8917  2.6751  2.6751''',
+    basis = 'gth-dzvp',
+    pseudo = 'gth-pade',
+)
+kpts = cell.make_kpts([2,2,2])
+
+mf = dft.KRKS(cell, kpts)
+dm = mf.get_init_guess()
+log = lib.logger.Logger(cell.stdout, 4)
+
+for xc in ('lda,vwn', 'pbe', 'm06l'):
+    mf = dft.KRKS(cell, kpts)
+    mf.xc = xc
+    t0 = time.time()
+    v0 = mf.get_veff(cell, dm)
+    t1 = time.time()
+
+    mf = multigrid.multigrid(mf)
+    for nthreads in (1, lib.num_threads()):
+        mf.with_df.task_threads = nthreads
+        mf.with_df.build()
+        t2 = time.time()
+        v1 = mf.get_veff(cell, dm)
+        t3 = time.time()
+        log.note('%-8s numint %8.2f s  multigrid (task_threads=%d) %8.2f s  '
+                 'max|dVxc| %.2g', xc, t1-t0, nthreads, t3-t2, abs(v1-v0).max())
@@ -30,6 +30,8 @@ class AO2MOpt(object):
         self._this = ctypes.POINTER(_vhf._CVHFOpt)()
         #print self._this.contents, expect ValueError: NULL pointer access
         self._intor = intor
+        self._q_cond = None
+        self.symm_ops = None
 
         c_atm = numpy.asarray(mol._atm, dtype=numpy.int32, order='C')
         c_bas = numpy.asarray(mol._bas, dtype=numpy.int32, order='C')
@@ -44,7 +46,14 @@ class AO2MOpt(object):
                                     c_env.ctypes.data_as(ctypes.c_void_p))
         self._this.contents.fprescreen = _fpointer(prescreen)
 
-        if prescreen != 'CVHFnoscreen' and intor in ('int2e_sph', 'int2e_cart'):
+        if (prescreen != 'CVHFnoscreen' and
+            qcondname == 'CVHFsetnr_direct_scf' and
+            intor in ('int2e_sph', 'int2e_cart') and
+            hasattr(mol, 'shell_pairs')):
+            # Schwarz bounds are shared through mol.shell_pairs()
+            self._q_cond = numpy.array(_vhf.get_q_cond(mol, intor))
+            self._this.contents.q_cond = self._q_cond.ctypes.data_as(ctypes.c_void_p)
+        elif prescreen != 'CVHFnoscreen' and intor in ('int2e_sph', 'int2e_cart'):
             # for int2e_sph, qcondname is 'CVHFsetnr_direct_scf'
             ao_loc = make_loc(c_bas, intor)
             fsetqcond = getattr(libao2mo, qcondname)
@@ -55,7 +64,15 @@ class AO2MOpt(object):
                       c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
                       c_env.ctypes.data_as(ctypes.c_void_p))
 
+    def set_symm_ops(self, mol):
+        '''Point group operations for the prescreen function
+        CVHFnr_skeleton_schwarz_cond'''
+        _vhf._set_symm_ops(self, mol)
+        return self
+
     def __del__(self):
+        if self._q_cond is not None and self._this:
+            self._this.contents.q_cond = None
         libao2mo.CVHFdel_optimizer(ctypes.byref(self._this))
 
 
@@ -32,7 +32,7 @@ MAX_MEMORY = getattr(__config__, 'ao2mo_outcore_max_memory', 2000)  # 2GB
 def full(mol, mo_coeff, erifile, dataname='eri_mo',
          intor='int2e', aosym='s4', comp=None,
          max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-         compact=True):
+         compact=True, orbsym=None):
     r'''Transfer arbitrary spherical AO integrals to MO integrals for given orbitals
 
     Args:
@@ -79,6 +79,11 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
             returned MO integrals has (up to 4-fold) permutation symmetry.
             If it's False, the function will abandon any permutation symmetry,
             and return the "plain" MO integrals
+        orbsym : 1D int array
+            Irrep IDs of the orbitals.  If given, only the symmetry-unique
+            shell quartets of the AO integrals are computed.  The MO integrals
+            which are not totally symmetric are set to zero.  mo_coeff must be
+            symmetry adapted orbitals.  See also function :func:`general`.
 
     Returns:
         None
@@ -107,14 +112,17 @@ def full(mol, mo_coeff, erifile, dataname='eri_mo',
     >>> view('full.h5')
     dataset ['eri_mo', 'new'], shape (3, 100, 55)
     '''
+    if orbsym is not None:
+        orbsym = (orbsym,) * 4
     general(mol, (mo_coeff,)*4, erifile, dataname,
-            intor, aosym, comp, max_memory, ioblk_size, verbose, compact)
+            intor, aosym, comp, max_memory, ioblk_size, verbose, compact,
+            orbsym)
     return erifile
 
 def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             intor='int2e', aosym='s4', comp=None,
             max_memory=MAX_MEMORY, ioblk_size=IOBLK_SIZE, verbose=logger.WARN,
-            compact=True):
+            compact=True, orbsym=None):
     r'''For the given four sets of orbitals, transfer arbitrary spherical AO
     integrals to MO integrals on the fly.
 
@@ -163,6 +171,13 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
             returned MO integrals has (up to 4-fold) permutation symmetry.
             If it's False, the function will abandon any permutation symmetry,
             and return the "plain" MO integrals
+        orbsym : 4-item list of 1D int arrays
+            Irrep IDs of the four sets of orbitals.  If given, the AO
+            integrals are generated for the symmetry-unique shell quartets
+            only (the skeleton integrals) and the MO integrals which are not
+            totally symmetric are set to zero.  The orbitals must be symmetry
+            adapted.  It is supported for the 2-electron Coulomb integrals
+            with aosym='s4'.
 
     Returns:
         None
@@ -264,10 +279,20 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
     log.debug('num. MO ints = %.8g, required disk %.8g MB',
               float(nij_pair)*nkl_pair*comp, nij_pair*nkl_pair*comp*8/1e6)
 
+    ao2mopt = None
+    if orbsym is not None:
+        if (intor not in ('int2e_sph', 'int2e_cart') or comp != 1 or
+            aosym != 's4'):
+            raise NotImplementedError('orbsym for %s aosym=%s' % (intor, aosym))
+        ao2mopt = _ao2mo.AO2MOpt(mol, intor, 'CVHFnr_skeleton_schwarz_cond',
+                                 'CVHFsetnr_direct_scf').set_symm_ops(mol)
+        ijsym, klsym = _pair_symm(mol, orbsym, nij_pair == nmoi*nmoj,
+                                  klmosym == 's1')
+
 # transform e1
     fswap = lib.H5TmpFile()
     half_e1(mol, mo_coeffs, fswap, intor, aosym, comp, max_memory, ioblk_size,
-            log, compact)
+            log, compact, ao2mopt)
 
     time_1pass = log.timer('AO->MO transformation for %s 1 pass'%intor,
                            *time_0pass)
@@ -319,6 +344,10 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
                     prefetch(icomp, row0, row1, buf_prefetch)
                     _ao2mo.nr_e2(buf[:nrow], mokl, klshape, aosym, klmosym,
                                  ao_loc=ao_loc, out=outbuf)
+                    if ao2mopt is not None:
+                        # Skeleton integrals are exact for totally symmetric
+                        # MO integrals only
+                        outbuf[:nrow][ijsym[row0:row1,None] != klsym] = 0
                     async_write(icomp, row0, row1, outbuf)
                     outbuf, buf_write = buf_write, outbuf  # avoid flushing writing buffer
 
@@ -335,6 +364,20 @@ def general(mol, mo_coeffs, erifile, dataname='eri_mo',
     return erifile
 
 
+def _pair_symm(mol, orbsym, ij_s1, kl_s1):
+    '''Irrep IDs of the ij and kl orbital pairs'''
+    orbsym = [numpy.asarray(x) for x in orbsym]
+    if mol.groupname in ('Dooh', 'Coov'):
+        orbsym = [x % 10 for x in orbsym]
+    def pair_symm(sym1, sym2, s1):
+        if s1:
+            return (sym1[:,None] ^ sym2).ravel()
+        else:
+            idx, idy = numpy.tril_indices(len(sym1))
+            return sym1[idx] ^ sym2[idy]
+    return (pair_symm(orbsym[0], orbsym[1], ij_s1),
+            pair_symm(orbsym[2], orbsym[3], kl_s1))
+
 # swapfile will be overwritten if exists.
 def half_e1(mol, mo_coeffs, swapfile,
             intor='int2e', aosym='s4', comp=1,
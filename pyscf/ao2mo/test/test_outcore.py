@@ -124,6 +124,30 @@ class KnownValues(unittest.TestCase):
         eri = ao2mo.kernel(mol, mo, intor='int2e_cart')
         self.assertAlmostEqual(lib.finger(eri), -977.99841341828437, 9)
 
+    def test_nroutcore_skeleton(self):
+        from pyscf import symm
+        pmol = mol.copy()
+        pmol.symmetry = True
+        pmol.build(False, False)
+        mf = scf.RHF(pmol).run()
+        mo = mf.mo_coeff
+        orbsym = symm.label_orb_symm(pmol, pmol.irrep_id, pmol.symm_orb, mo)
+        erifile = tempfile.NamedTemporaryFile()
+        ao2mo.outcore.full(pmol, mo, erifile.name, dataname='ref')
+        ao2mo.outcore.full(pmol, mo, erifile.name, orbsym=orbsym)
+        with h5py.File(erifile.name, 'r') as f:
+            self.assertAlmostEqual(abs(f['eri_mo'][:] - f['ref'][:]).max(), 0, 11)
+
+        mos = (mo[:,:4], mo[:,2:9], mo[:,1:], mo[:,:6])
+        syms = (orbsym[:4], orbsym[2:9], orbsym[1:], orbsym[:6])
+        ao2mo.outcore.general(pmol, mos, erifile.name, dataname='ref')
+        ao2mo.outcore.general(pmol, mos, erifile.name, orbsym=syms)
+        with h5py.File(erifile.name, 'r') as f:
+            self.assertAlmostEqual(abs(f['eri_mo'][:] - f['ref'][:]).max(), 0, 11)
+
+        self.assertRaises(NotImplementedError, ao2mo.outcore.full, pmol, mo,
+                          erifile.name, aosym='s1', orbsym=orbsym)
+
 if __name__ == '__main__':
     print('Full Tests for ao2mo.outcore')
     unittest.main()
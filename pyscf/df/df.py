@@ -69,6 +69,10 @@ class DF(lib.StreamObject):
         blockdim : int
             When reading DF integrals from disk the chunk size to load.  It is
             used to improve the IO performance.
+        nproc : int
+            Number of processes to distribute the DF integral transformation
+            of DF-CASSCF over.  The processes share the readonly _cderi.
+            Default is 1.
     '''
     def __init__(self, mol, auxbasis=None):
         self.mol = mol
@@ -76,6 +80,7 @@ class DF(lib.StreamObject):
         self.verbose = mol.verbose
         self.max_memory = mol.max_memory
         self._auxbasis = auxbasis
+        self.nproc = getattr(__config__, 'df_df_DF_nproc', 1)
 
 ##################################################
 # Following are not input options
@@ -113,6 +118,8 @@ class DF(lib.StreamObject):
             log.info('_cderi_to_save = %s', self._cderi_to_save)
         else:
             log.info('_cderi_to_save = %s', self._cderi_to_save.name)
+        if self.nproc > 1:
+            log.info('nproc = %d', self.nproc)
         return self
 
     def build(self):
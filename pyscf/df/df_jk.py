@@ -148,6 +148,13 @@ def density_fit(mf, auxbasis=None, with_df=None):
         def nuc_grad_method(self):
             raise NotImplementedError
 
+        def Hessian(self):
+            from pyscf.df import hessian
+            if self.with_df and hessian._is_supported(self):
+                return hessian.Hessian(self)
+            else:
+                return mf_class.Hessian(self)
+
     return DFHF(mf)
 
 # 1. A tag to label the derived SCF class
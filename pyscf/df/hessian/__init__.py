@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Analytical nuclear Hessian with density fitting
+'''
+
+from . import rhf
+from . import uhf
+from .rhf import Hessian as RHF
+from .uhf import Hessian as UHF
+
+try:
+    from . import rks
+    from . import uks
+    from .rks import Hessian as RKS
+    from .uks import Hessian as UKS
+except ImportError:
+    pass
+
+def Hessian(mf):
+    from pyscf import scf, dft
+    if not _is_supported(mf):
+        raise NotImplementedError('DF Hessian for %s' % mf.__class__)
+    if isinstance(mf, (dft.rks.RKS, dft.rks_symm.RKS)):
+        return rks.Hessian(mf)
+    elif isinstance(mf, (dft.uks.UKS, dft.uks_symm.UKS)):
+        return uks.Hessian(mf)
+    elif isinstance(mf, scf.uhf.UHF):
+        return uhf.Hessian(mf)
+    else:
+        return rhf.Hessian(mf)
+
+def _is_supported(mf):
+    '''DF Hessian is available for closed-shell RHF/RKS and for UHF/UKS'''
+    from pyscf import scf
+    if isinstance(mf, scf.uhf.UHF):
+        return True
+    return isinstance(mf, scf.hf.RHF) and not isinstance(mf, scf.rohf.ROHF)
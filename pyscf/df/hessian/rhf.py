@@ -0,0 +1,512 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Non-relativistic RHF analytical Hessian with density fitting
+
+The two-electron energy is
+
+    E_J = 1/2 rho_P (P|Q)^{-1} rho_Q,     rho_P = (uv|P) D_uv
+    E_K = -1/4 D_uw D_vl (uv|P) (P|Q)^{-1} (Q|wl)
+
+Its derivatives are computed with the 3-center derivative integrals
+int3c2e_ip1, int3c2e_ipip1, int3c2e_ipvip1, int3c2e_ip1ip2 and the 2-center
+derivatives of the fitting metric, including the response of the auxiliary
+basis.  The 3-center integrals are evaluated in blocks of auxiliary shells.
+The first order exchange vectors, which are needed for every pair of atoms,
+are held in a temporary HDF5 file and contracted in batches of atoms within
+hessobj.max_memory.
+'''
+
+import time
+import numpy
+import scipy.linalg
+from pyscf import lib
+from pyscf import gto
+from pyscf.lib import logger
+from pyscf.df import addons as df_addons
+from pyscf.grad import rhf as rhf_grad
+from pyscf.grad.mp2 import _shell_prange
+from pyscf.hessian import rhf as rhf_hess
+
+
+def partial_hess_elec(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None):
+    '''Partial derivative
+    '''
+    e1, ej, ek = _partial_hess_ejk(hessobj, mo_energy, mo_coeff, mo_occ,
+                                   atmlst, max_memory, verbose, True)
+    return e1 + ej - ek * .5
+
+def _partial_hess_ejk(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None, with_k=True):
+    '''Partial derivatives of the core Hamiltonian, the overlap (e1) and the
+    DF Coulomb (ej) and exchange (ek) energies.  ek is the second derivative
+    of 1/2 Tr(D K[D]).
+    '''
+    log = logger.new_logger(hessobj, verbose)
+    time0 = (time.clock(), time.time())
+
+    mol = hessobj.mol
+    mf = hessobj.base
+    if mo_energy is None: mo_energy = mf.mo_energy
+    if mo_occ is None:    mo_occ = mf.mo_occ
+    if mo_coeff is None:  mo_coeff = mf.mo_coeff
+    if atmlst is None: atmlst = range(mol.natm)
+
+    mocc = mo_coeff[:,mo_occ>0]
+    dm0 = numpy.dot(mocc, mocc.T) * 2
+    # Energy weighted density matrix
+    dme0 = numpy.einsum('pi,qi,i->pq', mocc, mocc, mo_energy[mo_occ>0]) * 2
+
+    hj, hk = _hess_jk(hessobj, dm0, [mocc], max_memory, log, with_k)
+    e1 = _partial_hess_e1(hessobj, dm0, dme0, atmlst)
+
+    atmlst = numpy.asarray(atmlst)
+    ej = hj[atmlst][:,atmlst]
+    ek = hk[atmlst][:,atmlst]
+    log.timer('RHF partial hessian', *time0)
+    return e1, ej, ek
+
+def _partial_hess_e1(hessobj, dm0, dme0, atmlst):
+    '''Second derivatives of the core Hamiltonian and the overlap terms'''
+    mol = hessobj.mol
+    aoslices = mol.aoslice_by_atom()
+    hcore_deriv = hessobj.hcore_generator(mol)
+    s1aa, s1ab, s1a = rhf_hess.get_ovlp(mol)
+    e1 = numpy.zeros((mol.natm,mol.natm,3,3))  # (A,B,dR_A,dR_B)
+    for i0, ia in enumerate(atmlst):
+        p0, p1 = aoslices[ia][2:]
+        e1[i0,i0] -= numpy.einsum('xypq,pq->xy', s1aa[:,:,p0:p1], dme0[p0:p1])*2
+        for j0, ja in enumerate(atmlst[:i0+1]):
+            q0, q1 = aoslices[ja][2:]
+            e1[i0,j0] -= numpy.einsum('xypq,pq->xy', s1ab[:,:,p0:p1,q0:q1], dme0[p0:p1,q0:q1])*2
+            h1ao = hcore_deriv(ia, ja)
+            e1[i0,j0] += numpy.einsum('xypq,pq->xy', h1ao, dm0)
+        for j0 in range(i0):
+            e1[j0,i0] = e1[i0,j0].T
+    natm_lst = len(atmlst)
+    return e1[:natm_lst,:natm_lst]
+
+def _hess_jk(hessobj, dm0, moccs, max_memory, log, with_k=True):
+    '''Second derivatives of the DF Coulomb energy 1/2 Tr(D J[D]) of the
+    density matrix dm0 and the DF exchange energy sum_s 1/2 Tr(D_s K[D_s])
+    for all atoms.  D_s = 2 C_s C_s^T is built from each set of occupied
+    orbitals C_s in moccs.
+    '''
+    t1 = (time.clock(), time.time())
+    mol = hessobj.mol
+    mf = hessobj.base
+    nao = dm0.shape[0]
+    noccs = [mocc.shape[1] for mocc in moccs]
+
+    auxmol, pmol = _make_auxmol(mf)
+    naux = auxmol.nao_nr()
+    natm = mol.natm
+    aoslices = mol.aoslice_by_atom()
+    auxslices = auxmol.aoslice_by_atom()
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, max_memory*.9-mem_now)
+    blksize = _aux_blksize(auxmol, nao, max_memory)
+
+    # Fitting coefficients cj = (P|Q)^{-1} rho_Q and cij = (P|Q)^{-1} (Q|ij)
+    int2c = auxmol.intor('int2c2e', aosym='s1')
+    low = scipy.linalg.cholesky(int2c, lower=True)
+    int2c = None
+    rhoj = numpy.empty(naux)
+    if with_k:
+        cijs = [numpy.empty((naux,nocc,nocc)) for nocc in noccs]
+    for q0, q1, int3c in _int3c_blocks(mol, auxmol, pmol, 'int3c2e', 1, blksize):
+        rhoj[q0:q1] = numpy.einsum('uvp,uv->p', int3c, dm0)
+        if with_k:
+            for mocc, cij in zip(moccs, cijs):
+                cij[q0:q1] = lib.einsum('uvp,ui,vj->pij', int3c, mocc, mocc)
+        int3c = None
+    cj = scipy.linalg.cho_solve((low, True), rhoj)
+    if with_k:
+        cijs = [scipy.linalg.cho_solve((low, True), cij.reshape(naux,-1))
+                for cij in cijs]
+        cijs = [cij.reshape(naux,nocc,nocc) for cij, nocc in zip(cijs, noccs)]
+    t1 = log.timer_debug1('DF hessian fitting coefficients', *t1)
+
+    # The second order 3-center integrals are contracted with
+    #   G[u,v,P] = D_uv cj_P                   for J
+    #   G[u,v,P] = sum_s D_uw D_vl cj_wl,P     for K
+    ncomp = 2 if with_k else 1
+    e2_diag = numpy.zeros((ncomp,9,nao))
+    e2_vv = numpy.zeros((ncomp,9,nao,nao))
+    e2_vp = numpy.zeros((ncomp,9,nao,naux))
+    for b0, b1, nf in _shell_prange(auxmol, 0, auxmol.nbas, blksize):
+        q0 = auxmol.ao_loc[b0]
+        q1 = q0 + nf
+        shls_slice = (0, mol.nbas, 0, mol.nbas, mol.nbas+b0, mol.nbas+b1)
+        gs = [dm0[:,:,None] * cj[q0:q1]]
+        if with_k:
+            gs.append(sum(lib.einsum('pij,ui,vj->uvp', cij[q0:q1], mocc, mocc)
+                          for mocc, cij in zip(moccs, cijs)) * 4)
+
+        int3c = pmol.intor('int3c2e_ipip1', comp=9, aosym='s1', shls_slice=shls_slice)
+        for k, g in enumerate(gs):
+            e2_diag[k] += numpy.einsum('xuvp,uvp->xu', int3c, g)
+        int3c = pmol.intor('int3c2e_ipvip1', comp=9, aosym='s1', shls_slice=shls_slice)
+        for k, g in enumerate(gs):
+            e2_vv[k] += numpy.einsum('xuvp,uvp->xuv', int3c, g)
+        int3c = pmol.intor('int3c2e_ip1ip2', comp=9, aosym='s1', shls_slice=shls_slice)
+        for k, g in enumerate(gs):
+            e2_vp[k,:,:,q0:q1] = numpy.einsum('xuvp,uvp->xup', int3c, g)
+        int3c = gs = None
+        t1 = log.timer_debug1('contracting int3c2e 2nd derivatives [%d:%d]'%(q0,q1), *t1)
+
+    hj = _assemble_int3c_deriv2(e2_diag[0], e2_vv[0], e2_vp[0], aoslices, auxslices)
+    if with_k:
+        hk = _assemble_int3c_deriv2(e2_diag[1], e2_vv[1], e2_vp[1], aoslices, auxslices)
+    e2_diag = e2_vv = e2_vp = None
+
+    # Second order derivatives of the metric, contracted with
+    #   W = cj cj^T                    for J
+    #   W = 4 sum_s sum_ij cij cij^T   for K
+    int2c_ipip1 = auxmol.intor('int2c2e_ipip1', comp=9).reshape(3,3,naux,naux)
+    int2c_ip1ip2 = auxmol.intor('int2c2e_ip1ip2', comp=9).reshape(3,3,naux,naux)
+    hj -= _contract_int2c_deriv2(int2c_ipip1, int2c_ip1ip2, numpy.outer(cj, cj),
+                                 auxslices)
+    if with_k:
+        wk = 0
+        for cij in cijs:
+            cij = cij.reshape(naux,-1)
+            wk = wk + numpy.dot(cij, cij.T) * 4
+        hk -= _contract_int2c_deriv2(int2c_ipip1, int2c_ip1ip2, wk, auxslices)
+        wk = None
+    int2c_ipip1 = int2c_ip1ip2 = None
+    int2c_ip1 = auxmol.intor('int2c2e_ip1', comp=3)
+    t1 = log.timer_debug1('contracting int2c2e 2nd derivatives', *t1)
+
+    # Products of the first order terms g_x (P|Q)^{-1} g_y with
+    #   g_x = d(uv|P)/dx Gamma_uv - d(P|Q)/dx c_Q
+    # The vectors are whitened by the Cholesky factor of the metric.
+    rhoj1 = numpy.zeros((natm,3,naux))
+    rsum = numpy.zeros((3,naux))
+    if with_k:
+        ftmp = lib.H5TmpFile()
+        gks = [[ftmp.create_dataset('gk/%d/%d'%(s,ia), (3,naux,nocc**2), 'f8')
+                for ia in range(natm)] for s, nocc in enumerate(noccs)]
+    for q0, q1, int3c in _int3c_blocks(mol, auxmol, pmol, 'int3c2e_ip1', 3, blksize):
+        r = numpy.einsum('xuvp,uv->xup', int3c, dm0)
+        rsum[:,q0:q1] = r.sum(axis=1)
+        for ia in range(natm):
+            p0, p1 = aoslices[ia,2:]
+            rhoj1[ia,:,q0:q1] -= r[:,p0:p1].sum(axis=1) * 2
+        r = None
+
+        if with_k:
+            nf = q1 - q0
+            for mocc, gk in zip(moccs, gks):
+                int3c_mo = lib.einsum('xuvp,vj->xujp', int3c, mocc)
+                fall = lib.einsum('ui,xujp->xijp', mocc, int3c_mo)
+                fall = fall + fall.transpose(0,2,1,3)
+                for ia in range(natm):
+                    p0, p1 = aoslices[ia,2:]
+                    f = lib.einsum('ui,xujp->xijp', mocc[p0:p1], int3c_mo[:,p0:p1])
+                    f = -f - f.transpose(0,2,1,3)
+                    a0, a1 = max(auxslices[ia,2], q0), min(auxslices[ia,3], q1)
+                    if a0 < a1:
+                        f[:,:,:,a0-q0:a1-q0] += fall[:,:,:,a0-q0:a1-q0]
+                    gk[ia][:,q0:q1] = f.transpose(0,3,1,2).reshape(3,nf,-1)
+                int3c_mo = fall = f = None
+        int3c = None
+    t1 = log.timer_debug1('contracting int3c2e_ip1', *t1)
+
+    for ia in range(natm):
+        p0, p1 = auxslices[ia,2:]
+        rhoj1[ia,:,p0:p1] += rsum[:,p0:p1] * 2
+        rhoj1[ia] += _int2c_deriv1_dot(int2c_ip1, cj, p0, p1)
+        rhoj1[ia] = scipy.linalg.solve_triangular(low, rhoj1[ia].T, lower=True).T
+    rhoj1 = rhoj1.reshape(natm*3,naux)
+    hj += numpy.dot(rhoj1, rhoj1.T).reshape(natm,3,natm,3).transpose(0,2,1,3)
+    rhoj1 = rsum = None
+
+    if with_k:
+        for cij, gk in zip(cijs, gks):
+            cij = cij.reshape(naux,-1)
+            for ia in range(natm):
+                p0, p1 = auxslices[ia,2:]
+                g = gk[ia][:]
+                g += _int2c_deriv1_dot(int2c_ip1, cij, p0, p1)
+                for x in range(3):
+                    g[x] = scipy.linalg.solve_triangular(low, g[x], lower=True)
+                gk[ia][:] = g
+                g = None
+        cijs = cij = None
+
+        for nocc, gk in zip(noccs, gks):
+            blksize = max(1, int(max_memory*.4e6/8 / (3*naux*max(1, nocc**2))))
+            for i0, i1 in lib.prange(0, natm, blksize):
+                gi = numpy.asarray([gk[ia][:] for ia in range(i0, i1)])
+                gi = gi.reshape((i1-i0)*3,-1)
+                for j0, j1 in lib.prange(0, i1, blksize):
+                    if j0 == i0:
+                        gj = gi
+                    else:
+                        gj = numpy.asarray([gk[ja][:] for ja in range(j0, j1)])
+                        gj = gj.reshape((j1-j0)*3,-1)
+                    hij = numpy.dot(gi, gj.T).reshape(i1-i0,3,j1-j0,3) * 4
+                    hk[i0:i1,j0:j1] += hij.transpose(0,2,1,3)
+                    if j0 != i0:
+                        hk[j0:j1,i0:i1] += hij.transpose(2,0,3,1)
+                    gj = None
+                gi = None
+        ftmp.close()
+        t1 = log.timer_debug1('contracting first order exchange vectors', *t1)
+    else:
+        hk = numpy.zeros_like(hj)
+    return hj, hk
+
+def make_h1(hessobj, mo_coeff, mo_occ, chkfile=None, atmlst=None, verbose=None):
+    mol = hessobj.mol
+    if atmlst is None:
+        atmlst = range(mol.natm)
+    hcore_deriv = rhf_grad.Gradients(hessobj.base).hcore_generator(mol)
+
+    vj1, vk1 = _gen_jk(hessobj, mo_coeff, mo_occ, atmlst, verbose, True)
+    h1ao = [None] * mol.natm
+    for i0, ia in enumerate(atmlst):
+        h1 = vj1[i0] - vk1[i0] * .5
+        h1 += hcore_deriv(ia)
+
+        if chkfile is None:
+            h1ao[ia] = h1
+        else:
+            key = 'scf_f1ao/%d' % ia
+            lib.chkfile.save(chkfile, key, h1)
+    if chkfile is None:
+        return h1ao
+    else:
+        return chkfile
+
+def _gen_jk(hessobj, mo_coeff, mo_occ, atmlst=None, verbose=None, with_k=True):
+    '''First order derivatives of the DF J and K matrices wrt the nuclear
+    coordinates of the atoms in atmlst, for the fixed density matrix.
+    '''
+    mocc = mo_coeff[:,mo_occ>0]
+    dm0 = numpy.dot(mocc, mocc.T) * 2
+    vj1, vk1 = _jk_deriv1(hessobj, dm0, [mocc], atmlst, verbose, with_k)
+    if with_k:
+        return vj1, vk1[0]
+    else:
+        return vj1, None
+
+def _jk_deriv1(hessobj, dm0, moccs, atmlst=None, verbose=None, with_k=True):
+    '''First order derivatives of J[dm0] and of K[D_s], D_s = 2 C_s C_s^T,
+    for each set of occupied orbitals C_s in moccs.  The K matrices are
+    returned as a list in the order of moccs.
+    '''
+    log = logger.new_logger(hessobj, verbose)
+    time0 = t1 = (time.clock(), time.time())
+
+    mol = hessobj.mol
+    mf = hessobj.base
+    if atmlst is None: atmlst = range(mol.natm)
+
+    nao = dm0.shape[0]
+    auxmol, pmol = _make_auxmol(mf)
+    naux = auxmol.nao_nr()
+    nset = len(atmlst)
+    aoslices = mol.aoslice_by_atom()
+    auxslices = auxmol.aoslice_by_atom()
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, hessobj.max_memory*.9-mem_now)
+    blksize = _aux_blksize(auxmol, nao, max_memory)
+
+    int2c = auxmol.intor('int2c2e', aosym='s1')
+    low = scipy.linalg.cholesky(int2c, lower=True)
+    int2c = None
+    rhoj = numpy.empty(naux)
+    if with_k:
+        # d[u,i,P] = (P|Q)^{-1} (ui|Q)
+        ds = [numpy.empty((nao,mocc.shape[1],naux)) for mocc in moccs]
+    for q0, q1, int3c in _int3c_blocks(mol, auxmol, pmol, 'int3c2e', 1, blksize):
+        rhoj[q0:q1] = numpy.einsum('uvp,uv->p', int3c, dm0)
+        if with_k:
+            for mocc, d in zip(moccs, ds):
+                d[:,:,q0:q1] = lib.einsum('uvp,vi->uip', int3c, mocc)
+        int3c = None
+    cj = scipy.linalg.cho_solve((low, True), rhoj)
+    if with_k:
+        ds = [scipy.linalg.cho_solve((low, True), d.reshape(-1,naux).T).T.reshape(d.shape)
+              for d in ds]
+    t1 = log.timer_debug1('DF fitting coefficients', *t1)
+
+    vj1 = numpy.zeros((nset,3,nao,nao))
+    if with_k:
+        vk1s = [numpy.zeros((nset,3,nao,nao)) for mocc in moccs]
+    rhoj1 = numpy.zeros((nset,3,naux))
+    rsum = numpy.zeros((3,naux))
+    jc = numpy.zeros((3,nao,nao))
+    for q0, q1, int3c in _int3c_blocks(mol, auxmol, pmol, 'int3c2e_ip1', 3, blksize):
+        r = numpy.einsum('xuvp,uv->xup', int3c, dm0)
+        rsum[:,q0:q1] = r.sum(axis=1)
+        jc += lib.einsum('xuvp,p->xuv', int3c, cj[q0:q1])
+        for i0, ia in enumerate(atmlst):
+            p0, p1 = aoslices[ia,2:]
+            rhoj1[i0,:,q0:q1] -= r[:,p0:p1].sum(axis=1) * 2
+            a0, a1 = max(auxslices[ia,2], q0), min(auxslices[ia,3], q1)
+            if a0 < a1:
+                vj1[i0] += lib.einsum('xuvp,p->xuv', int3c[:,:,:,a0-q0:a1-q0],
+                                      cj[a0:a1])
+        r = None
+
+        if with_k:
+            for mocc, d, vk1 in zip(moccs, ds, vk1s):
+                # dt[w,v,P] = C_wi d[v,i,P]
+                dt = lib.einsum('wi,vip->wvp', mocc, d[:,:,q0:q1])
+                vk0 = lib.einsum('xuwp,wvp->xuv', int3c, dt)
+                for i0, ia in enumerate(atmlst):
+                    p0, p1 = aoslices[ia,2:]
+                    vk1[i0,:,p0:p1] -= vk0[:,p0:p1]
+                    vk1[i0] -= lib.einsum('xwup,wvp->xuv', int3c[:,p0:p1], dt[p0:p1])
+                    a0, a1 = max(auxslices[ia,2], q0), min(auxslices[ia,3], q1)
+                    if a0 < a1:
+                        ints = int3c[:,:,:,a0-q0:a1-q0]
+                        vk1[i0] += lib.einsum('xuwp,wvp->xuv', ints, dt[:,:,a0-q0:a1-q0])
+                        vk1[i0] += lib.einsum('xwup,wvp->xuv', ints, dt[:,:,a0-q0:a1-q0])
+                dt = vk0 = ints = None
+        int3c = None
+    t1 = log.timer_debug1('contracting int3c2e_ip1', *t1)
+
+    int2c_ip1 = auxmol.intor('int2c2e_ip1', comp=3)
+    for i0, ia in enumerate(atmlst):
+        p0, p1 = aoslices[ia,2:]
+        vj1[i0,:,p0:p1] -= jc[:,p0:p1]
+        a0, a1 = auxslices[ia,2:]
+        rhoj1[i0,:,a0:a1] += rsum[:,a0:a1] * 2
+        rhoj1[i0] += _int2c_deriv1_dot(int2c_ip1, cj, a0, a1)
+        if with_k:
+            for d, vk1 in zip(ds, vk1s):
+                tmp = lib.einsum('xpq,viq->xvip', int2c_ip1[:,a0:a1], d)
+                vk1[i0] += lib.einsum('uip,xvip->xuv', d[:,:,a0:a1], tmp)
+                tmp = None
+    vj1 += vj1.transpose(0,1,3,2)
+    jc = rsum = ds = None
+
+    # The response of the fitting coefficients (P|Q)^{-1} g_Q
+    rhoj1 = scipy.linalg.cho_solve((low, True), rhoj1.reshape(-1,naux).T)
+    for q0, q1, int3c in _int3c_blocks(mol, auxmol, pmol, 'int3c2e', 1, blksize):
+        vj1 += lib.einsum('uvp,pk->kuv', int3c, rhoj1[q0:q1]).reshape(nset,3,nao,nao)
+        int3c = None
+    log.timer('DF J/K first derivatives', *time0)
+    if with_k:
+        return vj1, [(vk1 + vk1.transpose(0,1,3,2)) * 2 for vk1 in vk1s]
+    else:
+        return vj1, None
+
+def _make_auxmol(mf):
+    mol = mf.mol
+    auxmol = getattr(mf.with_df, 'auxmol', None)
+    if auxmol is None:
+        auxmol = df_addons.make_auxmol(mol, mf.with_df.auxbasis)
+    pmol = gto.mole.conc_mol(mol, auxmol)
+    return auxmol, pmol
+
+def _aux_blksize(auxmol, nao, max_memory):
+    # Three 9-component derivative integrals and the intermediates
+    blksize = int(max_memory*.5e6/8 / (nao**2*24))
+    return max(blksize, max(auxmol.ao_loc[1:] - auxmol.ao_loc[:-1]))
+
+def _int3c_blocks(mol, auxmol, pmol, intor, comp, blksize):
+    '''3-center integrals (uv|P) or their derivatives in blocks of
+    auxiliary shells'''
+    nbas = mol.nbas
+    for b0, b1, nf in _shell_prange(auxmol, 0, auxmol.nbas, blksize):
+        q0 = auxmol.ao_loc[b0]
+        shls_slice = (0, nbas, 0, nbas, nbas+b0, nbas+b1)
+        int3c = pmol.intor(intor, comp=comp, aosym='s1', shls_slice=shls_slice)
+        yield q0, q0+nf, int3c
+
+def _int2c_deriv1_dot(int2c_ip1, c, p0, p1):
+    '''-d(P|Q)/dR c_Q for the atom whose auxiliary functions are [p0:p1]'''
+    shape = c.shape
+    c = c.reshape(shape[0],-1)
+    v = numpy.zeros((3,)+c.shape)
+    for x in range(3):
+        v[x,p0:p1] += numpy.dot(int2c_ip1[x,p0:p1], c)
+        v[x] += numpy.dot(int2c_ip1[x,p0:p1].T, c[p0:p1])
+    return v.reshape((3,)+shape)
+
+def _assemble_int3c_deriv2(e2_diag, e2_vv, e2_vp, aoslices, auxslices):
+    '''Sum the contractions of int3c2e_ipip1, int3c2e_ipvip1 and
+    int3c2e_ip1ip2 over the functions of each atom.  The second derivatives
+    of the auxiliary functions are obtained by translational invariance.'''
+    natm = len(aoslices)
+    nao = e2_vv.shape[-1]
+    e2_diag = e2_diag.reshape(3,3,nao)
+    e2_vv = e2_vv.reshape(3,3,nao,nao)
+    e2_vp = e2_vp.reshape(3,3,nao,-1)
+    e2 = numpy.zeros((natm,natm,3,3))
+    for ia in range(natm):
+        p0, p1 = aoslices[ia,2:]
+        a0, a1 = auxslices[ia,2:]
+        e2[ia,ia] += e2_diag[:,:,p0:p1].sum(axis=2) * 2
+        e2[ia,ia] -= e2_vp[:,:,:,a0:a1].sum(axis=(2,3)) * 2
+        for ja in range(natm):
+            q0, q1 = aoslices[ja,2:]
+            b0, b1 = auxslices[ja,2:]
+            e2[ia,ja] += e2_vv[:,:,p0:p1,q0:q1].sum(axis=(2,3)) * 2
+            y = e2_vp[:,:,p0:p1,b0:b1].sum(axis=(2,3)) * 2
+            e2[ia,ja] += y
+            e2[ja,ia] += y.T
+    return e2
+
+def _contract_int2c_deriv2(int2c_ipip1, int2c_ip1ip2, w, auxslices):
+    '''1/2 d^2(P|Q)/dR_A dR_B W_PQ'''
+    natm = len(auxslices)
+    e2 = numpy.zeros((natm,natm,3,3))
+    for ia in range(natm):
+        p0, p1 = auxslices[ia,2:]
+        e2[ia,ia] += numpy.einsum('xypq,pq->xy', int2c_ipip1[:,:,p0:p1], w[p0:p1])
+        for ja in range(natm):
+            q0, q1 = auxslices[ja,2:]
+            e2[ia,ja] += numpy.einsum('xypq,pq->xy', int2c_ip1ip2[:,:,p0:p1,q0:q1],
+                                      w[p0:p1,q0:q1])
+    return e2
+
+
+class Hessian(rhf_hess.Hessian):
+    '''Non-relativistic restricted Hartree-Fock hessian with density fitting'''
+
+    partial_hess_elec = partial_hess_elec
+    make_h1 = make_h1
+
+
+if __name__ == '__main__':
+    from pyscf import scf
+
+    mol = gto.Mole()
+    mol.verbose = 0
+    mol.output = None
+    mol.atom = [
+        [1 , (1. ,  0.     , 0.000)],
+        [1 , (0. ,  1.     , 0.000)],
+        [1 , (0. , -1.517  , 1.177)],
+        [1 , (0. ,  1.517  , 1.177)] ]
+    mol.basis = '631g'
+    mol.unit = 'B'
+    mol.build()
+    mf = scf.RHF(mol).density_fit()
+    mf.conv_tol = 1e-14
+    mf.scf()
+    n3 = mol.natm * 3
+    hobj = Hessian(mf)
+    e2 = hobj.kernel().transpose(0,2,1,3).reshape(n3,n3)
+    print(lib.finger(e2))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Non-relativistic RKS analytical Hessian with density fitting
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.grad import rhf as rhf_grad
+from pyscf.hessian import rks as rks_hess
+from pyscf.df.hessian import rhf as df_rhf_hess
+
+
+def partial_hess_elec(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None):
+    log = logger.new_logger(hessobj, verbose)
+    time0 = (time.clock(), time.time())
+
+    mol = hessobj.mol
+    mf = hessobj.base
+    if mo_energy is None: mo_energy = mf.mo_energy
+    if mo_occ is None:    mo_occ = mf.mo_occ
+    if mo_coeff is None:  mo_coeff = mf.mo_coeff
+    if atmlst is None: atmlst = range(mol.natm)
+
+    if mf.nlc != '':
+        raise NotImplementedError
+    omega, alpha, hyb = mf._numint.rsh_and_hybrid_coeff(mf.xc, spin=mol.spin)
+    if abs(omega) > 1e-10:
+        raise NotImplementedError('DF Hessian for range-separated functionals')
+    with_k = abs(hyb) > 1e-10
+
+    de2, ej, ek = df_rhf_hess._partial_hess_ejk(hessobj, mo_energy, mo_coeff,
+                                                mo_occ, atmlst, max_memory,
+                                                verbose, with_k)
+    de2 += ej
+    if with_k:
+        de2 -= hyb * .5 * ek
+
+    mocc = mo_coeff[:,mo_occ>0]
+    dm0 = numpy.dot(mocc, mocc.T) * 2
+
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, mf.max_memory*.9-mem_now)
+    veff_diag = rks_hess._get_vxc_diag(hessobj, mo_coeff, mo_occ, max_memory)
+    vxc = rks_hess._get_vxc_deriv2(hessobj, mo_coeff, mo_occ, max_memory)
+    aoslices = mol.aoslice_by_atom()
+    exc = numpy.zeros_like(de2)
+    for i0, ia in enumerate(atmlst):
+        shl0, shl1, p0, p1 = aoslices[ia]
+        exc[i0,i0] += numpy.einsum('xypq,pq->xy', veff_diag[:,:,p0:p1], dm0[p0:p1])*2
+        for j0, ja in enumerate(atmlst[:i0+1]):
+            q0, q1 = aoslices[ja][2:]
+            exc[i0,j0] += numpy.einsum('xypq,pq->xy', vxc[ia][:,:,q0:q1], dm0[q0:q1])*2
+        for j0 in range(i0):
+            exc[j0,i0] = exc[i0,j0].T
+    de2 += exc
+
+    log.timer('RKS partial hessian', *time0)
+    return de2
+
+def make_h1(hessobj, mo_coeff, mo_occ, chkfile=None, atmlst=None, verbose=None):
+    mol = hessobj.mol
+    if atmlst is None:
+        atmlst = range(mol.natm)
+    hcore_deriv = rhf_grad.Gradients(hessobj.base).hcore_generator(mol)
+
+    mf = hessobj.base
+    ni = mf._numint
+    ni.libxc.test_deriv_order(mf.xc, 2, raise_error=True)
+    omega, alpha, hyb = ni.rsh_and_hybrid_coeff(mf.xc, spin=mol.spin)
+    if abs(omega) > 1e-10:
+        raise NotImplementedError('DF Hessian for range-separated functionals')
+    with_k = abs(hyb) > 1e-10
+
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, mf.max_memory*.9-mem_now)
+    h1ao = rks_hess._get_vxc_deriv1(hessobj, mo_coeff, mo_occ, max_memory)
+    vj1, vk1 = df_rhf_hess._gen_jk(hessobj, mo_coeff, mo_occ, atmlst,
+                                   verbose, with_k)
+    for i0, ia in enumerate(atmlst):
+        h1ao[ia] += vj1[i0]
+        if with_k:
+            h1ao[ia] -= hyb * .5 * vk1[i0]
+        h1ao[ia] += hcore_deriv(ia)
+
+    if chkfile is None:
+        return h1ao
+    else:
+        for ia in atmlst:
+            lib.chkfile.save(chkfile, 'scf_f1ao/%d'%ia, h1ao[ia])
+        return chkfile
+
+
+class Hessian(rks_hess.Hessian):
+    '''Non-relativistic RKS hessian with density fitting'''
+
+    partial_hess_elec = partial_hess_elec
+    make_h1 = make_h1
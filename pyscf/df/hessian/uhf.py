@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Non-relativistic UHF analytical Hessian with density fitting
+
+The DF integrals are contracted as in df.hessian.rhf, with the Coulomb term
+built from the total density and the exchange term from the alpha and beta
+occupied orbitals separately.
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.grad import uhf as uhf_grad
+from pyscf.hessian import uhf as uhf_hess
+from pyscf.df.hessian import rhf as df_rhf_hess
+
+
+def partial_hess_elec(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None):
+    '''Partial derivative
+    '''
+    e1, ej, ek = _partial_hess_ejk(hessobj, mo_energy, mo_coeff, mo_occ,
+                                   atmlst, max_memory, verbose, True)
+    return e1 + ej - ek
+
+def _partial_hess_ejk(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None, with_k=True):
+    '''Partial derivatives of the core Hamiltonian, the overlap (e1) and the
+    DF Coulomb (ej) and exchange (ek) energies.  ek is the second derivative
+    of 1/2 Tr(Da K[Da]) + 1/2 Tr(Db K[Db]).
+    '''
+    log = logger.new_logger(hessobj, verbose)
+    time0 = (time.clock(), time.time())
+
+    mol = hessobj.mol
+    mf = hessobj.base
+    if mo_energy is None: mo_energy = mf.mo_energy
+    if mo_occ is None:    mo_occ = mf.mo_occ
+    if mo_coeff is None:  mo_coeff = mf.mo_coeff
+    if atmlst is None: atmlst = range(mol.natm)
+
+    mocca = mo_coeff[0][:,mo_occ[0]>0]
+    moccb = mo_coeff[1][:,mo_occ[1]>0]
+    dm0 = numpy.dot(mocca, mocca.T) + numpy.dot(moccb, moccb.T)
+    # Energy weighted density matrix
+    mo_ea = mo_energy[0][mo_occ[0]>0]
+    mo_eb = mo_energy[1][mo_occ[1]>0]
+    dme0 = numpy.einsum('pi,qi,i->pq', mocca, mocca, mo_ea)
+    dme0+= numpy.einsum('pi,qi,i->pq', moccb, moccb, mo_eb)
+
+    # df_rhf_hess._hess_jk builds K for D_s = 2 C_s C_s^T
+    hj, hk = df_rhf_hess._hess_jk(hessobj, dm0, [mocca, moccb], max_memory,
+                                  log, with_k)
+    e1 = df_rhf_hess._partial_hess_e1(hessobj, dm0, dme0, atmlst)
+
+    atmlst = numpy.asarray(atmlst)
+    ej = hj[atmlst][:,atmlst]
+    ek = hk[atmlst][:,atmlst] * .25
+    log.timer('UHF partial hessian', *time0)
+    return e1, ej, ek
+
+def make_h1(hessobj, mo_coeff, mo_occ, chkfile=None, atmlst=None, verbose=None):
+    mol = hessobj.mol
+    if atmlst is None:
+        atmlst = range(mol.natm)
+    hcore_deriv = uhf_grad.Gradients(hessobj.base).hcore_generator(mol)
+
+    vj1, vk1a, vk1b = _gen_jk(hessobj, mo_coeff, mo_occ, atmlst, verbose, True)
+    h1aoa = [None] * mol.natm
+    h1aob = [None] * mol.natm
+    for i0, ia in enumerate(atmlst):
+        h1 = hcore_deriv(ia) + vj1[i0]
+        h1a = h1 - vk1a[i0]
+        h1b = h1 - vk1b[i0]
+
+        if chkfile is None:
+            h1aoa[ia] = h1a
+            h1aob[ia] = h1b
+        else:
+            lib.chkfile.save(chkfile, 'scf_f1ao/0/%d' % ia, h1a)
+            lib.chkfile.save(chkfile, 'scf_f1ao/1/%d' % ia, h1b)
+    if chkfile is None:
+        return (h1aoa,h1aob)
+    else:
+        return chkfile
+
+def _gen_jk(hessobj, mo_coeff, mo_occ, atmlst=None, verbose=None, with_k=True):
+    '''First order derivatives of the DF J[Da+Db], K[Da] and K[Db] matrices
+    wrt the nuclear coordinates of the atoms in atmlst.
+    '''
+    mocca = mo_coeff[0][:,mo_occ[0]>0]
+    moccb = mo_coeff[1][:,mo_occ[1]>0]
+    dm0 = numpy.dot(mocca, mocca.T) + numpy.dot(moccb, moccb.T)
+    vj1, vk1 = df_rhf_hess._jk_deriv1(hessobj, dm0, [mocca, moccb], atmlst,
+                                      verbose, with_k)
+    if with_k:
+        # K[D_s] for D_s = C_s C_s^T
+        return vj1, vk1[0] * .5, vk1[1] * .5
+    else:
+        return vj1, None, None
+
+
+class Hessian(uhf_hess.Hessian):
+    '''Non-relativistic UHF hessian with density fitting'''
+
+    partial_hess_elec = partial_hess_elec
+    make_h1 = make_h1
+
+
+if __name__ == '__main__':
+    from pyscf import gto
+    from pyscf import scf
+
+    mol = gto.Mole()
+    mol.verbose = 0
+    mol.output = None
+    mol.atom = [
+        [1 , (1. ,  0.     , 0.000)],
+        [1 , (0. ,  1.     , 0.000)],
+        [1 , (0. , -1.517  , 1.177)],
+        [1 , (0. ,  1.517  , 1.177)] ]
+    mol.basis = '631g'
+    mol.unit = 'B'
+    mol.spin = 2
+    mol.build()
+    mf = scf.UHF(mol).density_fit()
+    mf.conv_tol = 1e-14
+    mf.scf()
+    n3 = mol.natm * 3
+    hobj = Hessian(mf)
+    e2 = hobj.kernel().transpose(0,2,1,3).reshape(n3,n3)
+    print(lib.finger(e2))
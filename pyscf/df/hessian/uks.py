@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Non-relativistic UKS analytical Hessian with density fitting
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.grad import uhf as uhf_grad
+from pyscf.hessian import uks as uks_hess
+from pyscf.df.hessian import uhf as df_uhf_hess
+
+
+def partial_hess_elec(hessobj, mo_energy=None, mo_coeff=None, mo_occ=None,
+                      atmlst=None, max_memory=4000, verbose=None):
+    log = logger.new_logger(hessobj, verbose)
+    time0 = (time.clock(), time.time())
+
+    mol = hessobj.mol
+    mf = hessobj.base
+    if mo_energy is None: mo_energy = mf.mo_energy
+    if mo_occ is None:    mo_occ = mf.mo_occ
+    if mo_coeff is None:  mo_coeff = mf.mo_coeff
+    if atmlst is None: atmlst = range(mol.natm)
+
+    if mf.nlc != '':
+        raise NotImplementedError
+    omega, alpha, hyb = mf._numint.rsh_and_hybrid_coeff(mf.xc, spin=mol.spin)
+    if abs(omega) > 1e-10:
+        raise NotImplementedError('DF Hessian for range-separated functionals')
+    with_k = abs(hyb) > 1e-10
+
+    de2, ej, ek = df_uhf_hess._partial_hess_ejk(hessobj, mo_energy, mo_coeff,
+                                                mo_occ, atmlst, max_memory,
+                                                verbose, with_k)
+    de2 += ej
+    if with_k:
+        de2 -= hyb * ek
+
+    mocca = mo_coeff[0][:,mo_occ[0]>0]
+    moccb = mo_coeff[1][:,mo_occ[1]>0]
+    dm0a = numpy.dot(mocca, mocca.T)
+    dm0b = numpy.dot(moccb, moccb.T)
+
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, mf.max_memory*.9-mem_now)
+    veffa_diag, veffb_diag = uks_hess._get_vxc_diag(hessobj, mo_coeff, mo_occ, max_memory)
+    vxca, vxcb = uks_hess._get_vxc_deriv2(hessobj, mo_coeff, mo_occ, max_memory)
+    aoslices = mol.aoslice_by_atom()
+    exc = numpy.zeros_like(de2)
+    for i0, ia in enumerate(atmlst):
+        shl0, shl1, p0, p1 = aoslices[ia]
+        exc[i0,i0] += numpy.einsum('xypq,pq->xy', veffa_diag[:,:,p0:p1], dm0a[p0:p1])*2
+        exc[i0,i0] += numpy.einsum('xypq,pq->xy', veffb_diag[:,:,p0:p1], dm0b[p0:p1])*2
+        for j0, ja in enumerate(atmlst[:i0+1]):
+            q0, q1 = aoslices[ja][2:]
+            exc[i0,j0] += numpy.einsum('xypq,pq->xy', vxca[ia][:,:,q0:q1], dm0a[q0:q1])*2
+            exc[i0,j0] += numpy.einsum('xypq,pq->xy', vxcb[ia][:,:,q0:q1], dm0b[q0:q1])*2
+        for j0 in range(i0):
+            exc[j0,i0] = exc[i0,j0].T
+    de2 += exc
+
+    log.timer('UKS partial hessian', *time0)
+    return de2
+
+def make_h1(hessobj, mo_coeff, mo_occ, chkfile=None, atmlst=None, verbose=None):
+    mol = hessobj.mol
+    if atmlst is None:
+        atmlst = range(mol.natm)
+    hcore_deriv = uhf_grad.Gradients(hessobj.base).hcore_generator(mol)
+
+    mf = hessobj.base
+    ni = mf._numint
+    ni.libxc.test_deriv_order(mf.xc, 2, raise_error=True)
+    omega, alpha, hyb = ni.rsh_and_hybrid_coeff(mf.xc, spin=mol.spin)
+    if abs(omega) > 1e-10:
+        raise NotImplementedError('DF Hessian for range-separated functionals')
+    with_k = abs(hyb) > 1e-10
+
+    mem_now = lib.current_memory()[0]
+    max_memory = max(2000, mf.max_memory*.9-mem_now)
+    h1aoa, h1aob = uks_hess._get_vxc_deriv1(hessobj, mo_coeff, mo_occ, max_memory)
+    vj1, vk1a, vk1b = df_uhf_hess._gen_jk(hessobj, mo_coeff, mo_occ, atmlst,
+                                          verbose, with_k)
+    for i0, ia in enumerate(atmlst):
+        h1 = hcore_deriv(ia) + vj1[i0]
+        h1aoa[ia] += h1
+        h1aob[ia] += h1
+        if with_k:
+            h1aoa[ia] -= hyb * vk1a[i0]
+            h1aob[ia] -= hyb * vk1b[i0]
+
+    if chkfile is None:
+        return h1aoa, h1aob
+    else:
+        for ia in atmlst:
+            lib.chkfile.save(chkfile, 'scf_f1ao/0/%d'%ia, h1aoa[ia])
+            lib.chkfile.save(chkfile, 'scf_f1ao/1/%d'%ia, h1aob[ia])
+        return chkfile
+
+
+class Hessian(uks_hess.Hessian):
+    '''Non-relativistic UKS hessian with density fitting'''
+
+    partial_hess_elec = partial_hess_elec
+    make_h1 = make_h1
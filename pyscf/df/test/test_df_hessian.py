@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import gto, scf, dft, lib
+from pyscf.df import hessian as df_hess
+
+mol = gto.Mole()
+mol.verbose = 5
+mol.output = '/dev/null'
+mol.atom.extend([
+    ["O" , (0. , 0.     , 0.)],
+    [1   , (0. , -0.757 , 0.587)],
+    [1   , (0. , 0.757  , 0.587)] ])
+mol.basis = '631g'
+mol.build()
+
+mf = scf.RHF(mol).density_fit()
+mf.conv_tol = 1e-14
+mf.kernel()
+
+mol1 = mol.copy()
+mol1.charge = 1
+mol1.spin = 1
+mol1.build(0, 0)
+
+def tearDownModule():
+    global mol, mf, mol1
+    mol.stdout.close()
+    del mol, mf, mol1
+
+class KnownValues(unittest.TestCase):
+    def test_make_h1(self):
+        hobj = mf.Hessian()
+        self.assertTrue(isinstance(hobj, df_hess.rhf.Hessian))
+        h1 = hobj.make_h1(mf.mo_coeff, mf.mo_occ)
+
+        dm0 = mf.make_rdm1()
+        def get_fock(coords):
+            pmol = mol.set_geom_(coords, unit='Bohr', inplace=False)
+            mf1 = scf.RHF(pmol).density_fit()
+            return mf1.get_hcore() + mf1.get_veff(pmol, dm0)
+        coords = mol.atom_coords()
+        coords[1,2] += 1e-4
+        f1 = get_fock(coords)
+        coords[1,2] -= 2e-4
+        f2 = get_fock(coords)
+        self.assertAlmostEqual(abs(h1[1][2] - (f1-f2)/2e-4).max(), 0, 7)
+
+    def test_finite_diff_df_rhf_hess(self):
+        hess = mf.Hessian().kernel()
+        self.assertAlmostEqual(lib.finger(hess), -0.7280534400527146, 6)
+
+        def energy(coords):
+            pmol = mol.set_geom_(coords, unit='Bohr', inplace=False)
+            return scf.RHF(pmol).density_fit().run(conv_tol=1e-14).e_tot
+        coords0 = mol.atom_coords()
+        e2 = numpy.empty(4)
+        for k, (s1, s2) in enumerate(((1,1), (1,-1), (-1,1), (-1,-1))):
+            coords = coords0.copy()
+            coords[0,2] += s1 * 1e-3
+            coords[1,1] += s2 * 1e-3
+            e2[k] = energy(coords)
+        ref = (e2[0] - e2[1] - e2[2] + e2[3]) / 4e-6
+        self.assertAlmostEqual(hess[0,1,2,1], ref, 5)
+
+    def test_finite_diff_df_uhf_hess(self):
+        umf = scf.UHF(mol1).density_fit().run(conv_tol=1e-14)
+        hobj = umf.Hessian()
+        self.assertTrue(isinstance(hobj, df_hess.uhf.Hessian))
+        hess = hobj.kernel()
+        self.assertAlmostEqual(lib.finger(hess), -0.7733533401632748, 6)
+
+        ref = scf.UHF(mol1).run(conv_tol=1e-14).Hessian().kernel()
+        self.assertAlmostEqual(abs(hess - ref).max(), 0, 3)
+
+        def energy(coords):
+            pmol = mol1.set_geom_(coords, unit='Bohr', inplace=False)
+            return scf.UHF(pmol).density_fit().run(conv_tol=1e-14).e_tot
+        coords0 = mol1.atom_coords()
+        e2 = numpy.empty(4)
+        for k, (s1, s2) in enumerate(((1,1), (1,-1), (-1,1), (-1,-1))):
+            coords = coords0.copy()
+            coords[0,2] += s1 * 1e-3
+            coords[1,1] += s2 * 1e-3
+            e2[k] = energy(coords)
+        ref = (e2[0] - e2[1] - e2[2] + e2[3]) / 4e-6
+        self.assertAlmostEqual(hess[0,1,2,1], ref, 5)
+
+    def test_uhf_make_h1(self):
+        umf = scf.UHF(mol1).density_fit().run(conv_tol=1e-14)
+        h1a, h1b = umf.Hessian().make_h1(umf.mo_coeff, umf.mo_occ)
+
+        dm0 = umf.make_rdm1()
+        def get_fock(coords):
+            pmol = mol1.set_geom_(coords, unit='Bohr', inplace=False)
+            mf1 = scf.UHF(pmol).density_fit()
+            return mf1.get_hcore() + mf1.get_veff(pmol, dm0)
+        coords = mol1.atom_coords()
+        coords[1,2] += 1e-4
+        f1 = get_fock(coords)
+        coords[1,2] -= 2e-4
+        f2 = get_fock(coords)
+        self.assertAlmostEqual(abs(h1a[1][2] - (f1[0]-f2[0])/2e-4).max(), 0, 7)
+        self.assertAlmostEqual(abs(h1b[1][2] - (f1[1]-f2[1])/2e-4).max(), 0, 7)
+
+    def test_uks_partial_hess(self):
+        from pyscf.hessian import uks as uks_hess
+        umf = dft.UKS(mol1).density_fit().run(xc='lda,vwn', conv_tol=1e-12)
+        hobj = umf.Hessian()
+        self.assertTrue(isinstance(hobj, df_hess.uks.Hessian))
+        e2 = hobj.partial_hess_elec(umf.mo_energy, umf.mo_coeff, umf.mo_occ)
+        ref = uks_hess.Hessian(umf).partial_hess_elec(umf.mo_energy, umf.mo_coeff,
+                                                       umf.mo_occ)
+        self.assertAlmostEqual(abs(e2 - ref).max(), 0, 3)
+
+        # Without the XC functional, UKS reduces to UHF
+        umf = dft.UKS(mol1).density_fit().run(xc='hf', conv_tol=1e-14)
+        self.assertAlmostEqual(lib.finger(umf.Hessian().kernel()), -0.7733533401632748, 6)
+
+if __name__ == "__main__":
+    print("Full Tests for DF Hessian")
+    unittest.main()
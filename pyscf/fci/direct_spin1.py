@@ -340,6 +340,75 @@ def make_rdm12(fcivec, norb, nelec, link_index=None, reorder=True):
         dm1, dm2 = rdm.reorder_rdm(dm1, dm2, inplace=True)
     return dm1, dm2
 
+def _stack_civecs(fcivecs, na, nb, weights=None):
+    '''Place nvec CI vectors side by side, ci[I,(n,J)] = fcivecs[n][I,J], to
+    form one vector of the enlarged (na, nvec*nb) CI space.  The weights are
+    absorbed as sqrt(w[n]).
+    '''
+    nvec = len(fcivecs)
+    ci = numpy.empty((na,nvec,nb))
+    for i, c in enumerate(fcivecs):
+        if weights is None:
+            ci[:,i] = c.reshape(na,nb)
+        else:
+            ci[:,i] = c.reshape(na,nb) * numpy.sqrt(weights[i])
+    return ci.reshape(na,nvec*nb)
+
+def _stack_link_index(link_indexb, nvec):
+    '''Block-diagonal beta link table for the CI vectors stacked by
+    :func:`_stack_civecs`.  The beta excitations do not couple different
+    vectors, the alpha link table is unchanged.
+    '''
+    nb = link_indexb.shape[0]
+    link_index = numpy.empty((nvec,)+link_indexb.shape, dtype=link_indexb.dtype)
+    for i in range(nvec):
+        link_index[i] = link_indexb
+        link_index[i,:,:,2] += i * nb
+    return link_index.reshape((nvec*nb,)+link_indexb.shape[1:])
+
+def _sa_link_index(norb, nelec, link_index, nvec):
+    if link_index is None:
+        neleca, nelecb = _unpack_nelec(nelec)
+        link_indexa = cistring.gen_linkstr_index(range(norb), neleca)
+        link_indexb = cistring.gen_linkstr_index(range(norb), nelecb)
+    else:
+        link_indexa, link_indexb = link_index
+    return link_indexa, _stack_link_index(link_indexb, nvec)
+
+def make_sa_rdm1s(fcivecs, weights, norb, nelec, link_index=None):
+    '''Weighted sum of the spin separated 1-particle density matrices of
+    several CI vectors, sum_n w[n] * make_rdm1s(fcivecs[n]).
+
+    The CI vectors are stacked into one vector of an enlarged CI space which
+    is passed to the density matrix kernel once.  Weights must not be
+    negative.
+    '''
+    link_indexa, link_indexb = _sa_link_index(norb, nelec, link_index,
+                                              len(fcivecs))
+    na = link_indexa.shape[0]
+    nb = link_indexb.shape[0] // len(fcivecs)
+    ci = _stack_civecs(fcivecs, na, nb, weights)
+    return make_rdm1s(ci, norb, nelec, (link_indexa, link_indexb))
+
+def make_sa_rdm1(fcivecs, weights, norb, nelec, link_index=None):
+    '''Weighted sum of the spin-traced 1-particle density matrices of several
+    CI vectors.  See also :func:`make_sa_rdm1s`
+    '''
+    rdm1a, rdm1b = make_sa_rdm1s(fcivecs, weights, norb, nelec, link_index)
+    return rdm1a + rdm1b
+
+def make_sa_rdm12(fcivecs, weights, norb, nelec, link_index=None, reorder=True):
+    '''Weighted sum of the spin-traced 1- and 2-particle density matrices of
+    several CI vectors, sum_n w[n] * make_rdm12(fcivecs[n]), in one pass over
+    the link tables.  See also :func:`make_sa_rdm1s`
+    '''
+    link_indexa, link_indexb = _sa_link_index(norb, nelec, link_index,
+                                              len(fcivecs))
+    na = link_indexa.shape[0]
+    nb = link_indexb.shape[0] // len(fcivecs)
+    ci = _stack_civecs(fcivecs, na, nb, weights)
+    return make_rdm12(ci, norb, nelec, (link_indexa, link_indexb), reorder)
+
 def trans_rdm1s(cibra, ciket, norb, nelec, link_index=None):
     r'''Spin separated transition 1-particle density matrices.
     The return values include two density matrices: (alpha,alpha), (beta,beta).
@@ -483,6 +552,20 @@ def kernel_ms1(fci, h1e, eri, norb, nelec, ci0=None, link_index=None,
         hc = fci.contract_2e(h2e, c, norb, nelec, (link_indexa,link_indexb))
         return hc.ravel()
 
+    if (nroots > 1 and getattr(fci.contract_2e, '__func__', None) is
+        getattr(FCISolver.contract_2e, '__func__', FCISolver.contract_2e)):
+        # Davidson passes the trial vectors of all roots together.  They are
+        # contracted with the Hamiltonian in one call on the stacked CI space.
+        def hop_batch(xs):
+            if len(xs) == 1:
+                return [hop(xs[0])]
+            nvec = len(xs)
+            ci = _stack_civecs(xs, na, nb)
+            link_index = (link_indexa, _stack_link_index(link_indexb, nvec))
+            hc = contract_2e(h2e, ci, norb, nelec, link_index)
+            return [x.ravel() for x in hc.reshape(na,nvec,nb).transpose(1,0,2)]
+        hop.batch = hop_batch
+
     if ci0 is None:
         if callable(getattr(fci, 'get_init_guess', None)):
             ci0 = lambda: fci.get_init_guess(norb, nelec, nroots, hdiag)
@@ -703,9 +786,11 @@ class FCISolver(lib.StreamObject):
             self.converged = True
             return scipy.linalg.eigh(op)
 
+        aop = getattr(op, 'batch', None)
+        if aop is None:
+            aop = lambda xs: [op(x) for x in xs]
         self.converged, e, ci = \
-                lib.davidson1(lambda xs: [op(x) for x in xs],
-                              x0, precond, lessio=self.lessio, **kwargs)
+                lib.davidson1(aop, x0, precond, lessio=self.lessio, **kwargs)
         if kwargs['nroots'] == 1:
             self.converged = self.converged[0]
             e = e[0]
@@ -122,6 +122,37 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(numpy.linalg.norm(dm1), 242.33237916212, 10)
         self.assertAlmostEqual(numpy.linalg.norm(dm2), 581.11055963403, 10)
 
+    def test_sa_rdm12(self):
+        w = [.3, .7]
+        dm1, dm2 = fci.direct_spin1.make_sa_rdm12([ci2, ci3], w, norb, neleci)
+        ref1 = ref2 = 0
+        for wi, c in zip(w, [ci2, ci3]):
+            r1, r2 = fci.direct_spin1.make_rdm12(c, norb, neleci)
+            ref1 += wi * r1
+            ref2 += wi * r2
+        self.assertAlmostEqual(abs(dm1 - ref1).max(), 0, 9)
+        self.assertAlmostEqual(abs(dm2 - ref2).max(), 0, 9)
+
+        dm1a, dm1b = fci.direct_spin1.make_sa_rdm1s([ci2, ci3], w, norb, neleci)
+        ref = [fci.direct_spin1.make_rdm1s(c, norb, neleci) for c in (ci2, ci3)]
+        self.assertAlmostEqual(abs(dm1a - w[0]*ref[0][0] - w[1]*ref[1][0]).max(), 0, 9)
+        self.assertAlmostEqual(abs(dm1b - w[0]*ref[0][1] - w[1]*ref[1][1]).max(), 0, 9)
+
+    def test_kernel_nroots_batch(self):
+        sol = fci.direct_spin1.FCI(mol)
+        sol.davidson_only = True
+        sol.nroots = 3
+        e, c = sol.kernel(h1e, g2e, norb, neleci)
+        # contract_2e overridden: trial vectors are contracted one by one
+        class Solver(fci.direct_spin1.FCISolver):
+            def contract_2e(self, *args, **kwargs):
+                return fci.direct_spin1.FCISolver.contract_2e(self, *args, **kwargs)
+        sol = Solver(mol)
+        sol.davidson_only = True
+        sol.nroots = 3
+        eref, cref = sol.kernel(h1e, g2e, norb, neleci)
+        self.assertAlmostEqual(abs(e - eref).max(), 0, 9)
+
     def test_trans_rdm1(self):
         dm1ref = fci.direct_spin0.trans_rdm1(ci0, ci1, norb, mol.nelectron)
         dm1 = fci.direct_spin1.trans_rdm1(ci0, ci1, norb, nelec)
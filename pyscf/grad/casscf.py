@@ -26,6 +26,7 @@ J. Comput. Chem., 5, 589
 import time
 from functools import reduce
 import numpy
+import scipy.linalg
 from pyscf import lib
 from pyscf import ao2mo
 from pyscf.lib import logger
@@ -115,6 +116,148 @@ def kernel(mc, mo_coeff=None, ci=None, atmlst=None, mf_grad=None,
     de += mf_grad.grad_nuc(mol, atmlst)
     return de
 
+def kernel_df(mc, mo_coeff=None, ci=None, atmlst=None, mf_grad=None,
+              verbose=None):
+    '''Nuclear gradients of DF-CASSCF (see mcscf.DFCASSCF), including the
+    derivatives of the auxiliary basis and the DF metric.
+
+    For state-averaged CASSCF, this is the gradient of the averaged energy.
+
+    With the densities of CASSCF confined in the occupied orbitals, the
+    fitting coefficients are only needed for the (occ,occ) MO pairs.  The
+    derivative integrals int3c2e_ip1/int3c2e_ip2 are evaluated in blocks of
+    auxiliary shells within mc.max_memory.
+    '''
+    from pyscf import gto
+    from pyscf.df import addons as df_addons
+    if mo_coeff is None: mo_coeff = mc.mo_coeff
+    if ci is None: ci = mc.ci
+    # Only the one-electron derivatives of mf_grad are used
+    if mf_grad is None: mf_grad = rhf_grad.Gradients(mc._scf)
+    if mc.frozen is not None:
+        raise NotImplementedError
+    log = logger.new_logger(mc, verbose)
+    t0 = (time.clock(), time.time())
+
+    mol = mc.mol
+    with_df = mc.with_df
+    ncore = mc.ncore
+    ncas = mc.ncas
+    nocc = ncore + ncas
+    nelecas = mc.nelecas
+    nao, nmo = mo_coeff.shape
+
+    mo_occ = mo_coeff[:,:nocc]
+    mo_core = mo_coeff[:,:ncore]
+    mo_cas = mo_coeff[:,ncore:nocc]
+
+    casdm1, casdm2 = mc.fcisolver.make_rdm12(ci, ncas, nelecas)
+
+# gfock = Generalized Fock, Adv. Chem. Phys., 69, 63
+    dm_core = numpy.dot(mo_core, mo_core.T) * 2
+    dm_cas = reduce(numpy.dot, (mo_cas, casdm1, mo_cas.T))
+    aapa = with_df.ao2mo((mo_cas, mo_cas, mo_occ, mo_cas), compact=False)
+    aapa = aapa.reshape(ncas,ncas,nocc,ncas)
+    vj, vk = mc.get_jk(mol, (dm_core, dm_cas))
+    h1 = mc.get_hcore()
+    vhf_c = vj[0] - vk[0] * .5
+    vhf_a = vj[1] - vk[1] * .5
+    gfock = reduce(numpy.dot, (mo_occ.T, h1 + vhf_c + vhf_a, mo_occ)) * 2
+    gfock[:,ncore:nocc] = reduce(numpy.dot, (mo_occ.T, h1 + vhf_c, mo_cas, casdm1))
+    gfock[:,ncore:nocc] += numpy.einsum('uviw,vuwt->it', aapa, casdm2)
+    dme0 = reduce(numpy.dot, (mo_occ, (gfock+gfock.T)*.5, mo_occ.T))
+    aapa = vj = vk = vhf_c = vhf_a = h1 = gfock = None
+    dm1 = dm_core + dm_cas
+
+    auxmol = getattr(with_df, 'auxmol', None)
+    if auxmol is None:
+        auxmol = df_addons.make_auxmol(mol, with_df.auxbasis)
+    pmol = gto.mole.conc_mol(mol, auxmol)
+    naux = auxmol.nao_nr()
+    auxslices = auxmol.aoslice_by_atom()
+    max_memory = mc.max_memory - lib.current_memory()[0]
+    blksize = int(max_memory*.9e6/8 / (nao**2*7))
+    blksize = max(blksize, max(auxmol.ao_loc[1:] - auxmol.ao_loc[:-1]))
+
+# Fitting coefficients c[P,ij] = (P|Q)^{-1} (Q|ij) for occupied MO pairs
+    int2c = auxmol.intor('int2c2e', aosym='s1')
+    bocc = numpy.empty((naux,nocc,nocc))
+    for b0, b1, nf in _shell_prange(auxmol, 0, auxmol.nbas, blksize):
+        q0 = auxmol.ao_loc[b0]
+        shls_slice = (0, mol.nbas, 0, mol.nbas, mol.nbas+b0, mol.nbas+b1)
+        int3c = pmol.intor('int3c2e', aosym='s1', shls_slice=shls_slice)
+        bocc[q0:q0+nf] = lib.einsum('ijP,ip,jq->Ppq', int3c, mo_occ, mo_occ)
+        int3c = None
+    cocc = scipy.linalg.solve(int2c, bocc.reshape(naux,-1), sym_pos=True)
+    cocc = cocc.reshape(naux,nocc,nocc)
+    bocc = int2c = None
+    t0 = log.timer_debug1('DF-CASSCF grad fitting coefficients', *t0)
+
+# gocc[P,ij] = sum_kl Gamma[ij,kl] c[P,kl] for the DF-CASSCF energy
+# E2 = 1/2 sum Gamma[ij,kl] (ij|kl)
+    dmc_mo = numpy.zeros((nocc,nocc))
+    dmc_mo[numpy.arange(ncore),numpy.arange(ncore)] = 2
+    dma_mo = numpy.zeros((nocc,nocc))
+    dma_mo[ncore:,ncore:] = casdm1
+    rhoc = numpy.einsum('pij,ij->p', cocc, dmc_mo)
+    rhoa = numpy.einsum('pij,ij->p', cocc, dma_mo)
+    gocc = numpy.einsum('p,ij->pij', rhoc+rhoa, dmc_mo)
+    gocc += numpy.einsum('p,ij->pij', rhoc, dma_mo)
+    tmp = lib.einsum('ij,pjk->pik', dmc_mo, cocc)
+    gocc -= lib.einsum('pik,kl->pil', tmp, dmc_mo+dma_mo) * .5
+    tmp = lib.einsum('ij,pjk->pik', dma_mo, cocc)
+    gocc -= lib.einsum('pik,kl->pil', tmp, dmc_mo) * .5
+    tmp = None
+    gocc[:,ncore:,ncore:] += lib.einsum('tuvw,pvw->ptu', casdm2,
+                                        cocc[:,ncore:,ncore:])
+    metric = numpy.dot(cocc.reshape(naux,-1), gocc.reshape(naux,-1).T)
+    cocc = None
+
+    if atmlst is None:
+        atmlst = range(mol.natm)
+    aoslices = mol.aoslice_by_atom()
+    de = numpy.zeros((mol.natm,3))
+
+    int2c_ip1 = auxmol.intor('int2c2e_ip1', comp=3)
+    metric = metric + metric.T
+    for ia in range(mol.natm):
+        p0, p1 = auxslices[ia,2:]
+        de[ia] += numpy.einsum('xpq,pq->x', int2c_ip1[:,p0:p1], metric[p0:p1]) * .5
+    int2c_ip1 = metric = None
+
+    for b0, b1, nf in _shell_prange(auxmol, 0, auxmol.nbas, blksize):
+        q0 = auxmol.ao_loc[b0]
+        q1 = q0 + nf
+        gao = lib.einsum('pij,ui,vj->puv', gocc[q0:q1], mo_occ, mo_occ)
+        shls_slice = (0, mol.nbas, 0, mol.nbas, mol.nbas+b0, mol.nbas+b1)
+        int3c = pmol.intor('int3c2e_ip1', comp=3, aosym='s1', shls_slice=shls_slice)
+        vi = numpy.einsum('xuvp,puv->xu', int3c, gao)
+        vi += numpy.einsum('xuvp,pvu->xu', int3c, gao)
+        int3c = pmol.intor('int3c2e_ip2', comp=3, aosym='s1', shls_slice=shls_slice)
+        vp = numpy.einsum('xuvp,puv->xp', int3c, gao)
+        int3c = gao = None
+        for ia in range(mol.natm):
+            p0, p1 = aoslices[ia,2:]
+            de[ia] -= vi[:,p0:p1].sum(axis=1)
+            p0, p1 = auxslices[ia,2:]
+            p0, p1 = max(p0, q0), min(p1, q1)
+            if p0 < p1:
+                de[ia] -= vp[:,p0-q0:p1-q0].sum(axis=1)
+    gocc = None
+    t0 = log.timer_debug1('DF-CASSCF grad 2e part', *t0)
+
+    de = de[atmlst]
+    hcore_deriv = mf_grad.hcore_generator(mol)
+    s1 = mf_grad.get_ovlp(mol)
+    for k, ia in enumerate(atmlst):
+        p0, p1 = aoslices[ia,2:]
+        h1ao = hcore_deriv(ia)
+        de[k] += numpy.einsum('xij,ij->x', h1ao, dm1)
+        de[k] -= numpy.einsum('xij,ij->x', s1[:,p0:p1], dme0[p0:p1]) * 2
+
+    de += mf_grad.grad_nuc(mol, atmlst)
+    return de
+
 def as_scanner(mcscf_grad):
     '''Generating a nuclear gradients scanner/solver (for geometry optimizer).
 
@@ -202,7 +345,11 @@ class Gradients(lib.StreamObject):
         if self.verbose >= logger.INFO:
             self.dump_flags()
 
-        self.de = kernel(self.base, mo_coeff, ci, atmlst, mf_grad, log)
+        from pyscf.mcscf import df as mc_df
+        if isinstance(self.base, mc_df._DFCASSCF):
+            self.de = kernel_df(self.base, mo_coeff, ci, atmlst, mf_grad, log)
+        else:
+            self.de = kernel(self.base, mo_coeff, ci, atmlst, mf_grad, log)
         log.timer('CASSCF gradients', *cput0)
         self._finalize()
         return self.de
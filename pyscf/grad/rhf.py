@@ -50,14 +50,17 @@ def grad_elec(mf_grad, mo_energy=None, mo_coeff=None, mo_occ=None, atmlst=None):
     if atmlst is None:
         atmlst = range(mol.natm)
     aoslices = mol.aoslice_by_atom()
+# nabla was applied on bra in vhf, *2 for the contributions of nabla|ket>.
+# The per-AO contributions are contracted once and summed over the AOs of
+# each atom.
+    de_ao = numpy.einsum('xij,ij->ix', vhf, dm0) * 2
+    de_ao-= numpy.einsum('xij,ij->ix', s1, dme0) * 2
     de = numpy.zeros((len(atmlst),3))
     for k, ia in enumerate(atmlst):
         p0, p1 = aoslices [ia,2:]
         h1ao = hcore_deriv(ia)
         de[k] += numpy.einsum('xij,ij->x', h1ao, dm0)
-# nabla was applied on bra in vhf, *2 for the contributions of nabla|ket>
-        de[k] += numpy.einsum('xij,ij->x', vhf[:,p0:p1], dm0[p0:p1]) * 2
-        de[k] -= numpy.einsum('xij,ij->x', s1[:,p0:p1], dme0[p0:p1]) * 2
+        de[k] += de_ao[p0:p1].sum(axis=0)
 
         de[k] += mf_grad.extra_force(ia, locals())
 
@@ -129,18 +132,49 @@ def hcore_generator(mf, mol=None):
 def get_ovlp(mol):
     return -mol.intor('int1e_ipovlp', comp=3)
 
-def get_jk(mol, dm):
+def get_jk(mol, dm, vhfopt=None):
     '''J = ((-nabla i) j| kl) D_lk
     K = ((-nabla i) j| kl) D_jk
+
+    Kwargs:
+        vhfopt : :class:`GradVHFOpt`
+            Shell-quartet screening for the derivative integrals.  See
+            :func:`make_vhfopt`.
     '''
     intor = mol._add_suffix('int2e_ip1')
     vj, vk = _vhf.direct_mapdm(intor,  # (nabla i,j|k,l)
                                's2kl', # ip1_sph has k>=l,
                                ('lk->s1ij', 'jk->s1il'),
                                dm, 3, # xyz, 3 components
-                               mol._atm, mol._bas, mol._env)
+                               mol._atm, mol._bas, mol._env, vhfopt=vhfopt)
     return -vj, -vk
 
+class GradVHFOpt(_vhf.VHFOpt):
+    '''Density weighted screening for the (nabla i j|kl) integrals.
+
+    q_cond[i,j] bounds both sqrt((nabla i j|nabla i j)) and sqrt((ij|ij)), so
+    that |(nabla i j|kl)| <= q_cond[i,j] * q_cond[k,l] (Schwarz inequality).
+    '''
+    def __init__(self, mol):
+        _vhf.VHFOpt.__init__(self, mol, 'int2e_ip1', 'CVHFnrs8_prescreen',
+                             None, 'CVHFsetnr_direct_scf_dm')
+        q_cond = _vhf.get_q_cond(mol)
+        q_ip1 = _vhf.get_q_cond(mol, 'int2e_ip1ip2')
+        self.set_q_cond(numpy.maximum(q_cond, q_ip1))
+
+    def set_dm(self, dm, atm, bas, env):
+        # CVHFsetnr_direct_scf_dm takes .5*(|D_ij|+|D_ji|) which can be smaller
+        # than max(|D_ij|,|D_ji|) for the non-symmetric density matrices used
+        # in response gradients.
+        dm = abs(numpy.asarray(dm))
+        dm = dm + dm.transpose(list(range(dm.ndim-2)) + [dm.ndim-1, dm.ndim-2])
+        _vhf.VHFOpt.set_dm(self, dm, atm, bas, env)
+
+def make_vhfopt(mol, direct_scf_tol=1e-13):
+    vhfopt = GradVHFOpt(mol)
+    vhfopt.direct_scf_tol = direct_scf_tol
+    return vhfopt
+
 def get_veff(mf_grad, mol, dm):
     '''NR Hartree-Fock Coulomb repulsion'''
     vj, vk = mf_grad.get_jk(mol, dm)
@@ -162,7 +196,8 @@ def as_scanner(mf_grad):
     The solver will automatically use the results of last calculation as the
     initial guess of the new calculation.  All parameters assigned in the
     nuc-grad object and SCF object (DIIS, conv_tol, max_memory etc) are
-    automatically applied in the solver.
+    automatically applied in the solver.  The keyword argument dm0 overwrites
+    the initial guess of the SCF calculation.
 
     Note scanner has side effects.  It may change many underlying objects
     (_scf, with_df, with_x2c, ...) during calculation.
@@ -190,7 +225,11 @@ def as_scanner(mf_grad):
                 mol = self.mol.set_geom_(mol_or_geom, inplace=False)
 
             mf_scanner = self.base
-            e_tot = mf_scanner(mol)
+            dm0 = kwargs.pop('dm0', None)
+            if dm0 is None:
+                e_tot = mf_scanner(mol)
+            else:
+                e_tot = mf_scanner(mol, dm0=dm0)
             self.mol = mol
             de = self.kernel(**kwargs)
             return e_tot, de
@@ -208,6 +247,7 @@ class Gradients(lib.StreamObject):
 
         self.atmlst = None
         self.de = None
+        self._vhfopt = None
         self._keys = set(self.__dict__.keys())
 
     def dump_flags(self):
@@ -236,8 +276,7 @@ class Gradients(lib.StreamObject):
         if mol is None: mol = self.mol
         if dm is None: dm = self.base.make_rdm1()
         cpu0 = (time.clock(), time.time())
-        #TODO: direct_scf opt
-        vj, vk = get_jk(mol, dm)
+        vj, vk = get_jk(mol, dm, self.get_vhfopt(mol))
         logger.timer(self, 'vj and vk', *cpu0)
         return vj, vk
 
@@ -246,14 +285,29 @@ class Gradients(lib.StreamObject):
         if dm is None: dm = self.base.make_rdm1()
         intor = mol._add_suffix('int2e_ip1')
         return -_vhf.direct_mapdm(intor, 's2kl', 'lk->s1ij', dm, 3,
-                                  mol._atm, mol._bas, mol._env)
+                                  mol._atm, mol._bas, mol._env,
+                                  vhfopt=self.get_vhfopt(mol))
 
     def get_k(self, mol=None, dm=None, hermi=0):
         if mol is None: mol = self.mol
         if dm is None: dm = self.base.make_rdm1()
         intor = mol._add_suffix('int2e_ip1')
         return -_vhf.direct_mapdm(intor, 's2kl', 'jk->s1il', dm, 3,
-                                  mol._atm, mol._bas, mol._env)
+                                  mol._atm, mol._bas, mol._env,
+                                  vhfopt=self.get_vhfopt(mol))
+
+    def get_vhfopt(self, mol=None):
+        '''Screening of derivative integrals, cached for the geometry of mol.
+        Returns None if screening is switched off (direct_scf=False).'''
+        if mol is None: mol = self.mol
+        if not getattr(self.base, 'direct_scf', True):
+            return None
+        key = (mol._bas.tobytes(), mol._env.tobytes())
+        cached = getattr(self, '_vhfopt', None)
+        if cached is None or cached[0] != key:
+            tol = getattr(self.base, 'direct_scf_tol', 1e-13)
+            self._vhfopt = (key, make_vhfopt(mol, tol))
+        return self._vhfopt[1]
 
     def get_veff(self, mol=None, dm=None):
         if mol is None: mol = self.mol
@@ -105,6 +105,22 @@ class KnownValues(unittest.TestCase):
         e2 = mcs(pmol.set_geom_('N 0 0 0; N 0 0 1.199; H 1 1 0; H 1 1 1.2'))
         self.assertAlmostEqual(g1[1,2], (e1-e2)/0.002*lib.param.BOHR, 4)
 
+    def test_df_casscf_grad(self):
+        def run(geom):
+            pmol = mol.copy().set_geom_(geom)
+            mf = scf.RHF(pmol).density_fit(auxbasis='weigend').run(conv_tol=1e-12)
+            mc = mcscf.DFCASSCF(mf, 4, 4).state_average_([.5, .5])
+            mc.conv_tol = 1e-11
+            return mc.run()
+        mc = run('N 0 0 0; N 0 0 1.2; H 1 1 0; H 1 1 1.2')
+        g1 = mc.nuc_grad_method().kernel()
+        self.assertAlmostEqual(abs(g1.sum(axis=0)).max(), 0, 9)
+        e1 = run('N 0 0 0; N 0 0 1.201; H 1 1 0; H 1 1 1.2').e_tot
+        e2 = run('N 0 0 0; N 0 0 1.199; H 1 1 0; H 1 1 1.2').e_tot
+        e1 = numpy.dot(e1, [.5, .5])
+        e2 = numpy.dot(e2, [.5, .5])
+        self.assertAlmostEqual(g1[1,2], (e1-e2)/0.002*lib.param.BOHR, 5)
+
 #    def test_frozen(self):
 #        mc = mcscf.CASSCF(mf, 4, 4).set(frozen=2).run()
 #        gscan = mc.nuc_grad_method().as_scanner()
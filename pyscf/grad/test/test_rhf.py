@@ -17,6 +17,7 @@ import unittest
 import numpy
 from pyscf import gto, scf, lib
 from pyscf import grad
+from pyscf.scf import _vhf
 
 mol = gto.Mole()
 mol.verbose = 5
@@ -108,6 +109,38 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(g[0,2], (e2-e1)/0.002*lib.param.BOHR, 6)
 
 
+    def test_get_jk_screened(self):
+        mf = scf.RHF(mol)
+        g = mf.nuc_grad_method()
+        vhfopt = g.get_vhfopt()
+        numpy.random.seed(1)
+        nao = mol.nao_nr()
+        dm = numpy.random.random((2,nao,nao)) - .5
+        dm[0] = dm[0] + dm[0].T
+        vj0, vk0 = grad.rhf.get_jk(mol, dm)
+        vj1, vk1 = grad.rhf.get_jk(mol, dm, vhfopt)
+        self.assertAlmostEqual(abs(vj0-vj1).max(), 0, 9)
+        self.assertAlmostEqual(abs(vk0-vk1).max(), 0, 9)
+        self.assertTrue(g.get_vhfopt() is vhfopt)
+
+        mol1 = mol.set_geom_(mol.atom_coords() + .1, unit='Bohr',
+                             inplace=False)
+        self.assertTrue(g.get_vhfopt(mol1) is not vhfopt)
+
+    def test_ip1ip2_q_cond(self):
+        q_cond = _vhf.get_q_cond(mol, 'int2e_ip1ip2')
+        ref = numpy.empty((mol.nbas,mol.nbas))
+        for i in range(mol.nbas):
+            for j in range(mol.nbas):
+                buf = gto.getints_by_shell('int2e_ip1ip2_sph', (i,j,i,j),
+                                           mol._atm, mol._bas, mol._env, 9)
+                di, dj = buf.shape[1:3]
+                buf = buf[[0,4,8]].reshape(3,di*dj,di*dj)
+                ref[i,j] = numpy.sqrt(abs(numpy.einsum('xpp->xp', buf)).max())
+        ref = numpy.maximum(ref, ref.T)
+        self.assertAlmostEqual(abs(q_cond - ref).max(), 0, 9)
+
+
 if __name__ == "__main__":
     print("Full Tests for RHF Gradients")
     unittest.main()
@@ -20,10 +20,17 @@
 Parsers for basis set in the NWChem format
 '''
 
+import os
 import re
+import copy
+from collections import OrderedDict
 import numpy
 import scipy.linalg
 from pyscf.data.elements import _std_symbol
+from pyscf import __config__
+
+# Number of the parsed basis/ECP of elements to be kept in memory
+CACHE_SIZE = getattr(__config__, 'gto_basis_parse_nwchem_cache_size', 512)
 
 MAXL = 10
 SPDF = ('S', 'P', 'D', 'F', 'G', 'H', 'I', 'K', 'L', 'M')
@@ -41,6 +48,9 @@ MAPSPDF = {'S': 0,
 
 BASIS_SET_DELIMITER = re.compile('# *BASIS SET.*\n')
 ECP_DELIMITER = re.compile('\n *ECP *\n')
+_BASIS_SET_DELIMITER_B = re.compile(BASIS_SET_DELIMITER.pattern.encode())
+_ECP_DELIMITER_B = re.compile(ECP_DELIMITER.pattern.encode())
+_TOKEN_B = re.compile(br'\S+')
 
 def parse(string, symb=None, optimize=True):
     '''Parse the basis text which is in NWChem format. Return an internal
@@ -97,7 +107,8 @@ def parse(string, symb=None, optimize=True):
     return _parse(bastxt, optimize)
 
 def load(basisfile, symb, optimize=True):
-    return _parse(search_seg(basisfile, symb), optimize)
+    key = ('basis', _file_key(basisfile), _std_symbol(symb), optimize)
+    return _cached(key, lambda: _parse(search_seg(basisfile, symb), optimize))
 
 def parse_ecp(string, symb=None):
     if symb is not None:
@@ -128,17 +139,19 @@ def parse_ecp(string, symb=None):
     return _parse_ecp(ecptxt)
 
 def load_ecp(basisfile, symb):
-    return _parse_ecp(search_ecp(basisfile, symb))
+    key = ('ecp', _file_key(basisfile), _std_symbol(symb))
+    return _cached(key, lambda: _parse_ecp(search_ecp(basisfile, symb)))
 
 def search_seg(basisfile, symb):
     symb = _std_symbol(symb)
-    with open(basisfile, 'r') as fin:
-        fdata = re.split(BASIS_SET_DELIMITER, fin.read())
-    dat = _search_seg(fdata, symb)
-    if dat is None:
+    index = _file_index(basisfile)
+    if symb not in index[0]:
         return []
-    else:
-        return [x.upper() for x in dat.splitlines() if x and 'END' not in x]
+    start, end = index[0][symb]
+    with open(basisfile, 'rb') as fin:
+        fin.seek(start)
+        dat = fin.read(end-start).decode()
+    return [x.upper() for x in dat.splitlines() if x and 'END' not in x]
 
 def _search_seg(raw_data, symb):
     for dat in raw_data:
@@ -148,16 +161,12 @@ def _search_seg(raw_data, symb):
 
 def search_ecp(basisfile, symb):
     symb = _std_symbol(symb)
-    with open(basisfile, 'r') as fin:
-        fdata = re.split(ECP_DELIMITER, fin.read())
-    if len(fdata) <= 1:
+    index = _file_index(basisfile)
+    fdata = index[1]
+    if symb not in index[2]:
         return []
 
-    fdata = fdata[1].splitlines()
-    for i, dat in enumerate(fdata):
-        dat0 = dat.split(None, 1)
-        if dat0 and dat0[0] == symb:
-            break
+    i = index[2][symb]
     seg = []
     for dat in fdata[i:]:
         dat = dat.strip().upper()
@@ -168,6 +177,62 @@ def search_ecp(basisfile, symb):
                 seg.append(dat)
     return []
 
+# {path: (file key, {symb: (start, end)}, ECP lines, {symb: line number})}
+_FILE_INDEX = {}
+# LRU cache {(type, file key, symb, ...): parsed basis or ECP}
+_PARSED_CACHE = OrderedDict()
+
+def _file_key(basisfile):
+    stat = os.stat(basisfile)
+    return (os.path.abspath(basisfile), stat.st_mtime, stat.st_size)
+
+def _file_index(basisfile):
+    '''The byte offsets of the basis segment and the ECP lines for each
+    element in the basis file.  The file is scanned once, then the basis of
+    other elements are read from the offsets.
+    '''
+    key = _file_key(basisfile)
+    index = _FILE_INDEX.get(key[0])
+    if index is not None and index[0] == key:
+        return index[1:]
+
+    with open(basisfile, 'rb') as fin:
+        raw = fin.read()
+
+    seg_index = {}
+    bounds = [0]
+    for m in _BASIS_SET_DELIMITER_B.finditer(raw):
+        bounds.extend([m.start(), m.end()])
+    bounds.append(len(raw))
+    for start, end in zip(bounds[::2], bounds[1::2]):
+        m = _TOKEN_B.search(raw, start, end)
+        if m is not None:
+            seg_index.setdefault(m.group().decode(), (start, end))
+
+    ecp_lines = []
+    ecp_index = {}
+    fdata = _ECP_DELIMITER_B.split(raw, 2)
+    if len(fdata) > 1:
+        ecp_lines = fdata[1].decode().splitlines()
+        for i, dat in enumerate(ecp_lines):
+            dat0 = dat.split(None, 1)
+            if dat0:
+                ecp_index.setdefault(dat0[0], i)
+
+    _FILE_INDEX[key[0]] = (key, seg_index, ecp_lines, ecp_index)
+    return seg_index, ecp_lines, ecp_index
+
+def _cached(key, fparse):
+    '''Return a copy of the parsed basis from the LRU cache'''
+    if key in _PARSED_CACHE:
+        val = _PARSED_CACHE.pop(key)
+    else:
+        val = fparse()
+    _PARSED_CACHE[key] = val
+    while len(_PARSED_CACHE) > CACHE_SIZE:
+        _PARSED_CACHE.popitem(last=False)
+    return copy.deepcopy(val)
+
 
 def convert_basis_to_nwchem(symb, basis):
     '''Convert the internal basis format to NWChem format string'''
@@ -21,8 +21,12 @@ import ctypes
 import numpy
 from pyscf import lib
 from pyscf.gto.moleintor import make_loc
+from pyscf import __config__
 
 BLKSIZE = 128 # needs to be the same to lib/gto/grid_ao_drv.c
+# Shells are screened in eval_gto_blocks if the radial part of all primitive
+# functions are smaller than this value in a block of grids
+CUTOFF = getattr(__config__, 'gto_eval_gto_cutoff', 1e-15)
 
 libcgto = lib.load_library('libcgto')
 
@@ -127,6 +131,133 @@ def eval_gto(mol, eval_name, coords,
             ao = ao[0]
     return ao
 
+def eval_gto_blocks(mol, eval_name, coords, comp=None, shls_slice=None,
+                    blksize=BLKSIZE*64, cutoff=CUTOFF, dtype=numpy.double,
+                    sort_coords=True):
+    r'''A generator to evaluate AO function values on a large number of
+    points block by block.
+
+    The points are sorted spatially then split into blocks.  For each block
+    of :data:`BLKSIZE` points, the shells whose radial functions are smaller
+    than cutoff in the region of the points are skipped.
+
+    Args:
+        eval_name : str
+            See :func:`eval_gto`
+        coords : 2D array, shape (N,3)
+            The coordinates of the points.
+
+    Kwargs:
+        comp : int
+            Number of the components of the operator
+        shls_slice : 2-element list
+            (shl_start, shl_end).  See :func:`eval_gto`
+        blksize : int
+            Number of points in each block.
+        cutoff : float
+            Threshold of AO values to screen the shells.
+        dtype : numpy.dtype
+            The data type of the output.  Using numpy.float32 halves the
+            memory footprint of the output.
+        sort_coords : bool
+            Whether to sort the points spatially to improve the efficiency of
+            screening.
+
+    Yields:
+        idx : 1D int array
+            Indices of the points (in coords) of the block.
+        ao : 2D array of shape (len(idx),nao) or 3D array of shape
+            (\*,len(idx),nao)
+            AO values on the points of the block.
+
+    Examples:
+
+    >>> mol = gto.M(atom='O 0 0 0; H 0 0 1; H 0 1 0', basis='ccpvdz')
+    >>> coords = numpy.random.random((100000,3)) * 10
+    >>> ao = numpy.empty((100000,mol.nao), dtype=numpy.float32)
+    >>> for idx, ao_blk in eval_gto_blocks(mol, 'GTOval', coords,
+    ...                                    dtype=numpy.float32):
+    ...     ao[idx] = ao_blk
+    '''
+    eval_name, comp = _get_intor_and_comp(mol, eval_name, comp)
+    coords = numpy.asarray(coords, dtype=numpy.double)
+    ngrids = len(coords)
+    blksize = max(BLKSIZE, blksize//BLKSIZE*BLKSIZE)
+    if sort_coords and ngrids > BLKSIZE:
+        order = _sort_coords(coords)
+    else:
+        order = numpy.arange(ngrids)
+
+    if shls_slice is None:
+        shls_slice = (0, mol.nbas)
+    ao_loc = make_loc(mol._bas, eval_name)
+    shl_rad = _shell_radius(mol, _deriv_order(eval_name), cutoff)
+    shl_coords = mol.atom_coords()[mol._bas[:,0]]
+
+    for p0, p1 in lib.prange(0, ngrids, blksize):
+        idx = order[p0:p1]
+        c = numpy.asarray(coords[idx], order='F')
+        non0tab = _make_screen_index(c, shl_coords, shl_rad)
+        ao = eval_gto(mol, eval_name, c, comp, shls_slice, non0tab, ao_loc)
+        if ao.dtype != dtype and ao.dtype.kind == numpy.dtype(dtype).kind:
+            ao = ao.astype(dtype)
+        yield idx, ao
+
+def _sort_coords(coords):
+    '''Order the points by the boxes they belong to.  The box size is
+    chosen so that each box has about BLKSIZE points.'''
+    cmin = coords.min(axis=0)
+    box = coords.max(axis=0) - cmin
+    box[box < 1e-9] = 1e-9
+    h = (box.prod() * BLKSIZE / len(coords)) ** (1./3)
+    box_id = ((coords - cmin) / h).astype(numpy.int64)
+    nx, ny, nz = box_id.max(axis=0) + 1
+    return numpy.argsort((box_id[:,0] * ny + box_id[:,1]) * nz + box_id[:,2],
+                         kind='mergesort')
+
+def _deriv_order(eval_name):
+    if 'deriv' in eval_name:
+        return int(eval_name.split('deriv')[1][0])
+    elif '_ipsp' in eval_name:
+        return 2
+    elif '_ip' in eval_name or '_ig' in eval_name or '_sp' in eval_name:
+        return 1
+    else:
+        return 0
+
+def _shell_radius(mol, deriv=0, cutoff=CUTOFF):
+    '''Estimate the radius of each shell beyond which the (derivatives of)
+    radial part of all primitive functions are smaller than cutoff.'''
+    rad = numpy.zeros(mol.nbas)
+    for ib in range(mol.nbas):
+        l = mol.bas_angular(ib) + deriv
+        es = mol.bas_exp(ib)
+        cs = abs(mol._libcint_ctr_coeff(ib)).sum(axis=1)
+        cs *= numpy.maximum(es*2, 1)**deriv
+        # Solve c r^l exp(-a r^2) = cutoff iteratively
+        r = numpy.ones_like(es) * 2
+        for i in range(4):
+            r = numpy.sqrt(numpy.maximum(
+                numpy.log(cs/cutoff) + l * numpy.log(r), 0) / es) + 1e-3
+        rad[ib] = r.max()
+    return rad
+
+def _make_screen_index(coords, shl_coords, shl_rad):
+    '''non0tab for each block of BLKSIZE points'''
+    ngrids = len(coords)
+    nblk = (ngrids+BLKSIZE-1) // BLKSIZE
+    pad = nblk * BLKSIZE - ngrids
+    if pad > 0:
+        coords = numpy.vstack((coords, numpy.repeat(coords[-1:], pad, axis=0)))
+    coords = coords.reshape(nblk, BLKSIZE, 3)
+    cmin = coords.min(axis=1)
+    cmax = coords.max(axis=1)
+    center = (cmin + cmax) * .5
+    blk_rad = numpy.linalg.norm(cmax - cmin, axis=1) * .5
+    dist = numpy.linalg.norm(center[:,None,:] - shl_coords, axis=2)
+    non0tab = dist - blk_rad[:,None] < shl_rad
+    return numpy.asarray(non0tab, dtype=numpy.int8, order='C')
+
 def _get_intor_and_comp(mol, eval_name, comp=None):
     if not ('_sph' in eval_name or '_cart' in eval_name or
             '_spinor' in eval_name):
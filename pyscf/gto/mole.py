@@ -24,6 +24,7 @@ import gc
 import time
 import json
 import ctypes
+import collections
 import numpy
 import h5py
 import scipy.special
@@ -35,6 +36,7 @@ from pyscf.lib import logger
 from pyscf.gto import cmd_args
 from pyscf.gto import basis
 from pyscf.gto import moleintor
+from pyscf.gto import shell_pairs
 from pyscf.gto.eval_gto import eval_gto
 from pyscf.gto import ecp
 from pyscf import __config__
@@ -907,6 +909,7 @@ def copy(mol):
     newmol._bas    = numpy.copy(mol._bas)
     newmol._env    = numpy.copy(mol._env)
     newmol._ecpbas = numpy.copy(mol._ecpbas)
+    newmol._intor_cache = collections.OrderedDict()
 
     newmol.atom    = copy.deepcopy(mol.atom)
     newmol._atom   = copy.deepcopy(mol._atom)
@@ -951,7 +954,8 @@ def unpack(moldic):
 def dumps(mol):
     '''Serialize Mole object to a JSON formatted str.
     '''
-    exclude_keys = set(('output', 'stdout', '_keys'))
+    exclude_keys = set(('output', 'stdout', '_keys', '_intor_cache',
+                        '_shell_pairs'))
     nparray_keys = set(('_atm', '_bas', '_env', '_ecpbas'))
 
     moldic = dict(mol.__dict__)
@@ -1048,6 +1052,49 @@ def loads(molstr):
         mol.symm_orb = symm_orb
     return mol
 
+def dumpb(mol):
+    '''Serialize Mole object to the binary format of :mod:`lib.serialize`.
+    Unlike :func:`dumps`, the arrays (_atm, _bas, _env, symm_orb, ...) are
+    stored as raw data.
+    '''
+    exclude_keys = set(('output', 'stdout', '_keys', '_intor_cache',
+                        '_shell_pairs'))
+    moldic = dict(mol.__dict__)
+    for k in exclude_keys:
+        moldic.pop(k, None)
+    moldic['atom'] = repr(mol.atom)
+    moldic['basis']= repr(mol.basis)
+    moldic['ecp' ] = repr(mol.ecp)
+    try:
+        return lib.serialize.dumps(moldic)
+    except TypeError:
+        import warnings
+        for k, v in list(moldic.items()):
+            try:
+                lib.serialize.dumps(v)
+            except TypeError:
+                msg =('Function mol.dumpb drops attribute %s because '
+                      'it is not serializable' % k)
+                warnings.warn(msg)
+                del(moldic[k])
+        return lib.serialize.dumps(moldic)
+
+def loadb(buf):
+    '''Deserialize a buffer generated by :func:`dumpb` to a Mole object.
+    '''
+    from numpy import array  # for eval function
+    moldic = lib.serialize.loads(buf, copy=True)
+    mol = Mole()
+    mol.__dict__.update(moldic)
+    mol.atom = eval(mol.atom)
+    mol.basis= eval(mol.basis)
+    mol.ecp  = eval(mol.ecp)
+    mol._atm = numpy.asarray(mol._atm, dtype=numpy.int32)
+    mol._bas = numpy.asarray(mol._bas, dtype=numpy.int32)
+    mol._env = numpy.asarray(mol._env, dtype=numpy.double)
+    mol._ecpbas = numpy.asarray(mol._ecpbas, dtype=numpy.int32)
+    return mol
+
 
 def len_spinor(l, kappa):
     '''The number of spinor associated with given angular momentum and kappa.  If kappa is 0,
@@ -1765,6 +1812,14 @@ class Mole(lib.StreamObject):
             It is needed by pyscf.prop module and submodules.
         cart : boolean
             Using Cartesian GTO basis and integrals (6d,10f,15g)
+        intor_cache_size : int
+            Memory (in MB) to cache the one-electron integrals computed by
+            :func:`Mole.intor`.  The cached integrals are looked up with the
+            integral name and arguments and the libcint arguments
+            (_atm, _bas, _env), so that any change of geometry, basis or the
+            global settings like common origin, rinv origin or range
+            separation parameter leads to a new calculation.  Default is 0
+            (no cache).
 
         ** Following attributes are generated by :func:`Mole.build` **
 
@@ -1843,6 +1898,9 @@ class Mole(lib.StreamObject):
     # Using cartesian GTO (6d,10f,15g)
     cart = getattr(__config__, 'gto_mole_Mole_cart', False)
 
+    # Memory (MB) to cache one-electron integrals. 0 to disable the cache
+    intor_cache_size = getattr(__config__, 'gto_mole_Mole_intor_cache_size', 0)
+
     def __init__(self, **kwargs):
         self.output = None
         self.max_memory = param.MAX_MEMORY
@@ -1883,6 +1941,8 @@ class Mole(lib.StreamObject):
         self._basis = {}
         self._ecp = {}
         self._built = False
+        self._intor_cache = collections.OrderedDict()
+        self._shell_pairs = None
 
         # _pseudo is created to make the mol object consistenet with the mol
         # object converted from Cell.to_mol(). It is initialized in the
@@ -1891,7 +1951,8 @@ class Mole(lib.StreamObject):
         # contents of _pseudo.
         self._pseudo = {}
 
-        keys = set(('verbose', 'unit', 'cart', 'incore_anyway'))
+        keys = set(('verbose', 'unit', 'cart', 'incore_anyway',
+                    'intor_cache_size'))
         self._keys = set(self.__dict__.keys()).union(keys)
         self.__dict__.update(kwargs)
 
@@ -1971,6 +2032,14 @@ class Mole(lib.StreamObject):
         self.__dict__.update(loads(molstr).__dict__)
         return self
 
+    dumpb = dumpb
+    @lib.with_doc(loadb.__doc__)
+    def loadb(self, buf):
+        return loadb(buf)
+    def loadb_(self, buf):
+        self.__dict__.update(loadb(buf).__dict__)
+        return self
+
     def build(self, dump_input=True, parse_arg=True,
               verbose=None, output=None, max_memory=None,
               atom=None, basis=None, unit=None, nucmod=None, ecp=None,
@@ -2118,6 +2187,8 @@ class Mole(lib.StreamObject):
         self._atm, self._bas, self._env = \
                 self.make_env(self._atom, self._basis, env, self.nucmod,
                               self.nucprop)
+        self._intor_cache = collections.OrderedDict()
+        self._shell_pairs = None
         self._atm, self._ecpbas, self._env = \
                 self.make_ecp_env(self._atm, self._ecp, self._env)
 
@@ -2502,6 +2573,12 @@ Note when symmetry attributes is assigned, the molecule needs to be placed in a
     def set_geom_(self, atoms_or_coords, unit=None, symmetry=None,
                   inplace=True):
         '''Update geometry
+
+        If the atoms (and their order) are not changed and the point group
+        symmetry is not required, only the coordinates in :attr:`_atom` and
+        :attr:`_env` are updated.  The basis, ECP and the other parts of
+        :attr:`_atm`, :attr:`_bas` and :attr:`_env` are kept.  Otherwise the
+        molecule is rebuilt.
         '''
         import copy
         if inplace:
@@ -2522,20 +2599,32 @@ Note when symmetry attributes is assigned, the molecule needs to be placed in a
         else:
             mol.atom = atoms_or_coords
 
-        if isinstance(atoms_or_coords, numpy.ndarray) and not symmetry:
-            mol._atom = mol.atom
-
-            if isinstance(unit, (str, unicode)):
-                if unit.upper().startswith(('B', 'AU')):
-                    unit = 1.
-                else: #unit[:3].upper() == 'ANG':
-                    unit = 1./param.BOHR
-            else:
-                unit = 1./unit
+        coords = None
+        if not symmetry and mol._built:
+            if isinstance(atoms_or_coords, numpy.ndarray):
+                if isinstance(unit, (str, unicode)):
+                    if unit.upper().startswith(('B', 'AU')):
+                        coords = atoms_or_coords * 1.
+                    else: #unit[:3].upper() == 'ANG':
+                        coords = atoms_or_coords / param.BOHR
+                else:
+                    coords = atoms_or_coords / unit
+                _atom = list(zip([x[0] for x in mol._atom], coords.tolist()))
+            elif not (isinstance(mol.atom, (str, unicode)) and
+                      os.path.isfile(mol.atom)):
+                _atom = mol.format_atom(mol.atom, unit=unit)
+                if [a[0] for a in _atom] == [a[0] for a in mol._atom]:
+                    coords = numpy.asarray([a[1] for a in _atom]).reshape(-1,3)
+
+        mol._intor_cache = collections.OrderedDict()
+        mol._shell_pairs = None
+        if coords is not None:
+            # Geometry-only change
+            mol._atom = _atom
             ptr = mol._atm[:,PTR_COORD]
-            mol._env[ptr+0] = unit * atoms_or_coords[:,0]
-            mol._env[ptr+1] = unit * atoms_or_coords[:,1]
-            mol._env[ptr+2] = unit * atoms_or_coords[:,2]
+            mol._env[ptr+0] = coords[:,0]
+            mol._env[ptr+1] = coords[:,1]
+            mol._env[ptr+2] = coords[:,2]
         else:
             mol.symmetry = symmetry
             mol.build(False, False)
@@ -2904,9 +2993,47 @@ Note when symmetry attributes is assigned, the molecule needs to be placed in a
                 shls_slice = (0, self.nbas, 0, self.nbas)
         else:
             bas = self._bas
+
+        if (self.intor_cache_size > 0 and out is None and
+            intor.startswith(('int1e', 'ECP'))):
+            if shls_slice is not None:
+                shls_slice = tuple(shls_slice)
+            key = (intor, comp, hermi, aosym, shls_slice, self._atm.tobytes(),
+                   bas.tobytes(), self._env.tobytes())
+            cache = self._intor_cache
+            if key in cache:
+                mat = cache.pop(key)
+            else:
+                mat = moleintor.getints(intor, self._atm, bas, self._env,
+                                        shls_slice, comp, hermi, aosym)
+            cache[key] = mat
+            nbytes = sum(x.nbytes for x in cache.values())
+            while nbytes > self.intor_cache_size * 1e6:
+                nbytes -= cache.popitem(last=False)[1].nbytes
+            return mat.copy()
+
         return moleintor.getints(intor, self._atm, bas, self._env,
                                  shls_slice, comp, hermi, aosym, out=out)
 
+    def shell_pairs(self):
+        '''Shell-pair data (overlap estimates, Gaussian product centers and
+        exponents, Schwarz bounds) of the current geometry.  See
+        :class:`gto.shell_pairs.ShellPairs`.
+
+        The data are computed once and shared by all integral drivers until
+        the geometry or the basis is changed.
+
+        Examples:
+
+        >>> mol.build(atom='H 0 0 0; Cl 0 0 1.1', basis='cc-pvdz')
+        >>> mol.shell_pairs().pair_list(1e-10).shape
+        (36, 2)
+        '''
+        key = (self._atm.tobytes(), self._bas.tobytes(), self._env.tobytes())
+        if self._shell_pairs is None or self._shell_pairs[0] != key:
+            self._shell_pairs = (key, shell_pairs.make_shell_pairs(self))
+        return self._shell_pairs[1]
+
     def _add_suffix(self, intor, cart=None):
         if not (intor[:4] == 'cint' or
                 intor.endswith(('_sph', '_cart', '_spinor', '_ssc'))):
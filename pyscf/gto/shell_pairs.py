@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Shell-pair quantities which only depend on the geometry and the basis set.
+They are computed once per geometry (see :meth:`Mole.shell_pairs`) and
+shared by the integral drivers.
+'''
+
+import numpy
+from pyscf.gto.moleintor import NPRIM_OF, NCTR_OF, PTR_EXP, PTR_COEFF
+
+PTR_COORD = 1
+ATOM_OF   = 0
+
+
+class ShellPairs(object):
+    '''Shell-pair data of a Mole object
+
+    Attributes:
+        ovlp_cond : 2D array, shape (nbas,nbas)
+            Estimated upper bound of the overlap |<i|j>| between the radial
+            parts of shells i and j, from the Gaussian products of all
+            primitive functions.
+        exponents : 2D array, shape (nbas,nbas)
+            Exponent of the most diffuse Gaussian product of shells i and j.
+        centers : 3D array, shape (nbas,nbas,3)
+            Center of the most diffuse Gaussian product of shells i and j.
+        q_cond : dict
+            Schwarz bounds sqrt(max|(ij|ij)|) (2D arrays of shape
+            (nbas,nbas)) indexed by the name of the two-electron integral.
+            They are filled by :func:`scf._vhf.get_q_cond` on demand.
+    '''
+    def __init__(self, atm, bas, env):
+        nbas = len(bas)
+        coords = env[atm[:,PTR_COORD,None] + numpy.arange(3)]
+        shl_coords = coords[bas[:,ATOM_OF]]
+
+        # The exponents and the contracted coefficients of all primitive
+        # functions, ordered by shells
+        nprim = bas[:,NPRIM_OF]
+        prim_loc = numpy.append(0, numpy.cumsum(nprim))
+        es = numpy.empty(prim_loc[-1])
+        cs = numpy.empty(prim_loc[-1])
+        for ib in range(nbas):
+            p0, p1 = prim_loc[ib], prim_loc[ib+1]
+            np, nc = nprim[ib], bas[ib,NCTR_OF]
+            es[p0:p1] = env[bas[ib,PTR_EXP]:bas[ib,PTR_EXP]+np]
+            c = env[bas[ib,PTR_COEFF]:bas[ib,PTR_COEFF]+np*nc]
+            cs[p0:p1] = abs(c.reshape(nc,np)).sum(axis=0)
+        prim_coords = numpy.repeat(shl_coords, nprim, axis=0)
+
+        ovlp_cond = numpy.empty((nbas,nbas))
+        for ib in range(nbas):
+            p0, p1 = prim_loc[ib], prim_loc[ib+1]
+            rr = numpy.einsum('px,px->p', prim_coords - shl_coords[ib],
+                              prim_coords - shl_coords[ib])
+            aij = es[p0:p1,None] + es
+            eij = numpy.exp(-es[p0:p1,None] * es / aij * rr)
+            sij = numpy.einsum('i,ip->p', cs[p0:p1],
+                               (numpy.pi/aij)**1.5 * eij) * cs
+            ovlp_cond[ib] = numpy.add.reduceat(sij, prim_loc[:-1])
+        self.ovlp_cond = ovlp_cond
+
+        emin = numpy.minimum.reduceat(es, prim_loc[:-1])
+        self.exponents = emin[:,None] + emin
+        self.centers = (numpy.einsum('i,ix->ix', emin, shl_coords)[:,None] +
+                        numpy.einsum('j,jx->jx', emin, shl_coords))
+        self.centers /= self.exponents[:,:,None]
+        self.q_cond = {}
+
+    def pair_list(self, cutoff=1e-14):
+        '''Indices (ish,jsh), ish >= jsh, of the significant shell pairs
+        whose estimated overlap is larger than cutoff.
+        '''
+        ish, jsh = numpy.tril_indices(len(self.ovlp_cond))
+        mask = self.ovlp_cond[ish,jsh] > cutoff
+        return numpy.asarray((ish[mask], jsh[mask])).T
+
+
+def make_shell_pairs(mol):
+    '''Shell-pair data of mol. See :class:`ShellPairs`'''
+    return ShellPairs(mol._atm, mol._bas, mol._env)
@@ -72,6 +72,33 @@ Li    S
         self.assertEqual(len(b[0][1:]), 3)
         self.assertEqual(len(b[1][1:]), 3)
 
+    def test_basis_load_cache(self):
+        b = gto.basis.load('ccpvtz', 'C')
+        b[0][1][0] = 0
+        self.assertEqual(gto.basis.load('ccpvtz', 'C'),
+                         gto.basis.parse_nwchem._parse(
+                             gto.basis.parse_nwchem.search_seg(
+                                 gto.basis.parse_nwchem.__file__.replace(
+                                     'parse_nwchem.py', 'cc-pvtz.dat'), 'C')))
+
+        ecp = gto.basis.load_ecp('def2-svp', 'Rb')
+        ecp[1][0][1][2][0][1] = 0
+        self.assertEqual(gto.basis.load_ecp('def2-svp', 'Rb'),
+                         gto.basis.parse_nwchem._parse_ecp(
+                             gto.basis.parse_nwchem.search_ecp(
+                                 gto.basis.parse_nwchem.__file__.replace(
+                                     'parse_nwchem.py', 'def2-svp.dat'), 'Rb')))
+
+        ftmp = tempfile.NamedTemporaryFile(mode='w')
+        ftmp.write('He    S\n     1.0     1.0\n')
+        ftmp.flush()
+        self.assertEqual(gto.basis.load(ftmp.name, 'He'), [[0, [1., 1.]]])
+        ftmp.seek(0)
+        ftmp.write('He    S\n     2.0     1.0\nHe    P\n     1.0     1.0\n')
+        ftmp.flush()
+        self.assertEqual(gto.basis.load(ftmp.name, 'He'),
+                         [[0, [2., 1.]], [1, [1., 1.]]])
+
     def test_basis_load_ecp(self):
         self.assertEqual(gto.basis.load_ecp(__file__, 'H'), [])
 
@@ -196,6 +196,32 @@ class KnownValues(unittest.TestCase):
                 dat = dat.reshape(3,3,di,dj)
                 self.assertAlmostEqual(abs(dat[:,2]-ref).max(), 0, 3)
 
+    def test_ecp_optimizer(self):
+        # Integrals computed with the ECP optimizer (mol.intor) should agree
+        # with the integrals evaluated without optimizer (intor_by_shell)
+        mol = gto.M(atom='''
+        Cu 0. 0. 0.
+        Na 0. 0. 2.4
+        H  1. 0. 0.
+        ''',
+                    basis={'Cu':'lanl2dz', 'Na':'lanl2dz', 'H':'sto3g'},
+                    ecp = {'Cu':'lanl2dz', 'Na':'lanl2dz'}, spin=1)
+        def by_shell(intor, comp=None):
+            return numpy.concatenate([
+                numpy.concatenate([mol.intor_by_shell(intor, (i,j), comp=comp)
+                                   for j in range(mol.nbas)], axis=-1)
+                for i in range(mol.nbas)], axis=-2)
+
+        dat = mol.intor('ECPscalar_sph')
+        self.assertAlmostEqual(abs(dat - by_shell('ECPscalar_sph')).max(), 0, 12)
+        dat = mol.intor('ECPscalar_cart')
+        self.assertAlmostEqual(abs(dat - by_shell('ECPscalar_cart')).max(), 0, 12)
+        for ia in range(2):
+            with mol.with_rinv_as_nucleus(ia):
+                dat = mol.intor('ECPscalar_iprinv_sph', comp=3)
+                ref = by_shell('ECPscalar_iprinv_sph', 3)
+            self.assertAlmostEqual(abs(dat - ref).max(), 0, 12)
+
     def test_pp_int(self):
         from pyscf import gto, scf
         from pyscf.pbc import gto as pbcgto
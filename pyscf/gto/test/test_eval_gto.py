@@ -69,6 +69,24 @@ class KnownValues(unittest.TestCase):
         self.assertEqual(val.shape, (3,100,70))
         self.assertAlmostEqual(lib.finger(val), -15.411590075004403, 9)
 
+    def test_eval_gto_blocks(self):
+        numpy.random.seed(2)
+        r = numpy.random.random((3000,3)) * 12 - 4
+        ref = mol.eval_gto('GTOval', r)
+        ao = numpy.zeros_like(ref)
+        for idx, blk in gto.eval_gto_blocks(mol, 'GTOval', r, blksize=512):
+            self.assertTrue(blk.shape[0] <= 512)
+            ao[idx] = blk
+        self.assertAlmostEqual(abs(ao - ref).max(), 0, 12)
+
+        ref = mol.eval_gto('GTOval_ip', r)
+        ao = numpy.zeros(ref.shape, dtype=numpy.float32)
+        for idx, blk in gto.eval_gto_blocks(mol, 'GTOval_ip', r,
+                                            dtype=numpy.float32):
+            self.assertEqual(blk.dtype, numpy.float32)
+            ao[:,idx] = blk
+        self.assertAlmostEqual(abs(ao - ref).max(), 0, 5)
+
 if __name__ == '__main__':
     print("Full Tests for eval_gto")
     unittest.main()
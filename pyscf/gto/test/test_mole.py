@@ -587,6 +587,71 @@ O    SP
         mol1.set_geom_(mol0.atom_coords(), unit=1.)
         mol1.set_geom_(mol0.atom_coords(), unit='Ang', inplace=False)
 
+        mol2 = mol1.set_geom_(mol0.atom_coords()*.5, unit='Ang', inplace=False)
+        self.assertTrue(mol2._bas is mol1._bas)
+        self.assertAlmostEqual(abs(mol2.atom_coords() - mol0.atom_coords()*.5/lib.param.BOHR).max(), 0, 12)
+        self.assertAlmostEqual(abs(numpy.array([a[1] for a in mol2._atom]) - mol2.atom_coords()).max(), 0, 12)
+        atom = [(a[0], numpy.array(a[1])+.1) for a in mol0._atom]
+        mol2 = mol1.set_geom_(atom, unit='B', inplace=False)
+        self.assertTrue(mol2._bas is mol1._bas)
+        self.assertAlmostEqual(abs(mol2.atom_coords() - mol0.atom_coords() - .1).max(), 0, 12)
+        mol2 = mol1.set_geom_(atom[1:]+atom[:1], unit='B', inplace=False)
+        self.assertTrue(mol2._bas is not mol1._bas)
+        self.assertEqual(mol2.atom_symbol(0), mol0.atom_symbol(1))
+
+    def test_intor_cache(self):
+        mol1 = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                     basis='ccpvdz', ecp={'O': 'lanl2dz'}, verbose=0)
+        ref = [mol1.intor('int1e_kin'), mol1.intor('int1e_r'),
+               mol1.intor('ECPscalar'), mol1.intor('int1e_ovlp', shls_slice=(0,3,2,5))]
+        mol1.intor_cache_size = 1
+        for i in range(2):
+            dat = [mol1.intor('int1e_kin'), mol1.intor('int1e_r'),
+                   mol1.intor('ECPscalar'), mol1.intor('int1e_ovlp', shls_slice=[0,3,2,5])]
+            for x, y in zip(dat, ref):
+                self.assertAlmostEqual(abs(x - y).max(), 0, 14)
+                x[:] = 0
+        self.assertEqual(len(mol1._intor_cache), 4)
+
+        with mol1.with_common_origin((0,0,1)):
+            r = mol1.intor('int1e_r')
+        self.assertAlmostEqual(abs(r[2] - ref[1][2] + mol1.intor('int1e_ovlp')).max(), 0, 12)
+
+        mol2 = mol1.set_geom_('O 0 0 0; H 0 .757 .6; H 0 -.757 .587', inplace=False)
+        kin = mol2.copy().set(intor_cache_size=0).intor('int1e_kin')
+        self.assertAlmostEqual(abs(mol2.intor('int1e_kin') - kin).max(), 0, 14)
+        self.assertTrue(abs(kin - ref[0]).max() > 1e-3)
+
+        mol1.intor_cache_size = 1e-3
+        mol1.intor('int1e_ipnuc')
+        self.assertEqual(len(mol1._intor_cache), 0)
+
+    def test_shell_pairs(self):
+        from pyscf.scf import _vhf
+        mol1 = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 20',
+                     basis='ccpvdz', verbose=0)
+        pairs = mol1.shell_pairs()
+        self.assertTrue(mol1.shell_pairs() is pairs)
+        s = abs(mol1.intor('int1e_ovlp'))
+        ao_loc = mol1.ao_loc_nr()
+        for i, j in [(0,1), (2,5), (3,9), (4,10), (6,9)]:
+            smax = s[ao_loc[i]:ao_loc[i+1],ao_loc[j]:ao_loc[j+1]].max()
+            self.assertTrue(smax <= pairs.ovlp_cond[i,j])
+        ij = pairs.pair_list(1e-10)
+        self.assertTrue(len(ij) < mol1.nbas*(mol1.nbas+1)//2)
+        self.assertTrue(numpy.all(ij[:,0] >= ij[:,1]))
+        self.assertAlmostEqual(abs(pairs.centers[1,1] - mol1.atom_coord(0)).max(), 0, 12)
+
+        q_cond = _vhf.get_q_cond(mol1)
+        self.assertTrue(pairs.q_cond['int2e_sph'] is q_cond)
+        eri = mol1.intor('int2e_sph', shls_slice=(4,5,2,3,4,5,2,3))
+        self.assertAlmostEqual(q_cond[4,2], numpy.sqrt(abs(eri).max()), 12)
+
+        mol2 = mol1.set_geom_('O 0 0 0; H 0 .757 .587; H 0 -.757 .587', inplace=False)
+        self.assertTrue(mol2.shell_pairs() is not pairs)
+        self.assertEqual(len(mol2.shell_pairs().pair_list(1e-10)),
+                         mol1.nbas*(mol1.nbas+1)//2)
+
     def test_apply(self):
         from pyscf import scf, mp
         self.assertTrue(isinstance(mol0.apply('RHF'), scf.rohf.ROHF))
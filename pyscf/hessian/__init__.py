@@ -18,6 +18,7 @@
 
 from pyscf.hessian import rhf
 from pyscf.hessian import uhf
+from pyscf.hessian import numerical
 from pyscf.hessian.rhf import Hessian as RHF
 from pyscf.hessian.uhf import Hessian as UHF
 from pyscf.hessian.rhf import hess_nuc
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Semi-numerical Hessian from the finite differences of analytical nuclear
+gradients.  It can be used with any method which provides the gradients
+scanner (SCF, MP2, CCSD, CASSCF, TDDFT, ...).
+
+Simple usage::
+
+    >>> from pyscf import gto, scf, cc
+    >>> from pyscf.hessian import numerical
+    >>> mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587', symmetry=True)
+    >>> mycc = cc.CCSD(scf.RHF(mol).run())
+    >>> h = numerical.Hessian(mycc.nuc_grad_method()).set(nproc=4).kernel()
+
+Only the symmetry-unique atoms (see symm.symm_identical_atoms) are displaced
+if the point group symmetry is enabled in mol.  The Hessian elements of the
+other atoms are generated by the symmetry operations.  The gradients of the
+displaced geometries are independent and are evaluated on a pool of
+processes.
+'''
+
+import time
+import numpy
+from pyscf import lib
+from pyscf import symm
+from pyscf.lib import logger
+from pyscf import __config__
+
+DISPLACEMENT = getattr(__config__, 'hessian_numerical_displacement', 5e-3)
+
+
+def kernel(hessobj, atmlst=None):
+    '''Hessian (natm,natm,3,3) from central differences of the gradients
+
+    Kwargs:
+        atmlst : list
+            The rows and columns of atmlst are returned.  The displacements
+            are generated for all symmetry-unique atoms.
+    '''
+    log = logger.new_logger(hessobj)
+    time0 = (time.clock(), time.time())
+    mol = hessobj.mol
+    natm = mol.natm
+    disp = hessobj.displacement
+
+    g_scanner = hessobj.base.as_scanner()
+    e0, g0 = g_scanner(mol)
+    log.debug('Reference energy %.15g', e0)
+    if not g_scanner.converged:
+        log.warn('Reference calculation not converged')
+    # Workers cannot write to the same chkfile
+    _remove_chkfile(g_scanner.base)
+
+    # The reference density matrix is used to extrapolate the initial guess
+    # of the displaced SCF calculations
+    mf = g_scanner.base
+    from pyscf.scf import hf
+    if isinstance(mf, hf.SCF):
+        dm0 = mf.make_rdm1()
+    else:
+        dm0 = None
+
+    ops, perms = symm_ops_and_perms(mol, hessobj.symmetry)
+    uniq_atms = symm_unique_atoms(mol, hessobj.symmetry)
+    log.info('Displace %d symmetry-unique atoms %s', len(uniq_atms), uniq_atms)
+
+    nproc = hessobj.nproc
+    if nproc is None:
+        nproc = lib.num_threads()
+    nproc = max(1, min(nproc, len(uniq_atms)*3))
+    nthreads = max(1, lib.num_threads() // nproc)
+    coords0 = mol.atom_coords()
+    # The displaced geometries should not be reoriented by the symmetry
+    # detection
+    mol_nosymm = mol.copy()
+    mol_nosymm.symmetry = False
+
+    def eval_displaced(task):
+        ia, x = task
+        coords = coords0.copy()
+        coords[ia,x] += disp
+        pmol = mol_nosymm.set_geom_(coords, unit='Bohr', inplace=False)
+        if dm0 is None:
+            e1, g1 = g_scanner(pmol)
+        else:
+            e1, g1 = g_scanner(pmol, dm0=dm0)
+        conv1 = g_scanner.converged
+
+        coords[ia,x] -= disp * 2
+        pmol = mol_nosymm.set_geom_(coords, unit='Bohr', inplace=False)
+        if dm0 is None:
+            e2, g2 = g_scanner(pmol)
+        else:
+            # D(-x) ~= 2 D(0) - D(+x)
+            dm1 = dm0 * 2 - g_scanner.base.make_rdm1()
+            e2, g2 = g_scanner(pmol, dm0=dm1)
+        conv2 = g_scanner.converged
+        return (g1 - g2) / (disp*2), conv1 and conv2
+
+    tasks = [(ia, x) for ia in uniq_atms for x in range(3)]
+    # The number of threads has to be set before the workers are forked.
+    # Resizing the OpenMP thread pool in a forked worker deadlocks.
+    threads_bak = lib.num_threads()
+    if nproc > 1:
+        lib.num_threads(nthreads)
+    try:
+        results = lib.process_map(eval_displaced, tasks, nproc)
+    finally:
+        lib.num_threads(threads_bak)
+
+    de = numpy.zeros((natm,natm,3,3))
+    for (ia, x), (dg, conv) in zip(tasks, results):
+        if not conv:
+            log.warn('Displaced calculation for atom %d coordinate %d '
+                     'not converged', ia, x)
+        de[ia,:,x] = dg
+
+    # de[perm[A],perm[C]] = R de[A,C] R^T
+    for ia in uniq_atms:
+        for op, perm in zip(ops, perms):
+            ib = perm[ia]
+            if ib != ia:
+                de[ib,perm] = lib.einsum('ij,cjk,lk->cil', op, de[ia], op)
+
+    de = (de + de.transpose(1,0,3,2)) * .5
+    if atmlst is not None:
+        de = de[atmlst][:,atmlst]
+    log.timer('Numerical hessian', *time0)
+    return de
+
+def _remove_chkfile(method):
+    objs = []
+    while method is not None and method not in objs:
+        objs.append(method)
+        if getattr(method, 'chkfile', None):
+            method.chkfile = None
+        method = getattr(method, '_scf', None)
+
+def symm_unique_atoms(mol, symmetry=True):
+    '''Indices of the symmetry-unique atoms'''
+    if not symmetry or not mol.symmetry:
+        return list(range(mol.natm))
+    eql_atoms = symm.symm_identical_atoms(mol.groupname, mol._atom)
+    return sorted([atoms[0] for atoms in eql_atoms])
+
+def symm_ops_and_perms(mol, symmetry=True):
+    '''The point group operations (3x3 matrices in the frame of mol) and the
+    permutations of atoms they generate: R r_A = r_perm[A]
+    '''
+    natm = mol.natm
+    if not symmetry or not mol.symmetry:
+        return [numpy.eye(3)], [numpy.arange(natm)]
+
+    gpname = mol.groupname
+    if gpname == 'Dooh':
+        gpname = 'D2h'
+    elif gpname == 'Coov':
+        gpname = 'C2v'
+    opdic = symm.geom.symm_ops(gpname)
+    coords = mol.atom_coords()
+    charges = mol.atom_charges()
+    ops = []
+    perms = []
+    for opname in symm.param.OPERATOR_TABLE[gpname]:
+        op = numpy.dot(numpy.eye(3), opdic[opname])
+        newc = numpy.dot(coords, op.T)
+        dist = numpy.linalg.norm(newc[:,None] - coords, axis=2)
+        perm = numpy.argmin(dist, axis=1)
+        if (dist[numpy.arange(natm),perm].max() > symm.geom.TOLERANCE or
+            numpy.any(charges[perm] != charges)):
+            raise RuntimeError('Symmetry operation %s of %s not found'
+                               % (opname, mol.groupname))
+        ops.append(op)
+        perms.append(perm)
+    return ops, perms
+
+
+class Hessian(lib.StreamObject):
+    '''Semi-numerical Hessian from the finite differences of the gradients
+
+    Attributes:
+        displacement : float
+            Step size (in Bohr) of the central differences.
+        nproc : int
+            Number of processes for the displaced gradients.  Default is the
+            number of OpenMP threads.  Each process uses
+            lib.num_threads()//nproc threads.
+        symmetry : bool
+            Whether to displace the symmetry-unique atoms only.  It takes
+            effect when mol.symmetry is enabled.
+    '''
+    def __init__(self, method_grad):
+        if hasattr(method_grad, 'nuc_grad_method'):
+            # Allow to input the method, e.g. CCSD, instead of the gradients
+            method_grad = method_grad.nuc_grad_method()
+        self.verbose = method_grad.verbose
+        self.stdout = method_grad.stdout
+        self.mol = method_grad.mol
+        self.base = method_grad
+        self.displacement = DISPLACEMENT
+        self.nproc = None
+        self.symmetry = True
+
+        self.de = numpy.zeros((0,0,3,3))  # (A,B,dR_A,dR_B)
+        self._keys = set(self.__dict__.keys())
+
+    def dump_flags(self):
+        log = logger.Logger(self.stdout, self.verbose)
+        log.info('\n')
+        log.info('******** %s for %s ********',
+                 self.__class__, self.base.__class__)
+        log.info('displacement = %g', self.displacement)
+        log.info('nproc = %s', self.nproc)
+        log.info('symmetry = %s', self.symmetry)
+        return self
+
+    def kernel(self, atmlst=None):
+        self.dump_flags()
+        self.de = kernel(self, atmlst)
+        return self.de
+    hess = kernel
+
+
+if __name__ == '__main__':
+    from pyscf import gto
+    from pyscf import scf
+    from pyscf import hessian
+    mol = gto.M(atom='O 0 0 0; H 0 .757 .587; H 0 -.757 .587',
+                basis='631g', symmetry=True, verbose=0)
+    mf = scf.RHF(mol).run(conv_tol=1e-12)
+    e2 = Hessian(mf.nuc_grad_method()).kernel()
+    e2ref = hessian.RHF(mf).kernel()
+    print(abs(e2 - e2ref).max())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+from pyscf import gto, scf, lib
+from pyscf import hessian
+from pyscf.hessian import numerical
+
+mol = gto.Mole()
+mol.verbose = 5
+mol.output = '/dev/null'
+mol.atom.extend([
+    ["O" , (0. , 0.     , 0.)],
+    [1   , (0. , -0.757 , 0.587)],
+    [1   , (0. , 0.757  , 0.587)] ])
+mol.basis = '631g'
+mol.symmetry = True
+mol.build()
+
+mf = scf.RHF(mol)
+mf.conv_tol = 1e-12
+mf.kernel()
+
+def tearDownModule():
+    global mol, mf
+    mol.stdout.close()
+    del mol, mf
+
+class KnownValues(unittest.TestCase):
+    def test_symm_unique_atoms(self):
+        self.assertEqual(numerical.symm_unique_atoms(mol), [0, 1])
+        ops, perms = numerical.symm_ops_and_perms(mol)
+        self.assertEqual(len(ops), 4)
+        coords = mol.atom_coords()
+        for op, perm in zip(ops, perms):
+            self.assertAlmostEqual(abs(coords.dot(op.T) - coords[perm]).max(), 0, 9)
+
+    def test_rhf_hess(self):
+        ref = hessian.RHF(mf).kernel()
+        hobj = numerical.Hessian(mf.nuc_grad_method())
+        hobj.nproc = 2
+        hess = hobj.kernel()
+        self.assertAlmostEqual(abs(hess - ref).max(), 0, 4)
+
+        hobj.symmetry = False
+        hess1 = hobj.kernel()
+        self.assertAlmostEqual(abs(hess1 - hess).max(), 0, 5)
+
+    def test_rhf_hess_omp_threads(self):
+        ref = hessian.RHF(mf).kernel()
+        threads_bak = lib.num_threads()
+        try:
+            lib.num_threads(4)
+            hobj = numerical.Hessian(mf.nuc_grad_method())
+            hobj.nproc = 2
+            hess = hobj.kernel()
+            self.assertEqual(lib.num_threads(), 4)
+        finally:
+            lib.num_threads(threads_bak)
+        self.assertAlmostEqual(abs(hess - ref).max(), 0, 4)
+
+if __name__ == "__main__":
+    print("Full Tests for numerical Hessian")
+    unittest.main()
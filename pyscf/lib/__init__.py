@@ -29,5 +29,6 @@ from pyscf.lib.misc import *
 from pyscf.lib.numpy_helper import *
 from pyscf.lib.linalg_helper import *
 from pyscf.lib import chkfile
+from pyscf.lib import serialize
 from pyscf.lib import diis
 from pyscf.lib.misc import StreamObject
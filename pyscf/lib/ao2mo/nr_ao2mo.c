@@ -745,10 +745,18 @@ static void s1_set0(double *eri, double *nop,
         } }
 }
 
+/* The integrals are scaled by the weight returned by fprescreen, see
+ * CVHFnr_skeleton_schwarz_cond */
 #define DISTR_INTS_BY(fcopy, fset0, istride) \
-        if ((*fprescreen)(shls, envs->vhfopt, envs->atm, envs->bas, envs->env) && \
+        if ((wt = (*fprescreen)(shls, envs->vhfopt, envs->atm, envs->bas, \
+                                envs->env)) && \
             (*intor)(buf, NULL, shls, envs->atm, envs->natm, \
                      envs->bas, envs->nbas, envs->env, envs->cintopt, NULL)) { \
+                if (wt > 1) { \
+                        for (n = 0; n < di*dj*dk*dl*envs->ncomp; n++) { \
+                                buf[n] *= wt; \
+                        } \
+                } \
                 pbuf = buf; \
                 for (icomp = 0; icomp < envs->ncomp; icomp++) { \
                         peri = eri + nao2 * nkl * icomp + ioff + ao_loc[jsh]; \
@@ -774,7 +782,7 @@ void AO2MOfill_nr_s1(int (*intor)(), int (*fprescreen)(),
         const int di = ao_loc[ish+1] - ao_loc[ish];
         const int ioff = ao_loc[ish] * nao;
         int kl, jsh, ksh, lsh, dj, dk, dl;
-        int icomp;
+        int icomp, n, wt;
         int shls[4];
         double *pbuf, *peri;
 
@@ -810,7 +818,7 @@ void AO2MOfill_nr_s2ij(int (*intor)(), int (*fprescreen)(),
         const int di = ao_loc[ish+1] - ao_loc[ish];
         const int ioff = ao_loc[ish] * (ao_loc[ish]+1) / 2;
         int kl, jsh, ksh, lsh, dj, dk, dl;
-        int icomp;
+        int icomp, n, wt;
         int shls[4];
         double *pbuf = buf;
         double *peri;
@@ -852,7 +860,7 @@ void AO2MOfill_nr_s2kl(int (*intor)(), int (*fprescreen)(),
         const int di = ao_loc[ish+1] - ao_loc[ish];
         const int ioff = ao_loc[ish] * nao;
         int kl, jsh, ksh, lsh, dj, dk, dl;
-        int icomp;
+        int icomp, n, wt;
         int shls[4];
         double *pbuf = buf;
         double *peri;
@@ -900,7 +908,7 @@ void AO2MOfill_nr_s4(int (*intor)(), int (*fprescreen)(),
         const int di = ao_loc[ish+1] - ao_loc[ish];
         const int ioff = ao_loc[ish] * (ao_loc[ish]+1) / 2;
         int kl, jsh, ksh, lsh, dj, dk, dl;
-        int icomp;
+        int icomp, n, wt;
         int shls[4];
         double *pbuf = buf;
         double *peri;
@@ -16,8 +16,11 @@
 # Author: Qiming Sun <osirpt.sun@gmail.com>
 #
 
+import os
 import json
+import numpy
 import h5py
+from pyscf.lib.misc import call_in_background
 
 def load(chkfile, key):
     '''Load array(s) from chkfile
@@ -46,28 +49,53 @@ def load(chkfile, key):
     >>> scfdat.keys()
     ['e_tot', 'mo_occ', 'mo_energy', 'mo_coeff']
     '''
-    def load_as_dic(key, group):
-        if key in group:
-            val = group[key]
-        elif key + '__from_list__' in group:
-            key = key + '__from_list__'
-            val = group[key]
-        else:
-            return None
-
-        if isinstance(val, h5py.Group):
-            if key.endswith('__from_list__'):
-                return [load_as_dic(k, val) for k in val]
-            else:
-                return dict([(k.replace('__from_list__', ''),
-                              load_as_dic(k, val)) for k in val])
-        else:
-            return val.value
+    writer = get_writer(chkfile)
+    if writer is not None:
+        return writer.load(key)
 
     with h5py.File(chkfile, 'r') as fh5:
-        return load_as_dic(key, fh5)
+        val = _load_as_dic(key, fh5)
+        if val is None:
+            # The link of a key managed by ChkfileWriter may be missing if
+            # the program was terminated when the link was being switched.
+            # Read the last complete slot then.
+            top, _, rest = key.partition('/')
+            slot = _last_good_slot(fh5, top)
+            if slot is not None:
+                val = _load_as_dic('/'.join((slot, rest)).rstrip('/'), fh5)
+        return val
 load_chkfile_key = load
 
+def _load_as_dic(key, group):
+    if key in group:
+        val = group[key]
+    elif key + '__from_list__' in group:
+        key = key + '__from_list__'
+        val = group[key]
+    else:
+        return None
+
+    if isinstance(val, h5py.Group):
+        if key.endswith('__from_list__'):
+            return [_load_as_dic(k, val) for k in val]
+        else:
+            return dict([(k.replace('__from_list__', ''),
+                          _load_as_dic(k, val)) for k in val])
+    else:
+        return val.value
+
+def _last_good_slot(fh5, top):
+    '''Name of the completely written slot of key top with the largest
+    commit id.'''
+    slot = None
+    commit = -1
+    for i in range(2):
+        name = _SLOT % (top, i)
+        if name in fh5 and fh5[name].attrs.get('commit', -1) > commit:
+            slot = name
+            commit = fh5[name].attrs['commit']
+    return slot
+
 def dump(chkfile, key, value):
     '''Save array(s) in chkfile
     
@@ -120,7 +148,10 @@ def dump(chkfile, key, value):
                 for k, v in enumerate(value):
                     save_as_group('%06d'%k, v, root1)
 
-    if h5py.is_hdf5(chkfile):
+    writer = get_writer(chkfile)
+    if writer is not None:
+        writer.dump(key, value)
+    elif h5py.is_hdf5(chkfile):
         with h5py.File(chkfile, 'r+') as fh5:
             if key in fh5:
                 del(fh5[key])
@@ -184,3 +215,348 @@ def save_mol(mol, chkfile):
     dump(chkfile, 'mol', mol.dumps())
 dump_mol = save_mol
 
+
+
+_SLOT = '%s__slot%d'
+# The ChkfileWriter objects which are currently attached to chkfiles
+_writers = {}
+
+def get_writer(chkfile):
+    '''The :class:`ChkfileWriter` attached to chkfile.  None if chkfile is
+    not managed by a writer.'''
+    if not _writers or not chkfile:
+        return None
+    return _writers.get(os.path.abspath(chkfile))
+
+def commit(chkfile):
+    '''Write the data staged in the :class:`ChkfileWriter` of chkfile to
+    disk in background.  Nothing is done if chkfile is not managed by a
+    writer.'''
+    writer = get_writer(chkfile)
+    if writer is not None:
+        writer.commit()
+
+class ChkfileWriter(object):
+    '''Keep the chkfile open and write data asynchronously.
+
+    When the writer is attached to a chkfile, :func:`dump` and :func:`load`
+    on that chkfile are redirected to the writer.  :func:`dump` only stages
+    the data in memory.  The staged data are written to the file in a
+    background thread when :meth:`commit` is called (or when a staged key is
+    dumped again, or when the writer is closed).
+
+    Each top-level key is stored in two alternating slots "key__slot0" and
+    "key__slot1".  The key itself is a soft link to the last completely
+    written slot, so that readers always see a consistent snapshot.  The
+    datasets of a slot are created in chunked layout and updated in place in
+    the next commits.  Datasets whose values were not changed since the
+    slot was written last time are skipped.
+
+    Args:
+        chkfile : str
+            Name of chkfile.
+
+    Examples:
+
+    >>> with lib.chkfile.ChkfileWriter('scf.chk'):
+    ...     for cycle in range(10):
+    ...         lib.chkfile.dump('scf.chk', 'scf/mo_coeff', mo_coeff)
+    ...         lib.chkfile.commit('scf.chk')
+    '''
+    def __init__(self, chkfile):
+        self.chkfile = os.path.abspath(chkfile)
+        if self.chkfile in _writers:
+            raise RuntimeError('chkfile %s is already opened by another '
+                               'ChkfileWriter' % chkfile)
+        if h5py.is_hdf5(chkfile):
+            self._fh5 = h5py.File(chkfile, 'r+')
+        else:
+            self._fh5 = h5py.File(chkfile, 'w')
+        # The latest values of the leaf datasets, grouped by the top-level
+        # key: {top: {path: value}}
+        self._records = {}
+        self._versions = {}
+        self._staged_keys = set()
+        self._staged_tops = set()
+        self._ncommit = 0
+        # The slot each top-level key points to and the versions of the
+        # datasets stored in each slot.  They are only accessed by the
+        # background thread after initialization.
+        self._slot = {}
+        self._slot_versions = {}
+        self._bg = call_in_background(self._write)
+        self._async_write = self._bg.__enter__()
+        _writers[self.chkfile] = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __contains__(self, key):
+        for top, path in self._locate(key.strip('/')):
+            prefixes = (path + '/', path + '__from_list__/')
+            if any(p == path or p.startswith(prefixes)
+                   for p in self._records[top]):
+                return True
+        return False
+
+    def _locate(self, key):
+        '''The records and the paths where key can be stored'''
+        top = key.split('/')[0]
+        for t in (top, top + '__from_list__'):
+            if t not in self._records:
+                self._import(t)
+            yield t, t + key[len(top):]
+
+    def dump(self, key, value):
+        '''Stage value for key.  See also :func:`dump`.'''
+        key = key.strip('/')
+        if key in self._staged_keys:
+            self.commit()
+
+        # Remove the old data of key.  The datasets which are dumped again
+        # with the same values keep their versions.
+        old = {}
+        for t, path in self._locate(key):
+            record = self._records[t]
+            prefixes = (path + '/', path + '__from_list__/')
+            for p in list(record):
+                if p == path or p.startswith(prefixes):
+                    old[p] = record.pop(p)
+                    self._staged_tops.add(t)
+
+        for p, val in _flatten(key, value):
+            t = p.split('/')[0]
+            if t not in self._records:
+                self._import(t)
+            record = self._records[t]
+            if p in old and _same_value(old[p], val):
+                record[p] = old.pop(p)
+            elif p in record and _same_value(record[p], val):
+                pass
+            else:
+                old.pop(p, None)
+                record[p] = _copy_value(val)
+                self._versions[p] = self._versions.get(p, 0) + 1
+            self._staged_tops.add(t)
+        for p in old:
+            self._versions[p] += 1
+        self._staged_keys.add(key)
+
+    def commit(self):
+        '''Write the staged data in background.'''
+        if not self._staged_tops:
+            return
+        self._ncommit += 1
+        snapshot = []
+        for top in self._staged_tops:
+            record = self._records[top]
+            snapshot.append((top, [(p, v, self._versions[p])
+                                   for p, v in record.items()]))
+        self._staged_keys = set()
+        self._staged_tops = set()
+        self._async_write(snapshot, self._ncommit)
+
+    def load(self, key):
+        '''Load key from the chkfile.  The staged data are committed first.
+        See also :func:`load`.'''
+        self.commit()
+        self._wait()
+        return _load_as_dic(key.strip('/'), self._fh5)
+
+    def close(self):
+        '''Commit the staged data, wait for the background writing and
+        detach the writer from the chkfile.'''
+        if self._fh5 is None:
+            return
+        try:
+            self.commit()
+            self._wait()
+        finally:
+            self._bg.__exit__(None, None, None)
+            self._fh5.close()
+            self._fh5 = None
+            del(_writers[self.chkfile])
+
+    def _wait(self):
+        handler = self._bg.handler
+        if handler is not None:
+            handler.join()
+            # Errors raised in the background thread are only reported in
+            # the next join()
+            handler.join()
+
+    def _import(self, top):
+        '''Load the existing data of top from the chkfile to the record.'''
+        self._wait()
+        fh5 = self._fh5
+        record = self._records[top] = {}
+        for i in range(2):
+            name = _SLOT % (top, i)
+            if name in fh5:
+                self._ncommit = max(self._ncommit,
+                                    fh5[name].attrs.get('commit', 0))
+
+        link = fh5.get(top, getlink=True)
+        if link is None:
+            src = _last_good_slot(fh5, top)
+        else:
+            src = top
+            if isinstance(link, h5py.SoftLink):
+                src = link.path.lstrip('/')
+        if src is None or src not in fh5:
+            return
+        for i in range(2):
+            if src == _SLOT % (top, i):
+                self._slot[top] = i
+
+        val = _load_as_dic(src, fh5)
+        if top.endswith('__from_list__'):
+            if isinstance(val, dict):
+                val = [val[k] for k in sorted(val)]
+            top = top[:-13]
+        for p, v in _flatten(top, val):
+            record[p] = v
+            self._versions[p] = self._versions.get(p, 0) + 1
+
+    def _write(self, snapshot, commit_id):
+        fh5 = self._fh5
+        for top, leaves in snapshot:
+            slot = self._slot.get(top)
+            if slot is None:
+                slot = 0
+            else:
+                slot = 1 - slot
+            name = _SLOT % (top, slot)
+            written = self._slot_versions.setdefault(name, {})
+
+            if not leaves:
+                if fh5.get(top, getlink=True) is not None:
+                    del(fh5[top])
+                for i in range(2):
+                    if _SLOT % (top, i) in fh5:
+                        del(fh5[_SLOT % (top, i)])
+                    self._slot_versions.pop(_SLOT % (top, i), None)
+                self._slot.pop(top, None)
+                fh5.flush()
+                continue
+
+            n = len(top)
+            if name in fh5:
+                fh5[name].attrs['commit'] = -1
+                fh5.flush()
+
+            if len(leaves) == 1 and leaves[0][0] == top:
+                # A dataset at the top level
+                path, val, version = leaves[0]
+                if written.get(path) != version:
+                    _write_leaf(fh5, name, val)
+                    written.clear()
+                    written[path] = version
+                obj = fh5[name]
+            else:
+                if name in fh5 and not isinstance(fh5[name], h5py.Group):
+                    del(fh5[name])
+                    written.clear()
+                obj = fh5.require_group(name)
+                paths = set(p for p, v, ver in leaves)
+                for p in list(written):
+                    if p not in paths:
+                        _delete_leaf(obj, p[n+1:])
+                        del(written[p])
+                for path, val, version in leaves:
+                    if written.get(path) != version:
+                        _write_leaf(obj, path[n+1:], val)
+                        written[path] = version
+            obj.attrs['commit'] = commit_id
+            fh5.flush()
+
+            if fh5.get(top, getlink=True) is not None:
+                del(fh5[top])
+            fh5[top] = h5py.SoftLink('/' + name)
+            fh5.flush()
+            self._slot[top] = slot
+
+class _EmptyGroup(object):
+    pass
+_EMPTY_GROUP = _EmptyGroup()
+
+def _flatten(key, value):
+    '''Split value into the leaf datasets, using the same HDF5 layout as
+    :func:`dump`'''
+    if isinstance(value, dict):
+        if not value:
+            yield key, _EMPTY_GROUP
+        for k in value:
+            for x in _flatten('%s/%s' % (key, k), value[k]):
+                yield x
+    elif isinstance(value, (tuple, list)):
+        if not value:
+            yield key + '__from_list__', _EMPTY_GROUP
+        for k, v in enumerate(value):
+            for x in _flatten('%s__from_list__/%06d' % (key, k), v):
+                yield x
+    elif value is _EMPTY_GROUP or isinstance(value, (str, bytes)):
+        yield key, value
+    else:
+        arr = numpy.asarray(value)
+        if arr.dtype == object:
+            for x in _flatten(key, list(value)):
+                yield x
+        else:
+            yield key, value
+
+def _same_value(v1, v2):
+    if v1 is _EMPTY_GROUP or v2 is _EMPTY_GROUP:
+        return v1 is v2
+    elif isinstance(v1, (str, bytes)) or isinstance(v2, (str, bytes)):
+        return type(v1) == type(v2) and v1 == v2
+    v1 = numpy.asarray(v1)
+    v2 = numpy.asarray(v2)
+    return (v1.dtype == v2.dtype and v1.shape == v2.shape and
+            numpy.array_equal(v1, v2))
+
+def _copy_value(value):
+    if value is _EMPTY_GROUP or isinstance(value, (str, bytes)):
+        return value
+    else:
+        return numpy.array(value, copy=True)
+
+def _write_leaf(group, path, value):
+    if value is _EMPTY_GROUP:
+        if path in group and not isinstance(group[path], h5py.Group):
+            del(group[path])
+        group.require_group(path)
+        return
+    elif isinstance(value, (str, bytes)):
+        if path in group:
+            del(group[path])
+        group[path] = value
+        return
+
+    if path in group:
+        dset = group[path]
+        if (isinstance(dset, h5py.Dataset) and dset.chunks is not None and
+            dset.dtype == value.dtype and dset.ndim == value.ndim):
+            if dset.shape != value.shape:
+                dset.resize(value.shape)
+            dset[...] = value
+            return
+        del(group[path])
+    if value.ndim > 0 and value.size > 0:
+        group.create_dataset(path, data=value, chunks=True,
+                             maxshape=(None,)*value.ndim)
+    else:
+        group[path] = value
+
+def _delete_leaf(group, path):
+    if path not in group:
+        return
+    del(group[path])
+    # Remove the empty parent groups
+    path = path.rsplit('/', 1)[0] if '/' in path else ''
+    while path and len(group[path]) == 0:
+        del(group[path])
+        path = path.rsplit('/', 1)[0] if '/' in path else ''
@@ -21,11 +21,11 @@
 #include <complex.h>
 #include "cint.h"
 #include "vhf/fblas.h"
+#include "gto/nr_ecp.h"
 
 //#define ATOM_OF         0
 //#define ANG_OF          1
 #define RADI_POWER      3
-#define ECP_LMAX        4
 //#define PTR_EXP         5
 //#define PTR_COEFF       6
 #define CART_MAX        128 // ~ lmax = 14
@@ -53,10 +53,6 @@
 
 double CINTcommon_fac_sp(int);
 
-typedef struct {
-    double *u_ecp;
-} ECPOpt;
-
 static double _sph_ine_tab[] = { // 400x24
 9.802640211919197e-01, 6.534919212092035e-03, 2.613937811451498e-05, 7.468346329123935e-08, 1.659625812043017e-10, 3.017493035919202e-13, 4.642287455711235e-16, 6.189706898282851e-19, 7.281999097680386e-22, 7.665254523625293e-25, 7.300236357712470e-28, 6.348027199385843e-31, 5.078418750076879e-34, 3.761789744992798e-37, 2.594336600846831e-40, 1.673764894480139e-43, 1.014402615043443e-46, 5.796584581226479e-50, 3.133288094277013e-53, 1.606814005366913e-56, 7.838115320992611e-60, 3.645634279400473e-63, 1.620281595519583e-66, 6.894814102547425e-70,
 9.423296940236874e-01, 1.884207224818979e-02, 2.260816141980705e-04, 1.937731683913445e-06, 1.291774150186003e-08, 7.045863444090539e-11, 3.251876940391953e-13, 1.300732413080320e-15, 4.590769115454675e-18, 1.449703482841226e-20, 4.141979079274455e-23, 1.080509516656789e-25, 2.593209009591830e-28, 5.762660193098549e-31, 1.192269748342981e-33, 2.307610747161589e-36, 4.195642826638227e-39, 7.192510565377163e-42, 1.166350154849031e-44, 1.794380813740386e-47, 2.625917780013486e-50, 3.664064504096460e-53, 4.885411023215048e-56, 6.236685174215352e-59,
@@ -4817,6 +4813,16 @@ void ECPgauss_chebyshev(double *rs, double *ws, int n)
         }
 }
 
+static int _ecp_channel(ECPOpt *opt, int *ecpshls, int *ecpbas)
+{
+        const int atm_id = ecpbas[ATOM_OF+ecpshls[0]*BAS_SLOTS];
+        const int lc = ecpbas[ANG_OF +ecpshls[0]*BAS_SLOTS];
+        if (opt == NULL || atm_id >= opt->natm || lc > ECP_LMAX) {
+                return -1;
+        }
+        return opt->u_ecp_loc[atm_id*(ECP_LMAX+2)+lc+1];
+}
+
 /*
  * Return the number of effective grids
  */
@@ -4835,35 +4841,43 @@ int ECPrad_part(double *ur, double *rs, int rs_off, int nrs, int inc,
         int nrs_max = 0;
 
         rs += rs_off;
+        int ich = _ecp_channel(opt, ecpshls, ecpbas);
+        if (ich >= 0) {
+                // U(r) r^n of the entire channel was tabulated in the optimizer
+                u_ecp = opt->u_ecp + ich * (1 << LEVEL_MAX) + rs_off;
+                nrs_now = (opt->u_ecp_nrs[ich] - rs_off + inc - 1) / inc;
+                nrs_now = MAX(nrs_now, 0);
+                if (nrs_now > nrs) {
+                        nrs_now = nrs;
+                }
+                for (i = 0; i < nrs_now; i++) {
+                        ur[i] = u_ecp[i*inc];
+                }
+                for (; i < nrs; i++) {
+                        ur[i] = 0;
+                }
+                return nrs_now;
+        }
+
         for (i = 0; i < nrs; i++) {
                 r2[i] = rs[i*inc] * rs[i*inc];
                 ur[i] = 0;
         }
 
         for (ish = ecpsh0; ish < ecpsh1; ish++) {
-                if (opt == NULL) {
-                        npk = ecpbas[ish*BAS_SLOTS+NPRIM_OF];
-                        ak = env + ecpbas[ish*BAS_SLOTS+PTR_EXP];
-                        ck = env + ecpbas[ish*BAS_SLOTS+PTR_COEFF];
+                npk = ecpbas[ish*BAS_SLOTS+NPRIM_OF];
+                ak = env + ecpbas[ish*BAS_SLOTS+PTR_EXP];
+                ck = env + ecpbas[ish*BAS_SLOTS+PTR_COEFF];
 
-                        for (i = 0; i < nrs; i++) {
-                                ubuf[i] = ck[0] * exp(-ak[0]*r2[i]);
-                                for (kp = 1; kp < npk; kp++) {
-                                        ubuf[i] += ck[kp] * exp(-ak[kp]*r2[i]);
-                                }
-                                if (i > 2 &&
-                                    fabs(ubuf[i]) < SIM_ZERO &&
-                                    fabs(ubuf[i-1]) < SIM_ZERO) {
-                                        break;
-                                }
+                for (i = 0; i < nrs; i++) {
+                        ubuf[i] = ck[0] * exp(-ak[0]*r2[i]);
+                        for (kp = 1; kp < npk; kp++) {
+                                ubuf[i] += ck[kp] * exp(-ak[kp]*r2[i]);
                         }
-                } else {
-                        u_ecp = opt->u_ecp + ish * (1 << LEVEL_MAX);
-                        for (i = 0; i < nrs; i++) {
-                                ubuf[i] = u_ecp[i*inc+rs_off];
-                                if (fabs(ubuf[i]) < SIM_ZERO) {
-                                        break;
-                                }
+                        if (i > 2 &&
+                            fabs(ubuf[i]) < SIM_ZERO &&
+                            fabs(ubuf[i-1]) < SIM_ZERO) {
+                                break;
                         }
                 }
                 nrs_now = i;
@@ -5073,6 +5087,54 @@ void type2_facs_ang(double *facs, int li, int lc, double *ri)
         }
 }
 
+/*
+ * The angular part of type2 integrals only depends on the ECP channel and the
+ * vector between the ECP center and the basis center.  It is computed once
+ * for each (channel, atom, li) and kept in opt.  The cached value is used only
+ * if it was generated for the same vector (the basis may be shifted to
+ * lattice images in the PBC integrals).
+ */
+static double *_type2_facs_ang_cached(double *buf, int li, int lc, double *rca,
+                                      int ia, int ich, ECPOpt *opt)
+{
+        if (ich < 0 || li > ECP_ANG_CACHE_LMAX || ia >= opt->natm) {
+                type2_facs_ang(buf, li, lc, rca);
+                return buf;
+        }
+
+        size_t key = ((size_t)ich * opt->natm + ia) * (ECP_ANG_CACHE_LMAX+1) + li;
+        double *facs;
+#pragma omp atomic read
+        facs = opt->ang_cache[key];
+        if (facs == NULL) {
+                const int nfi = (li+1) * (li+2) / 2;
+                size_t size = (li+1) * nfi * (lc*2+1) * (li+lc+1);
+                double *cached;
+                facs = malloc(sizeof(double) * (size + 3));
+                facs[0] = rca[0];
+                facs[1] = rca[1];
+                facs[2] = rca[2];
+                type2_facs_ang(facs+3, li, lc, rca);
+#pragma omp critical(ECPang_cache)
+{
+                cached = opt->ang_cache[key];
+                if (cached == NULL) {
+                        opt->ang_cache[key] = facs;
+                }
+}
+                if (cached != NULL) {
+                        free(facs);
+                        facs = cached;
+                }
+        }
+        if (facs[0] == rca[0] && facs[1] == rca[1] && facs[2] == rca[2]) {
+                return facs + 3;
+        } else {
+                type2_facs_ang(buf, li, lc, rca);
+                return buf;
+        }
+}
+
 void type2_facs_rad(double *facs, int ish, int lc, double rca,
                     double *rs, int nrs, int inc,
                     int *atm, int natm, int *bas, int nbas, double *env)
@@ -5284,11 +5346,14 @@ int ECPtype2_cart(double *gctr, int *shls, int *ecpbas, int necpbas,
         const double *ri = env + atm[PTR_COORD+bas[ATOM_OF+ish*BAS_SLOTS]*ATM_SLOTS];
         const double *rj = env + atm[PTR_COORD+bas[ATOM_OF+jsh*BAS_SLOTS]*ATM_SLOTS];
 
-        int nrs = 1 << LEVEL_MAX;
+        const int ngrids = 1 << LEVEL_MAX;
+        const int lilj1 = li + lj + 1;
+        // the largest size of rad_all for one ECP channel
+        const int rad_size = nci*ncj*lilj1*(li+ECP_LMAX+1)*(lj+ECP_LMAX+1);
         int ecploc[necpbas+1];
         int nslots = _loc_ecpbas(ecploc, ecpbas, necpbas);
         int *ecpshls;
-        int iloc;
+        int iloc, iloc1;
 
         const double D0 = 0;
         const double D1 = 1;
@@ -5296,41 +5361,53 @@ int ECPtype2_cart(double *gctr, int *shls, int *ecpbas, int necpbas,
         const char TRANS_T = 'T';
         const double common_fac = CINTcommon_fac_sp(li) *
                                   CINTcommon_fac_sp(lj) * 16 * M_PI * M_PI;
-        int atm_id, lc, lab, lilc1, ljlc1, lilj1, dlc, im, mq;
-        int i, j, n, ic, jc;
-        int d2, d3;
-        double ur[nrs];
-        double rur[nrs*(li+lj+1)];
-        double radi[nci*(li+ECP_LMAX+1)*nrs];
-        double radj[ncj*(lj+ECP_LMAX+1)*nrs];
+        int atm_id, lc, lcmax, lab, lilc1, ljlc1, dlc, im, mq;
+        int i, j, n, ic, jc, k, nch;
+        int d2, d3, nrs, nrs_max;
+        int chloc[ECP_LMAX+1];
+        int nrs_ch[ECP_LMAX+1];
+        char ch_conv[ECP_LMAX+1];
+        double ur[(ECP_LMAX+1)*ngrids];
+        double rur[ngrids*lilj1];
+        double radi[nci*(li+ECP_LMAX+1)*ngrids];
+        double radj[ncj*(lj+ECP_LMAX+1)*ngrids];
         double angi[(li+1)*nfi*(ECP_LMAX*2+1)*(li+ECP_LMAX+1)];
         double angj[(lj+1)*nfj*(ECP_LMAX*2+1)*(lj+ECP_LMAX+1)];
-        double rad_all[nci*ncj*(li+lj+1)*(li+ECP_LMAX+1)*(lj+ECP_LMAX+1)];
+        double rad_all[(ECP_LMAX+1)*rad_size];
         double rca[3];
         double rcb[3];
         double buf[nfi*(ECP_LMAX*2+1)*(lj+ECP_LMAX+1)];
         double dca, dcb, s;
-        double *rc, *pradi, *pradj, *prur;
+        double *rc, *pur, *pradi, *pradj, *prur, *pangi, *pangj;
         int has_value = 0;
-        int ecp_lmax = 0;
-        for (i = 0; i < necpbas; i++) {
-                ecp_lmax = MAX(ecp_lmax, ecpbas[ANG_OF +i*BAS_SLOTS]);
-        }
+        int ich, ldi, ldj;
 
         for (i = 0; i < nci*ncj*nfi*nfj; i++) { gctr[i] = 0; }
 
-        for (iloc = 0; iloc < nslots; iloc++) {
-                lc = ecpbas[ANG_OF+ecploc[iloc]*BAS_SLOTS];
-                if (lc == -1) {
-                        continue;
-                }
+        for (iloc = 0; iloc < nslots; iloc = iloc1) {
                 atm_id = ecpbas[ATOM_OF+ecploc[iloc]*BAS_SLOTS];
                 rc = env + atm[PTR_COORD+atm_id*ATM_SLOTS];
-                ecpshls = ecploc + iloc;
-
-        if (!check_3c_overlap(shls, atm, bas, env, rc, ecpshls, ecpbas)) {
-                continue;
-        }
+                // All semi-local channels of the ECP center share the radial
+                // parts of the basis functions
+                nch = 0;
+                lcmax = 0;
+                for (iloc1 = iloc; iloc1 < nslots; iloc1++) {
+                        if (ecpbas[ATOM_OF+ecploc[iloc1]*BAS_SLOTS] != atm_id) {
+                                break;
+                        }
+                        lc = ecpbas[ANG_OF+ecploc[iloc1]*BAS_SLOTS];
+                        if (lc == -1 ||
+                            !check_3c_overlap(shls, atm, bas, env, rc,
+                                              ecploc+iloc1, ecpbas)) {
+                                continue;
+                        }
+                        chloc[nch] = iloc1;
+                        lcmax = MAX(lcmax, lc);
+                        nch++;
+                }
+                if (nch == 0) {
+                        continue;
+                }
 
         has_value = 1;
         rca[0] = rc[0] - ri[0];
@@ -5341,78 +5418,98 @@ int ECPtype2_cart(double *gctr, int *shls, int *ecpbas, int necpbas,
         rcb[2] = rc[2] - rj[2];
         dca = sqrt(SQUARE(rca));
         dcb = sqrt(SQUARE(rcb));
-
-        dlc = lc * 2 + 1;
-        lilj1 = li + lj + 1;
-        lilc1 = li + lc + 1;
-        ljlc1 = lj + lc + 1;
-        d2 = lilc1 * ljlc1;
-        d3 = lilj1 * d2;
-        im = nfi * dlc;
-        mq = dlc * ljlc1;
+        ldi = li + lcmax + 1;
+        ldj = lj + lcmax + 1;
 
         int level, nrs0, start, step, ijl;
         double wtscale;
         double *prad;
-        double plast[d2];
-        char converged[nci*ncj*lilj1];
+        double plast[ldi*ldj];
         char all_conv;
         double *rs = rs_gauss_chebyshev2047;
         double *ws = ws_gauss_chebyshev2047;
-        for (i = 0; i < nci*ncj*lilj1; i++) { converged[i] = 0; }
-        for (i = 0; i < nci*ncj*d3; i++) { rad_all[i] = 0; }
+        for (k = 0; k < nch; k++) { ch_conv[k] = 0; }
+        for (i = 0; i < nch*rad_size; i++) { rad_all[i] = 0; }
         nrs0 = (1 << LEVEL0) - 1;
         step = 1 << (LEVEL_MAX - LEVEL0);
         start = step - 1;
         wtscale = step;
         for (level = LEVEL0; level <= LEVEL_MAX; level++) {
-                nrs = ECPrad_part(ur, rs, start, nrs0, step, ecpshls, ecpbas,
-                                  atm, natm, bas, nbas, env, opt);
-                for (i = 0; i < nrs; i++) {
-                        ur[i] *= ws[start+i*step] * wtscale;
-                        rur[i] = ur[i];
-                        for (lab = 1; lab <= li+lj; lab++) {
-                                rur[nrs*lab+i] = rur[nrs*(lab-1)+i] * rs[start+i*step];
+                nrs_max = 0;
+                for (k = 0; k < nch; k++) {
+                        if (ch_conv[k]) {
+                                continue;
+                        }
+                        ecpshls = ecploc + chloc[k];
+                        pur = ur + k * ngrids;
+                        nrs = ECPrad_part(pur, rs, start, nrs0, step, ecpshls, ecpbas,
+                                          atm, natm, bas, nbas, env, opt);
+                        for (i = 0; i < nrs; i++) {
+                                pur[i] *= ws[start+i*step] * wtscale;
                         }
+                        nrs_ch[k] = nrs;
+                        nrs_max = MAX(nrs_max, nrs);
+                }
+
+                if (nrs_max > 0) {
+                        type2_facs_rad(radi, ish, lcmax, dca, rs+start, nrs_max, step,
+                                       atm, natm, bas, nbas, env);
+                        type2_facs_rad(radj, jsh, lcmax, dcb, rs+start, nrs_max, step,
+                                       atm, natm, bas, nbas, env);
                 }
 
-                type2_facs_rad(radi, ish, lc, dca, rs+start, nrs, step,
-                               atm, natm, bas, nbas, env);
-                type2_facs_rad(radj, jsh, lc, dcb, rs+start, nrs, step,
-                               atm, natm, bas, nbas, env);
                 all_conv = 1;
-                for (ijl = 0, ic = 0; ic < nci; ic++) {
-                for (jc = 0; jc < ncj; jc++) {
-                        pradi = radi + ic * nrs * lilc1;
-                        pradj = radj + jc * nrs * ljlc1;
-                        for (lab = 0; lab <= li+lj; lab++, ijl++) {
-                                if (!converged[ijl]) {
+                for (k = 0; k < nch; k++) {
+                        if (ch_conv[k]) {
+                                continue;
+                        }
+                        lc = ecpbas[ANG_OF+ecploc[chloc[k]]*BAS_SLOTS];
+                        lilc1 = li + lc + 1;
+                        ljlc1 = lj + lc + 1;
+                        d2 = lilc1 * ljlc1;
+                        nrs = nrs_ch[k];
+                        pur = ur + k * ngrids;
+                        for (i = 0; i < nrs; i++) {
+                                rur[i] = pur[i];
+                                for (lab = 1; lab <= li+lj; lab++) {
+                                        rur[nrs*lab+i] = rur[nrs*(lab-1)+i] * rs[start+i*step];
+                                }
+                        }
+
+                        ch_conv[k] = 1;
+                        for (ijl = 0, ic = 0; ic < nci; ic++) {
+                        for (jc = 0; jc < ncj; jc++) {
+                                pradi = radi + ic * nrs_max * ldi;
+                                pradj = radj + jc * nrs_max * ldj;
+                                for (lab = 0; lab <= li+lj; lab++, ijl++) {
         prur = rur + lab * nrs;
-        prad = rad_all + ijl*d2;
+        prad = rad_all + k*rad_size + ijl*d2;
         for (i = 0; i < d2; i++) {
                 plast[i] = prad[i];
                 prad[i] *= .5;
         }
 
-        for (i = 0; i < lilc1; i++) {
-        for (j = 0; j < ljlc1; j++) {
-                s = prad[i*ljlc1+j];
-                for (n = 0; n < nrs; n++) {
-                        s += prur[n] * pradi[n*lilc1+i] * pradj[n*ljlc1+j];
+        for (n = 0; n < nrs; n++) {
+                for (i = 0; i < lilc1; i++) {
+                        s = prur[n] * pradi[n*ldi+i];
+                        for (j = 0; j < ljlc1; j++) {
+                                prad[i*ljlc1+j] += s * pradj[n*ldj+j];
+                        }
                 }
-                prad[i*ljlc1+j] = s;
-        } }
+        }
 
-        for (i = 0; i < d2; i++) {
-                if (!CLOSE_ENOUGH(plast[i],prad[i])) {
-                        converged[ijl] = 0;
-                        all_conv = 0;
-                        break;
+        if (ch_conv[k]) {
+                for (i = 0; i < d2; i++) {
+                        if (!CLOSE_ENOUGH(plast[i],prad[i])) {
+                                ch_conv[k] = 0;
+                                break;
+                        }
                 }
         }
                                 }
-                        }
-                } }
+                        } }
+                        all_conv &= ch_conv[k];
+                }
 
                 if (all_conv) {
                         break;
@@ -5424,21 +5521,35 @@ int ECPtype2_cart(double *gctr, int *shls, int *ecpbas, int necpbas,
                 }
         }
 
-        type2_facs_ang(angi, li, lc, rca);
-        type2_facs_ang(angj, lj, lc, rcb);
-        for (ic = 0; ic < nci; ic++) {
-        for (jc = 0; jc < ncj; jc++) {
-                prad = rad_all + (ic*ncj+jc)*d3;
-                for (i = 0; i <= li; i++) {
-                for (j = 0; j <= lj; j++) {
-                        dgemm_(&TRANS_N, &TRANS_N, &ljlc1, &im, &lilc1,
-                               &D1, prad+(i+j)*d2, &ljlc1,
-                               angi+i*nfi*dlc*lilc1, &lilc1, &D0, buf, &ljlc1);
-                        dgemm_(&TRANS_T, &TRANS_N, &nfi, &nfj, &mq,
-                               &common_fac, buf, &mq, angj+j*nfj*dlc*ljlc1, &mq,
-                               &D1, gctr+jc*nfj*di+ic*nfi, &di);
+        for (k = 0; k < nch; k++) {
+                ecpshls = ecploc + chloc[k];
+                lc = ecpbas[ANG_OF+ecpshls[0]*BAS_SLOTS];
+                dlc = lc * 2 + 1;
+                lilc1 = li + lc + 1;
+                ljlc1 = lj + lc + 1;
+                d2 = lilc1 * ljlc1;
+                d3 = lilj1 * d2;
+                im = nfi * dlc;
+                mq = dlc * ljlc1;
+                ich = _ecp_channel(opt, ecpshls, ecpbas);
+                pangi = _type2_facs_ang_cached(angi, li, lc, rca,
+                                               bas[ATOM_OF+ish*BAS_SLOTS], ich, opt);
+                pangj = _type2_facs_ang_cached(angj, lj, lc, rcb,
+                                               bas[ATOM_OF+jsh*BAS_SLOTS], ich, opt);
+                for (ic = 0; ic < nci; ic++) {
+                for (jc = 0; jc < ncj; jc++) {
+                        prad = rad_all + k*rad_size + (ic*ncj+jc)*d3;
+                        for (i = 0; i <= li; i++) {
+                        for (j = 0; j <= lj; j++) {
+                                dgemm_(&TRANS_N, &TRANS_N, &ljlc1, &im, &lilc1,
+                                       &D1, prad+(i+j)*d2, &ljlc1,
+                                       pangi+i*nfi*dlc*lilc1, &lilc1, &D0, buf, &ljlc1);
+                                dgemm_(&TRANS_T, &TRANS_N, &nfi, &nfj, &mq,
+                                       &common_fac, buf, &mq, pangj+j*nfj*dlc*ljlc1, &mq,
+                                       &D1, gctr+jc*nfj*di+ic*nfi, &di);
+                        } }
                 } }
-        } }
+        }
         }
         return has_value;
 }
@@ -5918,27 +6029,64 @@ void ECPscalar_optimizer(ECPOpt **opt, int *atm, int natm, int *bas, int nbas, d
 
         int *ecpbas = bas + (int)(env[AS_ECPBAS_OFFSET])*BAS_SLOTS;
         int necpbas = (int)(env[AS_NECPBAS]);
+        const int ngrids = 1 << LEVEL_MAX;
+        const int nslots = natm * (ECP_LMAX+2);
+
+        int ecploc[necpbas+1];
+        int nchannels = _loc_ecpbas(ecploc, ecpbas, necpbas);
+        opt0->natm = natm;
+        opt0->nchannels = nchannels;
+        opt0->u_ecp_loc = malloc(sizeof(int) * nslots);
+        opt0->u_ecp_nrs = malloc(sizeof(int) * (nchannels+1));
+        opt0->u_ecp = malloc(sizeof(double) * ngrids * (nchannels+1));
+        opt0->ang_cache = calloc((size_t)nchannels * natm * (ECP_ANG_CACHE_LMAX+1),
+                                 sizeof(double *));
 
-        double r2;
+        double r, r2;
         double *ak, *ck, *uk;
-        int npk;
+        int npk, atm_id, lc, ich;
         int i, ib, kp;
+        for (i = 0; i < nslots; i++) {
+                opt0->u_ecp_loc[i] = -1;
+        }
 
-        opt0->u_ecp = malloc(sizeof(double) * (1 << LEVEL_MAX) * necpbas);
-        uk = opt0->u_ecp;
-        for (ib = 0; ib < necpbas; ib++) {
-                npk = ecpbas[ib*BAS_SLOTS+NPRIM_OF];
-                ak = env + ecpbas[ib*BAS_SLOTS+PTR_EXP];
-                ck = env + ecpbas[ib*BAS_SLOTS+PTR_COEFF];
+        for (ich = 0; ich < nchannels; ich++) {
+                atm_id = ecpbas[ATOM_OF+ecploc[ich]*BAS_SLOTS];
+                lc = ecpbas[ANG_OF +ecploc[ich]*BAS_SLOTS];
+                if (atm_id < natm && lc <= ECP_LMAX) {
+                        opt0->u_ecp_loc[atm_id*(ECP_LMAX+2)+lc+1] = ich;
+                }
 
-                for (i = 0; i < (1 << LEVEL_MAX); i++) {
-                        r2 = rs_gauss_chebyshev2047[i]*rs_gauss_chebyshev2047[i];
-                        uk[i] = ck[0] * exp(-ak[0]*r2);
-                        for (kp = 1; kp < npk; kp++) {
-                                uk[i] += ck[kp] * exp(-ak[kp]*r2);
+                uk = opt0->u_ecp + ich * ngrids;
+                for (i = 0; i < ngrids; i++) {
+                        uk[i] = 0;
+                }
+                opt0->u_ecp_nrs[ich] = 0;
+                for (ib = ecploc[ich]; ib < ecploc[ich+1]; ib++) {
+                        npk = ecpbas[ib*BAS_SLOTS+NPRIM_OF];
+                        ak = env + ecpbas[ib*BAS_SLOTS+PTR_EXP];
+                        ck = env + ecpbas[ib*BAS_SLOTS+PTR_COEFF];
+
+                        for (i = 0; i < ngrids; i++) {
+                                r = rs_gauss_chebyshev2047[i];
+                                r2 = r * r;
+                                double u = ck[0] * exp(-ak[0]*r2);
+                                for (kp = 1; kp < npk; kp++) {
+                                        u += ck[kp] * exp(-ak[kp]*r2);
+                                }
+                                // the radial grids are in ascending order
+                                if (fabs(u) < SIM_ZERO) {
+                                        break;
+                                }
+                                switch (ecpbas[ib*BAS_SLOTS+RADI_POWER]) {
+                                case 1: u *= r; break;
+                                case 2: u *= r2; break;
+                                case 3: u *= r2 * r; break;
+                                }
+                                uk[i] += u;
                         }
+                        opt0->u_ecp_nrs[ich] = MAX(opt0->u_ecp_nrs[ich], i);
                 }
-                uk += (1 << LEVEL_MAX);
         }
 }
 
@@ -5953,9 +6101,17 @@ void ECPdel_optimizer(ECPOpt **opt)
                 return;
         }
 
-        if (opt0->u_ecp != NULL) {
-                free(opt0->u_ecp);
+        size_t i;
+        size_t ncache = (size_t)opt0->nchannels * opt0->natm * (ECP_ANG_CACHE_LMAX+1);
+        for (i = 0; i < ncache; i++) {
+                if (opt0->ang_cache[i] != NULL) {
+                        free(opt0->ang_cache[i]);
+                }
         }
+        free(opt0->ang_cache);
+        free(opt0->u_ecp);
+        free(opt0->u_ecp_loc);
+        free(opt0->u_ecp_nrs);
         free(opt0);
-        opt = NULL;
+        *opt = NULL;
 }
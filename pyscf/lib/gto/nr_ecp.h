@@ -0,0 +1,40 @@
+/* Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+    you may not use this file except in compliance with the License.
+    You may obtain a copy of the License at
+
+        http://www.apache.org/licenses/LICENSE-2.0
+
+    Unless required by applicable law or agreed to in writing, software
+    distributed under the License is distributed on an "AS IS" BASIS,
+    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+    See the License for the specific language governing permissions and
+    limitations under the License.
+
+ *
+ * Author: Qiming Sun <osirpt.sun@gmail.com>
+ */
+
+#define ECP_LMAX        4
+// The angular parts of type2 integrals are cached for li <= ECP_ANG_CACHE_LMAX
+#define ECP_ANG_CACHE_LMAX      7
+
+/*
+ * Quantities of the ECP centers which are shared by all shell pairs
+ */
+typedef struct {
+        // U_l(r) r^n summed over the shells of each ECP channel (atom, l),
+        // tabulated on the radial grids
+        double *u_ecp;
+        // u_ecp_loc[atm_id*(ECP_LMAX+2)+l+1] is the index of the channel
+        // (atm_id, l) in u_ecp, -1 if the channel does not exist
+        int *u_ecp_loc;
+        // The grids beyond u_ecp_nrs[channel] are negligible
+        int *u_ecp_nrs;
+        int nchannels;
+        int natm;
+        // The angular parts of type2 integrals, indexed by (channel, atom of
+        // the basis, l of the basis).  They are computed on demand.
+        double **ang_cache;
+} ECPOpt;
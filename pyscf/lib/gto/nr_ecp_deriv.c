@@ -21,6 +21,7 @@
 #include <complex.h>
 #include "cint.h"
 #include "vhf/fblas.h"
+#include "gto/nr_ecp.h"
 
 #define CART_MAX        128 // ~ lmax = 14
 #define SIM_ZERO        1e-50
@@ -35,10 +36,6 @@
 #define AS_ECPBAS_OFFSET        18
 #define AS_NECPBAS              19
 
-typedef struct {
-    double *u_ecp;
-} ECPOpt;
-
 int ECPtype1_cart(double *gctr, int *shls, int *ecpbas, int necpbas,
                   int *atm, int natm, int *bas, int nbas, double *env,
                   ECPOpt *opt, double *cache);
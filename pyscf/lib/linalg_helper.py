@@ -535,6 +535,171 @@ def davidson1(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
     return numpy.asarray(conv), e, x0
 
 
+def davidson_locking(aop, x0, precond, tol=1e-12, max_cycle=50, max_space=12,
+                     lindep=DAVIDSON_LINDEP, dot=numpy.dot, callback=None,
+                     nroots=1, pick=None, verbose=logger.WARN,
+                     tol_residual=None):
+    '''Davidson diagonalization with hard locking of the converged roots.
+
+    The converged Ritz vectors are removed (deflated) from the active subspace
+    and no new trial vectors are generated for them.  The remaining roots are
+    solved in the orthogonal complement of the locked vectors.  When the
+    subspace is collapsed, the new subspace and the associated a*x are
+    assembled from the existing a*x, so that aop is called for the new trial
+    vectors only.  Each root is preconditioned with its own eigenvalue.  This
+    solver is useful when many roots (tens to hundreds) are required.
+
+    Args, kwargs and returns are the same to :func:`davidson1`.  aop receives
+    a list of the new trial vectors, which are orthogonal to the locked
+    vectors.  The callback function is called in every iteration before aop
+    is called for the new trial vectors.
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+
+    if tol_residual is None:
+        toloose = numpy.sqrt(tol)
+    else:
+        toloose = tol_residual
+    log.debug1('tol %g  toloose %g', tol, toloose)
+
+    if not callable(precond):
+        precond = make_diag_precond(precond)
+
+    if callable(x0):
+        x0 = x0()
+    if isinstance(x0, numpy.ndarray) and x0.ndim == 1:
+        x0 = [x0]
+    max_space = max_space + (nroots-1) * 3
+    log.debug1('max_cycle %d  max_space %d', max_cycle, max_space)
+
+    # Locked (converged) eigenvalues and eigenvectors
+    e_lock = []
+    x_lock = []
+    # Orthonormal basis of the active subspace, orthogonal to x_lock
+    xs = []
+    ax = []
+    heff = numpy.zeros((0,0))
+    xt = list(_qr(x0, dot, lindep)[0])
+    e = numpy.zeros(0)
+    x0 = []
+    dx_norm = []
+    conv = []
+
+    for icyc in range(max_cycle):
+        for xl in x_lock:
+            for xi in xt:
+                xi -= xl * dot(xl.conj(), xi)
+        for xsi in xs:
+            for xi in xt:
+                xi -= xsi * dot(xsi.conj(), xi)
+        if xt:
+            xt = list(_qr(xt, dot, lindep)[0])
+        if not xt:
+            log.debug('Linear dependency in trial subspace. |r| for each state %s',
+                      dx_norm)
+            conv = [norm < toloose for norm in dx_norm]
+            break
+
+        if callable(callback):
+            callback(locals())
+
+        axt = aop(xt)
+        head = len(xs)
+        xs.extend(xt)
+        ax.extend(axt)
+        space = len(xs)
+
+        dtype = numpy.result_type(heff, *axt)
+        h = numpy.empty((space,space), dtype=dtype)
+        h[:head,:head] = heff
+        for i in range(space):
+            for k in range(max(i,head), space):
+                h[i,k] = dot(xs[i].conj(), ax[k])
+                h[k,i] = h[i,k].conj()
+        heff = h
+        xt = axt = None
+
+        w, v = scipy.linalg.eigh(heff)
+        nact = nroots - len(e_lock)
+        if callable(pick):
+            w1, v1, idx = pick(w, v, nact, locals())
+            idx = numpy.asarray(idx)[:nact]
+        else:
+            idx = numpy.arange(min(nact, space))
+        elast = e
+        e = w[idx]
+        x0 = _gen_x0(v[:,idx], xs)
+        ax0 = _gen_x0(v[:,idx], ax)
+        if elast.size == e.size:
+            de = e - elast
+        else:
+            de = e
+
+        dx_norm = []
+        xt = []
+        conv = []
+        for k, ek in enumerate(e):
+            xt.append(ax0[k] - ek * x0[k])
+            dx_norm.append(numpy.sqrt(dot(xt[k].conj(), xt[k]).real))
+            conv.append(abs(de[k]) < tol and dx_norm[k] < toloose)
+        ax0 = None
+        log.debug('davidson_locking %d %d  locked %d  |r|= %4.3g  e= %s  max|de|= %4.3g',
+                  icyc, space, len(e_lock), max(dx_norm), e, max(abs(de)))
+
+        if any(conv):
+            for k in numpy.where(conv)[0]:
+                log.debug('root %d locked  |r|= %4.3g  e= %s',
+                          len(e_lock), dx_norm[k], e[k])
+                e_lock.append(e[k])
+                x_lock.append(x0[k])
+            if len(e_lock) >= nroots:
+                e = numpy.zeros(0)
+                x0 = []
+                conv = []
+                break
+            # Deflate the locked roots.  The rotated subspace is orthonormal
+            # and orthogonal to the locked vectors.
+            keep = numpy.ones(space, dtype=bool)
+            keep[idx[numpy.asarray(conv)]] = False
+            unconv = [k for k, c in enumerate(conv) if not c]
+            conv = [False] * len(unconv)
+            e = e[unconv]
+            x0 = [x0[k] for k in unconv]
+            xt = [xt[k] for k in unconv]
+            dx_norm = [dx_norm[k] for k in unconv]
+            xs = list(_gen_x0(v[:,keep], xs))
+            ax = list(_gen_x0(v[:,keep], ax))
+            heff = numpy.diag(w[keep]).astype(heff.dtype)
+            space = len(xs)
+
+        if space + len(xt) > max_space:
+            # Collapse the subspace to the current Ritz vectors.  a*x of the
+            # Ritz vectors are assembled from the existing a*x.
+            w, v = scipy.linalg.eigh(heff)
+            if callable(pick):
+                idx = numpy.asarray(pick(w, v, len(e), locals())[2])[:len(e)]
+            else:
+                idx = numpy.arange(len(e))
+            xs = list(_gen_x0(v[:,idx], xs))
+            ax = list(_gen_x0(v[:,idx], ax))
+            heff = numpy.diag(w[idx]).astype(heff.dtype)
+            log.debug1('Collapse subspace to %d Ritz vectors', len(xs))
+
+        xt = [precond(xt[k], ek, x0[k])
+              for k, ek in enumerate(e) if dx_norm[k]**2 > lindep]
+
+    conv = [True] * len(e_lock) + list(conv)
+    e = numpy.hstack((e_lock, e))
+    x0 = x_lock + list(x0)
+    idx = numpy.argsort(e, kind='mergesort')[:nroots]
+    conv = numpy.asarray(conv, dtype=bool)[idx]
+    x0 = [x0[i] for i in idx]
+    return conv, e[idx], x0
+
+
 def make_diag_precond(diag, level_shift=0):
     '''Generate the preconditioner function with the diagonal function.'''
     def precond(dx, e, *args):
@@ -1207,7 +1372,14 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
         x0 : 1D array
             Initial guess
         tol : float
-            Tolerance to terminate the operation aop(x).
+            Tolerance to terminate the operation aop(x).  The meaning
+            depends on b.  For a single vector b, tol is absolute: the
+            iteration stops when the norm of the new Krylov vector is below
+            tol.  For a list of vectors b, tol is relative: the iteration
+            stops when the residual of each equation is below
+            tol * |b[j]|.  The two coincide for normalized b.  A list whose
+            vectors are all linearly dependent is solved with the single
+            vector criterion.
         max_cycle : int
             max number of iterations.
         lindep : float
@@ -1267,6 +1439,18 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
             return numpy.zeros_like(b)
         else:
             return x0
+    nvec0 = len(x1)
+
+    # The first nvec0 vectors are array b or b-(1+a)x0.  The Krylov vectors
+    # generated later are orthogonal to b.
+    g = numpy.zeros((nvec0,nroots), dtype=x1.dtype)
+    if b.ndim == 1:
+        g[0] = innerprod[0]
+    else:
+        for i in range(nvec0):
+            for j in range(nroots):
+                g[i,j] = dot(x1[i].conj(), b[j])
+        bnorm = numpy.array([dot(bj.conj(), bj).real for bj in b])
 
     _incore = max_memory*1e6/b.nbytes > 14
     log.debug1('max_memory %d  incore %s', max_memory, _incore)
@@ -1277,6 +1461,7 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
         xs = _Xlist()
         ax = _Xlist()
 
+    h = numpy.empty((0,0), dtype=x1.dtype)
     max_cycle = min(max_cycle, ndim)
     for cycle in range(max_cycle):
         axt = aop(x1)
@@ -1286,6 +1471,7 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
         ax.extend(axt)
         if callable(callback):
             callback(cycle, xs, ax)
+        h = _krylov_subspace_h(h, xs, ax, innerprod, hermi, dot)
 
         x1 = axt.copy()
         for i in range(len(xs)):
@@ -1294,48 +1480,51 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
                 x1[j] -= xsi * (dot(xsi.conj(), axj) / innerprod[i])
         axt = None
 
-        max_innerprod = 0
+        if nvec0 > 1:
+            # Solve the equations in the current subspace.  The residual of
+            # each right-hand side b[j] is -sum_k c[k,j] x1[k], with k running
+            # over the vectors generated in this cycle.  A vector is deflated
+            # when its contribution to the residuals is below tol relative to
+            # the norm of b[j].
+            nd = len(xs)
+            c = numpy.linalg.solve(h, _pad_rows(g, nd))[nd-len(x1):]
+            ovlp = numpy.array([[dot(xi.conj(), xj) for xj in x1] for xi in x1])
+            r2 = numpy.einsum('kj,kl,lj->j', c.conj(), ovlp, c).real
+            conv = abs(c)**2 * ovlp.diagonal().real[:,None] <= tol**2 * bnorm
+            conv = conv.all(axis=1)
+            max_innerprod = max(r2 / numpy.maximum(bnorm, 1e-200))
+            if all(r2 <= tol**2 * bnorm):
+                log.debug('krylov cycle %d  r = %g  nvec = 0',
+                          cycle, max_innerprod**.5)
+                break
+
+        max_innerprod1 = 0
         idx = []
         for i, xi in enumerate(x1):
-            innerprod1 = dot(xi.conj(), xi).real
-            max_innerprod = max(max_innerprod, innerprod1)
-            if innerprod1 > lindep and innerprod1 > tol**2:
+            if nvec0 > 1:
+                # Orthogonalize the vectors within the block
+                for k, j in enumerate(idx):
+                    xi -= x1[j] * (dot(x1[j].conj(), xi) / innerprod[-len(idx)+k])
+                innerprod1 = dot(xi.conj(), xi).real
+                independent = innerprod1 > lindep * ovlp[i,i].real
+                independent = independent and not conv[i]
+            else:
+                innerprod1 = dot(xi.conj(), xi).real
+                independent = innerprod1 > lindep and innerprod1 > tol**2
+            max_innerprod1 = max(max_innerprod1, innerprod1)
+            if independent:
                 idx.append(i)
                 innerprod.append(innerprod1)
-        log.debug('krylov cycle %d  r = %g', cycle, max_innerprod**.5)
-        if max_innerprod < lindep or max_innerprod < tol**2:
+        if nvec0 == 1:
+            max_innerprod = max_innerprod1
+        log.debug('krylov cycle %d  r = %g  nvec = %d',
+                  cycle, max_innerprod**.5, len(idx))
+        if not idx:
             break
 
         x1 = x1[idx]
 
-    nd = cycle + 1
-    h = numpy.empty((nd,nd), dtype=x1.dtype)
-
-    for i in range(nd):
-        xi = numpy.asarray(xs[i])
-        if hermi:
-            for j in range(i+1):
-                h[i,j] = dot(xi.conj(), ax[j])
-                h[j,i] = h[i,j].conj()
-        else:
-            for j in range(nd):
-                h[i,j] = dot(xi.conj(), ax[j])
-        xi = None
-
-    # Add the contribution of I in (1+a)
-    for i in range(nd):
-        h[i,i] += innerprod[i]
-
-    g = numpy.zeros((nd,nroots), dtype=x1.dtype)
-    if b.ndim == 1:
-        g[0] = innerprod[0]
-    else:
-        # Restore the first nroots vectors, which are array b or b-(1+a)x0
-        for i in range(min(nd, nroots)):
-            xsi = numpy.asarray(xs[i])
-            for j in range(nroots):
-                g[i,j] = dot(xsi.conj(), b[j])
-
+    g = _pad_rows(g, len(xs))
     c = numpy.linalg.solve(h, g)
     x = _gen_x0(c, xs)
     if b.ndim == 1:
@@ -1345,6 +1534,37 @@ def krylov(aop, b, x0=None, tol=1e-10, max_cycle=30, dot=numpy.dot,
         x += x0
     return x
 
+def _krylov_subspace_h(h, xs, ax, innerprod, hermi, dot):
+    '''Extend the matrix of (1+a) in the subspace xs with the vectors added
+    after the previous call'''
+    nd0, nd = len(h), len(xs)
+    dtype = numpy.result_type(h, numpy.asarray(ax[nd-1]))
+    hnew = numpy.empty((nd,nd), dtype=dtype)
+    hnew[:nd0,:nd0] = h
+    if hermi:
+        for i in range(nd0, nd):
+            xi = numpy.asarray(xs[i])
+            for j in range(i+1):
+                hnew[i,j] = dot(xi.conj(), ax[j])
+                hnew[j,i] = hnew[i,j].conj()
+            xi = None
+    else:
+        for i in range(nd):
+            xi = numpy.asarray(xs[i])
+            for j in range(nd0 if i < nd0 else 0, nd):
+                hnew[i,j] = dot(xi.conj(), ax[j])
+            xi = None
+
+    # Add the contribution of I in (1+a)
+    for i in range(nd0, nd):
+        hnew[i,i] += innerprod[i]
+    return hnew
+
+def _pad_rows(a, n):
+    if len(a) < n:
+        a = numpy.vstack((a, numpy.zeros((n-len(a),)+a.shape[1:], dtype=a.dtype)))
+    return a
+
 
 def dsolve(aop, b, precond, tol=1e-12, max_cycle=30, dot=numpy.dot,
            lindep=DSOLVE_LINDEP, verbose=0, tol_residual=None):
@@ -777,6 +777,65 @@ def background_process(func, *args, **kwargs):
 bg = background = bg_thread = background_thread
 bp = bg_process = background_process
 
+_process_map_fn = None
+def _process_map_worker(task):
+    # OpenMP is not fork-safe.  The workers have to run in single thread.
+    with with_omp_threads(1):
+        return _process_map_fn(task)
+
+def process_map(fn, tasks, nproc=None):
+    '''Evaluate fn(task) for each task on a pool of forked processes.
+
+    The workers are forked from the current process. They inherit fn and all
+    data it refers to (e.g. the name of a read-only integral file).  Only
+    tasks and the return values are transferred between processes.  The
+    function is executed in the current process if nproc <= 1, if fork is
+    not supported on the platform, or if process_map is called in a worker.
+    fn should not call num_threads to resize the OpenMP thread pool in the
+    workers.  The number of threads of the workers is set by calling
+    num_threads before process_map.
+
+    Args:
+        fn : function
+            It takes one task as the argument.  Its return value needs to be
+            picklable.
+        tasks : list
+
+    Kwargs:
+        nproc : int
+            Number of processes.  Default is the number of CPUs.
+
+    Returns:
+        A list of fn(task) in the order of tasks.
+
+    Examples:
+
+    >>> a = numpy.random.random((4,10,10))
+    >>> lib.process_map(lambda k: numpy.linalg.eigh(a[k]+a[k].T)[0], range(4), 2)
+    '''
+    global _process_map_fn
+    import multiprocessing
+    tasks = list(tasks)
+    if nproc is None:
+        nproc = multiprocessing.cpu_count()
+    nproc = min(nproc, len(tasks))
+    # Daemonic pool workers are not allowed to fork their own workers
+    if (nproc <= 1 or not hasattr(os, 'fork') or
+        multiprocessing.current_process().daemon):
+        return [fn(task) for task in tasks]
+
+    # fn has to be assigned before the workers are forked
+    _process_map_fn = fn
+    if sys.version_info >= (3,4):
+        pool = multiprocessing.get_context('fork').Pool(nproc)
+    else:
+        pool = multiprocessing.Pool(nproc)
+    try:
+        return pool.map(_process_map_worker, tasks, chunksize=1)
+    finally:
+        pool.terminate()
+        _process_map_fn = None
+
 ASYNC_IO = getattr(__config__, 'ASYNC_IO', True)
 class call_in_background(object):
     '''Within this macro, function(s) can be executed asynchronously (the
@@ -63,6 +63,52 @@ static void shift_bas(double *env_loc, double *env, double *Ls, int ptr, int iL)
         env_loc[ptr+2] = env[ptr+2] + Ls[iL*3+2];
 }
 
+static int *alloc_pair_images(int nimgs)
+{
+        return malloc(sizeof(int) * ((size_t)nimgs * (nimgs+2) + 1));
+}
+
+/*
+ * Lattice images (iL, jL) of the shell pair (shls[0], shls[1]) which pass the
+ * prescreening of pbcopt.  The images are tested once for each shell pair.
+ * The significant jL associated to the n-th image iL = iLlst[n] are stored in
+ * jLlst[jLoff[n]:jLoff[n+1]].  The images iL without any significant jL are
+ * skipped.  Returns the number of images iL.
+ */
+static int pair_images(int *iLlst, int *jLoff, int *jLlst, int *shls,
+                       int nimgs, int iptrxyz, int jptrxyz,
+                       double *env_loc, double *Ls, PBCOpt *pbcopt,
+                       int *atm, int *bas, double *env)
+{
+        int (*fprescreen)();
+        if (pbcopt != NULL) {
+                fprescreen = pbcopt->fprescreen;
+        } else {
+                fprescreen = PBCnoscreen;
+        }
+
+        int iL, jL;
+        int niL = 0;
+        int njL = 0;
+        jLoff[0] = 0;
+        for (iL = 0; iL < nimgs; iL++) {
+                shift_bas(env_loc, env, Ls, iptrxyz, iL);
+                for (jL = 0; jL < nimgs; jL++) {
+                        shift_bas(env_loc, env, Ls, jptrxyz, jL);
+                        if ((*fprescreen)(shls, pbcopt, atm, bas, env_loc)) {
+                                jLlst[njL] = jL;
+                                njL++;
+                        }
+                }
+                if (njL > jLoff[niL]) {
+                        iLlst[niL] = iL;
+                        niL++;
+                        jLoff[niL] = njL;
+                }
+        }
+        return niL;
+}
+
 static void sort3c_kks1(double complex *out, double *bufr, double *bufi,
                         int *kptij_idx, int *shls_slice, int *ao_loc,
                         int nkpts, int nkpts_ij, int comp, int ish, int jsh,
@@ -152,19 +198,23 @@ static void _nr3c_fill_kk(int (*intor)(), void (*fsort)(),
         int kshloc[ksh1-ksh0+1];
         int nkshloc = shloc_partition(kshloc, ao_loc, ksh0, ksh1, dkmax);
 
-        int i, m, msh0, msh1, dijm, dijmc, dijmk, empty;
-        int ksh, dk, iL0, iL, jL, iLcount;
+        int i, k, m, n, n0, msh0, msh1, dijm, dijmc, dijmk;
+        int ksh, dk, iL, jL, jLp, njL, nLcount;
         int shls[3];
+        double *bufexpj_r = buf;
+        double *bufexpj_i = bufexpj_r + (size_t)nimgs * nkpts;
+        double *bufexpi_r = bufexpj_i + (size_t)nimgs * nkpts;
+        double *bufexpi_i = bufexpi_r + (size_t)MIN(nimgs,IMGBLK) * nkpts;
         double *bufkk_r, *bufkk_i, *bufkL_r, *bufkL_i, *bufL, *pbuf, *cache;
-        int (*fprescreen)();
-        if (pbcopt != NULL) {
-                fprescreen = pbcopt->fprescreen;
-        } else {
-                fprescreen = PBCnoscreen;
-        }
 
         shls[0] = ish;
         shls[1] = jsh;
+        int *iLlst = alloc_pair_images(nimgs);
+        int *jLoff = iLlst + nimgs;
+        int *jLlst = jLoff + nimgs + 1;
+        int niL = pair_images(iLlst, jLoff, jLlst, shls, nimgs, iptrxyz, jptrxyz,
+                              env_loc, Ls, pbcopt, atm, bas, env);
+
         for (m = 0; m < nkshloc; m++) {
                 msh0 = kshloc[m];
                 msh1 = kshloc[m+1];
@@ -172,7 +222,7 @@ static void _nr3c_fill_kk(int (*intor)(), void (*fsort)(),
                 dijm = dij * dkmax;
                 dijmc = dijm * comp;
                 dijmk = dijmc * nkpts;
-                bufkk_r = buf;
+                bufkk_r = bufexpi_i + (size_t)MIN(nimgs,IMGBLK) * nkpts;
                 bufkk_i = bufkk_r + (size_t)nkpts * dijmk;
                 bufkL_r = bufkk_i + (size_t)nkpts * dijmk;
                 bufkL_i = bufkL_r + (size_t)MIN(nimgs,IMGBLK) * dijmk;
@@ -182,56 +232,59 @@ static void _nr3c_fill_kk(int (*intor)(), void (*fsort)(),
                         bufkk_r[i] = 0;
                 }
 
-                for (iL0 = 0; iL0 < nimgs; iL0+=IMGBLK) {
-                        iLcount = MIN(IMGBLK, nimgs - iL0);
-                        for (iL = iL0; iL < iL0+iLcount; iL++) {
+                for (n0 = 0; n0 < niL; n0+=IMGBLK) {
+                        nLcount = MIN(IMGBLK, niL - n0);
+                        for (n = n0; n < n0+nLcount; n++) {
+                                iL = iLlst[n];
                                 shift_bas(env_loc, env, Ls, iptrxyz, iL);
+                                njL = jLoff[n+1] - jLoff[n];
                                 pbuf = bufL;
-        for (jL = 0; jL < nimgs; jL++) {
+        for (jLp = 0; jLp < njL; jLp++) {
+                jL = jLlst[jLoff[n]+jLp];
                 shift_bas(env_loc, env, Ls, jptrxyz, jL);
-                if ((*fprescreen)(shls, pbcopt, atm, bas, env_loc)) {
-                        for (ksh = msh0; ksh < msh1; ksh++) {
-                                shls[2] = ksh;
-                                if ((*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
-                                             env_loc, cintopt, cache)) {
-                                        empty = 0;
-                                }
-                                dk = ao_loc[ksh+1] - ao_loc[ksh];
-                                pbuf += dij*dk * comp;
-                        }
-                } else {
-                        for (i = 0; i < dijmc; i++) {
-                                pbuf[i] = 0;
-                        }
-                        pbuf += dijmc;
+                for (ksh = msh0; ksh < msh1; ksh++) {
+                        shls[2] = ksh;
+                        (*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
+                                 env_loc, cintopt, cache);
+                        dk = ao_loc[ksh+1] - ao_loc[ksh];
+                        pbuf += dij*dk * comp;
                 }
+                for (k = 0; k < nkpts; k++) {
+                        bufexpj_r[k*njL+jLp] = expkL_r[k*nimgs+jL];
+                        bufexpj_i[k*njL+jLp] = expkL_i[k*nimgs+jL];
+                }
+        }
+        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &njL,
+               &D1, bufL, &dijmc, bufexpj_r, &njL,
+               &D0, bufkL_r+(n-n0)*(size_t)dijmk, &dijmc);
+        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &njL,
+               &D1, bufL, &dijmc, bufexpj_i, &njL,
+               &D0, bufkL_i+(n-n0)*(size_t)dijmk, &dijmc);
+        for (k = 0; k < nkpts; k++) {
+                bufexpi_r[k*nLcount+n-n0] = expkL_r[k*nimgs+iL];
+                bufexpi_i[k*nLcount+n-n0] = expkL_i[k*nimgs+iL];
         }
-        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &nimgs,
-               &D1, bufL, &dijmc, expkL_r, &nimgs,
-               &D0, bufkL_r+(iL-iL0)*(size_t)dijmk, &dijmc);
-        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &nimgs,
-               &D1, bufL, &dijmc, expkL_i, &nimgs,
-               &D0, bufkL_i+(iL-iL0)*(size_t)dijmk, &dijmc);
-
-                        } // iL in range(0, nimgs)
+
+                        } // iL in iLlst
                         // conj(exp(1j*dot(h,k)))
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &iLcount,
-                               &D1, bufkL_r, &dijmk, expkL_r+iL0, &nimgs,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &nLcount,
+                               &D1, bufkL_r, &dijmk, bufexpi_r, &nLcount,
                                &D1, bufkk_r, &dijmk);
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &iLcount,
-                               &D1, bufkL_i, &dijmk, expkL_i+iL0, &nimgs,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &nLcount,
+                               &D1, bufkL_i, &dijmk, bufexpi_i, &nLcount,
                                &D1, bufkk_r, &dijmk);
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &iLcount,
-                               &D1, bufkL_i, &dijmk, expkL_r+iL0, &nimgs,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &nLcount,
+                               &D1, bufkL_i, &dijmk, bufexpi_r, &nLcount,
                                &D1, bufkk_i, &dijmk);
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &iLcount,
-                               &ND1, bufkL_r, &dijmk, expkL_i+iL0, &nimgs,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmk, &nkpts, &nLcount,
+                               &ND1, bufkL_r, &dijmk, bufexpi_i, &nLcount,
                                &D1, bufkk_i, &dijmk);
                 }
                 (*fsort)(out, bufkk_r, bufkk_i, kptij_idx, shls_slice,
                          ao_loc, nkpts, nkpts_ij, comp, ish, jsh,
                          msh0, msh1);
         }
+        free(iLlst);
 }
 
 /* ('...LM,kL,lM->...kl', int3c, exp_kL, exp_kL) */
@@ -428,23 +481,23 @@ static void _nr3c_fill_k(int (*intor)(), void (*fsort)(),
         int kshloc[ksh1-ksh0+1];
         int nkshloc = shloc_partition(kshloc, ao_loc, ksh0, ksh1, dkmax);
 
-        int i, m, msh0, msh1, dijmc, empty;
+        int i, m, n, msh0, msh1, dijmc;
         size_t dijmk;
-        int ksh, dk, iL, jL, jLcount;
+        int ksh, dk, iL, jL, jLp, njL;
         int shls[3];
         double *bufexp_r = buf;
         double *bufexp_i = bufexp_r + nimgs * nkpts;
         double *bufk_r = bufexp_i + nimgs * nkpts;
         double *bufk_i, *bufL, *pbuf, *cache;
-        int (*fprescreen)();
-        if (pbcopt != NULL) {
-                fprescreen = pbcopt->fprescreen;
-        } else {
-                fprescreen = PBCnoscreen;
-        }
 
         shls[0] = ish;
         shls[1] = jsh;
+        int *iLlst = alloc_pair_images(nimgs);
+        int *jLoff = iLlst + nimgs;
+        int *jLlst = jLoff + nimgs + 1;
+        int niL = pair_images(iLlst, jLoff, jLlst, shls, nimgs, iptrxyz, jptrxyz,
+                              env_loc, Ls, pbcopt, atm, bas, env);
+
         for (m = 0; m < nkshloc; m++) {
                 msh0 = kshloc[m];
                 msh1 = kshloc[m+1];
@@ -458,42 +511,40 @@ static void _nr3c_fill_k(int (*intor)(), void (*fsort)(),
                         bufk_r[i] = 0;
                 }
 
-                for (iL = 0; iL < nimgs; iL++) {
+                for (n = 0; n < niL; n++) {
+                        iL = iLlst[n];
                         shift_bas(env_loc, env, Ls, iptrxyz, iL);
+                        njL = jLoff[n+1] - jLoff[n];
                         pbuf = bufL;
-                        jLcount = 0;
-                        for (jL = 0; jL < nimgs; jL++) {
+                        for (jLp = 0; jLp < njL; jLp++) {
+                                jL = jLlst[jLoff[n]+jLp];
                                 shift_bas(env_loc, env, Ls, jptrxyz, jL);
 
-        if ((*fprescreen)(shls, pbcopt, atm, bas, env_loc)) {
                 for (ksh = msh0; ksh < msh1; ksh++) {
                         shls[2] = ksh;
-                        if ((*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
-                                     env_loc, cintopt, cache)) {
-                                empty = 0;
-                        }
+                        (*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
+                                 env_loc, cintopt, cache);
                         dk = ao_loc[ksh+1] - ao_loc[ksh];
                         pbuf += dij*dk * comp;
                 }
                 // ('k,kL->kL', conj(expkL[iL]), expkL)
                 for (i = 0; i < nkpts; i++) {
-                        bufexp_r[i*nimgs+jLcount] = expkL_r[i*nimgs+jL] * expkL_r[i*nimgs+iL];
-                        bufexp_r[i*nimgs+jLcount]+= expkL_i[i*nimgs+jL] * expkL_i[i*nimgs+iL];
-                        bufexp_i[i*nimgs+jLcount] = expkL_i[i*nimgs+jL] * expkL_r[i*nimgs+iL];
-                        bufexp_i[i*nimgs+jLcount]-= expkL_r[i*nimgs+jL] * expkL_i[i*nimgs+iL];
+                        bufexp_r[i*nimgs+jLp] = expkL_r[i*nimgs+jL] * expkL_r[i*nimgs+iL];
+                        bufexp_r[i*nimgs+jLp]+= expkL_i[i*nimgs+jL] * expkL_i[i*nimgs+iL];
+                        bufexp_i[i*nimgs+jLp] = expkL_i[i*nimgs+jL] * expkL_r[i*nimgs+iL];
+                        bufexp_i[i*nimgs+jLp]-= expkL_r[i*nimgs+jL] * expkL_i[i*nimgs+iL];
                 }
-                jLcount++;
-        }
                         }
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &jLcount,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &njL,
                                &D1, bufL, &dijmc, bufexp_r, &nimgs, &D1, bufk_r, &dijmc);
-                        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &jLcount,
+                        dgemm_(&TRANS_N, &TRANS_N, &dijmc, &nkpts, &njL,
                                &D1, bufL, &dijmc, bufexp_i, &nimgs, &D1, bufk_i, &dijmc);
 
-                } // iL in range(0, nimgs)
+                } // iL in iLlst
                 (*fsort)(out, bufk_r, bufk_i, shls_slice, ao_loc,
                          nkpts, comp, ish, jsh, msh0, msh1);
         }
+        free(iLlst);
 }
 /* ('...LM,kL,kM->...k', int3c, exp_kL, exp_kL) */
 void PBCnr3c_fill_ks1(int (*intor)(), double complex *out, int nkpts_ij,
@@ -706,23 +757,23 @@ static void _nr3c_fill_g(int (*intor)(), void (*fsort)(), double *out, int nkpts
         int kshloc[ksh1-ksh0+1];
         int nkshloc = shloc_partition(kshloc, ao_loc, ksh0, ksh1, dkmax);
 
-        int i, m, msh0, msh1, dijm;
-        int ksh, dk, iL, jL, dijkc;
+        int i, m, n, msh0, msh1, dijm;
+        int ksh, dk, iL, jL, jLp, dijkc;
         int shls[3];
 
         int dijmc = dij * dkmax * comp;
         double *bufL = buf + dijmc;
         double *cache = bufL + dijmc;
         double *pbuf;
-        int (*fprescreen)();
-        if (pbcopt != NULL) {
-                fprescreen = pbcopt->fprescreen;
-        } else {
-                fprescreen = PBCnoscreen;
-        }
 
         shls[0] = ish;
         shls[1] = jsh;
+        int *iLlst = alloc_pair_images(nimgs);
+        int *jLoff = iLlst + nimgs;
+        int *jLlst = jLoff + nimgs + 1;
+        int niL = pair_images(iLlst, jLoff, jLlst, shls, nimgs, iptrxyz, jptrxyz,
+                              env_loc, Ls, pbcopt, atm, bas, env);
+
         for (m = 0; m < nkshloc; m++) {
                 msh0 = kshloc[m];
                 msh1 = kshloc[m+1];
@@ -733,12 +784,13 @@ static void _nr3c_fill_g(int (*intor)(), void (*fsort)(), double *out, int nkpts
                         bufL[i] = 0;
                 }
 
-                for (iL = 0; iL < nimgs; iL++) {
+                for (n = 0; n < niL; n++) {
+                        iL = iLlst[n];
                         shift_bas(env_loc, env, Ls, iptrxyz, iL);
-                        for (jL = 0; jL < nimgs; jL++) {
+                        for (jLp = jLoff[n]; jLp < jLoff[n+1]; jLp++) {
+                                jL = jLlst[jLp];
                                 shift_bas(env_loc, env, Ls, jptrxyz, jL);
 
-        if ((*fprescreen)(shls, pbcopt, atm, bas, env_loc)) {
                 pbuf = bufL;
                 for (ksh = msh0; ksh < msh1; ksh++) {
                         shls[2] = ksh;
@@ -752,11 +804,11 @@ static void _nr3c_fill_g(int (*intor)(), void (*fsort)(), double *out, int nkpts
                         }
                         pbuf += dijkc;
                 }
-        }
                         }
-                } // iL in range(0, nimgs)
+                } // iL in iLlst
                 (*fsort)(out, bufL, shls_slice, ao_loc, comp, ish, jsh, msh0, msh1);
         }
+        free(iLlst);
 }
 /* ('...LM->...', int3c) */
 void PBCnr3c_fill_gs1(int (*intor)(), double *out, int nkpts_ij,
@@ -926,6 +978,7 @@ void PBCnr3c_drv(int (*intor)(), void (*fill)(), double complex *eri,
                         nkpts*MIN(nimgs,IMGBLK) * OF_CMPLX + nimgs;
 // MAX(INTBUFMAX, dijk) to ensure buffer is enough for at least one (i,j,k) shell
                 count*= MAX(INTBUFMAX, dijk) * comp;
+                count+= (nimgs + MIN(nimgs,IMGBLK)) * nkpts * OF_CMPLX;
         } else {
                 count = (nkpts * OF_CMPLX + nimgs) * INTBUFMAX10 * comp;
                 count+= nimgs * nkpts * OF_CMPLX;
@@ -1020,11 +1073,20 @@ static void _nr2c_fill(int (*intor)(), double complex *out,
         int ishloc[ish1-ish0+1];
         int nishloc = shloc_partition(ishloc, ao_loc, ish0, ish1, dimax);
 
-        int m, msh0, msh1, dmjc, ish, di, empty;
-        int jL;
+        int i, k, m, msh0, msh1, dmjc, ish, di, dijc, empty;
+        int jL, njL;
         int shls[2];
-        double *bufk_r = buf;
+        int ish_mask[ish1-ish0];
+        double *bufexp_r = buf;
+        double *bufexp_i = bufexp_r + nimgs * nkpts;
+        double *bufk_r = bufexp_i + nimgs * nkpts;
         double *bufk_i, *bufL, *pbuf, *cache;
+        int (*fprescreen)();
+        if (pbcopt != NULL) {
+                fprescreen = pbcopt->fprescreen;
+        } else {
+                fprescreen = PBCnoscreen;
+        }
 
         shls[1] = jsh;
         for (m = 0; m < nishloc; m++) {
@@ -1037,22 +1099,45 @@ static void _nr2c_fill(int (*intor)(), double complex *out,
                 cache  = bufL   + dmjc * nimgs;
 
                 pbuf = bufL;
+                njL = 0;
                 for (jL = 0; jL < nimgs; jL++) {
                         shift_bas(env_loc, env, Ls, jptrxyz, jL);
+                        // Skip the image jL if it is insignificant to all shells
+                        // of the block
+                        empty = 1;
+                        for (ish = msh0; ish < msh1; ish++) {
+                                shls[0] = ish;
+                                ish_mask[ish-msh0] = (*fprescreen)(shls, pbcopt, atm, bas, env_loc);
+                                empty &= !ish_mask[ish-msh0];
+                        }
+                        if (empty) {
+                                continue;
+                        }
+
                         for (ish = msh0; ish < msh1; ish++) {
                                 shls[0] = ish;
                                 di = ao_loc[ish+1] - ao_loc[ish];
-                                if ((*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
-                                             env_loc, cintopt, cache)) {
-                                        empty = 0;
+                                dijc = di * dj * comp;
+                                if (ish_mask[ish-msh0]) {
+                                        (*intor)(pbuf, NULL, shls, atm, natm, bas, nbas,
+                                                 env_loc, cintopt, cache);
+                                } else {
+                                        for (i = 0; i < dijc; i++) {
+                                                pbuf[i] = 0;
+                                        }
                                 }
-                                pbuf += di * dj * comp;
+                                pbuf += dijc;
                         }
+                        for (k = 0; k < nkpts; k++) {
+                                bufexp_r[k*nimgs+njL] = expkL_r[k*nimgs+jL];
+                                bufexp_i[k*nimgs+njL] = expkL_i[k*nimgs+jL];
+                        }
+                        njL++;
                 }
-                dgemm_(&TRANS_N, &TRANS_N, &dmjc, &nkpts, &nimgs,
-                       &D1, bufL, &dmjc, expkL_r, &nimgs, &D0, bufk_r, &dmjc);
-                dgemm_(&TRANS_N, &TRANS_N, &dmjc, &nkpts, &nimgs,
-                       &D1, bufL, &dmjc, expkL_i, &nimgs, &D0, bufk_i, &dmjc);
+                dgemm_(&TRANS_N, &TRANS_N, &dmjc, &nkpts, &njL,
+                       &D1, bufL, &dmjc, bufexp_r, &nimgs, &D0, bufk_r, &dmjc);
+                dgemm_(&TRANS_N, &TRANS_N, &dmjc, &nkpts, &njL,
+                       &D1, bufL, &dmjc, bufexp_i, &nimgs, &D0, bufk_i, &dmjc);
 
                 sort2c_ks1(out, bufk_r, bufk_i, shls_slice, ao_loc,
                            nkpts, comp, jsh, msh0, msh1);
@@ -1111,8 +1196,9 @@ void PBCnr2c_drv(int (*intor)(), void (*fill)(), double complex *out,
         int jsh;
         double *env_loc = malloc(sizeof(double)*nenv);
         memcpy(env_loc, env, sizeof(double)*nenv);
-        size_t count = nkpts * OF_CMPLX + nimgs;
-        double *buf = malloc(sizeof(double)*(count*INTBUFMAX10*comp+cache_size));
+        size_t count = (nkpts * OF_CMPLX + nimgs) * INTBUFMAX10 * comp;
+        count += nimgs * nkpts * OF_CMPLX;
+        double *buf = malloc(sizeof(double)*(count+cache_size));
 #pragma omp for schedule(dynamic)
         for (jsh = 0; jsh < njsh; jsh++) {
                 (*fill)(intor, out, nkpts, comp, nimgs, jsh,
@@ -38,7 +38,7 @@ void PBCdel_optimizer(PBCOpt **opt)
                 return;
         }
 
-        if (!opt0->rrcut) {
+        if (opt0->rrcut) {
                 free(opt0->rrcut);
         }
         free(opt0);
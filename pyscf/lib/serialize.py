@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# Copyright 2014-2019 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+'''
+Binary serialization of nested dicts/lists of numpy arrays
+
+The stream starts with a small JSON header which holds the structure of the
+object and the scalar values.  The arrays are stored after the header as raw
+data, one contiguous block for each array aligned to ALIGNMENT bytes::
+
+    magic       8 bytes  b'PYSCFBIN'
+    version     uint32   FORMAT_VERSION
+    reserved    uint32
+    header_len  uint64
+    header      JSON text
+    padding
+    data        raw data of the arrays
+
+:func:`loads` and :func:`load` do not copy the array data.  The arrays they
+return are read-only views of the input buffer (or of the memory-mapped
+file) unless ``copy=True`` is given.
+
+Examples:
+
+>>> from pyscf import lib
+>>> buf = lib.serialize.dumps({'mo_coeff': mf.mo_coeff, 'e_tot': mf.e_tot})
+>>> lib.serialize.loads(buf)['mo_coeff'].shape
+(24, 24)
+>>> lib.serialize.dump('cderi.bin', {'cderi': mydf._cderi})
+>>> cderi = lib.serialize.load('cderi.bin')['cderi']
+'''
+
+import sys
+import json
+import mmap
+import struct
+import numpy
+
+MAGIC = b'PYSCFBIN'
+# Increase FORMAT_VERSION when the layout of the stream is changed.  Streams
+# written by newer versions are rejected by loads.
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sIIQ')
+
+if sys.version_info >= (3,):
+    unicode = str
+    long = int
+
+
+def _encode(obj, arrays, offset):
+    '''Convert obj to a JSON-serializable structure.  The numpy arrays are
+    appended to the list arrays.  Returns the structure and the offset of
+    the next array in the data block.
+    '''
+    if obj is None or isinstance(obj, (bool, str, unicode)):
+        return obj, offset
+    elif isinstance(obj, (int, long, float)):
+        return obj, offset
+    elif isinstance(obj, numpy.ndarray):
+        if obj.dtype.hasobject:
+            raise TypeError('Array of Python objects is not supported')
+        arr = numpy.ascontiguousarray(obj)
+        arrays.append((offset, arr))
+        rec = {'__ndarray__': [offset, arr.dtype.str, list(arr.shape)]}
+        offset += (arr.nbytes + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        return rec, offset
+    elif isinstance(obj, numpy.generic):
+        return _encode(obj.item(), arrays, offset)
+    elif isinstance(obj, complex):
+        return {'__complex__': [obj.real, obj.imag]}, offset
+    elif isinstance(obj, (list, tuple, set)):
+        seq = []
+        for v in obj:
+            v, offset = _encode(v, arrays, offset)
+            seq.append(v)
+        if isinstance(obj, tuple):
+            return {'__tuple__': seq}, offset
+        elif isinstance(obj, set):
+            return {'__set__': seq}, offset
+        else:
+            return seq, offset
+    elif isinstance(obj, dict):
+        if all(isinstance(k, (str, unicode)) and not k.startswith('__')
+               for k in obj):
+            dic = {}
+            for k, v in obj.items():
+                dic[k], offset = _encode(v, arrays, offset)
+            return dic, offset
+        else:
+            items, offset = _encode([[k, v] for k, v in obj.items()],
+                                    arrays, offset)
+            return {'__dict__': items}, offset
+    else:
+        raise TypeError('Object of type %s is not serializable' % type(obj))
+
+def _decode(obj, data, copy):
+    if isinstance(obj, list):
+        return [_decode(v, data, copy) for v in obj]
+    elif not isinstance(obj, dict):
+        return obj
+    elif '__ndarray__' in obj:
+        offset, dtype, shape = obj['__ndarray__']
+        dtype = numpy.dtype(dtype)
+        count = int(numpy.prod(shape))
+        arr = numpy.frombuffer(data, dtype, count, offset).reshape(shape)
+        if copy:
+            arr = arr.copy()
+        return arr
+    elif '__tuple__' in obj:
+        return tuple(_decode(v, data, copy) for v in obj['__tuple__'])
+    elif '__set__' in obj:
+        return set(_decode(v, data, copy) for v in obj['__set__'])
+    elif '__complex__' in obj:
+        return complex(*obj['__complex__'])
+    elif '__dict__' in obj:
+        return dict((_decode(k, data, copy), _decode(v, data, copy))
+                    for k, v in obj['__dict__'])
+    else:
+        return dict((str(k), _decode(v, data, copy)) for k, v in obj.items())
+
+def _chunks(obj):
+    '''Generate the pieces of the binary stream of obj'''
+    arrays = []
+    header, data_size = _encode(obj, arrays, 0)
+    header = json.dumps(header).encode('utf-8')
+    head_size = _PREAMBLE.size + len(header)
+    pad = (ALIGNMENT - head_size % ALIGNMENT) % ALIGNMENT
+    yield _PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header))
+    yield header
+    yield b'\0' * pad
+
+    offset = 0
+    for p0, arr in arrays:
+        if p0 > offset:
+            yield b'\0' * (p0 - offset)
+        if arr.size > 0:
+            yield memoryview(arr.reshape(-1).view(numpy.uint8))
+        offset = p0 + arr.nbytes
+    if data_size > offset:
+        yield b'\0' * (data_size - offset)
+
+def dumps(obj):
+    '''Serialize obj to bytes.
+
+    obj can be composed of dicts, lists, tuples, sets, numpy arrays and the
+    scalars None, bool, int, float, complex and str.  TypeError is raised
+    for other types.
+    '''
+    return b''.join(_chunks(obj))
+
+def loads(buf, copy=False):
+    '''Deserialize obj from a bytes-like object (bytes, bytearray,
+    memoryview, mmap or numpy uint8 array).
+
+    Kwargs:
+        copy : bool
+            Whether to copy the arrays.  By default, the arrays are read-only
+            views of buf.
+    '''
+    buf = memoryview(buf)
+    if buf.ndim != 1 or buf.itemsize != 1:
+        buf = buf.cast('B')
+    if len(buf) < _PREAMBLE.size:
+        raise ValueError('Not a PySCF binary stream')
+    magic, version, _, header_len = _PREAMBLE.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError('Not a PySCF binary stream')
+    if version > FORMAT_VERSION:
+        raise ValueError('PySCF binary stream version %d is not supported '
+                         '(version <= %d)' % (version, FORMAT_VERSION))
+    p0 = _PREAMBLE.size
+    p1 = p0 + header_len
+    header = json.loads(bytes(buf[p0:p1]).decode('utf-8'))
+    data_start = (p1 + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+    return _decode(header, buf[data_start:], copy)
+
+def dump(filename, obj):
+    '''Serialize obj to file'''
+    with open(filename, 'wb') as f:
+        for chunk in _chunks(obj):
+            f.write(chunk)
+
+def load(filename, copy=False):
+    '''Deserialize obj from file.  The file is memory-mapped.  The arrays are
+    read-only views of the mapped file unless copy=True is given.
+    '''
+    with open(filename, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(buf, copy)
+
@@ -16,6 +16,7 @@
 import unittest
 import numpy
 import tempfile
+import h5py
 from pyscf import lib, gto
 
 class KnownValues(unittest.TestCase):
@@ -60,6 +61,60 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(numpy.all(a['x'][1] == dat['x'][1]))
         self.assertTrue(numpy.all(a['y'][0] == dat['y'][0]))
 
+    def test_chkfile_writer(self):
+        fchk = tempfile.NamedTemporaryFile()
+        lib.chkfile.save(fchk.name, 'mol', 'abc')
+        c = numpy.random.random((4,4))
+        with lib.chkfile.ChkfileWriter(fchk.name) as writer:
+            self.assertTrue('mol' in writer)
+            for i in range(3):
+                lib.chkfile.dump(fchk.name, 'scf', {'e_tot': -1.-i, 'mo_coeff': c+i,
+                                                    'mo_occ': [numpy.ones(2)]*2})
+                lib.chkfile.dump(fchk.name, 'scf/kpts', numpy.zeros((i+1,3)))
+                lib.chkfile.commit(fchk.name)
+            dat = lib.chkfile.load(fchk.name, 'scf')
+            self.assertEqual(dat['e_tot'], -3)
+            self.assertEqual(dat['kpts'].shape, (3,3))
+            # The staged data are visible to load before commit
+            lib.chkfile.dump(fchk.name, 'scf/e_tot', -4.)
+            self.assertEqual(lib.chkfile.load(fchk.name, 'scf/e_tot'), -4)
+            lib.chkfile.dump(fchk.name, 'scf/mo_coeff', c+3)
+        self.assertTrue(lib.chkfile.get_writer(fchk.name) is None)
+
+        dat = lib.chkfile.load(fchk.name, 'scf')
+        self.assertAlmostEqual(abs(dat['mo_coeff'] - (c+3)).max(), 0, 14)
+        self.assertEqual(dat['e_tot'], -4)
+        self.assertTrue(isinstance(dat['mo_occ'], list))
+        self.assertEqual(lib.chkfile.load(fchk.name, 'mol'), 'abc')
+
+        # Recover the last complete slot if the link is missing
+        with h5py.File(fchk.name, 'r+') as f:
+            self.assertTrue(isinstance(f.get('scf', getlink=True), h5py.SoftLink))
+            del(f['scf'])
+        self.assertEqual(lib.chkfile.load(fchk.name, 'scf/e_tot'), -4)
+        with lib.chkfile.ChkfileWriter(fchk.name):
+            lib.chkfile.dump(fchk.name, 'scf/e_tot', -5.)
+        dat = lib.chkfile.load(fchk.name, 'scf')
+        self.assertEqual(dat['e_tot'], -5)
+        self.assertAlmostEqual(abs(dat['mo_coeff'] - (c+3)).max(), 0, 14)
+
+    def test_scf_async_chkfile(self):
+        from pyscf import scf
+        mol = gto.M(atom='H 0 0 0; F 0 0 1.1', basis='631g', verbose=0)
+        mf = scf.RHF(mol)
+        e_ref = mf.kernel()
+        mo_ref = lib.chkfile.load(mf.chkfile, 'scf/mo_coeff')
+        try:
+            scf.hf.ASYNC_CHKFILE = True
+            mf = scf.RHF(mol)
+            self.assertAlmostEqual(mf.kernel(), e_ref, 9)
+        finally:
+            scf.hf.ASYNC_CHKFILE = False
+        mol1, dat = scf.chkfile.load_scf(mf.chkfile)
+        self.assertAlmostEqual(dat['e_tot'], e_ref, 9)
+        self.assertAlmostEqual(abs(abs(dat['mo_coeff']) - abs(mo_ref)).max(), 0, 6)
+        self.assertTrue(numpy.all(mol1._env == mol._env))
+
 
 if __name__ == "__main__":
     print("Full Tests for lib.chkfile")
@@ -19,6 +19,7 @@ import unittest
 import numpy
 import scipy.linalg
 import tempfile
+from pyscf import lib
 from pyscf import gto
 from pyscf import scf
 from pyscf import fci
@@ -38,6 +39,40 @@ class KnownValues(unittest.TestCase):
         e = myfci.kernel()[0]
         self.assertAlmostEqual(e, -11.579978414933732+mol.energy_nuc(), 9)
 
+    def test_davidson_locking(self):
+        numpy.random.seed(12)
+        n = 200
+        a = numpy.random.rand(n,n) * .1
+        a = a + a.T + numpy.diag(numpy.arange(n) * .1)
+        aop = lambda xs: [a.dot(x) for x in xs]
+        x0 = numpy.eye(n)[:16]
+        conv, e, x = lib.davidson_locking(aop, x0, a.diagonal(), tol=1e-10,
+                                          nroots=16, max_space=16, max_cycle=100)
+        ref, c = numpy.linalg.eigh(a)
+        self.assertTrue(all(conv))
+        self.assertAlmostEqual(abs(e - ref[:16]).max(), 0, 9)
+        self.assertAlmostEqual(abs(abs(numpy.dot(x, c[:,:16])) - numpy.eye(16)).max(), 0, 4)
+
+    def test_krylov_multiple_roots(self):
+        numpy.random.seed(10)
+        n = 100
+        a = numpy.random.rand(n,n) - .5
+        a = a.dot(a.T) * .01
+        b = numpy.random.rand(4,n) * numpy.array([1, 1e-2, 1e-4, 1])[:,None]
+        b[3] = b[0] - b[1]
+        aop = lambda x: numpy.dot(x, a.T)
+        x = lib.krylov(aop, b, tol=1e-12, max_cycle=100)
+        ref = numpy.linalg.solve(numpy.eye(n)+a, b.T).T
+        self.assertAlmostEqual(abs(x - ref).max(), 0, 9)
+
+        # tol is the residual relative to the norm of each right-hand side
+        x = lib.krylov(aop, b, tol=1e-8, max_cycle=100)
+        r = numpy.linalg.norm(x + aop(x) - b, axis=1)
+        self.assertTrue(all(r < 1e-8 * numpy.linalg.norm(b, axis=1)))
+
+        x = lib.krylov(aop, b[0], tol=1e-12, max_cycle=100)
+        self.assertAlmostEqual(abs(x - ref[0]).max(), 0, 8)
+
 if __name__ == "__main__":
     print("Full Tests for linalg_helper")
     unittest.main()
@@ -50,5 +50,16 @@ class KnownValues(unittest.TestCase):
         b = B()
         self.assertEqual(b.f2(), 'b')
 
+    def test_process_map(self):
+        a = numpy.random.random((5,8,8))
+        ref = [numpy.linalg.eigh(x+x.T)[0] for x in a]
+        e = lib.process_map(lambda k: numpy.linalg.eigh(a[k]+a[k].T)[0], range(5), 2)
+        self.assertAlmostEqual(abs(numpy.array(e) - ref).max(), 0, 12)
+
+        # process_map called in a worker runs serially
+        e = lib.process_map(lambda k: lib.process_map(
+            lambda x: numpy.linalg.eigh(x+x.T)[0], [a[k], a[k]], 2)[0], range(5), 2)
+        self.assertAlmostEqual(abs(numpy.array(e) - ref).max(), 0, 12)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# Copyright 2014-2018 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+import tempfile
+from pyscf import lib, gto
+from pyscf.scf import chkfile
+
+class KnownValues(unittest.TestCase):
+    def test_dumps_loads(self):
+        a = {'x': [numpy.random.random((4,3)), numpy.arange(5)],
+             'y': (1, 2.5, 1+2j, None, 'abc'),
+             'z': {1: numpy.zeros((2,0,3)), (0,1): set([2])},
+             'w': numpy.random.random((3,4)).T + 1j}
+        buf = lib.serialize.dumps(a)
+        dat = lib.serialize.loads(buf)
+        self.assertTrue(numpy.all(a['x'][0] == dat['x'][0]))
+        self.assertTrue(numpy.all(a['x'][1] == dat['x'][1]))
+        self.assertEqual(dat['x'][1].dtype, a['x'][1].dtype)
+        self.assertEqual(dat['y'], a['y'])
+        self.assertEqual(dat['z'][1].shape, (2,0,3))
+        self.assertEqual(dat['z'][(0,1)], set([2]))
+        self.assertTrue(numpy.all(a['w'] == dat['w']))
+        # zero-copy: arrays are read-only views of the input buffer
+        self.assertFalse(dat['x'][0].flags.writeable)
+        dat = lib.serialize.loads(buf, copy=True)
+        self.assertTrue(dat['x'][0].flags.writeable)
+
+        self.assertRaises(TypeError, lib.serialize.dumps, {'a': object()})
+        self.assertRaises(ValueError, lib.serialize.loads, b'x' * 32)
+        buf = bytearray(buf)
+        buf[8] = lib.serialize.FORMAT_VERSION + 1
+        self.assertRaises(ValueError, lib.serialize.loads, buf)
+
+    def test_dump_load_file(self):
+        a = {'cderi': numpy.random.random((6,10)), 'kpt': numpy.zeros(3)}
+        ftmp = tempfile.NamedTemporaryFile()
+        lib.serialize.dump(ftmp.name, a)
+        dat = lib.serialize.load(ftmp.name)
+        self.assertTrue(numpy.all(a['cderi'] == dat['cderi']))
+        self.assertTrue(numpy.all(a['kpt'] == dat['kpt']))
+        self.assertEqual(dat['cderi'].ctypes.data % lib.serialize.ALIGNMENT, 0)
+
+    def test_mole_dumpb_loadb(self):
+        mol = gto.M(atom='O 0 0 0; H 0 1 .8; H 0 -1 .8', basis='ccpvdz',
+                    symmetry=True, verbose=0)
+        mol1 = gto.loadb(mol.dumpb())
+        self.assertTrue(numpy.all(mol1._atm == mol._atm))
+        self.assertTrue(numpy.all(mol1._bas == mol._bas))
+        self.assertTrue(numpy.all(mol1._env == mol._env))
+        self.assertEqual(mol1.atom, mol.atom)
+        self.assertEqual(mol1.topgroup, mol.topgroup)
+        self.assertEqual(len(mol1.symm_orb), len(mol.symm_orb))
+        self.assertTrue(numpy.all(mol1.symm_orb[1] == mol.symm_orb[1]))
+        mol1._env[0] = 1.  # should be writable
+        self.assertAlmostEqual(abs(mol1.intor('int1e_ovlp') -
+                                   mol.intor('int1e_ovlp')).max(), 0, 14)
+
+    def test_scf_dumpb_loadb(self):
+        mol = gto.M(atom='H 0 0 0; H 0 0 .74', basis='sto3g', verbose=0)
+        mo_coeff = numpy.random.random((2,2))
+        buf = chkfile.dumpb_scf(mol, -1.1, numpy.arange(2.), mo_coeff,
+                                numpy.array([2., 0]))
+        mol1, scf_rec = chkfile.loadb_scf(buf)
+        self.assertTrue(numpy.all(mol1._env == mol._env))
+        self.assertEqual(scf_rec['e_tot'], -1.1)
+        self.assertTrue(numpy.all(scf_rec['mo_coeff'] == mo_coeff))
+
+    def test_cell_dumpb_loadb(self):
+        from pyscf.pbc import gto as pbcgto
+        cell = pbcgto.M(atom='He 0 0 0', a=numpy.eye(3)*3, basis='sto3g',
+                        verbose=0)
+        cell1 = cell.loadb(cell.dumpb())
+        self.assertTrue(numpy.all(cell1._env == cell._env))
+        self.assertTrue(numpy.all(cell1.lattice_vectors() == cell.lattice_vectors()))
+        self.assertTrue(numpy.all(cell1.mesh == cell.mesh))
+
+
+if __name__ == "__main__":
+    print("Full Tests for lib.serialize")
+    unittest.main()
@@ -62,16 +62,24 @@ int GTOmax_cache_size(int (*intor)(), int *shls_slice, int ncenter,
         } else { \
                 fprescreen = CVHFnoscreen; \
         } \
-        int ksh, lsh, k0, k1, l0, l1, idm;
+        int ksh, lsh, k0, k1, l0, l1, idm, n, wt;
 
+/* The return value of fprescreen is the weight of the integrals.  It is
+ * larger than 1 for the symmetry-unique shell quartets of the skeleton
+ * integrals (see CVHFnrs8_skeleton_prescreen) */
 #define INTOR_AND_CONTRACT \
-        if ((*fprescreen)(shls, vhfopt, atm, bas, env) \
+        if ((wt = (*fprescreen)(shls, vhfopt, atm, bas, env)) \
             && (*intor)(buf, NULL, shls, atm, natm, bas, nbas, env, \
                         cintopt, cache)) { \
                 k0 = ao_loc[ksh] - koff; \
                 l0 = ao_loc[lsh] - loff; \
                 k1 = ao_loc[ksh+1] - koff; \
                 l1 = ao_loc[lsh+1] - loff; \
+                if (wt > 1) { \
+                        for (n = 0; n < di*dj*(k1-k0)*(l1-l0)*ncomp; n++) { \
+                                buf[n] *= wt; \
+                        } \
+                } \
                 for (idm = 0; idm < n_dm; idm++) { \
                         pf = jkop[idm]->contract; \
                         (*pf)(buf, dms[idm], vjk[idm], shls, \
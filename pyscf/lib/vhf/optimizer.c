@@ -40,6 +40,8 @@ void CVHFinit_optimizer(CVHFOpt **opt, int *atm, int natm,
         opt0->dm_cond = NULL;
         opt0->fprescreen = &CVHFnoscreen;
         opt0->r_vkscreen = &CVHFr_vknoscreen;
+        opt0->nsymm_ops = 0;
+        opt0->symm_shl_map = NULL;
         *opt = opt0;
 }
 
@@ -117,6 +119,95 @@ int CVHFnrs8_prescreen(int *shls, CVHFOpt *opt,
             || (  dm_cond[i*n+l] > dmin));
 }
 
+/*
+ * The number of distinct shell quartets in the orbit of the given quartet
+ * under the point group operations, if the quartet is the representative
+ * (the largest one in the lexical order) of the orbit.  Zero is returned
+ * for the other quartets of the orbit.  Quartets are compared after
+ * sorting the indices within the two pairs (i>=j, k>=l).  When pair_swap
+ * is set, the two pairs are sorted as well ((ij)>=(kl)), which matches the
+ * 8-fold permutation symmetry of the shell loops in CVHFdot_nrs8.
+ */
+static int skeleton_weight(int *shls, CVHFOpt *opt, int pair_swap)
+{
+        const int nbas = opt->nbas;
+        const int nops = opt->nsymm_ops;
+        const int *shl_map = opt->symm_shl_map;
+        int i = shls[0];
+        int j = shls[1];
+        int k = shls[2];
+        int l = shls[3];
+        int op, ri, rj, rk, rl, tmp;
+        int nstab = 0;
+        for (op = 0; op < nops; op++) {
+                ri = shl_map[op*nbas+i];
+                rj = shl_map[op*nbas+j];
+                rk = shl_map[op*nbas+k];
+                rl = shl_map[op*nbas+l];
+                if (ri < rj) { tmp = ri; ri = rj; rj = tmp; }
+                if (rk < rl) { tmp = rk; rk = rl; rl = tmp; }
+                if (pair_swap && (rk > ri || (rk == ri && rl > rj))) {
+                        tmp = ri; ri = rk; rk = tmp;
+                        tmp = rj; rj = rl; rl = tmp;
+                }
+                if (ri != i) {
+                        if (ri > i) return 0;
+                } else if (rj != j) {
+                        if (rj > j) return 0;
+                } else if (rk != k) {
+                        if (rk > k) return 0;
+                } else if (rl != l) {
+                        if (rl > l) return 0;
+                } else {
+                        nstab++;
+                }
+        }
+        return nops / nstab;
+}
+
+/*
+ * Screening function for the skeleton Fock matrix.  It returns the weight
+ * of the shell quartet (see skeleton_weight) which is used by
+ * CVHFnr_direct_drv to scale the integrals.
+ */
+int CVHFnrs8_skeleton_prescreen(int *shls, CVHFOpt *opt,
+                                int *atm, int *bas, double *env)
+{
+        if (!opt) {
+                return 1;
+        }
+        int weight = 1;
+        if (opt->nsymm_ops > 1) {
+                weight = skeleton_weight(shls, opt, 1);
+        }
+        if (weight && opt->dm_cond &&
+            !CVHFnrs8_prescreen(shls, opt, atm, bas, env)) {
+                weight = 0;
+        }
+        return weight;
+}
+
+/*
+ * Skeleton integrals for the AO2MO transformation in 4-fold permutation
+ * symmetry.  Returns the weight of the shell quartet.
+ */
+int CVHFnr_skeleton_schwarz_cond(int *shls, CVHFOpt *opt,
+                                 int *atm, int *bas, double *env)
+{
+        if (!opt) {
+                return 1;
+        }
+        int weight = 1;
+        if (opt->nsymm_ops > 1) {
+                weight = skeleton_weight(shls, opt, 0);
+        }
+        if (weight && opt->q_cond &&
+            !CVHFnr_schwarz_cond(shls, opt, atm, bas, env)) {
+                weight = 0;
+        }
+        return weight;
+}
+
 int CVHFnrs8_vj_prescreen(int *shls, CVHFOpt *opt,
                           int *atm, int *bas, double *env)
 {
@@ -245,6 +336,74 @@ void CVHFsetnr_direct_scf(CVHFOpt *opt, int (*intor)(), CINTOpt *cintopt,
 }
 }
 
+/*
+ * Bounds sqrt(max|(nabla i j|nabla i j)|) for the integrals of nuclear
+ * gradients.  intor is int2e_ip1ip2 which has 9 components.  Only the
+ * diagonal components xx, yy, zz are used.  (nabla i j|nabla i j) is not
+ * symmetric in i and j.  q_cond is symmetrized by the larger of the two.
+ */
+void CVHFsetnr_direct_scf_ip1ip2(CVHFOpt *opt, int (*intor)(), CINTOpt *cintopt,
+                                 int *ao_loc, int *atm, int natm,
+                                 int *bas, int nbas, double *env)
+{
+        if (opt->q_cond) {
+                free(opt->q_cond);
+        }
+        opt->q_cond = (double *)malloc(sizeof(double) * nbas*nbas);
+        double *qtmp_all = malloc(sizeof(double) * nbas*nbas);
+        int shls_slice[] = {0, nbas};
+        const int cache_size = GTOmax_cache_size(intor, shls_slice, 1,
+                                                 atm, natm, bas, nbas, env);
+#pragma omp parallel
+{
+        double qtmp, tmp;
+        int ij, i, j, x, di, dj, ish, jsh;
+        size_t dijij;
+        int shls[4];
+        double *cache = malloc(sizeof(double) * cache_size);
+        di = 0;
+        for (ish = 0; ish < nbas; ish++) {
+                dj = ao_loc[ish+1] - ao_loc[ish];
+                di = MAX(di, dj);
+        }
+        double *buf = malloc(sizeof(double) * di*di*di*di * 9);
+#pragma omp for schedule(dynamic, 4)
+        for (ij = 0; ij < nbas*nbas; ij++) {
+                ish = ij / nbas;
+                jsh = ij % nbas;
+                di = ao_loc[ish+1] - ao_loc[ish];
+                dj = ao_loc[jsh+1] - ao_loc[jsh];
+                dijij = (size_t)di * dj * di * dj;
+                shls[0] = ish;
+                shls[1] = jsh;
+                shls[2] = ish;
+                shls[3] = jsh;
+                qtmp = 1e-100;
+                if (0 != (*intor)(buf, NULL, shls, atm, natm, bas, nbas, env,
+                                  cintopt, cache)) {
+                        // components xx, yy, zz
+                        for (x = 0; x < 9; x += 4) {
+                        for (i = 0; i < di; i++) {
+                        for (j = 0; j < dj; j++) {
+                                tmp = fabs(buf[dijij*x+i+di*j+di*dj*i+di*dj*di*j]);
+                                qtmp = MAX(qtmp, tmp);
+                        } } }
+                        qtmp = sqrt(qtmp);
+                }
+                qtmp_all[ij] = qtmp;
+        }
+        free(buf);
+        free(cache);
+}
+        int ish, jsh;
+        for (ish = 0; ish < nbas; ish++) {
+        for (jsh = 0; jsh < nbas; jsh++) {
+                opt->q_cond[ish*nbas+jsh] = MAX(qtmp_all[ish*nbas+jsh],
+                                                qtmp_all[jsh*nbas+ish]);
+        } }
+        free(qtmp_all);
+}
+
 void CVHFsetnr_direct_scf_dm(CVHFOpt *opt, double *dm, int nset, int *ao_loc,
                              int *atm, int natm, int *bas, int nbas, double *env)
 {
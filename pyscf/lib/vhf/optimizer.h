@@ -29,6 +29,10 @@ typedef struct CVHFOpt_struct {
     int (*r_vkscreen)(int *shls, struct CVHFOpt_struct *opt,
                       double **dms_cond, int n_dm, double *dm_atleast,
                       int *atm, int *bas, double *env);
+    // Point group operations on shells for the skeleton integrals.
+    // symm_shl_map[op*nbas+ish] is the image of shell ish under op.
+    int nsymm_ops;
+    int *symm_shl_map;
 } CVHFOpt;
 #endif
 
@@ -43,6 +47,10 @@ int CVHFnr_schwarz_cond(int *shls, CVHFOpt *opt,
                         int *atm, int *bas, double *env);
 int CVHFnrs8_prescreen(int *shls, CVHFOpt *opt,
                        int *atm, int *bas, double *env);
+int CVHFnrs8_skeleton_prescreen(int *shls, CVHFOpt *opt,
+                                int *atm, int *bas, double *env);
+int CVHFnr_skeleton_schwarz_cond(int *shls, CVHFOpt *opt,
+                                 int *atm, int *bas, double *env);
 
 int CVHFr_vknoscreen(int *shls, CVHFOpt *opt,
                      double **dms_cond, int n_dm, double *dm_atleast,
@@ -51,6 +59,9 @@ int CVHFr_vknoscreen(int *shls, CVHFOpt *opt,
 void CVHFsetnr_direct_scf(CVHFOpt *opt, int (*intor)(), CINTOpt *cintopt,
                           int *ao_loc, int *atm, int natm,
                           int *bas, int nbas, double *env);
+void CVHFsetnr_direct_scf_ip1ip2(CVHFOpt *opt, int (*intor)(), CINTOpt *cintopt,
+                                 int *ao_loc, int *atm, int natm,
+                                 int *bas, int nbas, double *env);
 void CVHFsetnr_direct_scf_dm(CVHFOpt *opt, double *dm, int nset, int *ao_loc,
                              int *atm, int natm, int *bas, int nbas, double *env);
 
@@ -591,6 +591,19 @@ def spin_square(casscf, mo_coeff=None, ci=None, ovlp=None):
 class StateAverageFCISolver:
     pass
 
+def _sa_rdm_batchable(fcibase_class, method, ci, weights, args, kwargs):
+    '''Whether the state-averaged density matrices of the base FCI solver can
+    be evaluated for all roots together by fci.direct_spin1.make_sa_rdm*'''
+    def unbound(f):
+        return getattr(f, '__func__', f)
+    fn = unbound(getattr(fcibase_class, method, None))
+    if (args or kwargs or min(weights) < 0 or
+        fn not in (unbound(getattr(fci.direct_spin1.FCISolver, method)),
+                   unbound(getattr(fci.direct_spin0.FCISolver, method)))):
+        return False
+    return all(isinstance(c, numpy.ndarray) and c.dtype == numpy.double
+               for c in ci)
+
 def state_average_(casscf, weights=(0.5,0.5)):
     ''' State average over the energy.  The energy funcitonal is
     E = w1<psi1|H|psi1> + w2<psi2|H|psi2> + ...
@@ -640,11 +653,17 @@ def state_average_(casscf, weights=(0.5,0.5)):
                                         nroots=self.nroots, **kwargs)
             return numpy.einsum('i,i->', e, weights), c
         def make_rdm1(self, ci0, norb, nelec, *args, **kwargs):
+            if _sa_rdm_batchable(fcibase_class, 'make_rdm1', ci0, weights, args, kwargs):
+                nelec = fci.direct_spin1._unpack_nelec(nelec, getattr(self, 'spin', None))
+                return fci.direct_spin1.make_sa_rdm1(ci0, weights, norb, nelec)
             dm1 = 0
             for i, wi in enumerate(weights):
                 dm1 += wi * fcibase_class.make_rdm1(self, ci0[i], norb, nelec, *args, **kwargs)
             return dm1
         def make_rdm1s(self, ci0, norb, nelec, *args, **kwargs):
+            if _sa_rdm_batchable(fcibase_class, 'make_rdm1s', ci0, weights, args, kwargs):
+                nelec = fci.direct_spin1._unpack_nelec(nelec, getattr(self, 'spin', None))
+                return fci.direct_spin1.make_sa_rdm1s(ci0, weights, norb, nelec)
             dm1a, dm1b = 0, 0
             for i, wi in enumerate(weights):
                 dm1s = fcibase_class.make_rdm1s(self, ci0[i], norb, nelec, *args, **kwargs)
@@ -652,6 +671,9 @@ def state_average_(casscf, weights=(0.5,0.5)):
                 dm1b += wi * dm1s[1]
             return dm1a, dm1b
         def make_rdm12(self, ci0, norb, nelec, *args, **kwargs):
+            if _sa_rdm_batchable(fcibase_class, 'make_rdm12', ci0, weights, args, kwargs):
+                nelec = fci.direct_spin1._unpack_nelec(nelec, getattr(self, 'spin', None))
+                return fci.direct_spin1.make_sa_rdm12(ci0, weights, norb, nelec)
             rdm1 = 0
             rdm2 = 0
             for i, wi in enumerate(weights):
@@ -19,8 +19,10 @@
 import sys
 import time
 import ctypes
+import tempfile
 from functools import reduce
 import numpy
+import h5py
 from pyscf import lib
 from pyscf.lib import logger
 from pyscf.ao2mo import _ao2mo
@@ -130,7 +132,10 @@ def density_fit(casscf, auxbasis=None, with_df=None):
                 return casscf_class._exact_paaa(self, mol, u, out)
 
         def nuc_grad_method(self):
-            raise NotImplementedError
+            if 'CASSCF' not in casscf_class.__name__:
+                raise NotImplementedError
+            from pyscf.grad import casscf
+            return casscf.Gradients(self)
 
     return DFCASSCF()
 
@@ -263,70 +268,15 @@ class _ERIS(object):
         self.feri = lib.H5TmpFile()
         self.ppaa = self.feri.create_dataset('ppaa', (nmo,nmo,ncas,ncas), 'f8')
         self.papa = self.feri.create_dataset('papa', (nmo,ncas,nmo,ncas), 'f8')
-        self.j_pc = numpy.zeros((nmo,ncore))
-        k_cp = numpy.zeros((ncore,nmo))
 
         mo = numpy.asarray(mo, order='F')
-        fxpp = lib.H5TmpFile()
-        bufpa = numpy.empty((naoaux,nmo,ncas))
-        bufs1 = numpy.empty((with_df.blockdim,nmo,nmo))
-        fmmm = _ao2mo.libao2mo.AO2MOmmm_nr_s2_iltj
-        fdrv = _ao2mo.libao2mo.AO2MOnr_e2_drv
-        ftrans = _ao2mo.libao2mo.AO2MOtranse2_nr_s2
-        fxpp_keys = []
-        b0 = 0
-        for k, eri1 in enumerate(with_df.loop()):
-            naux = eri1.shape[0]
-            bufpp = bufs1[:naux]
-            fdrv(ftrans, fmmm,
-                 bufpp.ctypes.data_as(ctypes.c_void_p),
-                 eri1.ctypes.data_as(ctypes.c_void_p),
-                 mo.ctypes.data_as(ctypes.c_void_p),
-                 ctypes.c_int(naux), ctypes.c_int(nao),
-                 (ctypes.c_int*4)(0, nmo, 0, nmo),
-                 ctypes.c_void_p(0), ctypes.c_int(0))
-            fxpp_keys.append([str(k), b0, b0+naux])
-            fxpp[str(k)] = bufpp.transpose(1,2,0)
-            bufpa[b0:b0+naux] = bufpp[:,:,ncore:nocc]
-            bufd = numpy.einsum('kii->ki', bufpp)
-            self.j_pc += numpy.einsum('ki,kj->ij', bufd, bufd[:,:ncore])
-            k_cp += numpy.einsum('kij,kij->ij', bufpp[:,:ncore], bufpp[:,:ncore])
-            b0 += naux
-            t1 = log.timer_debug1('j_pc and k_pc', *t1)
-        self.k_pc = k_cp.T.copy()
-        bufs1 = bufpp = None
-        t1 = log.timer('density fitting ao2mo pass1', *t0)
-
-        mem_now = lib.current_memory()[0]
-        nblk = int(max(8, min(nmo, ((max_memory-mem_now)*1e6/8-bufpa.size)/(ncas**2*nmo))))
-        bufs1 = numpy.empty((nblk,ncas,nmo,ncas))
-        dgemm = lib.numpy_helper._dgemm
-        for p0, p1 in prange(0, nmo, nblk):
-            #tmp = numpy.dot(bufpa[:,p0:p1].reshape(naoaux,-1).T,
-            #                bufpa.reshape(naoaux,-1))
-            tmp = bufs1[:p1-p0]
-            dgemm('T', 'N', (p1-p0)*ncas, nmo*ncas, naoaux,
-                  bufpa.reshape(naoaux,-1), bufpa.reshape(naoaux,-1),
-                  tmp.reshape(-1,nmo*ncas), 1, 0, p0*ncas, 0, 0)
-            self.papa[p0:p1] = tmp.reshape(p1-p0,ncas,nmo,ncas)
-        bufaa = bufpa[:,ncore:nocc,:].copy().reshape(-1,ncas**2)
-        bufs1 = bufpa = None
-        t1 = log.timer('density fitting papa pass2', *t1)
-
-        mem_now = lib.current_memory()[0]
-        nblk = int(max(8, min(nmo, (max_memory-mem_now)*1e6/8/(nmo*naoaux+ncas**2*nmo))))
-        bufs1 = numpy.empty((nblk,nmo,naoaux))
-        bufs2 = numpy.empty((nblk,nmo,ncas,ncas))
-        for p0, p1 in prange(0, nmo, nblk):
-            nrow = p1 - p0
-            buf = bufs1[:nrow]
-            tmp = bufs2[:nrow].reshape(-1,ncas**2)
-            for key, col0, col1 in fxpp_keys:
-                buf[:nrow,:,col0:col1] = fxpp[key][p0:p1]
-            lib.dot(buf.reshape(-1,naoaux), bufaa, 1, tmp)
-            self.ppaa[p0:p1] = tmp.reshape(p1-p0,nmo,ncas,ncas)
-        bufs1 = bufs2 = buf = None
-        t1 = log.timer('density fitting ppaa pass2', *t1)
+        nproc = with_df.nproc
+        if nproc > 1 and isinstance(with_df._cderi, (str, numpy.ndarray)):
+            self.j_pc, self.k_pc = _trans_nproc(self.ppaa, self.papa, mo, ncore, ncas,
+                                                with_df, max_memory, nproc, log)
+        else:
+            self.j_pc, self.k_pc = _trans(self.ppaa, self.papa, mo, ncore, ncas,
+                                          with_df, max_memory, log)
 
         self.feri.flush()
 
@@ -335,6 +285,162 @@ class _ERIS(object):
         self.vhf_c = reduce(numpy.dot, (mo.T, vj*2-vk, mo))
         t0 = log.timer('density fitting ao2mo', *t0)
 
+def _trans(ppaa, papa, mo, ncore, ncas, with_df, max_memory, log):
+    '''DF integral transformation of _ERIS.  Returns j_pc and k_pc.'''
+    t1 = t0 = (time.clock(), time.time())
+    nao, nmo = mo.shape
+    nocc = ncore + ncas
+    naoaux = with_df.get_naoaux()
+    j_pc = numpy.zeros((nmo,ncore))
+    k_cp = numpy.zeros((ncore,nmo))
+    fxpp = lib.H5TmpFile()
+    bufpa = numpy.empty((naoaux,nmo,ncas))
+    bufs1 = numpy.empty((with_df.blockdim,nmo,nmo))
+    fmmm = _ao2mo.libao2mo.AO2MOmmm_nr_s2_iltj
+    fdrv = _ao2mo.libao2mo.AO2MOnr_e2_drv
+    ftrans = _ao2mo.libao2mo.AO2MOtranse2_nr_s2
+    fxpp_keys = []
+    b0 = 0
+    for k, eri1 in enumerate(with_df.loop()):
+        naux = eri1.shape[0]
+        bufpp = bufs1[:naux]
+        fdrv(ftrans, fmmm,
+             bufpp.ctypes.data_as(ctypes.c_void_p),
+             eri1.ctypes.data_as(ctypes.c_void_p),
+             mo.ctypes.data_as(ctypes.c_void_p),
+             ctypes.c_int(naux), ctypes.c_int(nao),
+             (ctypes.c_int*4)(0, nmo, 0, nmo),
+             ctypes.c_void_p(0), ctypes.c_int(0))
+        fxpp_keys.append([str(k), b0, b0+naux])
+        fxpp[str(k)] = bufpp.transpose(1,2,0)
+        bufpa[b0:b0+naux] = bufpp[:,:,ncore:nocc]
+        bufd = numpy.einsum('kii->ki', bufpp)
+        j_pc += numpy.einsum('ki,kj->ij', bufd, bufd[:,:ncore])
+        k_cp += numpy.einsum('kij,kij->ij', bufpp[:,:ncore], bufpp[:,:ncore])
+        b0 += naux
+        t1 = log.timer_debug1('j_pc and k_pc', *t1)
+    bufs1 = bufpp = None
+    t1 = log.timer('density fitting ao2mo pass1', *t0)
+
+    bufaa = _make_papa(papa, bufpa, ncore, ncas, max_memory)
+    bufpa = None
+    t1 = log.timer('density fitting papa pass2', *t1)
+
+    mem_now = lib.current_memory()[0]
+    nblk = int(max(8, min(nmo, (max_memory-mem_now)*1e6/8/(nmo*naoaux+ncas**2*nmo))))
+    bufs1 = numpy.empty((nblk,nmo,naoaux))
+    bufs2 = numpy.empty((nblk,nmo,ncas,ncas))
+    for p0, p1 in prange(0, nmo, nblk):
+        nrow = p1 - p0
+        buf = bufs1[:nrow]
+        tmp = bufs2[:nrow].reshape(-1,ncas**2)
+        for key, col0, col1 in fxpp_keys:
+            buf[:nrow,:,col0:col1] = fxpp[key][p0:p1]
+        lib.dot(buf.reshape(-1,naoaux), bufaa, 1, tmp)
+        ppaa[p0:p1] = tmp.reshape(p1-p0,nmo,ncas,ncas)
+    bufs1 = bufs2 = buf = None
+    t1 = log.timer('density fitting ppaa pass2', *t1)
+    return j_pc, k_cp.T.copy()
+
+def _make_papa(papa, bufpa, ncore, ncas, max_memory):
+    '''(pa|pa) from the (L|pa) tensor.  Returns (L|aa) for the ppaa pass.'''
+    naoaux, nmo = bufpa.shape[:2]
+    nocc = ncore + ncas
+    mem_now = lib.current_memory()[0]
+    nblk = int(max(8, min(nmo, ((max_memory-mem_now)*1e6/8-bufpa.size)/(ncas**2*nmo))))
+    bufs1 = numpy.empty((nblk,ncas,nmo,ncas))
+    dgemm = lib.numpy_helper._dgemm
+    for p0, p1 in prange(0, nmo, nblk):
+        #tmp = numpy.dot(bufpa[:,p0:p1].reshape(naoaux,-1).T,
+        #                bufpa.reshape(naoaux,-1))
+        tmp = bufs1[:p1-p0]
+        dgemm('T', 'N', (p1-p0)*ncas, nmo*ncas, naoaux,
+              bufpa.reshape(naoaux,-1), bufpa.reshape(naoaux,-1),
+              tmp.reshape(-1,nmo*ncas), 1, 0, p0*ncas, 0, 0)
+        papa[p0:p1] = tmp.reshape(p1-p0,ncas,nmo,ncas)
+    return bufpa[:,ncore:nocc,:].copy().reshape(-1,ncas**2)
+
+def _trans_nproc(ppaa, papa, mo, ncore, ncas, with_df, max_memory, nproc,
+                 log):
+    '''DF integral transformation of _ERIS on nproc worker processes.
+
+    The auxiliary blocks of the 3-index tensor are distributed over the
+    workers.  Each worker saves its (L|pq) blocks in its own scratch file.
+    The ppaa pass is then distributed over the p index.
+    '''
+    t1 = t0 = (time.clock(), time.time())
+    nao, nmo = mo.shape
+    nocc = ncore + ncas
+    cderi = with_df._cderi
+    with df.load(cderi, 'j3c') as feri:
+        naoaux = feri.shape[0]
+    aux_slices = list(prange(0, naoaux, with_df.blockdim))
+    nproc = min(nproc, len(aux_slices))
+    ftmps = [tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+             for i in range(nproc)]
+
+    fmmm = _ao2mo.libao2mo.AO2MOmmm_nr_s2_iltj
+    fdrv = _ao2mo.libao2mo.AO2MOnr_e2_drv
+    ftrans = _ao2mo.libao2mo.AO2MOtranse2_nr_s2
+    def pass1(rank):
+        j_pc = numpy.zeros((nmo,ncore))
+        k_cp = numpy.zeros((ncore,nmo))
+        bufpa = []
+        with df.load(cderi, 'j3c') as feri, \
+                h5py.File(ftmps[rank].name, 'w') as fxpp:
+            for b0, b1 in aux_slices[rank::nproc]:
+                eri1 = numpy.asarray(feri[b0:b1], order='C')
+                naux = b1 - b0
+                bufpp = numpy.empty((naux,nmo,nmo))
+                fdrv(ftrans, fmmm,
+                     bufpp.ctypes.data_as(ctypes.c_void_p),
+                     eri1.ctypes.data_as(ctypes.c_void_p),
+                     mo.ctypes.data_as(ctypes.c_void_p),
+                     ctypes.c_int(naux), ctypes.c_int(nao),
+                     (ctypes.c_int*4)(0, nmo, 0, nmo),
+                     ctypes.c_void_p(0), ctypes.c_int(0))
+                fxpp[str(b0)] = bufpp.transpose(1,2,0)
+                bufpa.append(bufpp[:,:,ncore:nocc].copy())
+                bufd = numpy.einsum('kii->ki', bufpp)
+                j_pc += numpy.einsum('ki,kj->ij', bufd, bufd[:,:ncore])
+                k_cp += numpy.einsum('kij,kij->ij', bufpp[:,:ncore], bufpp[:,:ncore])
+        return j_pc, k_cp, bufpa
+
+    j_pc = numpy.zeros((nmo,ncore))
+    k_cp = numpy.zeros((ncore,nmo))
+    bufpa = numpy.empty((naoaux,nmo,ncas))
+    for rank, (j1, k1, pa1) in enumerate(lib.process_map(pass1, range(nproc), nproc)):
+        j_pc += j1
+        k_cp += k1
+        for (b0, b1), v in zip(aux_slices[rank::nproc], pa1):
+            bufpa[b0:b1] = v
+    t1 = log.timer('density fitting ao2mo pass1 (%d processes)' % nproc, *t0)
+
+    bufaa = _make_papa(papa, bufpa, ncore, ncas, max_memory)
+    bufpa = None
+    t1 = log.timer('density fitting papa pass2', *t1)
+
+    mem_now = lib.current_memory()[0]
+    nblk = int(max(8, min(nmo, (max_memory-mem_now)*1e6/8/nproc/(nmo*naoaux+ncas**2*nmo))))
+    def pass2(p0p1):
+        p0, p1 = p0p1
+        buf = numpy.empty((p1-p0,nmo,naoaux))
+        for rank in range(nproc):
+            with h5py.File(ftmps[rank].name, 'r') as fxpp:
+                for b0, b1 in aux_slices[rank::nproc]:
+                    buf[:,:,b0:b1] = fxpp[str(b0)][p0:p1]
+        return lib.dot(buf.reshape(-1,naoaux), bufaa).reshape(p1-p0,nmo,ncas,ncas)
+
+    p_slices = list(prange(0, nmo, nblk))
+    for i in range(0, len(p_slices), nproc):
+        tasks = p_slices[i:i+nproc]
+        for (p0, p1), v in zip(tasks, lib.process_map(pass2, tasks, nproc)):
+            ppaa[p0:p1] = v
+    for f in ftmps:
+        f.close()
+    t1 = log.timer('density fitting ppaa pass2', *t1)
+    return j_pc, k_cp.T.copy()
+
 def _mem_usage(ncore, ncas, nmo):
     nvir = nmo - ncore
     outcore = basic = ncas**2*nmo**2*2 * 8/1e6
@@ -173,6 +173,20 @@ class KnownValues(unittest.TestCase):
         self.assertTrue(numpy.allclose(eri0[:,:,ncore:nocc,ncore:nocc], eris.ppaa))
         self.assertTrue(numpy.allclose(eri0[:,ncore:nocc,:,ncore:nocc], eris.papa))
 
+    def test_df_ao2mo_nproc(self):
+        mf = scf.density_fit(m, auxbasis='weigend')
+        mf.kernel()
+        mc = mcscf.DFCASSCF(mf, 4, 4)
+        eris0 = mc.ao2mo(mc.mo_coeff)
+        mf.with_df.blockdim = 40
+        mf.with_df.nproc = 2
+        eris1 = mc.ao2mo(mc.mo_coeff)
+        self.assertAlmostEqual(abs(eris0.ppaa[:] - eris1.ppaa[:]).max(), 0, 12)
+        self.assertAlmostEqual(abs(eris0.papa[:] - eris1.papa[:]).max(), 0, 12)
+        self.assertAlmostEqual(abs(eris0.j_pc - eris1.j_pc).max(), 0, 12)
+        self.assertAlmostEqual(abs(eris0.k_pc - eris1.k_pc).max(), 0, 12)
+        self.assertAlmostEqual(abs(eris0.vhf_c - eris1.vhf_c).max(), 0, 12)
+
     def test_assign_cderi(self):
         nao = molsym.nao_nr()
         w, u = scipy.linalg.eigh(mol.intor('int2e_sph', aosym='s4'))
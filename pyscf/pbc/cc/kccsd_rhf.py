@@ -17,7 +17,10 @@
 #          Timothy Berkelbach <tim.berkelbach@gmail.com>
 #
 
+import os
 import time
+import tempfile
+import hashlib
 from functools import reduce
 import numpy as np
 import h5py
@@ -383,6 +386,7 @@ def add_vvvv_(cc, Ht2, t1, t2, eris):
     nvir = nmo - nocc
     nkpts = cc.nkpts
     kconserv = cc.khelper.kconserv
+    nproc = getattr(cc._scf.with_df, 'nproc', 1)
 
     mem_now = lib.current_memory()[0]
     if cc.direct and getattr(eris, 'Lpv', None) is not None:
@@ -420,6 +424,8 @@ def add_vvvv_(cc, Ht2, t1, t2, eris):
         _Wvvvv = imdk.cc_Wvvvv(t1, t2, eris, kconserv, _Wvvvv)
         def get_Wvvvv(ka, kb, kc):
             return _Wvvvv[ka, kb, kc]
+        # The HDF5 file handle cannot be shared with forked processes
+        nproc = 1
 
     #:Ps = kconserve_pmatrix(cc.nkpts, cc.khelper.kconserv)
     #:Wvvvv = einsum('xyzakcd,ykb->xyzabcd', eris.vovv, -t1)
@@ -430,15 +436,34 @@ def add_vvvv_(cc, Ht2, t1, t2, eris):
     #:idx = np.arange(nkpts)
     #:tau[idx,:,idx] += einsum('xic,yjd->xyijcd', t1, t1)
     #:Ht2 += einsum('xyuijcd,zwuabcd,xyuv,zwuv->xyzijab', tau, Wvvvv, Ps, Ps)
-    for ka, kb, kc in kpts_helper.loop_kkk(nkpts):
-        kd = kconserv[ka, kc, kb]
-        Wvvvv = get_Wvvvv(ka, kb, kc)
-        for ki in range(nkpts):
-            kj = kconserv[ka, ki, kb]
-            tau = t2[ki, kj, kc].copy()
-            if ki == kc and kj == kd:
-                tau += np.einsum('ic,jd->ijcd', t1[ki], t1[kj])
-            Ht2[ki, kj, ka] += lib.einsum('abcd,ijcd->ijab', Wvvvv, tau)
+    def contract_ka(kas, Ht2_ka=None):
+        # Ht2[:,:,ka] of the given ka
+        if Ht2_ka is None:
+            Ht2_ka = np.zeros((len(kas),nkpts,nkpts,nocc,nocc,nvir,nvir), dtype=Ht2.dtype)
+        for n, ka in enumerate(kas):
+            for kb in range(nkpts):
+                for kc in range(nkpts):
+                    kd = kconserv[ka, kc, kb]
+                    Wvvvv = get_Wvvvv(ka, kb, kc)
+                    for ki in range(nkpts):
+                        kj = kconserv[ka, ki, kb]
+                        tau = t2[ki, kj, kc].copy()
+                        if ki == kc and kj == kd:
+                            tau += np.einsum('ic,jd->ijcd', t1[ki], t1[kj])
+                        Ht2_ka[n][ki, kj] += lib.einsum('abcd,ijcd->ijab', Wvvvv, tau)
+        return Ht2_ka
+
+    if nproc > 1:
+        # The cost of each ka is the same (nkpts^2 Wvvvv blocks).  The
+        # k-points ka are distributed evenly over the processes.  Each process
+        # returns its own buffer.
+        ka_groups = [list(range(nkpts))[i::nproc] for i in range(min(nproc, nkpts))]
+        for kas, Ht2_ka in zip(ka_groups, lib.process_map(contract_ka, ka_groups, nproc)):
+            for n, ka in enumerate(kas):
+                Ht2[:, :, ka] += Ht2_ka[n]
+    else:
+        # Accumulate to Ht2 directly, without the memory of a second Ht2
+        contract_ka(range(nkpts), [Ht2[:, :, ka] for ka in range(nkpts)])
     fimd = None
     return Ht2
 
@@ -458,6 +483,85 @@ def kconserve_pmatrix(nkpts, kconserv):
     return Ps
 
 
+def _solve_kshifts(eom, solve_kshift, kptlist, label, nroots, size,
+                   partition=None, koopmans=False, guess=None):
+    '''Run the EOM eigensolver ``solve_kshift(k)`` for every kshift in kptlist.
+
+    The kshift-independent intermediates have to be built before calling this
+    function so that the worker processes share them.  The kshifts are
+    distributed over ``with_df.nproc`` processes.  If ``eom.eom_chkfile`` is
+    given, the roots of each kshift are saved in the chkfile after they are
+    converged, together with a key of the ground state amplitudes, kshift,
+    nroots, vector size, partition, koopmans, the initial guess and
+    conv_tol.  A kshift is not solved again if its key in the chkfile matches
+    the current problem.
+    '''
+    log = logger.Logger(eom.stdout, eom.verbose)
+    evals = np.zeros((len(kptlist), nroots), np.float)
+    evecs = np.zeros((len(kptlist), nroots, size), np.complex)
+
+    chkfile = eom.eom_chkfile
+    if chkfile:
+        amp_hash = hashlib.sha1(np.ascontiguousarray(eom.t1).view(np.uint8))
+        amp_hash.update(np.ascontiguousarray(eom.t2).view(np.uint8))
+        amp_hash = amp_hash.hexdigest()
+    def chk_key(k):
+        if guess:
+            guess_hash = hashlib.sha1()
+            for g in guess[k]:
+                guess_hash.update(np.ascontiguousarray(g).view(np.uint8))
+            guess_hash = guess_hash.hexdigest()
+        else:
+            guess_hash = 'None'
+        return {'amp_hash': amp_hash, 'kshift': kptlist[k], 'nroots': nroots,
+                'size': size, 'partition': str(partition),
+                'koopmans': int(bool(koopmans)), 'guess': guess_hash,
+                'conv_tol': eom.conv_tol}
+
+    todo = []
+    for k, kshift in enumerate(kptlist):
+        key = 'eom_%s/kshift_%d' % (label, kshift)
+        if chkfile and h5py.is_hdf5(chkfile):
+            dat = lib.chkfile.load(chkfile, key)
+            if dat is not None and _eom_chk_key_match(dat.get('key'), chk_key(k)):
+                evals[k] = dat['e']
+                evecs[k] = dat['v']
+                log.debug('EOM-CCSD %s kshift %d loaded from %s',
+                          label.upper(), kshift, chkfile)
+                continue
+        todo.append(k)
+
+    nproc = getattr(eom._scf.with_df, 'nproc', 1)
+    if getattr(eom.imds, '_fimd', None) is not None:
+        # Intermediates in the temporary HDF5 file cannot be shared by forked
+        # processes
+        nproc = 1
+    # Solve nproc kshifts at a time so that the chkfile is updated after each
+    # batch
+    for p0 in range(0, len(todo), nproc):
+        batch = todo[p0:p0+nproc]
+        for k, (e, v) in zip(batch, lib.process_map(solve_kshift, batch, nproc)):
+            evals[k] = e
+            evecs[k] = v
+            if chkfile:
+                key = 'eom_%s/kshift_%d' % (label, kptlist[k])
+                lib.chkfile.save(chkfile, key, {'e': evals[k], 'v': evecs[k],
+                                                'key': chk_key(k)})
+    return evals, evecs
+
+def _eom_chk_key_match(saved, key):
+    '''Whether the key saved with the EOM roots in eom_chkfile matches key'''
+    if saved is None:
+        return False
+    for name, val in key.items():
+        saved_val = saved.get(name)
+        if isinstance(saved_val, bytes):
+            saved_val = saved_val.decode()
+        if saved_val is None or saved_val != val:
+            return False
+    return True
+
+
 class RCCSD(pyscf.cc.ccsd.CCSD):
     max_space = getattr(__config__, 'pbc_cc_kccsd_rhf_KRCCSD_max_space', 20)
 
@@ -472,10 +576,12 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
         self.ip_partition = None
         self.ea_partition = None
         self.direct = True  # If possible, use GDF to compute Wvvvv on-the-fly
+        # If given, EOM roots are saved per kshift and reloaded on restart
+        self.eom_chkfile = None
 
         keys = set(['kpts', 'khelper', 'made_ee_imds',
                     'made_ip_imds', 'made_ea_imds', 'ip_partition',
-                    'ea_partition', 'max_space', 'direct'])
+                    'ea_partition', 'max_space', 'direct', 'eom_chkfile'])
         self._keys = self._keys.union(keys)
 
     @property
@@ -664,10 +770,13 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             partition = partition.lower()
             assert partition in ['mp', 'full']
         self.ip_partition = partition
-        evals = np.zeros((len(kptlist), nroots), np.float)
-        evecs = np.zeros((len(kptlist), nroots, size), np.complex)
+        if not getattr(self, 'imds', None):
+            self.imds = _IMDS(self)
+        if not self.imds.made_ip_imds:
+            self.imds.make_ip(partition)
 
-        for k, kshift in enumerate(kptlist):
+        def solve_kshift(k):
+            kshift = kptlist[k]
             adiag = self.ipccsd_diag(kshift)
             adiag = self.mask_frozen_ip(adiag, kshift, const=LARGE_DENOM)
             if partition == 'full':
@@ -676,11 +785,12 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             user_guess = False
             if guess:
                 user_guess = True
-                assert len(guess[k]) == nroots
-                for g in guess[k]:
+                guess_k = guess[k]
+                assert len(guess_k) == nroots
+                for g in guess_k:
                     assert g.size == size
             else:
-                guess = []
+                guess_k = []
                 if koopmans:
                     # Get location of padded elements in occupied and virtual space
                     nonzero_opadding = padding_k_idx(self, kind="split")[0][kshift]
@@ -689,43 +799,43 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
                         g = np.zeros(size)
                         g[n] = 1.0
                         g = self.mask_frozen_ip(g, kshift, const=0.0)
-                        guess.append(g)
+                        guess_k.append(g)
                 else:
                     idx = adiag.argsort()[:nroots]
                     for i in idx:
                         g = np.zeros(size)
                         g[i] = 1.0
                         g = self.mask_frozen_ip(g, kshift, const=0.0)
-                        guess.append(g)
+                        guess_k.append(g)
 
             def precond(r, e0, x0):
                 return r / (e0 - adiag + 1e-12)
 
-            eig = linalg_helper.eig
+            def matvec(xs):
+                return self.ipccsd_matvec_block(xs, kshift)
+
+            eig = linalg_helper.davidson_nosym1
             if user_guess or koopmans:
                 def pickeig(w, v, nr, envs):
                     x0 = linalg_helper._gen_x0(envs['v'], envs['xs'])
-                    idx = np.argmax(np.abs(np.dot(np.array(guess).conj(), np.array(x0).T)), axis=1)
+                    idx = np.argmax(np.abs(np.dot(np.array(guess_k).conj(), np.array(x0).T)), axis=1)
                     return lib.linalg_helper._eigs_cmplx2real(w, v, idx)
 
-                evals_k, evecs_k = eig(lambda _arg: self.ipccsd_matvec(_arg, kshift), guess, precond, pick=pickeig,
+                conv, evals_k, evecs_k = eig(matvec, guess_k, precond, pick=pickeig,
                                        tol=self.conv_tol, max_cycle=self.max_cycle,
                                        max_space=self.max_space, nroots=nroots, verbose=self.verbose)
             else:
-                evals_k, evecs_k = eig(lambda _arg: self.ipccsd_matvec(_arg, kshift), guess, precond,
+                conv, evals_k, evecs_k = eig(matvec, guess_k, precond,
                                        tol=self.conv_tol, max_cycle=self.max_cycle,
                                        max_space=self.max_space, nroots=nroots, verbose=self.verbose)
-            if not user_guess:
-                guess = None
-
-            evals_k = evals_k.real
-            evals[k] = evals_k
-            evecs[k] = evecs_k
+            return evals_k.real, evecs_k
 
-            if nroots == 1:
-                evals_k, evecs_k = [evals_k], [evecs_k]
+        evals, evecs = _solve_kshifts(self, solve_kshift, kptlist, 'ip',
+                                      nroots, size, partition, koopmans, guess)
 
-            for n, en, vn in zip(range(nroots), evals_k, evecs_k):
+        for k, kshift in enumerate(kptlist):
+            logger.info(self, 'EOM-CCSD IP kshift = %d', kshift)
+            for n, en, vn in zip(range(nroots), evals[k], evecs[k]):
                 r1, r2 = self.ip_vector_to_amplitudes(vn)
                 qp_weight = np.linalg.norm(r1) ** 2
                 logger.info(self, 'EOM root %d E = %.16g  qpwt = %0.6g',
@@ -736,6 +846,11 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
 
     def ipccsd_matvec(self, vector, kshift):
         '''2ph operators are of the form s_{ij}^{ b}, i.e. 'jb' indices are coupled.'''
+        return self.ipccsd_matvec_block([vector], kshift)[0]
+
+    def ipccsd_matvec_block(self, vectors, kshift):
+        '''EOM-IP matrix-vector products of a list of trial vectors.  Each
+        intermediate block is loaded once and contracted with all vectors.'''
         # Ref: Nooijen and Snijders, J. Chem. Phys. 102, 1681 (1995) Eqs.(8)-(9)
         if not getattr(self, 'imds', None):
             self.imds = _IMDS(self)
@@ -743,30 +858,39 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             self.imds.make_ip(self.ip_partition)
         imds = self.imds
 
-        vector = self.mask_frozen_ip(vector, kshift, const=0.0)
-        r1, r2 = self.ip_vector_to_amplitudes(vector)
+        r1 = []
+        r2 = []
+        for vector in vectors:
+            vector = self.mask_frozen_ip(vector, kshift, const=0.0)
+            r1i, r2i = self.ip_vector_to_amplitudes(vector)
+            r1.append(r1i)
+            r2.append(r2i)
+        nvec = len(r1)
+        r1 = np.asarray(r1)
+        # r2[ki,kj] is the (nvec,nocc,nocc,nvir) block of all vectors
+        r2 = np.asarray(r2).transpose(1,2,0,3,4,5)
 
         t1, t2 = self.t1, self.t2
         nkpts = self.nkpts
         kconserv = self.khelper.kconserv
 
         # 1h-1h block
-        Hr1 = -einsum('ki,k->i', imds.Loo[kshift], r1)
+        Hr1 = -einsum('ki,nk->ni', imds.Loo[kshift], r1)
         # 1h-2h1p block
         for kl in range(nkpts):
-            Hr1 += 2. * einsum('ld,ild->i', imds.Fov[kl], r2[kshift, kl])
-            Hr1 += -einsum('ld,lid->i', imds.Fov[kl], r2[kl, kshift])
+            Hr1 += 2. * einsum('ld,nild->ni', imds.Fov[kl], r2[kshift, kl])
+            Hr1 += -einsum('ld,nlid->ni', imds.Fov[kl], r2[kl, kshift])
             for kk in range(nkpts):
                 kd = kconserv[kk, kshift, kl]
-                Hr1 += -2. * einsum('klid,kld->i', imds.Wooov[kk, kl, kshift], r2[kk, kl])
-                Hr1 += einsum('lkid,kld->i', imds.Wooov[kl, kk, kshift], r2[kk, kl])
+                Hr1 += -2. * einsum('klid,nkld->ni', imds.Wooov[kk, kl, kshift], r2[kk, kl])
+                Hr1 += einsum('lkid,nkld->ni', imds.Wooov[kl, kk, kshift], r2[kk, kl])
 
         Hr2 = np.zeros(r2.shape, dtype=np.common_type(imds.Wovoo[0, 0, 0], r1))
         # 2h1p-1h block
         for ki in range(nkpts):
             for kj in range(nkpts):
                 kb = kconserv[ki, kshift, kj]
-                Hr2[ki, kj] -= einsum('kbij,k->ijb', imds.Wovoo[kshift, kb, ki], r1)
+                Hr2[ki, kj] -= einsum('kbij,nk->nijb', imds.Wovoo[kshift, kb, ki], r1)
         # 2h1p-2h1p block
         if self.ip_partition == 'mp':
             nkpts, nocc, nvir = self.t1.shape
@@ -776,32 +900,34 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             for ki in range(nkpts):
                 for kj in range(nkpts):
                     kb = kconserv[ki, kshift, kj]
-                    Hr2[ki, kj] += einsum('bd,ijd->ijb', fvv[kb], r2[ki, kj])
-                    Hr2[ki, kj] -= einsum('li,ljb->ijb', foo[ki], r2[ki, kj])
-                    Hr2[ki, kj] -= einsum('lj,ilb->ijb', foo[kj], r2[ki, kj])
+                    Hr2[ki, kj] += einsum('bd,nijd->nijb', fvv[kb], r2[ki, kj])
+                    Hr2[ki, kj] -= einsum('li,nljb->nijb', foo[ki], r2[ki, kj])
+                    Hr2[ki, kj] -= einsum('lj,nilb->nijb', foo[kj], r2[ki, kj])
         elif self.ip_partition == 'full':
-            Hr2 += self._ipccsd_diag_matrix2 * r2
+            Hr2 += self._ipccsd_diag_matrix2[:, :, None] * r2
         else:
             for ki in range(nkpts):
                 for kj in range(nkpts):
                     kb = kconserv[ki, kshift, kj]
-                    Hr2[ki, kj] += einsum('bd,ijd->ijb', imds.Lvv[kb], r2[ki, kj])
-                    Hr2[ki, kj] -= einsum('li,ljb->ijb', imds.Loo[ki], r2[ki, kj])
-                    Hr2[ki, kj] -= einsum('lj,ilb->ijb', imds.Loo[kj], r2[ki, kj])
+                    Hr2[ki, kj] += einsum('bd,nijd->nijb', imds.Lvv[kb], r2[ki, kj])
+                    Hr2[ki, kj] -= einsum('li,nljb->nijb', imds.Loo[ki], r2[ki, kj])
+                    Hr2[ki, kj] -= einsum('lj,nilb->nijb', imds.Loo[kj], r2[ki, kj])
                     for kl in range(nkpts):
                         kk = kconserv[ki, kl, kj]
-                        Hr2[ki, kj] += einsum('klij,klb->ijb', imds.Woooo[kk, kl, ki], r2[kk, kl])
+                        Hr2[ki, kj] += einsum('klij,nklb->nijb', imds.Woooo[kk, kl, ki], r2[kk, kl])
                         kd = kconserv[kl, kj, kb]
-                        Hr2[ki, kj] += 2. * einsum('lbdj,ild->ijb', imds.Wovvo[kl, kb, kd], r2[ki, kl])
-                        Hr2[ki, kj] += -einsum('lbdj,lid->ijb', imds.Wovvo[kl, kb, kd], r2[kl, ki])
-                        Hr2[ki, kj] += -einsum('lbjd,ild->ijb', imds.Wovov[kl, kb, kj], r2[ki, kl])  # typo in Ref
+                        Hr2[ki, kj] += 2. * einsum('lbdj,nild->nijb', imds.Wovvo[kl, kb, kd], r2[ki, kl])
+                        Hr2[ki, kj] += -einsum('lbdj,nlid->nijb', imds.Wovvo[kl, kb, kd], r2[kl, ki])
+                        Hr2[ki, kj] += -einsum('lbjd,nild->nijb', imds.Wovov[kl, kb, kj], r2[ki, kl])  # typo in Ref
                         kd = kconserv[kl, ki, kb]
-                        Hr2[ki, kj] += -einsum('lbid,ljd->ijb', imds.Wovov[kl, kb, ki], r2[kl, kj])
-            tmp = (2. * einsum('xyklcd,xykld->c', imds.Woovv[:, :, kshift], r2[:, :])
-                      - einsum('yxlkcd,xykld->c', imds.Woovv[:, :, kshift], r2[:, :]))
-            Hr2[:, :] += -einsum('c,xyijcb->xyijb', tmp, t2[:, :, kshift])
+                        Hr2[ki, kj] += -einsum('lbid,nljd->nijb', imds.Wovov[kl, kb, ki], r2[kl, kj])
+            tmp = (2. * einsum('xyklcd,xynkld->nc', imds.Woovv[:, :, kshift], r2[:, :])
+                      - einsum('yxlkcd,xynkld->nc', imds.Woovv[:, :, kshift], r2[:, :]))
+            Hr2[:, :] += -einsum('nc,xyijcb->xynijb', tmp, t2[:, :, kshift])
 
-        return self.mask_frozen_ip(self.ip_amplitudes_to_vector(Hr1, Hr2), kshift, const=0.0)
+        Hr2 = Hr2.transpose(2,0,1,3,4,5)
+        return [self.mask_frozen_ip(self.ip_amplitudes_to_vector(Hr1[i], Hr2[i]),
+                                    kshift, const=0.0) for i in range(nvec)]
 
     def ipccsd_diag(self, kshift):
         if not getattr(self, 'imds', None):
@@ -904,10 +1030,13 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             partition = partition.lower()
             assert partition in ['mp', 'full']
         self.ea_partition = partition
-        evals = np.zeros((len(kptlist), nroots), np.float)
-        evecs = np.zeros((len(kptlist), nroots, size), np.complex)
+        if not getattr(self, 'imds', None):
+            self.imds = _IMDS(self)
+        if not self.imds.made_ea_imds:
+            self.imds.make_ea(partition)
 
-        for k, kshift in enumerate(kptlist):
+        def solve_kshift(k):
+            kshift = kptlist[k]
             adiag = self.eaccsd_diag(kshift)
             adiag = self.mask_frozen_ea(adiag, kshift, const=LARGE_DENOM)
             if partition == 'full':
@@ -916,11 +1045,12 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             user_guess = False
             if guess:
                 user_guess = True
-                assert len(guess[k]) == nroots
-                for g in guess[k]:
+                guess_k = guess[k]
+                assert len(guess_k) == nroots
+                for g in guess_k:
                     assert g.size == size
             else:
-                guess = []
+                guess_k = []
                 if koopmans:
                     # Get location of padded elements in occupied and virtual space
                     nonzero_vpadding = padding_k_idx(self, kind="split")[1][kshift]
@@ -929,43 +1059,43 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
                         g = np.zeros(size)
                         g[n] = 1.0
                         g = self.mask_frozen_ea(g, kshift, const=0.0)
-                        guess.append(g)
+                        guess_k.append(g)
                 else:
                     idx = adiag.argsort()[:nroots]
                     for i in idx:
                         g = np.zeros(size)
                         g[i] = 1.0
                         g = self.mask_frozen_ea(g, kshift, const=0.0)
-                        guess.append(g)
+                        guess_k.append(g)
 
             def precond(r, e0, x0):
                 return r / (e0 - adiag + 1e-12)
 
-            eig = linalg_helper.eig
+            def matvec(xs):
+                return self.eaccsd_matvec_block(xs, kshift)
+
+            eig = linalg_helper.davidson_nosym1
             if user_guess or koopmans:
                 def pickeig(w, v, nr, envs):
                     x0 = linalg_helper._gen_x0(envs['v'], envs['xs'])
-                    idx = np.argmax(np.abs(np.dot(np.array(guess).conj(), np.array(x0).T)), axis=1)
+                    idx = np.argmax(np.abs(np.dot(np.array(guess_k).conj(), np.array(x0).T)), axis=1)
                     return lib.linalg_helper._eigs_cmplx2real(w, v, idx)
 
-                evals_k, evecs_k = eig(lambda _arg: self.eaccsd_matvec(_arg, kshift), guess, precond, pick=pickeig,
+                conv, evals_k, evecs_k = eig(matvec, guess_k, precond, pick=pickeig,
                                        tol=self.conv_tol, max_cycle=self.max_cycle,
                                        max_space=self.max_space, nroots=nroots, verbose=self.verbose)
             else:
-                evals_k, evecs_k = eig(lambda _arg: self.eaccsd_matvec(_arg, kshift), guess, precond,
+                conv, evals_k, evecs_k = eig(matvec, guess_k, precond,
                                        tol=self.conv_tol, max_cycle=self.max_cycle,
                                        max_space=self.max_space, nroots=nroots, verbose=self.verbose)
-            if not user_guess:
-                guess = None
-
-            evals_k = evals_k.real
-            evals[k] = evals_k
-            evecs[k] = evecs_k
+            return evals_k.real, evecs_k
 
-            if nroots == 1:
-                evals_k, evecs_k = [evals_k], [evecs_k]
+        evals, evecs = _solve_kshifts(self, solve_kshift, kptlist, 'ea',
+                                      nroots, size, partition, koopmans, guess)
 
-            for n, en, vn in zip(range(nroots), evals_k, evecs_k):
+        for k, kshift in enumerate(kptlist):
+            logger.info(self, 'EOM-CCSD EA kshift = %d', kshift)
+            for n, en, vn in zip(range(nroots), evals[k], evecs[k]):
                 r1, r2 = self.ea_vector_to_amplitudes(vn)
                 qp_weight = np.linalg.norm(r1) ** 2
                 logger.info(self, 'EOM root %d E = %.16g  qpwt = %0.6g',
@@ -975,6 +1105,11 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
         return self.eea, evecs
 
     def eaccsd_matvec(self, vector, kshift):
+        return self.eaccsd_matvec_block([vector], kshift)[0]
+
+    def eaccsd_matvec_block(self, vectors, kshift):
+        '''EOM-EA matrix-vector products of a list of trial vectors.  Each
+        intermediate block is loaded once and contracted with all vectors.'''
         # Ref: Nooijen and Bartlett, J. Chem. Phys. 102, 3629 (1994) Eqs.(30)-(31)
         if not getattr(self, 'imds', None):
             self.imds = _IMDS(self)
@@ -982,8 +1117,17 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             self.imds.make_ea(self.ea_partition)
         imds = self.imds
 
-        vector = self.mask_frozen_ea(vector, kshift, const=0.0)
-        r1, r2 = self.ea_vector_to_amplitudes(vector)
+        r1 = []
+        r2 = []
+        for vector in vectors:
+            vector = self.mask_frozen_ea(vector, kshift, const=0.0)
+            r1i, r2i = self.ea_vector_to_amplitudes(vector)
+            r1.append(r1i)
+            r2.append(r2i)
+        nvec = len(r1)
+        r1 = np.asarray(r1)
+        # r2[kj,ka] is the (nvec,nocc,nvir,nvir) block of all vectors
+        r2 = np.asarray(r2).transpose(1,2,0,3,4,5)
 
         t1, t2 = self.t1, self.t2
         nkpts = self.nkpts
@@ -991,15 +1135,15 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
 
         # Eq. (30)
         # 1p-1p block
-        Hr1 = einsum('ac,c->a', imds.Lvv[kshift], r1)
+        Hr1 = einsum('ac,nc->na', imds.Lvv[kshift], r1)
         # 1p-2p1h block
         for kl in range(nkpts):
-            Hr1 += 2. * einsum('ld,lad->a', imds.Fov[kl], r2[kl, kshift])
-            Hr1 += -einsum('ld,lda->a', imds.Fov[kl], r2[kl, kl])
+            Hr1 += 2. * einsum('ld,nlad->na', imds.Fov[kl], r2[kl, kshift])
+            Hr1 += -einsum('ld,nlda->na', imds.Fov[kl], r2[kl, kl])
             for kc in range(nkpts):
                 kd = kconserv[kshift, kc, kl]
-                Hr1 += 2. * einsum('alcd,lcd->a', imds.Wvovv[kshift, kl, kc], r2[kl, kc])
-                Hr1 += -einsum('aldc,lcd->a', imds.Wvovv[kshift, kl, kd], r2[kl, kc])
+                Hr1 += 2. * einsum('alcd,nlcd->na', imds.Wvovv[kshift, kl, kc], r2[kl, kc])
+                Hr1 += -einsum('aldc,nlcd->na', imds.Wvovv[kshift, kl, kd], r2[kl, kc])
 
         # Eq. (31)
         # 2p1h-1p block
@@ -1007,7 +1151,7 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
         for kj in range(nkpts):
             for ka in range(nkpts):
                 kb = kconserv[kshift,ka,kj]
-                Hr2[kj,ka] += einsum('abcj,c->jab',imds.Wvvvo[ka,kb,kshift],r1)
+                Hr2[kj,ka] += einsum('abcj,nc->njab',imds.Wvvvo[ka,kb,kshift],r1)
 
         # 2p1h-2p1h block
         if self.ea_partition == 'mp':
@@ -1018,38 +1162,40 @@ class RCCSD(pyscf.cc.ccsd.CCSD):
             for kj in range(nkpts):
                 for ka in range(nkpts):
                     kb = kconserv[kshift, ka, kj]
-                    Hr2[kj, ka] -= einsum('lj,lab->jab', foo[kj], r2[kj, ka])
-                    Hr2[kj, ka] += einsum('ac,jcb->jab', fvv[ka], r2[kj, ka])
-                    Hr2[kj, ka] += einsum('bd,jad->jab', fvv[kb], r2[kj, ka])
+                    Hr2[kj, ka] -= einsum('lj,nlab->njab', foo[kj], r2[kj, ka])
+                    Hr2[kj, ka] += einsum('ac,njcb->njab', fvv[ka], r2[kj, ka])
+                    Hr2[kj, ka] += einsum('bd,njad->njab', fvv[kb], r2[kj, ka])
         elif self.ea_partition == 'full':
-            Hr2 += self._eaccsd_diag_matrix2 * r2
+            Hr2 += self._eaccsd_diag_matrix2[:, :, None] * r2
         else:
             for kj in range(nkpts):
                 for ka in range(nkpts):
                     kb = kconserv[kshift, ka, kj]
-                    Hr2[kj, ka] -= einsum('lj,lab->jab', imds.Loo[kj], r2[kj, ka])
-                    Hr2[kj, ka] += einsum('ac,jcb->jab', imds.Lvv[ka], r2[kj, ka])
-                    Hr2[kj, ka] += einsum('bd,jad->jab', imds.Lvv[kb], r2[kj, ka])
+                    Hr2[kj, ka] -= einsum('lj,nlab->njab', imds.Loo[kj], r2[kj, ka])
+                    Hr2[kj, ka] += einsum('ac,njcb->njab', imds.Lvv[ka], r2[kj, ka])
+                    Hr2[kj, ka] += einsum('bd,njad->njab', imds.Lvv[kb], r2[kj, ka])
                     for kd in range(nkpts):
                         kc = kconserv[ka, kd, kb]
-                        Hr2[kj, ka] += einsum('abcd,jcd->jab', imds.Wvvvv[ka, kb, kc], r2[kj, kc])
+                        Hr2[kj, ka] += einsum('abcd,njcd->njab', imds.Wvvvv[ka, kb, kc], r2[kj, kc])
                         kl = kconserv[kd, kb, kj]
-                        Hr2[kj, ka] += 2. * einsum('lbdj,lad->jab', imds.Wovvo[kl, kb, kd], r2[kl, ka])
+                        Hr2[kj, ka] += 2. * einsum('lbdj,nlad->njab', imds.Wovvo[kl, kb, kd], r2[kl, ka])
                         # imds.Wvovo[kb,kl,kd,kj] <= imds.Wovov[kl,kb,kj,kd].transpose(1,0,3,2)
-                        Hr2[kj, ka] += -einsum('bldj,lad->jab', imds.Wovov[kl, kb, kj].transpose(1, 0, 3, 2),
+                        Hr2[kj, ka] += -einsum('bldj,nlad->njab', imds.Wovov[kl, kb, kj].transpose(1, 0, 3, 2),
                                                r2[kl, ka])
                         # imds.Wvoov[kb,kl,kj,kd] <= imds.Wovvo[kl,kb,kd,kj].transpose(1,0,3,2)
-                        Hr2[kj, ka] += -einsum('bljd,lda->jab', imds.Wovvo[kl, kb, kd].transpose(1, 0, 3, 2),
+                        Hr2[kj, ka] += -einsum('bljd,nlda->njab', imds.Wovvo[kl, kb, kd].transpose(1, 0, 3, 2),
                                                r2[kl, kd])
                         kl = kconserv[kd, ka, kj]
                         # imds.Wvovo[ka,kl,kd,kj] <= imds.Wovov[kl,ka,kj,kd].transpose(1,0,3,2)
-                        Hr2[kj, ka] += -einsum('aldj,ldb->jab', imds.Wovov[kl, ka, kj].transpose(1, 0, 3, 2),
+                        Hr2[kj, ka] += -einsum('aldj,nldb->njab', imds.Wovov[kl, ka, kj].transpose(1, 0, 3, 2),
                                                r2[kl, kd])
-            tmp = (2. * einsum('xyklcd,xylcd->k', imds.Woovv[kshift, :, :], r2[:, :])
-                      - einsum('xylkcd,xylcd->k', imds.Woovv[:, kshift, :], r2[:, :]))
-            Hr2[:, :] += -einsum('k,xykjab->xyjab', tmp, t2[kshift, :, :])
+            tmp = (2. * einsum('xyklcd,xynlcd->nk', imds.Woovv[kshift, :, :], r2[:, :])
+                      - einsum('xylkcd,xynlcd->nk', imds.Woovv[:, kshift, :], r2[:, :]))
+            Hr2[:, :] += -einsum('nk,xykjab->xynjab', tmp, t2[kshift, :, :])
 
-        return self.mask_frozen_ea(self.ea_amplitudes_to_vector(Hr1, Hr2), kshift, const=0.0)
+        Hr2 = Hr2.transpose(2,0,1,3,4,5)
+        return [self.mask_frozen_ea(self.ea_amplitudes_to_vector(Hr1[i], Hr2[i]),
+                                    kshift, const=0.0) for i in range(nvec)]
 
     def eaccsd_diag(self, kshift):
         if not getattr(self, 'imds', None):
@@ -1358,7 +1504,12 @@ def _init_df_eris(cc, eris):
     else:
         dtype = np.complex128
     dtype = np.result_type(dtype, *eris.mo_coeff)
-    eris.Lpv = Lpv = np.empty((nkpts,nkpts), dtype=object)
+    mem_now = lib.current_memory()[0]
+    if nkpts**2*naux*nmo*nvir*16/1e6 + mem_now < cc.max_memory * .6:
+        eris.Lpv = Lpv = np.empty((nkpts,nkpts), dtype=object)
+    else:
+        logger.debug(cc, 'Lpv is saved in a temporary file')
+        eris.Lpv = Lpv = _Lpv_outcore(nkpts)
 
     with h5py.File(cc._scf.with_df._cderi, 'r') as f:
         kptij_lst = f['j3c-kptij'].value
@@ -1381,6 +1532,37 @@ def _init_df_eris(cc, eris):
                 Lpv[ki,kj] = out.reshape(-1,nmo,nvir)
     return eris
 
+class _Lpv_outcore(object):
+    '''(L|pv) of all k-pairs stored in a temporary HDF5 file.  The blocks are
+    accessed as Lpv[ki,kj].  Each process opens the file in read-only mode
+    on the first read, so that the object can be used by forked workers.
+    '''
+    def __init__(self, nkpts):
+        self.nkpts = nkpts
+        self._tmpfile = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        self.filename = self._tmpfile.name
+        h5py.File(self.filename, 'w').close()
+        self._feri = None
+        self._pid = None
+
+    def __setitem__(self, key, val):
+        ki, kj = key
+        self.close()
+        with h5py.File(self.filename, 'a') as f:
+            f['%d' % (ki*self.nkpts+kj)] = val
+
+    def __getitem__(self, key):
+        ki, kj = key
+        if self._feri is None or self._pid != os.getpid():
+            self._feri = h5py.File(self.filename, 'r')
+            self._pid = os.getpid()
+        return np.asarray(self._feri['%d' % (ki*self.nkpts+kj)])
+
+    def close(self):
+        if self._feri is not None and self._pid == os.getpid():
+            self._feri.close()
+        self._feri = None
+
 imd = imdk
 
 
@@ -18,6 +18,7 @@
 #
 
 import unittest
+import tempfile
 import numpy as np
 
 from pyscf.lib import finger
@@ -273,6 +274,66 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(finger(np.array(eris3.Lpv.tolist())),
                                -2.2567245766867092+0.7648803028093745j, 12)
 
+    def test_ccsd_df_outcore_nproc(self):
+        kmf = pbcscf.KRHF(cell, cell.make_kpts([2,1,1]), exxdiv=None)
+        kmf = kmf.density_fit().run()
+        mycc = pbcc.KRCCSD(kmf)
+        ecc0 = mycc.kernel()[0]
+
+        mycc = pbcc.KRCCSD(kmf)
+        mycc.max_memory = 1
+        eris = mycc.ao2mo()
+        self.assertTrue(isinstance(eris.Lpv, pbcc.kccsd_rhf._Lpv_outcore))
+        self.assertAlmostEqual(mycc.kernel(eris=eris)[0], ecc0, 9)
+
+        kmf.with_df.nproc = 2
+        mycc = pbcc.KRCCSD(kmf)
+        self.assertAlmostEqual(mycc.kernel()[0], ecc0, 9)
+
+        # Wvvvv in a temporary HDF5 file
+        mycc = pbcc.KRCCSD(kmf)
+        mycc.direct = False
+        eris = mycc.ao2mo()
+        mycc.max_memory = 1
+        self.assertAlmostEqual(mycc.kernel(eris=eris)[0], ecc0, 9)
+
+    def test_eom_kshift_nproc_restart(self):
+        kmf = pbcscf.KRHF(cell, cell.make_kpts([2,1,1]), exxdiv=None)
+        kmf = kmf.density_fit().run()
+        mycc = pbcc.KRCCSD(kmf).run()
+        eip0 = mycc.ipccsd(nroots=2)[0]
+        eea0 = mycc.eaccsd(nroots=2)[0]
+
+        kmf.with_df.nproc = 2
+        eip1 = mycc.ipccsd(nroots=2)[0]
+        eea1 = mycc.eaccsd(nroots=2)[0]
+        self.assertAlmostEqual(abs(eip1 - eip0).max(), 0, 9)
+        self.assertAlmostEqual(abs(eea1 - eea0).max(), 0, 9)
+
+        kmf.with_df.nproc = 1
+        with tempfile.NamedTemporaryFile() as ftmp:
+            mycc.eom_chkfile = ftmp.name
+            eip1, vip1 = mycc.ipccsd(nroots=2, kptlist=[1])
+            self.assertAlmostEqual(abs(eip1 - eip0[1]).max(), 0, 9)
+            # kshift 1 is read from eom_chkfile
+            mycc.max_cycle = 0
+            eip1, vip2 = mycc.ipccsd(nroots=2, kptlist=[1])
+            self.assertAlmostEqual(abs(vip2 - vip1).max(), 0, 12)
+            # Roots of other ground state amplitudes are not reused
+            t1 = mycc.t1
+            mycc.t1 = t1 + 1e-3
+            vip3 = mycc.ipccsd(nroots=2, kptlist=[1])[1]
+            self.assertTrue(abs(vip3 - vip1).max() > 1e-3)
+            mycc.t1 = t1
+            # Nor the roots of other partition or koopmans settings
+            vip3 = mycc.ipccsd(nroots=2, kptlist=[1], partition='mp')[1]
+            self.assertTrue(abs(vip3 - vip1).max() > 1e-3)
+            vip3 = mycc.ipccsd(nroots=2, kptlist=[1], koopmans=True)[1]
+            self.assertTrue(abs(vip3 - vip1).max() > 1e-3)
+            mycc.max_cycle = 50
+            eip1 = mycc.ipccsd(nroots=2)[0]
+            self.assertAlmostEqual(abs(eip1 - eip0).max(), 0, 9)
+
     def _test_cu_metallic_nonequal_occ(self, kmf, cell, ecc1_bench=-0.9646107739333411):
         assert cell.mesh == [7, 7, 7]
         max_cycle = 5  # Too expensive to do more
@@ -451,6 +451,10 @@ class GDF(aft.AFTDF):
         # 0 since v1.5.2.
         self.exp_to_discard = cell.exp_to_discard
 
+        # Number of processes to distribute the k-points (or k-pairs) of the
+        # J/K matrices over.  The processes share the readonly _cderi file.
+        self.nproc = getattr(__config__, 'pbc_df_df_DF_nproc', 1)
+
         # The following attributes are not input options.
         self.exxdiv = None  # to mimic KRHF/KUHF object in function get_coulG
         self.auxcell = None
@@ -493,6 +497,8 @@ class GDF(aft.AFTDF):
             log.info('auxbasis = %s', self.auxcell.basis)
         log.info('eta = %s', self.eta)
         log.info('exp_to_discard = %s', self.exp_to_discard)
+        if self.nproc > 1:
+            log.info('nproc = %d', self.nproc)
         if isinstance(self._cderi, str):
             log.info('_cderi = %s  where DF integrals are loaded (readonly).',
                      self._cderi)
@@ -94,45 +94,62 @@ def get_j_kpts(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), kpts_band=None):
 
     dmsR = dms.real.transpose(0,1,3,2).reshape(nset,nkpts,nao**2)
     dmsI = dms.imag.transpose(0,1,3,2).reshape(nset,nkpts,nao**2)
-    rhoR = numpy.zeros((nset,naux))
-    rhoI = numpy.zeros((nset,naux))
     max_memory = max(2000, (mydf.max_memory - lib.current_memory()[0]))
-    for k, kpt in enumerate(kpts):
-        kptii = numpy.asarray((kpt,kpt))
-        p1 = 0
-        for LpqR, LpqI, sign in mydf.sr_loop(kptii, max_memory, False):
-            p0, p1 = p1, p1+LpqR.shape[0]
-            #:Lpq = (LpqR + LpqI*1j).reshape(-1,nao,nao)
-            #:rhoR[:,p0:p1] += numpy.einsum('Lpq,xqp->xL', Lpq, dms[:,k]).real
-            #:rhoI[:,p0:p1] += numpy.einsum('Lpq,xqp->xL', Lpq, dms[:,k]).imag
-            rhoR[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqR, dmsR[:,k])
-            rhoI[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqR, dmsI[:,k])
-            if LpqI is not None:
-                rhoR[:,p0:p1] -= sign * numpy.einsum('Lp,xp->xL', LpqI, dmsI[:,k])
-                rhoI[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqI, dmsR[:,k])
-            LpqR = LpqI = None
+    nproc = getattr(mydf, 'nproc', 1)
+    def make_rho(kpts_group):
+        rhoR = numpy.zeros((nset,naux))
+        rhoI = numpy.zeros((nset,naux))
+        for k in kpts_group:
+            kptii = numpy.asarray((kpts[k],kpts[k]))
+            p1 = 0
+            for LpqR, LpqI, sign in mydf.sr_loop(kptii, max_memory, False):
+                p0, p1 = p1, p1+LpqR.shape[0]
+                #:Lpq = (LpqR + LpqI*1j).reshape(-1,nao,nao)
+                #:rhoR[:,p0:p1] += numpy.einsum('Lpq,xqp->xL', Lpq, dms[:,k]).real
+                #:rhoI[:,p0:p1] += numpy.einsum('Lpq,xqp->xL', Lpq, dms[:,k]).imag
+                rhoR[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqR, dmsR[:,k])
+                rhoI[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqR, dmsI[:,k])
+                if LpqI is not None:
+                    rhoR[:,p0:p1] -= sign * numpy.einsum('Lp,xp->xL', LpqI, dmsI[:,k])
+                    rhoI[:,p0:p1] += sign * numpy.einsum('Lp,xp->xL', LpqI, dmsR[:,k])
+                LpqR = LpqI = None
+        return rhoR, rhoI
+
+    if nproc > 1:
+        rhoR, rhoI = _sum_task_groups(make_rho, _task_groups(range(nkpts), nproc),
+                                      nproc)
+    else:
+        rhoR, rhoI = make_rho(range(nkpts))
     t1 = log.timer_debug1('get_j pass 1', *t1)
 
     weight = 1./nkpts
     rhoR *= weight
     rhoI *= weight
-    vjR = numpy.zeros((nset,nband,nao_pair))
-    vjI = numpy.zeros((nset,nband,nao_pair))
-    for k, kpt in enumerate(kpts_band):
-        kptii = numpy.asarray((kpt,kpt))
-        p1 = 0
-        for LpqR, LpqI, sign in mydf.sr_loop(kptii, max_memory, True):
-            p0, p1 = p1, p1+LpqR.shape[0]
-            #:Lpq = (LpqR + LpqI*1j)#.reshape(-1,nao,nao)
-            #:vjR[:,k] += numpy.dot(rho[:,p0:p1], Lpq).real
-            #:vjI[:,k] += numpy.dot(rho[:,p0:p1], Lpq).imag
-            vjR[:,k] += numpy.dot(rhoR[:,p0:p1], LpqR)
-            if not j_real:
-                vjI[:,k] += numpy.dot(rhoI[:,p0:p1], LpqR)
-                if LpqI is not None:
-                    vjR[:,k] -= numpy.dot(rhoI[:,p0:p1], LpqI)
-                    vjI[:,k] += numpy.dot(rhoR[:,p0:p1], LpqI)
-            LpqR = LpqI = None
+    def make_vj(kpts_group):
+        vjR = numpy.zeros((nset,nband,nao_pair))
+        vjI = numpy.zeros((nset,nband,nao_pair))
+        for k in kpts_group:
+            kptii = numpy.asarray((kpts_band[k],kpts_band[k]))
+            p1 = 0
+            for LpqR, LpqI, sign in mydf.sr_loop(kptii, max_memory, True):
+                p0, p1 = p1, p1+LpqR.shape[0]
+                #:Lpq = (LpqR + LpqI*1j)#.reshape(-1,nao,nao)
+                #:vjR[:,k] += numpy.dot(rho[:,p0:p1], Lpq).real
+                #:vjI[:,k] += numpy.dot(rho[:,p0:p1], Lpq).imag
+                vjR[:,k] += numpy.dot(rhoR[:,p0:p1], LpqR)
+                if not j_real:
+                    vjI[:,k] += numpy.dot(rhoI[:,p0:p1], LpqR)
+                    if LpqI is not None:
+                        vjR[:,k] -= numpy.dot(rhoI[:,p0:p1], LpqI)
+                        vjI[:,k] += numpy.dot(rhoR[:,p0:p1], LpqI)
+                LpqR = LpqI = None
+        return vjR, vjI
+
+    if nproc > 1:
+        vjR, vjI = _sum_task_groups(make_vj, _task_groups(range(nband), nproc),
+                                    nproc)
+    else:
+        vjR, vjI = make_vj(range(nband))
     t1 = log.timer_debug1('get_j pass 2', *t1)
 
     if j_real:
@@ -173,7 +190,7 @@ def get_k_kpts(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), kpts_band=None,
     bufR = numpy.empty((mydf.blockdim*nao**2))
     bufI = numpy.empty((mydf.blockdim*nao**2))
     max_memory = max(2000, mydf.max_memory-lib.current_memory()[0])
-    def make_kpt(ki, kj, swap_2e):
+    def make_kpt(ki, kj, swap_2e, vkR=vkR, vkI=vkI):
         kpti = kpts[ki]
         kptj = kpts_band[kj]
 
@@ -203,7 +220,26 @@ def get_k_kpts(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), kpts_band=None,
                            pLqR.reshape(nao,-1).T, pLqI.reshape(nao,-1).T,
                            sign, vkR[i,ki], vkI[i,ki], 1)
 
-    if kpts_band is kpts:  # normal k-points HF/DFT
+    nproc = getattr(mydf, 'nproc', 1)
+    if nproc > 1:
+        # Each process reads the (read-only) _cderi file for the k-pairs it
+        # is assigned to and returns its contribution to vk
+        if kpts_band is kpts:
+            kpairs = [(ki, kj, ki != kj)
+                      for ki in range(nkpts) for kj in range(ki+1)]
+        else:
+            kpairs = [(ki, kj, False)
+                      for ki in range(nkpts) for kj in range(nband)]
+        def make_kpairs(kpairs_group):
+            vR = numpy.zeros_like(vkR)
+            vI = numpy.zeros_like(vkI)
+            for ki, kj, swap_2e in kpairs_group:
+                make_kpt(ki, kj, swap_2e, vR, vI)
+            return vR, vI
+        vkR, vkI = _sum_task_groups(make_kpairs, _task_groups(kpairs, nproc),
+                                    nproc)
+        t1 = log.timer_debug1('get_k_kpts: make_kpt on %d processes' % nproc, *t1)
+    elif kpts_band is kpts:  # normal k-points HF/DFT
         for ki in range(nkpts):
             for kj in range(ki):
                 make_kpt(ki, kj, True)
@@ -357,6 +393,19 @@ def get_jk(mydf, dm, hermi=1, kpt=numpy.zeros(3),
     return vj, vk
 
 
+def _task_groups(tasks, nproc):
+    '''Round-robin distribution of tasks (k-points or k-pairs) over nproc
+    processes'''
+    tasks = list(tasks)
+    return [tasks[i::nproc] for i in range(min(nproc, len(tasks)))]
+
+def _sum_task_groups(fn, task_groups, nproc):
+    '''Evaluate fn for each task group on nproc processes.  fn returns a
+    tuple of arrays which it allocates for the task group.  The arrays of all
+    task groups are summed.'''
+    results = lib.process_map(fn, task_groups, nproc)
+    return [sum(x[1:], x[0]) for x in zip(*results)]
+
 def _format_dms(dm_kpts, kpts):
     nkpts = len(kpts)
     nao = dm_kpts.shape[-1]
@@ -343,6 +343,10 @@ class MDF(df.DF):
         # can be set to the value of self.eta
         self.exp_to_discard = None
 
+        # Number of processes to distribute the k-points (or k-pairs) of the
+        # J/K matrices over.  The processes share the readonly _cderi file.
+        self.nproc = getattr(__config__, 'pbc_df_df_DF_nproc', 1)
+
         # The following attributes are not input options.
         self.exxdiv = None  # to mimic KRHF/KUHF object in function get_coulG
         self.auxcell = None
@@ -178,6 +178,45 @@ class KnowValues(unittest.TestCase):
         self.assertAlmostEqual(finger(vk[6]), (0.45430752211150049-0.0068611602260866128j), 9)
         self.assertAlmostEqual(finger(vk[7]), (0.41856931218763038+0.0051073315205987522j), 9)
 
+    def test_jk_kpts_nproc(self):
+        cell = pgto.Cell()
+        cell.atom = 'He 1. .5 .5; He .1 1.3 2.1'
+        cell.basis = {'He': [(0, (2.5, 1)), (0, (1., 1))]}
+        cell.a = numpy.eye(3) * 2.5
+        cell.mesh = [11] * 3
+        cell.build()
+        kpts = cell.make_kpts([2,2,1])
+
+        numpy.random.seed(1)
+        nao = cell.nao_nr()
+        dm = numpy.random.random((4,nao,nao))
+        dm = dm + dm.transpose(0,2,1)
+        mydf = df.DF(cell, kpts).set(auxbasis='weigend')
+        mydf.exxdiv = None
+        vj0 = df_jk.get_j_kpts(mydf, dm, 1, kpts)
+        vk0 = df_jk.get_k_kpts(mydf, dm, 1, kpts)
+        mydf.nproc = 3
+        vj1 = df_jk.get_j_kpts(mydf, dm, 1, kpts)
+        vk1 = df_jk.get_k_kpts(mydf, dm, 1, kpts)
+        self.assertAlmostEqual(abs(vj1 - vj0).max(), 0, 12)
+        self.assertAlmostEqual(abs(vk1 - vk0).max(), 0, 12)
+
+        kpts_band = kpts[:3] + .1
+        vk0 = df_jk.get_k_kpts(mydf, dm, 1, kpts, kpts_band)
+        mydf.nproc = 1
+        vk1 = df_jk.get_k_kpts(mydf, dm, 1, kpts, kpts_band)
+        self.assertAlmostEqual(abs(vk1 - vk0).max(), 0, 12)
+
+        # A single k-point is evaluated serially by process_map
+        mydf = df.DF(cell).set(auxbasis='weigend')
+        vj0 = df_jk.get_j_kpts(mydf, dm[0], 1)
+        vk0 = df_jk.get_k_kpts(mydf, dm[0], 1)
+        mydf.nproc = 2
+        vj1 = df_jk.get_j_kpts(mydf, dm[0], 1)
+        vk1 = df_jk.get_k_kpts(mydf, dm[0], 1)
+        self.assertAlmostEqual(abs(vj1 - vj0).max(), 0, 12)
+        self.assertAlmostEqual(abs(vk1 - vk0).max(), 0, 12)
+
     def test_k_kpts_2(self):
         cell = pgto.Cell()
         cell.atom = 'He 1. .5 .5; He .1 1.3 2.1'
@@ -53,6 +53,7 @@ INIT_MESH_ORTH = getattr(__config__, 'pbc_dft_multigrid_init_mesh_orth', (12,12,
 INIT_MESH_NONORTH = getattr(__config__, 'pbc_dft_multigrid_init_mesh_nonorth', (32,32,32))
 KE_RATIO = getattr(__config__, 'pbc_dft_multigrid_ke_ratio', 1.3)
 TASKS_TYPE = getattr(__config__, 'pbc_dft_multigrid_tasks_type', 'ke_cut') # 'rcut'
+TASK_THREADS = getattr(__config__, 'pbc_dft_multigrid_task_threads', 1)
 
 # RHOG_HIGH_ORDER=True will compute the high order derivatives of electron
 # density in real space and FT to reciprocal space.  Set RHOG_HIGH_ORDER=False
@@ -457,14 +458,15 @@ def _eval_rhoG(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), deriv=0,
         mydf.tasks = tasks = multi_grids_tasks(cell, mydf.mesh, log)
         log.debug('Multigrid ntasks %s', len(tasks))
 
-    assert(deriv < 2)
+    assert(deriv <= 2)
     #hermi = hermi and abs(dms - dms.transpose(0,1,3,2).conj()).max() < 1e-9
     gga_high_order = False
+    with_tau = False
     if deriv == 0:
         xctype = 'LDA'
         rhodim = 1
 
-    elif deriv == 1:
+    elif deriv == 1 or deriv == 2:
         if rhog_high_order:
             xctype = 'GGA'
             rhodim = 4
@@ -472,19 +474,20 @@ def _eval_rhoG(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), deriv=0,
             gga_high_order = True
             xctype = 'LDA'
             rhodim = 1
-            deriv = 0
-        assert(hermi == 1 or gamma_point(kpts))
-
-    elif deriv == 2:  # meta-GGA
-        raise NotImplementedError
+        # For meta-GGA, the laplacian is computed in reciprocal space. tau
+        # is evaluated with the AO derivatives on the grids of each task.
+        with_tau = (deriv == 2)
+        deriv = rhodim // 4
         assert(hermi == 1 or gamma_point(kpts))
 
     ignore_imag = (hermi == 1)
 
     ni = mydf._numint
     nx, ny, nz = mydf.mesh
-    rhoG = numpy.zeros((nset*rhodim,nx,ny,nz), dtype=numpy.complex128)
-    for grids_dense, grids_sparse in tasks:
+    ncomp = rhodim + with_tau
+    rhoG = numpy.zeros((nset*ncomp,nx,ny,nz), dtype=numpy.complex128)
+    def eval_rho_task(task):
+        grids_dense, grids_sparse = task
         h_cell = grids_dense.cell
         mesh = tuple(grids_dense.mesh)
         ngrids = numpy.prod(mesh)
@@ -576,23 +579,84 @@ def _eval_rhoG(mydf, dm_kpts, hermi=1, kpts=numpy.zeros((1,3)), deriv=0,
                 else:
                     raise NotImplementedError
 
+        if with_tau:
+            tau = _eval_tau_sub(mydf, dms, kpts, grids_dense, grids_sparse)
+            rho = numpy.concatenate([rho.reshape(nset,rhodim,ngrids),
+                                     tau.reshape(nset,1,ngrids)], axis=1)
+
         weight = 1./nkpts * cell.vol/ngrids
-        rho_freq = tools.fft(rho.reshape(nset*rhodim, -1), mesh)
+        rho_freq = tools.fft(rho.reshape(nset*ncomp, -1), mesh)
         rho_freq *= weight
+        return mesh, rho_freq
+
+    for mesh, rho_freq in _task_map(mydf, eval_rho_task, tasks):
         gx = numpy.fft.fftfreq(mesh[0], 1./mesh[0]).astype(numpy.int32)
         gy = numpy.fft.fftfreq(mesh[1], 1./mesh[1]).astype(numpy.int32)
         gz = numpy.fft.fftfreq(mesh[2], 1./mesh[2]).astype(numpy.int32)
         #:rhoG[:,gx[:,None,None],gy[:,None],gz] += rho_freq.reshape((-1,)+mesh)
         _takebak_4d(rhoG, rho_freq.reshape((-1,) + mesh), (None, gx, gy, gz))
 
-    rhoG = rhoG.reshape(nset,rhodim,-1)
+    rhoG = rhoG.reshape(nset,ncomp,-1)
+    if with_tau:
+        rhoG, tauG = rhoG[:,:rhodim], rhoG[:,rhodim:]
 
     if gga_high_order:
         Gv = cell.get_Gv(mydf.mesh)
         rhoG1 = numpy.einsum('np,px->nxp', 1j*rhoG[:,0], Gv)
         rhoG = numpy.concatenate([rhoG, rhoG1], axis=1)
+
+    if with_tau:
+        # rhoG = (rho, nabla rho, laplacian, tau), the same order as the
+        # meta-GGA density in numint.eval_rho
+        Gv = cell.get_Gv(mydf.mesh)
+        G2 = numpy.einsum('px,px->p', Gv, Gv)
+        laplG = -G2 * rhoG[:,0]
+        rhoG = numpy.concatenate([rhoG, laplG[:,None], tauG], axis=1)
     return rhoG
 
+def _eval_tau_sub(mydf, dms, kpts, grids_dense, grids_sparse):
+    '''Kinetic energy density tau = 1/2 \nabla\chi_i DM(i,j) \nabla\chi_j of
+    the shell pairs which are assigned to the given task.  Only the real part
+    is computed.
+    '''
+    nset, nkpts = dms.shape[:2]
+    grids_t, idx_h, idx_t = _task_ao_grids(grids_dense, grids_sparse)
+    naoh = len(idx_h)
+    dms_ht = numpy.asarray(dms[:,:,idx_h[:,None],idx_t], order='C')
+    dms_lh = numpy.asarray(dms[:,:,idx_t[naoh:,None],idx_h], order='C')
+
+    tau = numpy.zeros((nset,numpy.prod(grids_t.mesh)))
+    for ao_t_etc, p0, p1 in mydf.aoR_loop(grids_t, kpts, deriv=1):
+        ao_t = ao_t_etc[0]
+        for k in range(nkpts):
+            for i in range(nset):
+                for x in range(1, 4):
+                    ao_x = ao_t[k][x]
+                    c0 = lib.dot(ao_x[:,:naoh], dms_ht[i,k])
+                    tau[i,p0:p1] += numpy.einsum('xi,xi->x', c0, ao_x.conj()).real
+                    if len(idx_t) > naoh:
+                        c0 = lib.dot(ao_x[:,naoh:], dms_lh[i,k])
+                        tau[i,p0:p1] += numpy.einsum('xi,xi->x', c0,
+                                                     ao_x[:,:naoh].conj()).real
+        ao_t = ao_t_etc = c0 = None
+    tau *= .5
+    return tau
+
+def _task_ao_grids(grids_dense, grids_sparse):
+    '''The grids to evaluate the AO values of both the dense and sparse
+    functions of a task on the mesh of the task.'''
+    idx_h = grids_dense.ao_idx
+    if grids_sparse is None:
+        return grids_dense, idx_h, idx_h
+
+    grids_t = getattr(grids_dense, '_grids_t', None)
+    if grids_t is None:
+        grids_t = gen_grid.UniformGrids(grids_dense.cell + grids_sparse.cell)
+        grids_t.mesh = grids_dense.mesh
+        grids_dense._grids_t = grids_t
+    idx_t = numpy.append(idx_h, grids_sparse.ao_idx)
+    return grids_t, idx_h, idx_t
+
 
 def _eval_rho_bra(cell, dms, shls_slice, hermi, xctype, kpts, grids,
                   ignore_imag, log):
@@ -770,8 +834,8 @@ def _get_j_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
     else:
         vj_kpts = numpy.zeros((nset,nkpts,nao,nao), dtype=numpy.complex128)
 
-    ni = mydf._numint
-    for grids_dense, grids_sparse in tasks:
+    def get_j_task(task):
+        grids_dense, grids_sparse = task
         mesh = grids_dense.mesh
         ngrids = numpy.prod(mesh)
         log.debug('mesh %s', mesh)
@@ -790,13 +854,15 @@ def _get_j_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
 
         idx_h = grids_dense.ao_idx
         if grids_sparse is None:
+            naoh = len(idx_h)
+            vp = numpy.zeros((nset,nkpts,naoh,naoh), dtype=vj_kpts.dtype)
             for ao_h_etc, p0, p1 in mydf.aoR_loop(grids_dense, kpts):
                 ao_h = ao_h_etc[0]
                 for k in range(nkpts):
                     for i in range(nset):
-                        vj_sub = lib.dot(ao_h[k].conj().T*v_rs[i,p0:p1], ao_h[k])
-                        vj_kpts[i,k,idx_h[:,None],idx_h] += vj_sub
+                        vp[i,k] += lib.dot(ao_h[k].conj().T*v_rs[i,p0:p1], ao_h[k])
                 ao_h = ao_h_etc = None
+            return idx_h, None, vp, None
         else:
             idx_h = grids_dense.ao_idx
             idx_l = grids_sparse.ao_idx
@@ -824,16 +890,15 @@ def _get_j_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
                 vp = vp + vpI * 1j
                 vpI = None
 
-            vj_kpts[:,:,idx_h[:,None],idx_h] += vp[:,:,:,:naoh]
-            vj_kpts[:,:,idx_h[:,None],idx_l] += vp[:,:,:,naoh:]
-
             #:shls_slice = (nshells_h, nshells_t, 0, nshells_h)
             #:vp = eval_mat(t_cell, vR, shls_slice, 1, 0, 'LDA', kpts)
             #:vp = lib.einsum('nkpq,pi,qj->nkij', vp, l_coeff, h_coeff)
             #:vj_kpts[:,:,idx_l[:,None],idx_h] += vp
-            vj_kpts[:,:,idx_l[:,None],idx_h] += \
-                    vp[:,:,:,naoh:].transpose(0,1,3,2).conj()
+            # is the hermitian conjugation of vp[:,:,:,naoh:]
+            return idx_h, idx_l, vp[:,:,:,:naoh], vp[:,:,:,naoh:]
 
+    for idx_h, idx_l, v_hh, v_hl in _task_map(mydf, get_j_task, tasks):
+        _takebak_task_vmat(vj_kpts, idx_h, idx_l, v_hh, v_hl)
     return vj_kpts
 
 
@@ -851,7 +916,8 @@ def _get_gga_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
     else:
         veff = numpy.zeros((nset,nkpts,nao,nao), dtype=numpy.complex128)
 
-    for grids_dense, grids_sparse in mydf.tasks:
+    def get_gga_task(task):
+        grids_dense, grids_sparse = task
         mesh = grids_dense.mesh
         ngrids = numpy.prod(mesh)
         log.debug('mesh %s', mesh)
@@ -867,14 +933,16 @@ def _get_gga_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
         if grids_sparse is None:
             idx_h = grids_dense.ao_idx
             naoh = len(idx_h)
+            v_hh = numpy.zeros((nset,nkpts,naoh,naoh), dtype=veff.dtype)
             for ao_h_etc, p0, p1 in mydf.aoR_loop(grids_dense, kpts, deriv=1):
                 ao_h = ao_h_etc[0]
                 for k in range(nkpts):
                     for i in range(nset):
-                        aow = numint._scale_ao(ao_h[k], wv[i])
+                        aow = numint._scale_ao(ao_h[k], wv[i,:,p0:p1])
                         v = lib.dot(aow.conj().T, ao_h[k][0])
-                        veff[i,k,idx_h[:,None],idx_h] += v + v.conj().T
+                        v_hh[i,k] += v + v.conj().T
                 ao_h = ao_h_etc = None
+            return idx_h, None, v_hh, None
         else:
             idx_h = grids_dense.ao_idx
             idx_l = grids_sparse.ao_idx
@@ -895,17 +963,70 @@ def _get_gga_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
             shls_slice = (0, nshells_h, 0, nshells_t)
             v = eval_mat(t_cell, wv, shls_slice, 1, 0, 'GGA', kpts)
             v = lib.einsum('nkpq,pi,qj->nkij', v, h_coeff, t_coeff)
-            veff[:,:,idx_h[:,None],idx_h] += v[:,:,:,:naoh]
-            veff[:,:,idx_h[:,None],idx_h] += v[:,:,:,:naoh].conj().transpose(0,1,3,2)
-            veff[:,:,idx_h[:,None],idx_l] += v[:,:,:,naoh:]
-            veff[:,:,idx_l[:,None],idx_h] += v[:,:,:,naoh:].conj().transpose(0,1,3,2)
+            v_hh = v[:,:,:,:naoh]
+            v_hh = v_hh + v_hh.conj().transpose(0,1,3,2)
+            v_hl = v[:,:,:,naoh:]
 
             shls_slice = (nshells_h, nshells_t, 0, nshells_h)
             v = eval_mat(t_cell, wv, shls_slice, 1, 0, 'GGA', kpts)#, offset, submesh)
             v = lib.einsum('nkpq,pi,qj->nkij', v, l_coeff.conj(), h_coeff)
-            veff[:,:,idx_l[:,None],idx_h] += v
-            veff[:,:,idx_h[:,None],idx_l] += v.conj().transpose(0,1,3,2)
+            v_hl = v_hl + v.conj().transpose(0,1,3,2)
+            return idx_h, idx_l, v_hh, v_hl
 
+    for idx_h, idx_l, v_hh, v_hl in _task_map(mydf, get_gga_task, mydf.tasks):
+        _takebak_task_vmat(veff, idx_h, idx_l, v_hh, v_hl)
+    return veff
+
+
+def _get_tau_pass2(mydf, vG, kpts=numpy.zeros((1,3)), verbose=None):
+    '''The matrix of the meta-GGA potential
+    V_ij = \nabla\chi_i vG \nabla\chi_j.  The factor 1/2 in tau needs to be
+    included in the input vG.'''
+    log = logger.new_logger(mydf, verbose)
+    cell = mydf.cell
+    nkpts = len(kpts)
+    nao = cell.nao_nr()
+    nx, ny, nz = mydf.mesh
+    vG = vG.reshape(-1,nx,ny,nz)
+    nset = vG.shape[0]
+
+    if gamma_point(kpts):
+        veff = numpy.zeros((nset,nkpts,nao,nao))
+    else:
+        veff = numpy.zeros((nset,nkpts,nao,nao), dtype=numpy.complex128)
+
+    def get_tau_task(task):
+        grids_dense, grids_sparse = task
+        mesh = grids_dense.mesh
+        ngrids = numpy.prod(mesh)
+        log.debug('mesh %s', mesh)
+
+        gx = numpy.fft.fftfreq(mesh[0], 1./mesh[0]).astype(numpy.int32)
+        gy = numpy.fft.fftfreq(mesh[1], 1./mesh[1]).astype(numpy.int32)
+        gz = numpy.fft.fftfreq(mesh[2], 1./mesh[2]).astype(numpy.int32)
+        #:sub_vG = vG[:,gx[:,None,None],gy[:,None],gz].reshape(nset,ngrids)
+        sub_vG = _take_4d(vG, (None, gx, gy, gz)).reshape(nset,ngrids)
+        wv = tools.ifft(sub_vG, mesh).real.reshape(nset,ngrids)
+
+        grids_t, idx_h, idx_t = _task_ao_grids(grids_dense, grids_sparse)
+        naoh = len(idx_h)
+        v = numpy.zeros((nset,nkpts,naoh,len(idx_t)), dtype=veff.dtype)
+        for ao_t_etc, p0, p1 in mydf.aoR_loop(grids_t, kpts, deriv=1):
+            ao_t = ao_t_etc[0]
+            for k in range(nkpts):
+                for i in range(nset):
+                    for x in range(1, 4):
+                        aow = ao_t[k][x][:,:naoh] * wv[i,p0:p1,None]
+                        v[i,k] += lib.dot(aow.conj().T, ao_t[k][x])
+            ao_t = ao_t_etc = aow = None
+
+        if grids_sparse is None:
+            return idx_h, None, v, None
+        else:
+            return idx_h, grids_sparse.ao_idx, v[:,:,:,:naoh], v[:,:,:,naoh:]
+
+    for idx_h, idx_l, v_hh, v_hl in _task_map(mydf, get_tau_task, mydf.tasks):
+        _takebak_task_vmat(veff, idx_h, idx_l, v_hh, v_hl)
     return veff
 
 
@@ -947,6 +1068,10 @@ def nr_rks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
         deriv = 0
     elif xctype == 'GGA':
         deriv = 1
+    elif xctype == 'MGGA':
+        if (any(x in xc_code.upper() for x in ('CC06', 'CS', 'BR89', 'MK00'))):
+            raise NotImplementedError('laplacian in meta-GGA method')
+        deriv = 2
     rhoG = _eval_rhoG(mydf, dm_kpts, hermi, kpts, deriv)
 
     mesh = mydf.mesh
@@ -972,6 +1097,10 @@ def nr_rks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
             wv = vxc[0].reshape(1,ngrids) * weight
         elif xctype == 'GGA':
             wv = numint._rks_gga_wv0(rhoR[i], vxc, weight)
+        elif xctype == 'MGGA':
+            # .5 for the libxc convention tau = 1/2 \nabla\chi_i \nabla\chi_j
+            wv = numint._rks_gga_wv0(rhoR[i], vxc, weight)
+            wv = numpy.vstack((wv, .5 * weight * vxc[3]))
 
         nelec[i] += rhoR[i,0].sum() * weight
         excsum[i] += (rhoR[i,0]*exc).sum() * weight
@@ -994,6 +1123,11 @@ def nr_rks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
         if with_j:  # *.5 because v+v.T.conj() is evaluated in _get_gga_pass2
             wv_freq[:,0] += vG.reshape(nset,*mesh) * .5
         veff = _get_gga_pass2(mydf, wv_freq, kpts_band, verbose=log)
+    elif xctype == 'MGGA':
+        if with_j:
+            wv_freq[:,0] += vG.reshape(nset,*mesh) * .5
+        veff = _get_gga_pass2(mydf, wv_freq[:,:4], kpts_band, verbose=log)
+        veff += _get_tau_pass2(mydf, wv_freq[:,4], kpts_band, verbose=log)
     veff = _format_jks(veff, dm_kpts, input_band, kpts)
 
     if return_j:
@@ -1048,6 +1182,10 @@ def nr_uks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
         deriv = 0
     elif xctype == 'GGA':
         deriv = 1
+    elif xctype == 'MGGA':
+        if (any(x in xc_code.upper() for x in ('CC06', 'CS', 'BR89', 'MK00'))):
+            raise NotImplementedError('laplacian in meta-GGA method')
+        deriv = 2
     rhoG = _eval_rhoG(mydf, dm_kpts, hermi, kpts, deriv)
 
     mesh = mydf.mesh
@@ -1075,6 +1213,11 @@ def nr_uks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
         wvb = vrho[:,1].reshape(1,ngrids) * weight
     elif xctype == 'GGA':
         wva, wvb = numint._uks_gga_wv0(rhoR, vxc, weight)
+    elif xctype == 'MGGA':
+        wva, wvb = numint._uks_gga_wv0(rhoR, vxc, weight)
+        vtau = vxc[3]
+        wva = numpy.vstack((wva, .5 * weight * vtau[:,0]))
+        wvb = numpy.vstack((wvb, .5 * weight * vtau[:,1]))
 
     nelec[0] += rhoR[0,0].sum() * weight
     nelec[1] += rhoR[1,0].sum() * weight
@@ -1094,6 +1237,11 @@ def nr_uks(mydf, xc_code, dm_kpts, hermi=1, kpts=None,
         if with_j:  # *.5 because v+v.T.conj() is evaluated in _get_gga_pass2
             wv_freq[:,0] += vG.reshape(*mesh) * .5
         veff = _get_gga_pass2(mydf, wv_freq, kpts_band, verbose=log)
+    elif xctype == 'MGGA':
+        if with_j:
+            wv_freq[:,0] += vG.reshape(*mesh) * .5
+        veff = _get_gga_pass2(mydf, wv_freq[:,:4], kpts_band, verbose=log)
+        veff += _get_tau_pass2(mydf, wv_freq[:,4], kpts_band, verbose=log)
     veff = _format_jks(veff, dm_kpts, input_band, kpts)
 
     if return_j:
@@ -1128,7 +1276,7 @@ def nr_rks_fxc(mydf, xc_code, dm0, dms, hermi=1, with_j=False,
     elif xctype == 'GGA':
         deriv = 1
     else:
-        deriv = 2
+        raise NotImplementedError('meta-GGA')
 
     weight = cell.vol / ngrids
     if rho0 is None:
@@ -1188,7 +1336,7 @@ def nr_rks_fxc_st(mydf, xc_code, dm0, dms_alpha, hermi=1, singlet=True, with_j=F
     elif xctype == 'GGA':
         deriv = 1
     else:
-        deriv = 2
+        raise NotImplementedError('meta-GGA')
 
     weight = cell.vol / ngrids
     if rho0 is None:
@@ -1271,7 +1419,7 @@ def nr_uks_fxc(mydf, xc_code, dm0, dms, hermi=1, with_j=False,
     elif xctype == 'GGA':
         deriv = 1
     else:
-        deriv = 2
+        raise NotImplementedError('meta-GGA')
 
     weight = cell.vol / ngrids
     if rho0 is None:
@@ -1330,7 +1478,7 @@ def cache_xc_kernel(mydf, xc_code, dm, spin=0, kpts=None):
         deriv = 1
         comp = 4
     else:
-        deriv = 2
+        raise NotImplementedError('meta-GGA')
 
     hermi = 1
     weight = cell.vol / ngrids
@@ -1700,7 +1848,9 @@ class MultiGridFFTDF(fft.FFTDF):
     def __init__(self, cell, kpts=numpy.zeros((1,3))):
         fft.FFTDF.__init__(self, cell, kpts)
         self.tasks = None
-        self._keys = self._keys.union(['tasks'])
+        # Number of threads to run the tasks (grid levels) concurrently.
+        self.task_threads = TASK_THREADS
+        self._keys = self._keys.union(['tasks', 'task_threads'])
 
     def build(self):
         self.tasks = multi_grids_tasks(self.cell, self.mesh, self.verbose)
@@ -1753,6 +1903,39 @@ def multigrid(mf):
     return mf
 
 
+def _task_map(mydf, fn, tasks):
+    '''Evaluate fn for each multigrid task.  The tasks are distributed over
+    mydf.task_threads Python threads.  The results are returned in the order
+    of the tasks so that the summation does not depend on the scheduling.
+    '''
+    nthreads = min(getattr(mydf, 'task_threads', 1), len(tasks))
+    if nthreads <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    # The collocation functions are OpenMP parallelized. Each thread calls
+    # them with one OpenMP thread to avoid oversubscribing the CPU cores.
+    def fn_1thread(task):
+        with lib.with_omp_threads(1):
+            return fn(task)
+
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(nthreads)
+    try:
+        for result in pool.imap(fn_1thread, tasks):
+            yield result
+    finally:
+        pool.terminate()
+
+def _takebak_task_vmat(vmat, idx_h, idx_l, v_hh, v_hl):
+    '''Add the matrix blocks of one task to vmat.  The (l,h) block is the
+    hermitian conjugation of the (h,l) block.'''
+    vmat[:,:,idx_h[:,None],idx_h] += v_hh
+    if v_hl is not None:
+        vmat[:,:,idx_h[:,None],idx_l] += v_hl
+        vmat[:,:,idx_l[:,None],idx_h] += v_hl.conj().transpose(0,1,3,2)
+
 def _pgto_shells(cell):
     return cell._bas[:,NPRIM_OF].sum()
 
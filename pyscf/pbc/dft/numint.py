@@ -510,10 +510,10 @@ def nr_uks(ni, cell, grids, xc_code, dms, spin=1, relativity=0, hermi=0,
                 nelec[1,i] += den.sum()
                 excsum[i] += (den*exc).sum()
 
-                v = (vrho[:,0], (vsigma[:,0],vsigma[:,1]), None, vtau[:,0])
+                v = (vrho[:,0], (vsigma[:,0],vsigma[:,1]), None, (vtau[:,0],vtau[:,1]))
                 vmata[i] += ni.eval_mat(cell, ao_k1, weight, (rho_a,rho_b), v,
                                         mask, xctype, 1, verbose)
-                v = (vrho[:,1], (vsigma[:,2],vsigma[:,1]), None, vtau[:,1])
+                v = (vrho[:,1], (vsigma[:,2],vsigma[:,1]), None, (vtau[:,1],vtau[:,0]))
                 vmatb[i] += ni.eval_mat(cell, ao_k1, weight, (rho_b,rho_a), v,
                                         mask, xctype, 1, verbose)
                 v = None
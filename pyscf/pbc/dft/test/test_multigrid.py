@@ -24,6 +24,7 @@ from pyscf.pbc import gto, scf, dft, df
 from pyscf.pbc import tools
 from pyscf.pbc.dft import gen_grid
 from pyscf.pbc.dft import multigrid
+from pyscf.dft import libxc
 multigrid.R_RATIO_SUBLOOP = 0.6
 
 numpy.random.seed(2)
@@ -71,6 +72,26 @@ dm_he = numpy.random.random((len(kpts), he_nao, he_nao))
 dm_he = dm_he + dm_he.transpose(0,2,1)
 dm_he = dm_he * .2 + numpy.eye(he_nao)
 
+# A polynomial meta-GGA functional.  It keeps the multigrid vs numint checks
+# of the tau terms independent of the functionals provided by libxc.
+def eval_mgga_xc(xc_code, rho, spin=0, relativity=0, deriv=1, verbose=None):
+    if spin == 0:
+        r, dr, tau = rho[0], rho[1:4], rho[5]
+    else:
+        r = rho[0][0] + rho[1][0]
+        dr = rho[0][1:4] + rho[1][1:4]
+        tau = rho[0][5] + rho[1][5]
+    sigma = numpy.einsum('xg,xg->g', dr, dr)
+    exc = .01 * r + .02 * tau + .005 * sigma
+    vrho = .02 * r + .02 * tau + .005 * sigma
+    if spin == 0:
+        vxc = (vrho, .005 * r, None, .02 * r)
+    else:
+        vxc = (numpy.vstack((vrho, vrho)).T,
+               numpy.vstack((.005*r, .01*r, .005*r)).T, None,
+               numpy.vstack((.02*r, .02*r)).T)
+    return exc, vxc, None, None
+
 def tearDownModule():
     global cell_orth, cell_nonorth, cell_he, mydf
     del cell_orth, cell_nonorth, cell_he, mydf
@@ -218,6 +239,27 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(float(abs(ref-vxc).max()), 0, 8)
         self.assertAlmostEqual(abs(exc0-exc1).max(), 0, 7)
 
+    def test_orth_rks_mgga_kpts(self):
+        mydf = df.FFTDF(cell_orth)
+        ni = libxc.define_xc_(dft.numint.KNumInt(), eval_mgga_xc, 'MGGA')
+        n, exc0, ref = ni.nr_rks(cell_orth, mydf.grids, 'mgga', dm, hermi=1, kpts=kpts)
+        mydf = multigrid.MultiGridFFTDF(cell_orth)
+        libxc.define_xc_(mydf._numint, eval_mgga_xc, 'MGGA')
+        n, exc1, vxc = multigrid.nr_rks(mydf, 'mgga', dm, hermi=1, kpts=kpts)
+        self.assertAlmostEqual(float(abs(ref-vxc).max()), 0, 9)
+        self.assertAlmostEqual(abs(exc0-exc1).max(), 0, 9)
+
+    def test_orth_uks_mgga(self):
+        dms = dm1 + dm1.transpose(0,2,1)
+        mydf = df.FFTDF(cell_orth)
+        ni = libxc.define_xc_(dft.numint.NumInt(), eval_mgga_xc, 'MGGA')
+        n, exc0, ref = ni.nr_uks(cell_orth, mydf.grids, 'mgga', dms, 1)
+        mydf = multigrid.MultiGridFFTDF(cell_orth)
+        libxc.define_xc_(mydf._numint, eval_mgga_xc, 'MGGA')
+        n, exc1, vxc = multigrid.nr_uks(mydf, 'mgga', dms, hermi=1)
+        self.assertAlmostEqual(float(abs(ref-vxc).max()), 0, 9)
+        self.assertAlmostEqual(abs(exc0-exc1).max(), 0, 8)
+
     def test_eval_rhoG_orth_kpts(self):
         numpy.random.seed(9)
         dm = numpy.random.random(dm1.shape) + numpy.random.random(dm1.shape) * 1j
@@ -260,6 +302,51 @@ class KnownValues(unittest.TestCase):
         rhoR *= numpy.prod(cell_nonorth.mesh)/cell_nonorth.vol
         self.assertAlmostEqual(abs(rhoR-ref).max(), 0, 5)
 
+    def test_eval_rhoG_orth_mgga(self):
+        mydf = multigrid.MultiGridFFTDF(cell_orth)
+        rhoG = multigrid._eval_rhoG(mydf, dm, hermi=1, kpts=kpts, deriv=2)
+        self.assertEqual(rhoG.shape[1], 6)
+
+        mydf = df.FFTDF(cell_orth)
+        ni = dft.numint.KNumInt()
+        ao_kpts = ni.eval_ao(cell_orth, mydf.grids.coords, kpts, deriv=2)
+        ref = ni.eval_rho(cell_orth, ao_kpts, dm, xctype='MGGA')
+        rhoR = tools.ifft(rhoG[0], cell_orth.mesh).real
+        rhoR *= numpy.prod(cell_orth.mesh)/cell_orth.vol
+        self.assertAlmostEqual(abs(rhoR[0]-ref[0]).max(), 0, 7)
+        self.assertAlmostEqual(abs(rhoR[4]-ref[4]).max(), 0, 4)
+        self.assertAlmostEqual(abs(rhoR[5]-ref[5]).max(), 0, 7)
+
+    def test_get_tau_pass2(self):
+        mydf = multigrid.MultiGridFFTDF(cell_orth)
+        mydf.tasks = multigrid.multi_grids_tasks(cell_orth, mydf.mesh)
+        numpy.random.seed(3)
+        mesh = cell_orth.mesh
+        wv = numpy.random.random(numpy.prod(mesh))
+        vtau = multigrid._get_tau_pass2(mydf, tools.fft(wv, mesh), kpts)[0]
+
+        ni = dft.numint.KNumInt()
+        coords = df.FFTDF(cell_orth).grids.coords
+        ao_kpts = ni.eval_ao(cell_orth, coords, kpts, deriv=1)
+        for k, ao in enumerate(ao_kpts):
+            ref = sum([lib.dot(ao[x].conj().T*wv, ao[x]) for x in (1,2,3)])
+            self.assertAlmostEqual(abs(vtau[k]-ref).max(), 0, 7)
+
+    def test_task_threads(self):
+        mydf = multigrid.MultiGridFFTDF(cell_orth)
+        rhoG = multigrid._eval_rhoG(mydf, dm, hermi=1, kpts=kpts, deriv=2)
+        vG = rhoG[:,:4].copy()
+        vj = multigrid._get_j_pass2(mydf, vG[0,0], kpts)
+        vgga = multigrid._get_gga_pass2(mydf, vG, kpts)
+
+        mydf.task_threads = 3
+        rhoG1 = multigrid._eval_rhoG(mydf, dm, hermi=1, kpts=kpts, deriv=2)
+        self.assertAlmostEqual(abs(rhoG1-rhoG).max(), 0, 12)
+        vj1 = multigrid._get_j_pass2(mydf, vG[0,0], kpts)
+        self.assertAlmostEqual(abs(vj1-vj).max(), 0, 12)
+        vgga1 = multigrid._get_gga_pass2(mydf, vG, kpts)
+        self.assertAlmostEqual(abs(vgga1-vgga).max(), 0, 12)
+
     def test_gen_rhf_response(self):
         numpy.random.seed(9)
         dm1 = numpy.random.random(dm_he.shape)
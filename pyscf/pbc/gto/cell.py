@@ -207,7 +207,8 @@ def unpack(celldic):
 def dumps(cell):
     '''Serialize Cell object to a JSON formatted str.
     '''
-    exclude_keys = set(('output', 'stdout', '_keys'))
+    exclude_keys = set(('output', 'stdout', '_keys', '_intor_cache',
+                        '_shell_pairs'))
 
     celldic = dict(cell.__dict__)
     for k in exclude_keys:
@@ -272,6 +273,48 @@ def loads(cellstr):
 
     return cell
 
+def dumpb(cell):
+    '''Serialize Cell object to the binary format of :mod:`lib.serialize`.
+    '''
+    exclude_keys = set(('output', 'stdout', '_keys', '_intor_cache',
+                        '_shell_pairs'))
+    celldic = dict(cell.__dict__)
+    for k in exclude_keys:
+        celldic.pop(k, None)
+    celldic['atom'] = repr(cell.atom)
+    celldic['basis']= repr(cell.basis)
+    celldic['pseudo'] = repr(cell.pseudo)
+    celldic['ecp'] = repr(cell.ecp)
+    try:
+        return lib.serialize.dumps(celldic)
+    except TypeError:
+        for k, v in list(celldic.items()):
+            try:
+                lib.serialize.dumps(v)
+            except TypeError:
+                msg =('Function cell.dumpb drops attribute %s because '
+                      'it is not serializable' % k)
+                warnings.warn(msg)
+                del(celldic[k])
+        return lib.serialize.dumps(celldic)
+
+def loadb(buf):
+    '''Deserialize a buffer generated by :func:`dumpb` to a Cell object.
+    '''
+    from numpy import array  # for eval function
+    celldic = lib.serialize.loads(buf, copy=True)
+    cell = Cell()
+    cell.__dict__.update(celldic)
+    cell.atom = eval(cell.atom)
+    cell.basis = eval(cell.basis)
+    cell.pseudo = eval(cell.pseudo)
+    cell.ecp = eval(cell.ecp)
+    cell._atm = np.asarray(cell._atm, dtype=np.int32)
+    cell._bas = np.asarray(cell._bas, dtype=np.int32)
+    cell._env = np.asarray(cell._env, dtype=np.double)
+    cell._ecpbas = np.asarray(cell._ecpbas, dtype=np.int32)
+    return cell
+
 def conc_cell(cell1, cell2):
     '''Concatenate two Cell objects.
     '''
@@ -384,7 +427,12 @@ def intor_cross(intor, cell1, cell2, comp=None, hermi=0, kpts=None, kpt=None,
     cintopt = lib.c_null_ptr()
     pbcopt = kwargs.get('pbcopt', None)
     if pbcopt is None:
-        pbcopt = _pbcintor.PBCOpt(pcell).init_rcut_cond(pcell)
+        if intor.startswith('int2c2e_'):
+# The rcut prescreening of lattice images only applies to short-range
+# operators.  Skip it for the long-range Coulomb integrals int2c2e_*
+            pbcopt = lib.c_null_ptr()
+        else:
+            pbcopt = _pbcintor.PBCOpt(pcell).init_rcut_cond(pcell)
     if isinstance(pbcopt, _pbcintor.PBCOpt):
         cpbcopt = pbcopt._this
     else:
@@ -1504,6 +1552,14 @@ class Cell(mole.Mole):
         self.__dict__.update(loads(molstr).__dict__)
         return self
 
+    dumpb = dumpb
+    @lib.with_doc(loadb.__doc__)
+    def loadb(self, buf):
+        return loadb(buf)
+    def loadb_(self, buf):
+        self.__dict__.update(loadb(buf).__dict__)
+        return self
+
     bas_rcut = bas_rcut
 
     get_lattice_Ls = pbctools.get_lattice_Ls
@@ -235,6 +235,14 @@ class KnownValues(unittest.TestCase):
         s1 = cl1.pbc_intor('int1e_ovlp_sph', hermi=1, kpts=kpts[0])
         self.assertAlmostEqual(finger(s1), 492.30658304804126, 4)
 
+    def test_pbc_intor_screening(self):
+        from pyscf import lib
+        numpy.random.seed(12)
+        kpts = numpy.random.random((2,3))
+        s0 = cl1.pbc_intor('int1e_kin', hermi=0, kpts=kpts)
+        s1 = cl1.pbc_intor('int1e_kin', hermi=0, kpts=kpts, pbcopt=lib.c_null_ptr())
+        self.assertAlmostEqual(abs(numpy.asarray(s0) - numpy.asarray(s1)).max(), 0, 6)
+
     def test_ecp_pseudo(self):
         from pyscf.pbc.gto import ecp
         cell = pgto.M(
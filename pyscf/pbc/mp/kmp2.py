@@ -27,13 +27,20 @@ eri of size (nkpts,nocc,nocc,nvir,nvir)
 '''
 
 import time
+import tempfile
 import numpy as np
+import h5py
 
 from pyscf import lib
 from pyscf.lib import logger
+from pyscf.ao2mo import _ao2mo
 from pyscf.mp import mp2
 from pyscf.pbc.lib import kpts_helper
 from pyscf.lib.parameters import LARGE_DENOM
+from pyscf import __config__
+
+OS_FACTOR = getattr(__config__, 'pbc_mp_kmp2_KMP2_os_factor', 1.)
+SS_FACTOR = getattr(__config__, 'pbc_mp_kmp2_KMP2_ss_factor', 1.)
 
 def kernel(mp, mo_energy, mo_coeff, verbose=logger.NOTE):
     nmo = mp.nmo
@@ -80,7 +87,8 @@ def kernel(mp, mo_energy, mo_coeff, verbose=logger.NOTE):
 
             eijab = lib.direct_sum('ia,jb->ijab',eia,ejb)
             t2_ijab = np.conj(oovv_ij[ka]/eijab)
-            woovv = 2*oovv_ij[ka] - oovv_ij[kb].transpose(0,1,3,2)
+            woovv = ((mp.os_factor+mp.ss_factor) * oovv_ij[ka]
+                     - mp.ss_factor * oovv_ij[kb].transpose(0,1,3,2))
             emp2 += np.einsum('ijab,ijab', t2_ijab, woovv).real
 
     emp2 /= nkpts
@@ -88,6 +96,109 @@ def kernel(mp, mo_energy, mo_coeff, verbose=logger.NOTE):
     return emp2, None
 
 
+def kernel_df(mp, mo_energy, mo_coeff, verbose=logger.NOTE):
+    '''KMP2 energy with the GDF 3-index integrals.
+
+    The integrals (L|ia) of each k-pair (ki,ka) are transformed only once.
+    They are held in memory, or in a temporary HDF5 file if they do not fit
+    in mp.max_memory.  For each (ki,kj) the (ia|jb) integrals of all ka are
+    generated by matrix multiplications of (L|ia).  The ki are distributed
+    over with_df.nproc processes.
+    '''
+    log = logger.new_logger(mp, verbose)
+    cput0 = (time.clock(), time.time())
+    nmo = mp.nmo
+    nocc = mp.nocc
+    nvir = nmo - nocc
+    nkpts = mp.nkpts
+    kconserv = mp.khelper.kconserv
+    with_df = mp._scf.with_df
+    nproc = getattr(with_df, 'nproc', 1)
+
+    mo_e_o = [mo_energy[k][:nocc] for k in range(nkpts)]
+    mo_e_v = [mo_energy[k][nocc:] for k in range(nkpts)]
+    nonzero_opadding, nonzero_vpadding = padding_k_idx(mp, kind="split")
+    eia = []
+    for ki in range(nkpts):
+        for ka in range(nkpts):
+            e = LARGE_DENOM * np.ones((nocc, nvir), dtype=mo_energy[0].dtype)
+            n0_ovp_ia = np.ix_(nonzero_opadding[ki], nonzero_vpadding[ka])
+            e[n0_ovp_ia] = (mo_e_o[ki][:,None] - mo_e_v[ka])[n0_ovp_ia]
+            eia.append(e)
+
+    naux = with_df.get_naoaux()
+    mem_now = lib.current_memory()[0]
+    incore = (nkpts**2*naux*nocc*nvir*16/1e6 + mem_now < mp.max_memory*.7)
+    if incore:
+        Lov = {}
+        feri = None
+    else:
+        log.debug('(L|ia) are saved in a temporary file')
+        feri = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+        Lov = h5py.File(feri.name, 'w')
+    for ki in range(nkpts):
+        for ka in range(nkpts):
+            Lov['%d' % (ki*nkpts+ka)] = _make_Lov(mp, mo_coeff, ki, ka)
+    if not incore:
+        Lov.close()
+    cput1 = log.timer('(L|ia) transformation', *cput0)
+
+    def get_emp2(kis):
+        if incore:
+            fLov = Lov
+        else:
+            fLov = h5py.File(feri.name, 'r')
+        emp2 = 0
+        oovv_ij = np.empty((nkpts,nocc,nocc,nvir,nvir), dtype=np.complex128)
+        for ki in kis:
+            Lov_i = [np.asarray(fLov['%d' % (ki*nkpts+ka)]) for ka in range(nkpts)]
+            for kj in range(nkpts):
+                for ka in range(nkpts):
+                    kb = kconserv[ki,ka,kj]
+                    Lov_j = np.asarray(fLov['%d' % (kj*nkpts+kb)])
+                    eri = lib.dot(Lov_i[ka].T, Lov_j, 1./nkpts)
+                    oovv_ij[ka] = eri.reshape(nocc,nvir,nocc,nvir).transpose(0,2,1,3)
+
+                for ka in range(nkpts):
+                    kb = kconserv[ki,ka,kj]
+                    eijab = lib.direct_sum('ia,jb->ijab', eia[ki*nkpts+ka],
+                                           eia[kj*nkpts+kb])
+                    t2_ijab = np.conj(oovv_ij[ka]/eijab)
+                    woovv = ((mp.os_factor+mp.ss_factor) * oovv_ij[ka]
+                             - mp.ss_factor * oovv_ij[kb].transpose(0,1,3,2))
+                    emp2 += np.einsum('ijab,ijab', t2_ijab, woovv).real
+        if not incore:
+            fLov.close()
+        return emp2
+
+    kis = [list(range(nkpts))[i::nproc] for i in range(min(nproc, nkpts))]
+    emp2 = sum(lib.process_map(get_emp2, kis, nproc)) / nkpts
+    log.timer('KMP2 energy', *cput1)
+    return emp2, None
+
+def _make_Lov(mp, mo_coeff, ki, ka):
+    '''(L|ia) of the k-pair (ki,ka) in the shape (naux,nocc*nvir)'''
+    nocc = mp.nocc
+    nmo = mp.nmo
+    with_df = mp._scf.with_df
+    kpts = mp.kpts
+    mo = np.asarray(np.hstack((mo_coeff[ki][:,:nocc], mo_coeff[ka][:,nocc:])),
+                    dtype=np.complex128, order='F')
+    ijslice = (0, nocc, nocc, nmo)
+    max_memory = max(2000, mp.max_memory - lib.current_memory()[0])
+    Lov = []
+    for LpqR, LpqI, sign in with_df.sr_loop((kpts[ki],kpts[ka]), max_memory,
+                                            False):
+        Lia = _ao2mo.r_e2(LpqR+LpqI*1j, mo, ijslice, [], None)
+        # The negative part (of low-dimensional systems) enters both (L|ia)
+        # and (L|jb).  It is absorbed in (L|ia) by the factor sqrt(-1).
+        if sign < 0:
+            Lia *= 1j
+        Lov.append(Lia)
+        LpqR = LpqI = None
+    return np.vstack(Lov)
+
+
 def padding_k_idx(mp, kind="split"):
     """A convention used for padding vectors, matrices and tensors in case when occupation numbers depend on the
     k-point index.
@@ -422,6 +533,10 @@ class KMP2(mp2.MP2):
         self.max_memory = mf.max_memory
 
         self.frozen = frozen
+        # Scaling factors of the opposite-spin and same-spin components.
+        # SOS-MP2: os_factor = 1.3, ss_factor = 0
+        self.os_factor = OS_FACTOR
+        self.ss_factor = SS_FACTOR
 
 ##################################################
 # don't modify the following attributes, they are not input options
@@ -454,8 +569,16 @@ class KMP2(mp2.MP2):
 
         mo_coeff, mo_energy = _add_padding(self, mo_coeff, mo_energy)
 
-        self.e_corr, self.t2 = \
-                kernel(self, mo_energy, mo_coeff, verbose=self.verbose)
+        from pyscf.pbc import df
+        with_df = getattr(self._scf, 'with_df', None)
+        # MDF integrals have an additional plane-wave part which is not
+        # included in the 3-index tensor
+        if isinstance(with_df, df.GDF) and not isinstance(with_df, df.MDF):
+            self.e_corr, self.t2 = \
+                    kernel_df(self, mo_energy, mo_coeff, verbose=self.verbose)
+        else:
+            self.e_corr, self.t2 = \
+                    kernel(self, mo_energy, mo_coeff, verbose=self.verbose)
         logger.log(self, 'KMP2 energy = %.15g', self.e_corr)
         return self.e_corr, self.t2
 KRMP2 = KMP2
@@ -118,6 +118,42 @@ class KnownValues(unittest.TestCase):
         emp2 /= np.prod(nmp)
         self.assertAlmostEqual(emp2, -0.022416773725207319, 6)
 
+    def test_kmp2_df(self):
+        cell = pbcgto.Cell()
+        cell.atom = [['H', (0.000000000, 0.000000000, 0.000000000)],
+                     ['H', (0.000000000, 0.500000000, 0.250000000)],
+                     ['H', (0.500000000, 0.500000000, 0.500000000)],
+                     ['H', (0.500000000, 0.000000000, 0.750000000)]]
+        cell.unit = 'Bohr'
+        cell.a = [[1.,0.,0.],[0.,1.,0],[0,0,2.2]]
+        cell.basis = [[0, [1.0, 1]],]
+        cell.pseudo = 'gth-pade'
+        cell.verbose = 0
+        for i in range(len(cell.atom)):
+            cell.atom[i][1] = tuple(np.dot(np.array(cell.atom[i][1]),np.array(cell.a)))
+        cell.build()
+
+        kmf = pbcscf.KRHF(cell, cell.make_kpts([3,1,1])).density_fit().run()
+        mymp = pyscf.pbc.mp.kmp2.KMP2(kmf, frozen=[[0], [], [3]])
+        ekmp2 = mymp.kernel()[0]
+        mo_coeff, mo_energy = pyscf.pbc.mp.kmp2._add_padding(
+            mymp, mymp.mo_coeff, mymp.mo_energy)
+        eref = pyscf.pbc.mp.kmp2.kernel(mymp, mo_energy, mo_coeff)[0]
+        self.assertAlmostEqual(ekmp2, eref, 12)
+
+        mymp.max_memory = 0
+        kmf.with_df.nproc = 2
+        self.assertAlmostEqual(mymp.kernel()[0], eref, 12)
+
+        mymp.ss_factor = 0
+        eos = mymp.kernel()[0]
+        mymp.os_factor = 0
+        mymp.ss_factor = 1
+        ess = mymp.kernel()[0]
+        self.assertAlmostEqual(eos + ess, eref, 12)
+        self.assertAlmostEqual(pyscf.pbc.mp.kmp2.kernel(mymp, mo_energy, mo_coeff)[0],
+                               ess, 12)
+
 if __name__ == '__main__':
     print("Full kpoint test")
     unittest.main()
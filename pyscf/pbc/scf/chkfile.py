@@ -18,9 +18,17 @@
 
 from pyscf.lib.chkfile import load_chkfile_key, load
 from pyscf.lib.chkfile import dump_chkfile_key, dump, save
+from pyscf.lib import serialize
 from pyscf.pbc.lib.chkfile import load_cell, save_cell
-from pyscf.scf.chkfile import dump_scf
+from pyscf.scf.chkfile import dump_scf, dumpb_scf
 
 def load_scf(chkfile):
     return load_cell(chkfile), load(chkfile, 'scf')
 
+def loadb_scf(buf):
+    '''Deserialize the buffer generated by :func:`dumpb_scf` to a Cell object
+    and a dict of the SCF results.
+    '''
+    from pyscf.pbc.gto.cell import loadb
+    rec = serialize.loads(buf)
+    return loadb(rec['mol']), rec['scf']
@@ -25,8 +25,11 @@ See Also:
     pyscf.pbc.scf.khf.py : Hartree-Fock for periodic systems with k-point sampling
 '''
 
+import os
 import sys
+import copy
 import time
+import tempfile
 import numpy as np
 import h5py
 from pyscf.scf import hf as mol_hf
@@ -165,22 +168,129 @@ def get_bands(mf, kpts_band, cell=None, dm=None, kpt=None):
     single_kpt_band = (getattr(kpts_band, 'ndim', None) == 1)
     kpts_band = kpts_band.reshape(-1,3)
 
-    fock = mf.get_hcore(cell, kpts_band)
-    fock = fock + mf.get_veff(cell, dm, kpt=kpt, kpts_band=kpts_band)
-    s1e = mf.get_ovlp(cell, kpts_band)
-    nkpts = len(kpts_band)
-    mo_energy = []
-    mo_coeff = []
-    for k in range(nkpts):
-        e, c = mf.eig(fock[k], s1e[k])
-        mo_energy.append(e)
-        mo_coeff.append(c)
+    def eig_block(mf, kpts_blk):
+        fock = mf.get_hcore(cell, kpts_blk)
+        fock = fock + mf.get_veff(cell, dm, kpt=kpt, kpts_band=kpts_blk)
+        s1e = mf.get_ovlp(cell, kpts_blk)
+        return [mf.eig(fock[k], s1e[k]) for k in range(len(kpts_blk))]
+    bands = eval_bands_blockwise(mf, kpts_band, eig_block)
+    mo_energy = [e for e, c in bands]
+    mo_coeff = [c for e, c in bands]
 
     if single_kpt_band:
         mo_energy = mo_energy[0]
         mo_coeff = mo_coeff[0]
     return mo_energy, mo_coeff
 
+def eval_bands_blockwise(mf, kpts_band, eig_block, blksize=None, nproc=None):
+    '''Evaluate the bands in blocks of k-points.
+
+    The Fock matrices of all band k-points are not held in memory at the same
+    time.  kpts_band are split into blocks whose size is determined by
+    mf.max_memory (or the given blksize) and eig_block is called for each
+    block.  If the DF integrals of mf.with_df do not cover the band k-points,
+    the integrals of the band k-points are generated once, on a copy of
+    mf.with_df.  mf and mf.with_df are not modified.
+
+    Args:
+        eig_block : function
+            eig_block(mf, kpts) returns a list of (mo_energy, mo_coeff) for
+            each k-point of the block.  The given mf is the SCF object to
+            build the Fock matrices with.
+
+    Kwargs:
+        nproc : int
+            Number of processes to evaluate the blocks.  Default is
+            mf.with_df.nproc if mf.with_df has this attribute, otherwise 1.
+
+    Returns:
+        A list of (mo_energy, mo_coeff) for each k-point of kpts_band.
+    '''
+    kpts_band = np.reshape(kpts_band, (-1,3))
+    nband = len(kpts_band)
+    with_df = getattr(mf, 'with_df', None)
+    if nproc is None:
+        nproc = getattr(with_df, 'nproc', 1)
+    if blksize is None:
+        nao = mf.cell.nao_nr()
+        # hcore, veff, ovlp, fock and mo_coeff are complex at each k-point
+        mem_now = lib.current_memory()[0]
+        max_memory = max(2000, mf.max_memory-mem_now)
+        blksize = int(max_memory*1e6/16/(nao**2*6)/max(1, nproc))
+    blksize = max(1, min(blksize, nband))
+    tasks = [kpts_band[p0:p0+blksize] for p0 in range(0, nband, blksize)]
+    nproc = max(1, min(nproc, len(tasks)))
+    logger.debug(mf, 'get_bands: %d k-points, blksize %d, nproc %d',
+                 nband, blksize, nproc)
+
+    if (hasattr(with_df, 'has_kpts') and
+        (with_df._cderi is None or not with_df.has_kpts(kpts_band))):
+        mf = copy.copy(mf)
+        mf.with_df = _df_for_kpts_band(with_df, kpts_band)
+
+    # The OpenMP threads have to be set before the workers are forked
+    threads_bak = lib.num_threads()
+    if nproc > 1:
+        lib.num_threads(max(1, threads_bak//nproc))
+    try:
+        bands = lib.process_map(lambda kpts_blk: eig_block(mf, kpts_blk),
+                                tasks, nproc)
+    finally:
+        lib.num_threads(threads_bak)
+    return [x for blk in bands for x in blk]
+
+def _df_for_kpts_band(with_df, kpts_band):
+    '''A copy of the GDF object with the 3-index integrals of kpts_band.
+
+    Only the integrals of the band k-point pairs are computed.  They are saved
+    in a new temporary file which links to the integrals of the SCF k-points
+    in with_df._cderi.
+    '''
+    from pyscf.pbc.lib.kpts_helper import unique
+    mydf = copy.copy(with_df)
+    mydf._cderi_to_save = tempfile.NamedTemporaryFile(dir=lib.param.TMPDIR)
+    if not (isinstance(with_df._cderi, str) and h5py.is_hdf5(with_df._cderi)):
+        mydf.kpts_band = None
+        mydf._cderi = None
+        return mydf.build(kpts_band=kpts_band)
+
+    kpts = np.reshape(with_df.kpts, (-1,3))
+    kband_uniq = [k for k in unique(kpts_band)[0] if not with_df.has_kpts(k)]
+    if with_df._j_only:
+        kptij_lst = [(ki, ki) for ki in kband_uniq]
+    else:
+        kptij_lst = [(ki, kj) for ki in kband_uniq for kj in kpts]
+        kptij_lst.extend([(ki, ki) for ki in kband_uniq])
+    kptij_lst = np.asarray(kptij_lst).reshape(-1,2,3)
+
+    cderi = mydf._cderi_to_save.name
+    mydf._make_j3c(mydf.cell, mydf.auxcell, kptij_lst, cderi)
+    _link_j3c(cderi, with_df._cderi, 'j3c-kptij')
+    mydf._cderi = cderi
+    if with_df.kpts_band is None:
+        mydf.kpts_band = np.asarray(kband_uniq)
+    else:
+        mydf.kpts_band = np.vstack((with_df.kpts_band, kband_uniq))
+    return mydf
+
+def _link_j3c(cderi, cderi_src, kptij_label):
+    '''Append the k-point pairs of cderi_src to cderi, as external links to
+    the integrals in cderi_src'''
+    cderi_src = os.path.abspath(cderi_src)
+    with h5py.File(cderi, 'a') as feri:
+        with h5py.File(cderi_src, 'r') as fsrc:
+            kptij_src = fsrc[kptij_label][()]
+            keys = ['%s/%s' % (label, k) for label in fsrc
+                    if label != kptij_label for k in fsrc[label]]
+        kptij_lst = feri[kptij_label][()]
+        offset = len(kptij_lst)
+        del(feri[kptij_label])
+        feri[kptij_label] = np.vstack((kptij_lst.reshape(-1,2,3),
+                                       kptij_src.reshape(-1,2,3)))
+        for key in keys:
+            label, k = key.split('/')
+            feri['%s/%d' % (label, int(k)+offset)] = \
+                    h5py.ExternalLink(cderi_src, key)
 
 def init_guess_by_chkfile(cell, chkfile_name, project=None, kpt=None):
     '''Read the HF results from checkpoint file, then project it to the
@@ -716,8 +826,7 @@ class SCF(mol_hf.SCF):
     def dump_chk(self, envs):
         if self.chkfile:
             mol_hf.SCF.dump_chk(self, envs)
-            with h5py.File(self.chkfile) as fh5:
-                fh5['scf/kpt'] = self.kpt
+            chkfile.dump(self.chkfile, 'scf/kpt', self.kpt)
         return self
 
     def _is_mem_enough(self):
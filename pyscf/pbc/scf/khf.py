@@ -621,10 +621,15 @@ class KSCF(pbchf.SCF):
         single_kpt_band = (kpts_band.ndim == 1)
         kpts_band = kpts_band.reshape(-1,3)
 
-        fock = self.get_hcore(cell, kpts_band)
-        fock = fock + self.get_veff(cell, dm_kpts, kpts=kpts, kpts_band=kpts_band)
-        s1e = self.get_ovlp(cell, kpts_band)
-        mo_energy, mo_coeff = self.eig(fock, s1e)
+        def eig_block(mf, kpts_blk):
+            fock = mf.get_hcore(cell, kpts_blk)
+            fock = fock + mf.get_veff(cell, dm_kpts, kpts=kpts, kpts_band=kpts_blk)
+            s1e = mf.get_ovlp(cell, kpts_blk)
+            return list(zip(*mf.eig(fock, s1e)))
+        bands = pbchf.eval_bands_blockwise(self, kpts_band, eig_block)
+        mo_energy = [e for e, c in bands]
+        mo_coeff = [c for e, c in bands]
+
         if single_kpt_band:
             mo_energy = mo_energy[0]
             mo_coeff = mo_coeff[0]
@@ -640,8 +645,7 @@ class KSCF(pbchf.SCF):
     def dump_chk(self, envs):
         if self.chkfile:
             mol_hf.SCF.dump_chk(self, envs)
-            with h5py.File(self.chkfile) as fh5:
-                fh5['scf/kpts'] = self.kpts
+            chkfile.dump(self.chkfile, 'scf/kpts', self.kpts)
         return self
 
     def mulliken_meta(self, cell=None, dm=None, verbose=logger.DEBUG,
@@ -28,6 +28,7 @@ import numpy as np
 import scipy.linalg
 from pyscf.scf import hf as mol_hf
 from pyscf.scf import uhf as mol_uhf
+from pyscf.pbc.scf import hf as pbchf
 from pyscf.pbc.scf import khf
 from pyscf.pbc.scf import uhf as pbcuhf
 from pyscf import lib
@@ -504,10 +505,18 @@ class KUHF(pbcuhf.UHF, khf.KSCF):
         single_kpt_band = (kpts_band.ndim == 1)
         kpts_band = kpts_band.reshape(-1,3)
 
-        fock = self.get_hcore(cell, kpts_band)
-        fock = fock + self.get_veff(cell, dm_kpts, kpts=kpts, kpts_band=kpts_band)
-        s1e = self.get_ovlp(cell, kpts_band)
-        (e_a,e_b), (c_a,c_b) = self.eig(fock, s1e)
+        def eig_block(mf, kpts_blk):
+            fock = mf.get_hcore(cell, kpts_blk)
+            fock = fock + mf.get_veff(cell, dm_kpts, kpts=kpts, kpts_band=kpts_blk)
+            s1e = mf.get_ovlp(cell, kpts_blk)
+            (e_a,e_b), (c_a,c_b) = mf.eig(fock, s1e)
+            return list(zip(zip(e_a, e_b), zip(c_a, c_b)))
+        bands = pbchf.eval_bands_blockwise(self, kpts_band, eig_block)
+        e_a = [e[0] for e, c in bands]
+        e_b = [e[1] for e, c in bands]
+        c_a = [c[0] for e, c in bands]
+        c_b = [c[1] for e, c in bands]
+
         if single_kpt_band:
             e_a = e_a[0]
             e_b = e_b[0]
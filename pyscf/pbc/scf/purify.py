@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# Copyright 2014-2018 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+'''
+Density matrix purification for Gamma-point SCF of large cells
+
+The diagonalization of the Fock matrix is replaced by the canonical
+purification of Palser and Manolopoulos (PRB, 58, 12704) in the
+non-orthogonal AO basis.  The overlap, Fock and density matrices are stored
+in scipy.sparse CSR format.  Their sparsity pattern is determined by the
+shell radii (cell.bas_rcut) and the minimum-image distance between the
+shells.
+
+Simple usage::
+
+    >>> mf = purify.purify(scf.RHF(cell)).run()
+
+For large cells, the Coulomb and XC potential of RKS can be computed with the
+multigrid method::
+
+    >>> mf = dft.RKS(cell)
+    >>> mf.with_df = multigrid.MultiGridFFTDF(cell)
+    >>> mf = purify.purify(mf).run()
+'''
+
+import sys
+import time
+import numpy
+import scipy.sparse
+from pyscf import lib
+from pyscf.lib import logger
+from pyscf.gto.mole import ATOM_OF
+from pyscf.pbc.scf import hf as pbchf
+from pyscf import __config__
+
+CONV_TOL = getattr(__config__, 'pbc_scf_purify_conv_tol', 1e-10)
+MAX_CYCLE = getattr(__config__, 'pbc_scf_purify_max_cycle', 100)
+
+
+def sparsity_mask(cell, precision=None):
+    '''The AO pairs of non-negligible Gamma-point matrix elements.
+
+    Shells i and j are coupled if the minimum-image distance between the two
+    shells is smaller than max(bas_rcut(i), bas_rcut(j)).
+
+    Returns:
+        A (nao,nao) scipy.sparse.csr_matrix of booleans
+    '''
+    if precision is None:
+        precision = cell.precision
+    rcut = numpy.array([cell.bas_rcut(ib, precision) for ib in range(cell.nbas)])
+    Ls = cell.get_lattice_Ls(rcut=rcut.max())
+    atom_coords = cell.atom_coords()
+    bas_atom = cell._bas[:,ATOM_OF]
+    ao_loc = cell.ao_loc_nr()
+    natm = cell.natm
+    nbas = cell.nbas
+    nao = ao_loc[-1]
+
+    # Minimum-image distances between atoms
+    dist = numpy.empty((natm,natm))
+    blksize = max(1, int(4e6 / max(1, natm*len(Ls))))
+    for i0, i1 in lib.prange(0, natm, blksize):
+        rr = atom_coords[i0:i1,None,:] - atom_coords
+        dist[i0:i1] = numpy.min([lib.norm(rr+L, axis=2) for L in Ls], axis=0)
+
+    # Coupled shell pairs, in blocks of rows
+    blksize = max(1, int(4e6 / max(1, nbas)))
+    rows = []
+    cols = []
+    for i0, i1 in lib.prange(0, nbas, blksize):
+        d = dist[bas_atom[i0:i1,None], bas_atom]
+        i, j = numpy.where(d < numpy.maximum(rcut[i0:i1,None], rcut))
+        rows.append(i + i0)
+        cols.append(j)
+    rows = numpy.hstack(rows)
+    cols = numpy.hstack(cols)
+    bas_mask = scipy.sparse.csr_matrix((numpy.ones(rows.size), (rows, cols)),
+                                       shape=(nbas,nbas))
+
+    # Expand the shell pairs to AO pairs
+    ao2bas = numpy.repeat(numpy.arange(nbas), numpy.diff(ao_loc))
+    expand = scipy.sparse.csr_matrix((numpy.ones(nao), (numpy.arange(nao), ao2bas)),
+                                     shape=(nao,nbas))
+    mask = expand.dot(bas_mask).dot(expand.T).tocsr().astype(bool)
+    mask.sort_indices()
+    return mask
+
+def block_sparse(mat, mask):
+    '''Extract the elements of the dense matrix mat on the pattern of mask'''
+    if scipy.sparse.issparse(mat):
+        return _truncate(mat, mask)
+    nao = mask.shape[0]
+    rows = numpy.repeat(numpy.arange(nao), numpy.diff(mask.indptr))
+    data = numpy.asarray(mat)[rows,mask.indices]
+    return scipy.sparse.csr_matrix((data, mask.indices, mask.indptr),
+                                   shape=mask.shape)
+
+def _truncate(mat, mask):
+    if mask is None:
+        return mat.tocsr()
+    return mat.multiply(mask).tocsr()
+
+def _trace_dot(a, b):
+    '''tr(AB) for symmetric A and B'''
+    return a.multiply(b).sum()
+
+def _pattern_data(mat, mask):
+    '''The elements of the sparse matrix mat on the pattern of mask, in the
+    order of mask.data'''
+    rows = numpy.repeat(numpy.arange(mask.shape[0]), numpy.diff(mask.indptr))
+    return numpy.asarray(mat[rows,mask.indices]).ravel()
+
+def _on_pattern(data, mask):
+    return scipy.sparse.csr_matrix((data, mask.indices, mask.indptr),
+                                   shape=mask.shape)
+
+def _norm(mat):
+    '''Frobenius norm of a sparse matrix'''
+    mat = mat.tocsr()
+    return numpy.linalg.norm(mat.data)
+
+def inv_ovlp(s, mask=None, tol=1e-10, max_cycle=MAX_CYCLE, verbose=logger.WARN):
+    '''Inverse of the sparse overlap matrix by the Newton-Schulz iteration
+
+        X_{n+1} = X_n (2 - S X_n)
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+    nao = s.shape[0]
+    eye = scipy.sparse.identity(nao, format='csr')
+    # ||S||_1 * ||S||_inf bounds the largest eigenvalue of S^2
+    x = s * (1. / abs(s).sum(axis=0).max()**2)
+    for cycle in range(max_cycle):
+        r = eye - s.dot(x)
+        err = abs(r).max()
+        log.debug1('inv_ovlp cycle %d  |1-SX| = %g', cycle, err)
+        if err < tol:
+            break
+        x = _truncate(x + x.dot(r), mask)
+        x = (x + x.T) * .5
+    else:
+        log.warn('inv_ovlp not converged.  |1-SX| = %g', err)
+    return x
+
+def purify_dm(fock, s, nocc, mask=None, sinv=None, conv_tol=CONV_TOL,
+              max_cycle=MAX_CYCLE, verbose=logger.WARN):
+    '''Canonical purification in the non-orthogonal basis.
+
+    Args:
+        fock, s : scipy.sparse matrices
+        nocc : int
+            Number of occupied orbitals
+
+    Kwargs:
+        mask : scipy.sparse matrix
+            The sparsity pattern to truncate the intermediate matrices.
+        sinv : scipy.sparse matrix
+            The inverse of s
+
+    Returns:
+        The density matrix P (of one spin) which satisfies PSP = P and
+        tr(PS) = nocc.
+    '''
+    if isinstance(verbose, logger.Logger):
+        log = verbose
+    else:
+        log = logger.Logger(sys.stdout, verbose)
+    if sinv is None:
+        sinv = inv_ovlp(s, mask, verbose=log)
+    nao = s.shape[0]
+
+    # Gershgorin bounds of the spectrum of S^{-1}F
+    sf = sinv.dot(fock).tocsr()
+    diag = sf.diagonal()
+    radius = numpy.asarray(abs(sf).sum(axis=1)).ravel() - abs(diag)
+    emin = (diag - radius).min()
+    emax = (diag + radius).max()
+    mu = diag.sum() / nao
+    lam = min(nocc/(emax-mu), (nao-nocc)/(mu-emin))
+    p = (sinv * (mu*lam+nocc) - sf.dot(sinv) * lam) * (1./nao)
+    p = _truncate((p + p.T) * .5, mask)
+
+    for cycle in range(max_cycle):
+        ps = p.dot(s)
+        p2 = _truncate(ps.dot(p), mask)
+        p3 = _truncate(ps.dot(p2), mask)
+        # tr((P-P^2)S) = \sum_i n_i(1-n_i) measures the idempotency
+        idem = _trace_dot(p - p2, s)
+        log.debug1('purify_dm cycle %d  tr(PS) = %.12g  idempotency = %g',
+                   cycle, _trace_dot(p, s), idem)
+        if abs(idem) < conv_tol:
+            break
+        c = _trace_dot(p2 - p3, s) / idem
+        if c >= .5:
+            p = (p2 * (1+c) - p3) * (1./c)
+        else:
+            p = (p * (1-2*c) + p2 * (1+c) - p3) * (1./(1-c))
+    else:
+        log.warn('purify_dm not converged.  idempotency = %g', idem)
+    return p
+
+
+def get_fock(mf, h1e, s1e, vhf, dm, cycle=-1, diis=None, mask=None):
+    '''Sparse counterpart of scf.hf.get_fock.  h1e and vhf are dense (as
+    returned by get_hcore and get_veff); s1e and dm are sparse.  The Fock
+    matrix and the DIIS error vectors SDF-FDS are computed on the pattern of
+    mask.
+
+    Returns:
+        The Fock matrix in scipy.sparse CSR format
+    '''
+    f = block_sparse(h1e + vhf, mask)
+    if cycle < 0 and diis is None:
+        return f
+
+    if 0 <= cycle < mf.diis_start_cycle-1 and abs(mf.damp) > 1e-4:
+        d = dm * .5
+        dm_vir = scipy.sparse.identity(dm.shape[0]) - s1e.dot(d)
+        f0 = _truncate(dm_vir.dot(f).dot(d).dot(s1e), mask)
+        f = f - (f0 + f0.T) * (mf.damp/(mf.damp+1.))
+    if diis is not None and cycle >= mf.diis_start_cycle:
+        sdf = s1e.dot(dm).dot(f)
+        errvec = _pattern_data(sdf.T - sdf, mask)
+        logger.debug1(mf, 'diis-norm(errvec)=%g', numpy.linalg.norm(errvec))
+        fdata = lib.diis.DIIS.update(diis, _pattern_data(f, mask), xerr=errvec)
+        f = _on_pattern(fdata, mask)
+    if abs(mf.level_shift) > 1e-4:
+        sds = _truncate(s1e.dot(dm).dot(s1e), mask)
+        f = f + (s1e - sds * .5) * mf.level_shift
+    return _truncate(f, mask)
+
+def kernel(mf, conv_tol=1e-10, conv_tol_grad=None, dm0=None, callback=None):
+    '''SCF driver which calls purify_dm in place of mf.eig and mf.get_occ.
+    The overlap, Fock and density matrices are kept sparse.  A dense density
+    matrix is only assembled as the input of mf.get_veff and mf.energy_tot.
+
+    Returns:
+        scf_conv, e_tot, dm
+    '''
+    cput0 = (time.clock(), time.time())
+    if conv_tol_grad is None:
+        conv_tol_grad = numpy.sqrt(conv_tol)
+    log = logger.new_logger(mf)
+    cell = mf.cell
+    if dm0 is None:
+        dm = mf.get_init_guess(cell, mf.init_guess)
+    else:
+        dm = dm0
+    nocc = cell.nelectron // 2
+    nao = cell.nao_nr()
+
+    mask = getattr(mf, 'sparse_mask', None)
+    if mask is None:
+        mask = mf.sparse_mask = sparsity_mask(cell)
+    logger.info(mf, 'Sparsity of the AO matrices %.4g',
+                mask.nnz / float(mask.shape[0]**2))
+
+    h1e = mf.get_hcore(cell)
+    s1e = block_sparse(mf.get_ovlp(cell), mask)
+    sinv = inv_ovlp(s1e, mask, verbose=log)
+    cput1 = logger.timer(mf, 'inverse of S', *cput0)
+
+    if mf.diis:
+        # The DIIS vectors are the Fock matrix elements on the sparse pattern
+        mf_diis = lib.diis.DIIS(mf, mf.diis_file)
+        mf_diis.space = mf.diis_space
+    else:
+        mf_diis = None
+
+    dm_sparse = block_sparse(dm, mask)
+    vhf = mf.get_veff(cell, dm)
+    e_tot = mf.energy_tot(dm, h1e, vhf)
+    logger.info(mf, 'init E= %.15g', e_tot)
+
+    scf_conv = False
+    for cycle in range(max(1, mf.max_cycle)):
+        dm_last, dm_last_sparse = dm, dm_sparse
+        last_hf_e = e_tot
+
+        fock = get_fock(mf, h1e, s1e, vhf, dm_sparse, cycle, mf_diis, mask)
+        dm_sparse = purify_dm(fock, s1e, nocc, mask, sinv, verbose=log) * 2
+        dm = dm_sparse.toarray()
+        vhf = mf.get_veff(cell, dm, dm_last, vhf)
+        e_tot = mf.energy_tot(dm, h1e, vhf)
+
+        fock = get_fock(mf, h1e, s1e, vhf, dm_sparse, mask=mask)
+        # The commutator FDS-SDF vanishes at convergence
+        fds = fock.dot(dm_sparse).dot(s1e)
+        norm_gorb = _norm(fds - fds.T) / nao
+        norm_ddm = _norm(dm_sparse - dm_last_sparse)
+        logger.info(mf, 'cycle= %d E= %.15g  delta_E= %4.3g  |g|= %4.3g  |ddm|= %4.3g',
+                    cycle+1, e_tot, e_tot-last_hf_e, norm_gorb, norm_ddm)
+
+        if abs(e_tot-last_hf_e) < conv_tol and norm_gorb < conv_tol_grad:
+            scf_conv = True
+
+        if callable(callback):
+            callback(locals())
+
+        cput1 = logger.timer(mf, 'cycle= %d'%(cycle+1), *cput1)
+        if scf_conv:
+            break
+
+    logger.timer(mf, 'scf_cycle', *cput0)
+    return scf_conv, e_tot, dm
+
+
+def purify(mf, mask=None):
+    '''Replace the diagonalization in the Gamma-point RHF/RKS by density
+    matrix purification.  Orbitals are not available in the returned object;
+    mf.make_rdm1() returns the converged density matrix.
+
+    Kwargs:
+        mask : scipy.sparse matrix
+            The sparsity pattern of the AO matrices.  It is generated by
+            :func:`sparsity_mask` if not given.
+
+    Examples:
+
+    >>> mf = purify(scf.RHF(cell)).run()
+    '''
+    from pyscf.pbc.scf import khf
+    from pyscf.scf import uhf
+    if (isinstance(mf, (khf.KSCF, uhf.UHF)) or
+        not isinstance(mf, pbchf.RHF) or mf.cell.spin != 0):
+        raise NotImplementedError('Purification for %s' % mf.__class__)
+
+    class PurifiedRHF(mf.__class__):
+        def __init__(self, mf):
+            self.__dict__.update(mf.__dict__)
+            self._scf = mf
+            self.sparse_mask = mask
+            self._dm = None
+            self._keys = self._keys.union(['sparse_mask'])
+
+        def dump_flags(self):
+            self._scf.dump_flags()
+            logger.info(self, 'Density matrix purification for Gamma point')
+            return self
+
+        def scf(self, dm0=None, **kwargs):
+            cput0 = (time.clock(), time.time())
+            self.dump_flags()
+            self.build(self.cell)
+            self.converged, self.e_tot, self._dm = \
+                    kernel(self, self.conv_tol, self.conv_tol_grad, dm0=dm0,
+                           callback=self.callback)
+            self.mo_energy = self.mo_coeff = self.mo_occ = None
+            logger.timer(self, 'SCF', *cput0)
+            self._finalize()
+            return self.e_tot
+        kernel = lib.alias(scf, alias_name='kernel')
+
+        def make_rdm1(self, mo_coeff=None, mo_occ=None, **kwargs):
+            if mo_coeff is None and self._dm is not None:
+                return self._dm
+            return mf.__class__.make_rdm1(self, mo_coeff, mo_occ, **kwargs)
+
+    return PurifiedRHF(mf)
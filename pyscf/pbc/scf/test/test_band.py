@@ -16,6 +16,7 @@
 import unittest
 import numpy as np
 import scipy.linalg
+import h5py
 from pyscf.pbc import gto
 from pyscf.pbc import scf
 from pyscf.pbc import dft
@@ -62,6 +63,57 @@ class KnowValues(unittest.TestCase):
         self.assertAlmostEqual(abs(np.array(bands_ref) - np.array(bands)).max(), 0, 9)
         self.assertAlmostEqual(finger(bands), -0.61562245312227049, 8)
 
+    def test_band_blockwise(self):
+        kpts = cell.make_kpts([2,1,1])
+        kmf = scf.KUHF(cell, kpts=kpts).density_fit().run()
+        np.random.seed(11)
+        kpts_band = np.random.random((5,3))
+        (ea, eb), (ca, cb) = kmf.get_bands(kpts_band)
+        dm = kmf.make_rdm1()
+        cderi = kmf.with_df._cderi
+        def eig_block(mf, kpts_blk):
+            self.assertEqual(len(kpts_blk), 2 if len(bands) < 4 else 1)
+            self.assertTrue(mf.with_df is not kmf.with_df)
+            fock = mf.get_hcore(kpts=kpts_blk)
+            fock = fock + mf.get_veff(cell, dm, kpts_band=kpts_blk)
+            s1e = mf.get_ovlp(kpts=kpts_blk)
+            (e_a,e_b), (c_a,c_b) = mf.eig(fock, s1e)
+            bands.extend(e_a)
+            return list(zip(e_a, c_a))
+        bands = []
+        ref = scf.hf.eval_bands_blockwise(kmf, kpts_band, eig_block, blksize=2)
+        self.assertAlmostEqual(abs(np.array(ea) - bands).max(), 0, 9)
+        self.assertEqual(len(ref), 5)
+        self.assertEqual(kmf.with_df._cderi, cderi)
+        self.assertTrue(kmf.with_df.kpts_band is None)
+
+        kmf.with_df.nproc = 2
+        (ea1, eb1), (ca1, cb1) = kmf.get_bands(kpts_band)
+        self.assertAlmostEqual(abs(np.array(ea1) - ea).max(), 0, 9)
+        self.assertAlmostEqual(abs(np.array(eb1) - eb).max(), 0, 9)
+
+    def test_df_for_kpts_band(self):
+        from pyscf.pbc import df
+        kpts = cell.make_kpts([2,1,1])
+        kmf = scf.KRHF(cell, kpts=kpts).density_fit()
+        kmf.with_df.build()
+        kpts_band = np.array([[.1, .2, .3], [.3, .2, .1], [.1, .2, .3]])
+        mydf = scf.hf._df_for_kpts_band(kmf.with_df, kpts_band)
+        self.assertTrue(mydf.has_kpts(kpts_band))
+        self.assertTrue(kmf.with_df.kpts_band is None)
+        # band pairs (kband,kpt) and (kband,kband), then the links to the
+        # three SCF pairs
+        with h5py.File(mydf._cderi, 'r') as f:
+            self.assertEqual(len(f['j3c-kptij']), 2*2+2 + 3)
+
+        ref = df.GDF(cell, kpts).build(kpts_band=kpts_band)
+        for kptij in [(kpts[1], kpts[0]), (kpts_band[0], kpts[1]),
+                      (kpts_band[1], kpts_band[1])]:
+            kptij = np.asarray(kptij)
+            v0 = [(LpqR, LpqI) for LpqR, LpqI, _ in mydf.sr_loop(kptij)]
+            v1 = [(LpqR, LpqI) for LpqR, LpqI, _ in ref.sr_loop(kptij)]
+            self.assertAlmostEqual(abs(np.array(v0) - np.array(v1)).max(), 0, 12)
+
 # TODO: test get_bands for hf/uhf with/without DF
 
 if __name__ == '__main__':
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# Copyright 2014-2018 The PySCF Developers. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import numpy
+import scipy.sparse
+from pyscf.pbc import gto
+from pyscf.pbc import scf
+from pyscf.pbc.scf import purify
+
+cell = gto.Cell()
+cell.a = numpy.diag([24., 3., 3.])
+cell.atom = ';'.join('H %f 0 0; H %f 0 0' % (i*3., i*3+.74) for i in range(8))
+cell.basis = 'sto3g'
+cell.mesh = [81,11,11]
+cell.verbose = 0
+cell.build()
+
+mf = scf.RHF(cell).run()
+
+class KnownValues(unittest.TestCase):
+    def test_sparsity_mask(self):
+        mask = purify.sparsity_mask(cell)
+        self.assertEqual(mask.nnz, 160)
+        s = cell.pbc_intor('int1e_ovlp')
+        s_sparse = purify.block_sparse(s, mask)
+        self.assertTrue(abs(s - s_sparse.toarray()).max() < cell.precision)
+
+    def test_purify_dm(self):
+        nocc = cell.nelectron // 2
+        s = cell.pbc_intor('int1e_ovlp')
+        f = mf.get_fock()
+        p = purify.purify_dm(scipy.sparse.csr_matrix(f),
+                             scipy.sparse.csr_matrix(s), nocc)
+        p = p.toarray()
+        e, c = mf.eig(f, s)
+        self.assertAlmostEqual(abs(p - c[:,:nocc].dot(c[:,:nocc].T)).max(), 0, 7)
+
+    def test_purify_rhf(self):
+        mf1 = purify.purify(scf.RHF(cell))
+        mf1.sparse_mask = scipy.sparse.csr_matrix(numpy.ones((cell.nao,cell.nao)))
+        mf1.kernel()
+        self.assertTrue(mf1.converged)
+        self.assertAlmostEqual(mf1.e_tot, mf.e_tot, 9)
+        self.assertAlmostEqual(abs(mf1.make_rdm1() - mf.make_rdm1()).max(), 0, 4)
+
+        mf1 = purify.purify(scf.RHF(cell)).run()
+        self.assertAlmostEqual(mf1.e_tot, mf.e_tot, 6)
+
+    def test_sparse_kernel(self):
+        cell1 = cell.copy()
+        cell1.a = numpy.diag([48., 3., 3.])
+        cell1.atom = ';'.join('H %f 0 0; H %f 0 0' % (i*3., i*3+.74) for i in range(16))
+        cell1.mesh = [161,11,11]
+        cell1.build()
+        nao = cell1.nao
+        mask = purify.sparsity_mask(cell1)
+        self.assertTrue(mask.nnz < nao**2 // 2)
+        envs = {}
+        def callback(envs_in):
+            envs.update(envs_in)
+        mf1 = purify.purify(scf.RHF(cell1))
+        mf1.callback = callback
+        mf1.kernel()
+        self.assertAlmostEqual(mf1.e_tot, scf.RHF(cell1).kernel(), 6)
+        # Fock, density matrix and the commutator FDS are not densified
+        for key in ('fock', 'dm_sparse', 's1e', 'fds'):
+            self.assertTrue(scipy.sparse.issparse(envs[key]))
+        self.assertTrue(envs['fock'].nnz <= mask.nnz)
+        self.assertTrue(envs['dm_sparse'].nnz <= mask.nnz)
+        self.assertTrue(envs['fds'].nnz < nao**2)
+
+        mf1 = purify.purify(scf.RHF(cell))
+        mf1.level_shift = .2
+        mf1.damp = .5
+        mf1.diis_start_cycle = 3
+        mf1.max_cycle = 100
+        mf1.kernel()
+        self.assertTrue(mf1.converged)
+        self.assertAlmostEqual(mf1.e_tot, mf.e_tot, 6)
+
+
+if __name__ == '__main__':
+    print("Full Tests for density matrix purification")
+    unittest.main()
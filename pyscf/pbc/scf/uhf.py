@@ -181,20 +181,17 @@ class UHF(mol_uhf.UHF, pbchf.SCF):
         single_kpt_band = (getattr(kpts_band, 'ndim', None) == 1)
         kpts_band = kpts_band.reshape(-1,3)
 
-        fock = self.get_hcore(cell, kpts_band)
-        focka, fockb = fock + self.get_veff(cell, dm, kpt=kpt, kpts_band=kpts_band)
-        s1e = self.get_ovlp(cell, kpts_band)
-        nkpts = len(kpts_band)
-        e_a = []
-        e_b = []
-        c_a = []
-        c_b = []
-        for k in range(nkpts):
-            e, c = self.eig((focka[k], fockb[k]), s1e[k])
-            e_a.append(e[0])
-            e_b.append(e[1])
-            c_a.append(c[0])
-            c_b.append(c[1])
+        def eig_block(mf, kpts_blk):
+            fock = mf.get_hcore(cell, kpts_blk)
+            focka, fockb = fock + mf.get_veff(cell, dm, kpt=kpt, kpts_band=kpts_blk)
+            s1e = mf.get_ovlp(cell, kpts_blk)
+            return [mf.eig((focka[k], fockb[k]), s1e[k])
+                    for k in range(len(kpts_blk))]
+        bands = pbchf.eval_bands_blockwise(self, kpts_band, eig_block)
+        e_a = [e[0] for e, c in bands]
+        e_b = [e[1] for e, c in bands]
+        c_a = [c[0] for e, c in bands]
+        c_b = [c[1] for e, c in bands]
         mo_energy = (e_a, e_b)
         mo_coeff = (c_a, c_b)
 
@@ -113,6 +113,8 @@ class TDA(rhf.TDA):
     def kernel(self, x0=None):
         '''TDA diagonalization solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for %s' % self.__class__)
         self.check_sanity()
         self.dump_flags()
 
@@ -204,6 +206,9 @@ class TDHF(TDA):
     def kernel(self, x0=None):
         '''TDHF diagonalization with non-Hermitian eigenvalue solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for the non-Hermitian '
+                                      'eigenvalue problem of %s' % self.__class__)
         logger.warn(self, 'PBC-TDDFT is an experimental feature. '
                     'It is numerically sensitive to the accuracy of integrals '
                     '(relating to cell.precision).')
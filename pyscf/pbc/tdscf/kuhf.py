@@ -123,6 +123,8 @@ class TDA(uhf.TDA):
     def kernel(self, x0=None):
         '''TDA diagonalization solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for %s' % self.__class__)
         self.check_sanity()
         self.dump_flags()
 
@@ -235,6 +237,9 @@ class TDHF(TDA):
     def kernel(self, x0=None):
         '''TDHF diagonalization with non-Hermitian eigenvalue solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for the non-Hermitian '
+                                      'eigenvalue problem of %s' % self.__class__)
         self.check_sanity()
         self.dump_flags()
 
@@ -34,6 +34,8 @@ class VHFOpt(object):
         self._intor = intor
         self._cintopt = lib.c_null_ptr()
         self._dmcondname = dmcondname
+        self._q_cond = None
+        self.symm_ops = None
         self.init_cvhf_direct(mol, intor, prescreen, qcondname)
 
     def init_cvhf_direct(self, mol, intor, prescreen, qcondname):
@@ -50,7 +52,12 @@ class VHFOpt(object):
                                    c_env.ctypes.data_as(ctypes.c_void_p))
         self._this.contents.fprescreen = _fpointer(prescreen)
 
-        if prescreen != 'CVHFnoscreen' and qcondname is not None:
+        if (prescreen != 'CVHFnoscreen' and
+            qcondname == 'CVHFsetnr_direct_scf' and
+            hasattr(mol, 'shell_pairs')):
+            # Schwarz bounds are shared through mol.shell_pairs()
+            self.set_q_cond(get_q_cond(mol, intor))
+        elif prescreen != 'CVHFnoscreen' and qcondname is not None:
             ao_loc = make_loc(c_bas, self._intor)
             fsetqcond = getattr(libcvhf, qcondname)
             fsetqcond(self._this,
@@ -60,6 +67,21 @@ class VHFOpt(object):
                       c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
                       c_env.ctypes.data_as(ctypes.c_void_p))
 
+    def set_q_cond(self, q_cond):
+        '''Assign the Schwarz bounds, a (nbas,nbas) array, to the optimizer'''
+        # q_cond is owned by the numpy array. It is detached from the C
+        # optimizer in __del__
+        self._q_cond = numpy.array(q_cond, dtype=numpy.double, order='C')
+        self._this.contents.q_cond = self._q_cond.ctypes.data_as(ctypes.c_void_p)
+
+    def set_symm_ops(self, mol):
+        '''Enable the skeleton J/K matrices.  Only the symmetry-unique shell
+        quartets are evaluated if the density matrices are symmetric under
+        the point group operations of mol.  See function direct.
+        '''
+        _set_symm_ops(self, mol)
+        return self
+
     @property
     def direct_scf_tol(self):
         return self._this.contents.direct_scf_cutoff
@@ -89,6 +111,8 @@ class VHFOpt(object):
                    c_env.ctypes.data_as(ctypes.c_void_p))
 
     def __del__(self):
+        if self._q_cond is not None and self._this:
+            self._this.contents.q_cond = None
         libcvhf.CVHFdel_optimizer(ctypes.byref(self._this))
 
 class _CVHFOpt(ctypes.Structure):
@@ -98,7 +122,89 @@ class _CVHFOpt(ctypes.Structure):
                 ('q_cond', ctypes.c_void_p),
                 ('dm_cond', ctypes.c_void_p),
                 ('fprescreen', ctypes.c_void_p),
-                ('r_vkscreen', ctypes.c_void_p)]
+                ('r_vkscreen', ctypes.c_void_p),
+                ('nsymm_ops', ctypes.c_int),
+                ('symm_shl_map', ctypes.c_void_p)]
+
+def _set_symm_ops(opt, mol):
+    '''Assign the point group operations of mol to the C optimizer of opt
+    (VHFOpt or AO2MOpt)'''
+    opt.symm_ops = None
+    opt._symm_shl_map = None
+    opt._this.contents.nsymm_ops = 0
+    opt._this.contents.symm_shl_map = None
+    if not mol.symmetry or mol.groupname == 'C1':
+        return opt
+    from pyscf import symm
+    shl_maps, ao_maps, ao_signs = symm.basis.ao_symm_ops(mol)
+    if len(shl_maps) > 1:
+        # shl_map is owned by the numpy array. It is not freed by
+        # CVHFdel_optimizer
+        opt._symm_shl_map = numpy.asarray(shl_maps, dtype=numpy.int32, order='C')
+        opt._this.contents.nsymm_ops = len(shl_maps)
+        opt._this.contents.symm_shl_map = \
+                opt._symm_shl_map.ctypes.data_as(ctypes.c_void_p)
+        opt.symm_ops = (ao_maps, ao_signs)
+    return opt
+
+def _is_symm_invariant(dms, symm_ops, tol=1e-9):
+    ao_maps, ao_signs = symm_ops
+    for p, s in zip(ao_maps, ao_signs):
+        ss = s[:,None] * s
+        for dm in dms:
+            if abs(dm[p[:,None],p] * ss - dm).max() > tol:
+                return False
+    return True
+
+def _symmetrize_vjk(vjk, symm_ops):
+    '''Symmetrize the skeleton J/K matrices'''
+    ao_maps, ao_signs = symm_ops
+    out = numpy.zeros_like(vjk)
+    for p, s in zip(ao_maps, ao_signs):
+        out[...,p[:,None],p] += vjk * (s[:,None] * s)
+    out *= 1./len(ao_maps)
+    return out
+
+def get_q_cond(mol, intor='int2e'):
+    '''Schwarz bounds sqrt(max|(ij|ij)|) of all shell pairs.
+
+    The bounds are evaluated once for the geometry and cached in
+    mol.shell_pairs().  They are shared by the integral screening of direct
+    SCF, nuclear gradients and AO-to-MO transformations.  For intor
+    int2e_ip1ip2, the bounds sqrt(max|(nabla i j|nabla i j)|) of the gradient
+    integrals are computed and symmetrized over i and j.
+    '''
+    intor = mol._add_suffix(intor)
+    pairs = mol.shell_pairs()
+    if intor not in pairs.q_cond:
+        c_atm = numpy.asarray(mol._atm, dtype=numpy.int32, order='C')
+        c_bas = numpy.asarray(mol._bas, dtype=numpy.int32, order='C')
+        c_env = numpy.asarray(mol._env, dtype=numpy.double, order='C')
+        natm = c_atm.shape[0]
+        nbas = c_bas.shape[0]
+        cintopt = make_cintopt(c_atm, c_bas, c_env, intor)
+        ao_loc = make_loc(c_bas, intor)
+        opt = ctypes.POINTER(_CVHFOpt)()
+        libcvhf.CVHFinit_optimizer(ctypes.byref(opt),
+                                   c_atm.ctypes.data_as(ctypes.c_void_p),
+                                   ctypes.c_int(natm),
+                                   c_bas.ctypes.data_as(ctypes.c_void_p),
+                                   ctypes.c_int(nbas),
+                                   c_env.ctypes.data_as(ctypes.c_void_p))
+        if intor.startswith('int2e_ip1ip2'):
+            fsetqcond = libcvhf.CVHFsetnr_direct_scf_ip1ip2
+        else:
+            fsetqcond = libcvhf.CVHFsetnr_direct_scf
+        fsetqcond(
+            opt, getattr(libcvhf, intor), cintopt,
+            ao_loc.ctypes.data_as(ctypes.c_void_p),
+            c_atm.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(natm),
+            c_bas.ctypes.data_as(ctypes.c_void_p), ctypes.c_int(nbas),
+            c_env.ctypes.data_as(ctypes.c_void_p))
+        q_ptr = ctypes.cast(opt.contents.q_cond, ctypes.POINTER(ctypes.c_double))
+        pairs.q_cond[intor] = numpy.ctypeslib.as_array(q_ptr, shape=(nbas,nbas)).copy()
+        libcvhf.CVHFdel_optimizer(ctypes.byref(opt))
+    return pairs.q_cond[intor]
 
 ################################################
 # for general DM
@@ -204,12 +310,26 @@ def direct(dms, atm, bas, env, vhfopt=None, hermi=0, cart=False):
     shls_slice = (ctypes.c_int*8)(*([0, c_bas.shape[0]]*4))
     ao_loc = make_loc(bas, intor)
 
-    fdrv(cintor, fdot, fjk, dmsptr, vjkptr,
-         ctypes.c_int(n_dm*2), ctypes.c_int(1),
-         shls_slice, ao_loc.ctypes.data_as(ctypes.c_void_p), cintopt, cvhfopt,
-         c_atm.ctypes.data_as(ctypes.c_void_p), natm,
-         c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
-         c_env.ctypes.data_as(ctypes.c_void_p))
+    # Skeleton J/K: only the symmetry-unique shell quartets are computed if
+    # the density matrices are invariant under the point group operations.
+    # The integrals of the unique quartets are scaled by the size of the
+    # orbits in the prescreen function.  J/K are symmetrized at the end.
+    skeleton = (vhfopt is not None and
+                getattr(vhfopt, 'symm_ops', None) is not None and
+                _is_symm_invariant(dms, vhfopt.symm_ops))
+    if skeleton:
+        fprescreen = vhfopt._this.contents.fprescreen
+        vhfopt._this.contents.fprescreen = _fpointer('CVHFnrs8_skeleton_prescreen')
+    try:
+        fdrv(cintor, fdot, fjk, dmsptr, vjkptr,
+             ctypes.c_int(n_dm*2), ctypes.c_int(1),
+             shls_slice, ao_loc.ctypes.data_as(ctypes.c_void_p), cintopt, cvhfopt,
+             c_atm.ctypes.data_as(ctypes.c_void_p), natm,
+             c_bas.ctypes.data_as(ctypes.c_void_p), nbas,
+             c_env.ctypes.data_as(ctypes.c_void_p))
+    finally:
+        if skeleton:
+            vhfopt._this.contents.fprescreen = fprescreen
 
     # vj must be symmetric
     for idm in range(n_dm):
@@ -217,6 +337,8 @@ def direct(dms, atm, bas, env, vhfopt=None, hermi=0, cart=False):
     if hermi != 0: # vk depends
         for idm in range(n_dm):
             vjk[1,idm] = lib.hermi_triu(vjk[1,idm], hermi)
+    if skeleton:
+        vjk = _symmetrize_vjk(vjk, vhfopt.symm_ops)
     if n_dm == 1:
         vjk = vjk.reshape(2,nao,nao)
     return vjk
@@ -17,9 +17,12 @@
 #
 
 import h5py
+import numpy
+from pyscf.lib import serialize
 from pyscf.lib.chkfile import load_chkfile_key, load
 from pyscf.lib.chkfile import dump_chkfile_key, dump, save
 from pyscf.lib.chkfile import load_mol, save_mol
+from pyscf.lib.chkfile import get_writer
 
 def load_scf(chkfile):
     return load_mol(chkfile), load(chkfile, 'scf')
@@ -27,7 +30,11 @@ def load_scf(chkfile):
 def dump_scf(mol, chkfile, e_tot, mo_energy, mo_coeff, mo_occ,
              overwrite_mol=True):
     '''save temporary results'''
-    if h5py.is_hdf5(chkfile) and not overwrite_mol:
+    writer = get_writer(chkfile)
+    if writer is not None:
+        if overwrite_mol or 'mol' not in writer:
+            save_mol(mol, chkfile)
+    elif h5py.is_hdf5(chkfile) and not overwrite_mol:
         with h5py.File(chkfile) as fh5:
             if 'mol' not in fh5:
                 fh5['mol'] = mol.dumps()
@@ -40,3 +47,25 @@ def dump_scf(mol, chkfile, e_tot, mo_energy, mo_coeff, mo_occ,
                'mo_coeff' : mo_coeff}
     save(chkfile, 'scf', scf_dic)
 
+def dumpb_scf(mol, e_tot, mo_energy, mo_coeff, mo_occ):
+    '''Serialize the molecule and the SCF results to the binary format of
+    :mod:`lib.serialize`.  The returned bytes can be written to a file and
+    read back by :func:`loadb_scf` or :func:`lib.serialize.load`.
+    '''
+    scf_dic = {'e_tot'    : e_tot,
+               'mo_energy': mo_energy,
+               'mo_occ'   : mo_occ,
+               'mo_coeff' : mo_coeff}
+    mol_buf = numpy.frombuffer(mol.dumpb(), dtype=numpy.uint8)
+    return serialize.dumps({'mol': mol_buf, 'scf': scf_dic})
+
+def loadb_scf(buf):
+    '''Deserialize the buffer generated by :func:`dumpb_scf`.  The orbital
+    arrays are read-only views of buf.
+
+    Returns:
+        mol and a dict of the SCF results
+    '''
+    from pyscf.gto.mole import loadb
+    rec = serialize.loads(buf)
+    return loadb(rec['mol']), rec['scf']
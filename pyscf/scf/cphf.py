@@ -58,10 +58,12 @@ def solve_nos1(fvind, mo_energy, mo_occ, h1,
     mo1base = h1 * -e_ai
 
     def vind_vo(mo1):
-        v = fvind(mo1.reshape(h1.shape)).reshape(h1.shape)
+        mo1 = mo1.reshape((-1,)+e_ai.shape)
+        v = fvind(mo1.reshape((-1,)+h1.shape[1:]) if h1.ndim == 3 else
+                  mo1.reshape(h1.shape)).reshape(mo1.shape)
         v *= e_ai
-        return v.ravel()
-    mo1 = lib.krylov(vind_vo, mo1base.ravel(),
+        return v.reshape(len(mo1),-1)
+    mo1 = lib.krylov(vind_vo, _krylov_rhs(mo1base, h1),
                      tol=tol, max_cycle=max_cycle, hermi=hermi, verbose=log)
     log.timer('krylov solver in CPHF', *t0)
     return mo1.reshape(h1.shape), None
@@ -101,11 +103,13 @@ def solve_withs1(fvind, mo_energy, mo_occ, h1, s1,
     mo1base[:,occidx] = -s1[:,occidx] * .5
 
     def vind_vo(mo1):
-        v = fvind(mo1.reshape(h1.shape)).reshape(-1,nmo,nocc)
+        mo1 = mo1.reshape(-1,nmo,nocc)
+        v = fvind(mo1.reshape((-1,)+h1.shape[1:]) if h1.ndim == 3 else
+                  mo1.reshape(h1.shape)).reshape(-1,nmo,nocc)
         v[:,viridx,:] *= e_ai
         v[:,occidx,:] = 0
-        return v.ravel()
-    mo1 = lib.krylov(vind_vo, mo1base.ravel(),
+        return v.reshape(len(mo1),-1)
+    mo1 = lib.krylov(vind_vo, _krylov_rhs(mo1base, h1),
                      tol=tol, max_cycle=max_cycle, hermi=hermi, verbose=log)
     mo1 = mo1.reshape(mo1base.shape)
     log.timer('krylov solver in CPHF', *t0)
@@ -123,6 +127,15 @@ def solve_withs1(fvind, mo_energy, mo_occ, h1, s1,
     else:
         return mo1.reshape(h1.shape), mo_e1.reshape(nocc,nocc)
 
+def _krylov_rhs(mo1base, h1):
+    '''Multiple perturbations (h1 of shape (nset,...)) are solved together
+    with the block Krylov solver.  Converged perturbations are deflated in
+    lib.krylov.'''
+    if h1.ndim == 3:
+        return mo1base.reshape(len(mo1base),-1)
+    else:
+        return mo1base.ravel()
+
 if __name__ == '__main__':
     numpy.random.seed(1)
     nd = 3
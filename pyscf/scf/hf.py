@@ -41,6 +41,9 @@ PRE_ORTH_METHOD = getattr(__config__, 'scf_analyze_pre_orth_method', 'ANO')
 MO_BASE = getattr(__config__, 'MO_BASE', 1)
 TIGHT_GRAD_CONV_TOL = getattr(__config__, 'scf_hf_kernel_tight_grad_conv_tol', True)
 MUTE_CHKFILE = getattr(__config__, 'scf_hf_SCF_mute_chkfile', False)
+# Keep chkfile open during the SCF iterations and write the intermediate
+# results in background (see lib.chkfile.ChkfileWriter)
+ASYNC_CHKFILE = getattr(__config__, 'scf_hf_SCF_async_chkfile', False)
 
 # For code compatiblity in python-2 and python-3
 if sys.version_info >= (3,):
@@ -187,6 +190,7 @@ Keyword argument "init_dm" is replaced by "dm0"''')
 
         if dump_chk:
             mf.dump_chk(locals())
+            lib.chkfile.commit(mf.chkfile)
 
         if callable(callback):
             callback(locals())
@@ -1075,6 +1079,40 @@ def unpack_uniq_var(dx, mo_occ):
     return x1 - x1.T.conj()
 
 
+def reset(mf, mol=None):
+    '''Reset mol and clean up the attributes which depend on the geometry
+    of mol (integrals, direct-SCF screening, DFT grids, DF tensors etc.)
+    '''
+    if mol is None:
+        mol = mf.mol
+    else:
+        mf.mol = mol
+    mf.opt = None
+    mf._eri = None
+    mf._coords = None
+    if getattr(mf, 'with_df', None):
+        mf.with_df.mol = mol
+        mf.with_df.auxmol = None
+        mf.with_df._cderi = None
+    if getattr(mf, 'with_x2c', None):
+        mf.with_x2c.mol = mol
+    if getattr(mf, 'grids', None):  # DFT
+        mf.grids.mol = mol
+        mf.grids.coords = None
+        mf.grids.weights = None
+        mf._dm_last = None
+    if getattr(mf, 'nlcgrids', None):
+        mf.nlcgrids.mol = mol
+        mf.nlcgrids.coords = None
+        mf.nlcgrids.weights = None
+    if getattr(mf, 'with_solvent', None):
+        mf.with_solvent.mol = mol
+        mf.with_solvent.grids.mol = mol
+        mf.with_solvent.grids.coords = None
+        mf.with_solvent.grids.weights = None
+        mf.with_solvent._solver_ = None
+    return mf
+
 def as_scanner(mf):
     '''Generating a scanner/solver for HF PES.
 
@@ -1140,26 +1178,7 @@ def as_scanner(mf):
                    # avoid endless loop caused by circular reference
                    mf_obj not in mf_objs):
                 mf_objs.append(mf_obj)
-                mf_obj.mol = mol
-                mf_obj.opt = None
-                mf_obj._eri = None
-                if getattr(mf_obj, 'with_df', None):
-                    mf_obj.with_df.mol = mol
-                    mf_obj.with_df.auxmol = None
-                    mf_obj.with_df._cderi = None
-                if getattr(mf_obj, 'with_x2c', None):
-                    mf_obj.with_x2c.mol = mol
-                if getattr(mf_obj, 'grids', None):  # DFT
-                    mf_obj.grids.mol = mol
-                    mf_obj.grids.coords = None
-                    mf_obj.grids.weights = None
-                    mf_obj._dm_last = None
-                if getattr(mf_obj, 'with_solvent', None):
-                    mf_obj.with_solvent.mol = mol
-                    mf_obj.with_solvent.grids.mol = mol
-                    mf_obj.with_solvent.grids.coords = None
-                    mf_obj.with_solvent.grids.weights = None
-                    mf_obj.with_solvent._solver_ = None
+                reset(mf_obj, mol)
                 mf_obj = getattr(mf_obj, '_scf', None)
 
             if 'dm0' in kwargs:
@@ -1325,6 +1344,8 @@ class SCF(lib.StreamObject):
 
         self.opt = None
         self._eri = None # Note: self._eri requires large amount of memory
+        # Geometry for which the integrals and caches were generated
+        self._coords = None
 
         keys = set(('conv_tol', 'conv_tol_grad', 'max_cycle', 'init_guess',
                     'DIIS', 'diis', 'diis_space', 'diis_start_cycle',
@@ -1336,6 +1357,13 @@ class SCF(lib.StreamObject):
         if mol is None: mol = self.mol
         if self.verbose >= logger.WARN:
             self.check_sanity()
+        coords = mol.atom_coords()
+        if (getattr(self, '_coords', None) is not None and
+            not numpy.array_equal(self._coords, coords)):
+            # Geometry was changed in place, e.g. by mol.set_geom_
+            logger.debug(self, 'Geometry changed. Reset integrals and caches')
+            self.reset()
+        self._coords = coords
         if not mol.incore_anyway and not self._is_mem_enough():
 # Should I lazy initialize direct SCF?
             self.opt = self.init_direct_scf(mol)
@@ -1515,11 +1543,18 @@ class SCF(lib.StreamObject):
 
         self.dump_flags()
         self.build(self.mol)
-        self.converged, self.e_tot, \
-                self.mo_energy, self.mo_coeff, self.mo_occ = \
-                kernel(self, self.conv_tol, self.conv_tol_grad,
-                       dm0=dm0, callback=self.callback,
-                       conv_check=self.conv_check, **kwargs)
+        chkwriter = None
+        if ASYNC_CHKFILE and self.chkfile:
+            chkwriter = lib.chkfile.ChkfileWriter(self.chkfile)
+        try:
+            self.converged, self.e_tot, \
+                    self.mo_energy, self.mo_coeff, self.mo_occ = \
+                    kernel(self, self.conv_tol, self.conv_tol_grad,
+                           dm0=dm0, callback=self.callback,
+                           conv_check=self.conv_check, **kwargs)
+        finally:
+            if chkwriter is not None:
+                chkwriter.close()
 
         logger.timer(self, 'SCF', *cput0)
         self._finalize()
@@ -1647,6 +1682,7 @@ class SCF(lib.StreamObject):
     update_from_chk = update_from_chk_ = update = update_
 
     as_scanner = as_scanner
+    reset = reset
 
     @property
     def hf_energy(self):  # pragma: no cover
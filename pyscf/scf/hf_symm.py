@@ -40,6 +40,9 @@ from pyscf import __config__
 
 WITH_META_LOWDIN = getattr(__config__, 'scf_analyze_with_meta_lowdin', True)
 MO_BASE = getattr(__config__, 'MO_BASE', 1)
+# Skeleton Fock matrix: only the symmetry-unique shell quartets are computed
+# in direct SCF, see scf._vhf.direct
+SKELETON_FOCK = getattr(__config__, 'scf_hf_symm_skeleton_fock', False)
 
 
 # mo_energy, mo_coeff, mo_occ are all in nosymm representation
@@ -367,6 +370,13 @@ class SymAdaptedRHF(hf.RHF):
         self.irrep_nelec = {} # {'ir_name':int,...}
         self._keys = self._keys.union(['irrep_nelec'])
 
+    def init_direct_scf(self, mol=None):
+        if mol is None: mol = self.mol
+        opt = hf.RHF.init_direct_scf(self, mol)
+        if SKELETON_FOCK and mol.symmetry:
+            opt.set_symm_ops(mol)
+        return opt
+
     def build(self, mol=None):
         if mol is None: mol = self.mol
         for irname in self.irrep_nelec:
@@ -528,6 +538,13 @@ class SymAdaptedROHF(rohf.ROHF):
             logger.info(self, 'irrep_nelec %s', self.irrep_nelec)
         return self
 
+    def init_direct_scf(self, mol=None):
+        if mol is None: mol = self.mol
+        opt = rohf.ROHF.init_direct_scf(self, mol)
+        if SKELETON_FOCK and mol.symmetry:
+            opt.set_symm_ops(mol)
+        return opt
+
     def build(self, mol=None):
         if mol is None: mol = self.mol
         if mol.symmetry:
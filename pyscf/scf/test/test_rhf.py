@@ -316,6 +316,19 @@ H     0    0.757    0.587'''
         mf = scf.hf_symm.RHF(n2sym)
         self.assertAlmostEqual(mf.scf(), -108.9298383856092, 9)
 
+    def test_hf_symm_skeleton_fock(self):
+        mf = scf.hf_symm.RHF(n2sym)
+        mf.max_memory = 0  # to enforce direct SCF
+        skeleton_fock = scf.hf_symm.SKELETON_FOCK
+        scf.hf_symm.SKELETON_FOCK = True
+        try:
+            self.assertAlmostEqual(mf.scf(), n2mf.e_tot, 9)
+            self.assertTrue(mf.opt.symm_ops is not None)
+            mf = scf.uhf_symm.UHF(n2sym).set(max_memory=0)
+            self.assertAlmostEqual(mf.scf(), n2mf.e_tot, 9)
+        finally:
+            scf.hf_symm.SKELETON_FOCK = skeleton_fock
+
     def test_n2_symm_rohf(self):
         pmol = n2sym.copy()
         pmol.charge = 1
@@ -644,6 +657,20 @@ H     0    0.757    0.587'''
         self.assertAlmostEqual(ss, 2, 12)
         self.assertAlmostEqual(s, 3, 12)
 
+    def test_geom_changed_inplace(self):
+        mol1 = mol.copy()
+        mf1 = scf.RHF(mol1).set(conv_tol=1e-10)
+        mf1.kernel()
+        self.assertTrue(mf1._eri is not None)
+        mol1.set_geom_(mol.atom_coords() * 1.1, unit='B')
+        e1 = mf1.kernel()
+        e2 = scf.RHF(mol1).set(conv_tol=1e-10).kernel()
+        self.assertAlmostEqual(e1, e2, 9)
+
+        mf1.reset(mol)
+        self.assertTrue(mf1.mol is mol)
+        self.assertTrue(mf1._eri is None)
+
 
 if __name__ == "__main__":
     print("Full Tests for rhf")
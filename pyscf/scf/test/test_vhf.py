@@ -150,6 +150,37 @@ class KnownValues(unittest.TestCase):
                                  dm, 1, mol._atm, mol._bas, mol._env, opt_llll)
         self.assertTrue(numpy.allclose(vk0,vk1))
 
+    def test_direct_skeleton(self):
+        pmol = gto.M(atom='''
+            C  0  0    .67
+            C  0  0   -.67
+            H  0  .92  1.23
+            H  0 -.92  1.23
+            H  0  .92 -1.23
+            H  0 -.92 -1.23''', basis='ccpvdz', symmetry=True)
+        self.assertEqual(pmol.groupname, 'D2h')
+        dm = scf.RHF(pmol).get_init_guess()
+        vhfopt = _vhf.VHFOpt(pmol, 'int2e', 'CVHFnrs8_prescreen',
+                             'CVHFsetnr_direct_scf',
+                             'CVHFsetnr_direct_scf_dm')
+        vhfopt.direct_scf_tol = 1e-14
+        vj0, vk0 = _vhf.direct(dm, pmol._atm, pmol._bas, pmol._env, vhfopt, hermi=1)
+        skel_opt = _vhf.VHFOpt(pmol, 'int2e', 'CVHFnrs8_prescreen',
+                               'CVHFsetnr_direct_scf',
+                               'CVHFsetnr_direct_scf_dm').set_symm_ops(pmol)
+        skel_opt.direct_scf_tol = 1e-14
+        self.assertTrue(skel_opt.symm_ops is not None)
+        vj1, vk1 = _vhf.direct(dm, pmol._atm, pmol._bas, pmol._env, skel_opt, hermi=1)
+        self.assertAlmostEqual(abs(vj0-vj1).max(), 0, 11)
+        self.assertAlmostEqual(abs(vk0-vk1).max(), 0, 11)
+
+        # Density matrix without symmetry falls back to the regular integrals
+        numpy.random.seed(1)
+        dm = numpy.random.random(dm.shape)
+        vj0, vk0 = _vhf.direct(dm, pmol._atm, pmol._bas, pmol._env, vhfopt)
+        vj1, vk1 = _vhf.direct(dm, pmol._atm, pmol._bas, pmol._env, skel_opt)
+        self.assertAlmostEqual(abs(vj0-vj1).max(), 0, 11)
+        self.assertAlmostEqual(abs(vk0-vk1).max(), 0, 11)
 
 if __name__ == "__main__":
     print("Full Tests for _vhf")
@@ -64,10 +64,11 @@ def solve_nos1(fvind, mo_energy, mo_occ, h1,
     mo1base *= -e_ai
 
     def vind_vo(mo1):
-        v = fvind(mo1.reshape(mo1base.shape)).reshape(mo1base.shape)
+        mo1 = mo1.reshape(-1,mo1base.shape[1])
+        v = fvind(mo1).reshape(mo1.shape)
         v *= e_ai
-        return v.ravel()
-    mo1 = lib.krylov(vind_vo, mo1base.ravel(),
+        return v
+    mo1 = lib.krylov(vind_vo, _krylov_rhs(mo1base, h1),
                      tol=tol, max_cycle=max_cycle, hermi=hermi, verbose=log)
     log.timer('krylov solver in CPHF', *t0)
 
@@ -121,15 +122,16 @@ def solve_withs1(fvind, mo_energy, mo_occ, h1, s1,
     mo1base = numpy.hstack((mo1base_a.reshape(nset,-1), mo1base_b.reshape(nset,-1)))
 
     def vind_vo(mo1):
-        v = fvind(mo1).reshape(mo1base.shape)
-        v1a = v[:,:nmoa*nocca].reshape(nset,nmoa,nocca)
-        v1b = v[:,nmoa*nocca:].reshape(nset,nmob,noccb)
+        mo1 = mo1.reshape(-1,mo1base.shape[1])
+        v = fvind(mo1).reshape(mo1.shape)
+        v1a = v[:,:nmoa*nocca].reshape(-1,nmoa,nocca)
+        v1b = v[:,nmoa*nocca:].reshape(-1,nmob,noccb)
         v1a[:,viridxa] *= eai_a
         v1b[:,viridxb] *= eai_b
         v1a[:,occidxa] = 0
         v1b[:,occidxb] = 0
-        return v.ravel()
-    mo1 = lib.krylov(vind_vo, mo1base.ravel(),
+        return v
+    mo1 = lib.krylov(vind_vo, _krylov_rhs(mo1base, h1),
                      tol=tol, max_cycle=max_cycle, hermi=hermi, verbose=log)
     log.timer('krylov solver in CPHF', *t0)
 
@@ -152,3 +154,10 @@ def solve_withs1(fvind, mo_energy, mo_occ, h1, s1,
         mo_e1_a, mo_e1_b = mo_e1_a[0], mo_e1_b[0]
     return (mo1_a, mo1_b), (mo_e1_a, mo_e1_b)
 
+def _krylov_rhs(mo1base, h1):
+    '''Multiple perturbations are solved together with the block Krylov
+    solver.  Converged perturbations are deflated in lib.krylov.'''
+    if isinstance(h1[0], numpy.ndarray) and h1[0].ndim == 2:
+        return mo1base.ravel()
+    else:
+        return mo1base
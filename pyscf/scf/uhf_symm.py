@@ -307,6 +307,13 @@ class SymAdaptedUHF(uhf.UHF):
             logger.info(self, 'irrep_nelec %s', self.irrep_nelec)
         return self
 
+    def init_direct_scf(self, mol=None):
+        if mol is None: mol = self.mol
+        opt = uhf.UHF.init_direct_scf(self, mol)
+        if hf_symm.SKELETON_FOCK and mol.symmetry:
+            opt.set_symm_ops(mol)
+        return opt
+
     def build(self, mol=None):
         if mol is None: mol = self.mol
         if mol.symmetry:
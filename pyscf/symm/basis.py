@@ -117,6 +117,69 @@ def dump_symm_adapted_basis(mol, so):
 def symmetrize_matrix(mat, so):
     return [reduce(numpy.dot, (c.conj().T,mat,c)) for c in so]
 
+def ao_symm_ops(mol, gpname=None):
+    '''Representation of the point group operations on shells and AOs.
+
+    Returns:
+        shl_maps : (nops, nbas) int array
+            shl_maps[op,ish] is the shell which shell ish is transformed to.
+        ao_maps : (nops, nao) int array
+            ao_maps[op,i] is the AO which AO i is transformed to.
+        ao_signs : (nops, nao) array
+            op |i> = ao_signs[op,i] |ao_maps[op,i]>
+
+    The operations of D2h (C2v) are used for Dooh (Coov).
+    '''
+    if gpname is None:
+        gpname = mol.groupname
+    if gpname == 'Dooh':
+        gpname = 'D2h'
+    elif gpname == 'Coov':
+        gpname = 'C2v'
+    op_names = param.OPERATOR_TABLE[gpname]
+    ops = numpy.asarray([param.D2H_OPS[op] for op in op_names])
+    nops = len(ops)
+    nao = mol.nao_nr()
+    aoslice = mol.aoslice_by_atom()
+    atom_coords = mol.atom_coords()
+
+    atm_maps = numpy.empty((nops,mol.natm), dtype=int)
+    for op_id, op in enumerate(ops):
+        op_coords = numpy.dot(atom_coords, op)
+        dc = abs(op_coords[:,None] - atom_coords).sum(axis=2)
+        for ia in range(mol.natm):
+            ja = numpy.where(dc[ia] < geom.TOLERANCE)[0]
+            if (len(ja) != 1 or
+                mol.atom_symbol(ia) != mol.atom_symbol(ja[0])):
+                raise RuntimeError('Symmetry identical atoms not found')
+            atm_maps[op_id,ia] = ja[0]
+
+    shl_maps = numpy.empty((nops,mol.nbas), dtype=int)
+    ao_maps = numpy.empty((nops,nao), dtype=int)
+    ao_signs = numpy.empty((nops,nao))
+    for ia in range(mol.natm):
+        b0, b1, p0, p1 = aoslice[ia]
+        ip = p0
+        for ib in range(b0, b1):
+            l = mol.bas_angular(ib)
+            if mol.cart:
+                xyz = [(x, y, l-x-y) for x in range(l, -1, -1)
+                       for y in range(l-x, -1, -1)]
+                signs = numpy.array([[op[0,0]**x * op[1,1]**y * op[2,2]**z
+                                      for x, y, z in xyz] for op in ops])
+            else:
+                signs = numpy.array([[-1 if tot_parity_odd(op, l, m) else 1
+                                      for m in range(-l, l+1)]
+                                     for op in op_names])
+            nd = signs.shape[1] * mol.bas_nctr(ib)
+            ao_signs[:,ip:ip+nd] = numpy.tile(signs, mol.bas_nctr(ib))
+            for op_id in range(nops):
+                ja = atm_maps[op_id,ia]
+                shl_maps[op_id,ib] = aoslice[ja,0] + ib - b0
+                ao_maps[op_id,ip:ip+nd] = numpy.arange(nd) + aoslice[ja,2] + ip - p0
+            ip += nd
+    return shl_maps, ao_maps, ao_signs
+
 def _basis_offset_for_atoms(atoms, basis_tab):
     basoff = [0]
     n = 0
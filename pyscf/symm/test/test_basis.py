@@ -142,6 +142,19 @@ class KnowValues(unittest.TestCase):
                  'Be': gto.basis.load('cc_pvqz', 'C'),}
         self.assertEqual(get_so(atoms,basis)[0], 220)
 
+    def test_ao_symm_ops(self):
+        mol = gto.M(atom='N 0 0 .6; N 0 0 -.6; He 0 1.5 0; He 0 -1.5 0',
+                    basis='ccpvdz', symmetry=True)
+        self.assertEqual(mol.groupname, 'D2h')
+        for cart in (False, True):
+            mol.cart = cart
+            s = mol.intor('int1e_ovlp')
+            shl_maps, ao_maps, ao_signs = symm.basis.ao_symm_ops(mol)
+            self.assertEqual(shl_maps.shape, (8, mol.nbas))
+            for p, sign in zip(ao_maps, ao_signs):
+                s1 = s[p[:,None],p] * sign[:,None] * sign
+                self.assertAlmostEqual(abs(s1 - s).max(), 0, 12)
+
 
 if __name__ == "__main__":
     print("Full Tests symm.basis")
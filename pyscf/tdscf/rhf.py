@@ -40,6 +40,8 @@ MO_BASE = getattr(__config__, 'MO_BASE', 1)
 
 # Low excitation filter to avoid numerical instability
 POSTIVE_EIG_THRESHOLD = getattr(__config__, 'tdscf_rhf_TDDFT_positive_eig_threshold', 1e-3)
+# Upper bound of the integral screening threshold in the root-locking solver
+MAX_SCREENING_TOL = getattr(__config__, 'tdscf_rhf_TDA_max_screening_tol', 1e-8)
 
 
 def gen_tda_operation(mf, fock_ao=None, singlet=True, wfnsym=None):
@@ -567,6 +569,55 @@ def oscillator_strength(tdobj, e=None, xy=None, gauge='length', order=0):
     return f
 
 
+def _residual_screening(mf, vind, log):
+    '''Relax the integral screening threshold of direct-SCF J/K builder
+    inversely to the residual norms.  The trial vectors generated from small
+    residuals carry small weights in the eigenvectors, thus their products
+    with the response matrix can be computed with lower accuracy.
+
+    Returns the screened vind and the callback to update the threshold for
+    the Davidson solver.
+    '''
+    opt = getattr(mf, 'opt', None)
+    if opt is None or getattr(mf, '_eri', None) is not None:
+        return vind, None
+
+    tol0 = opt.direct_scf_tol
+    screening_tol = [tol0]
+    def callback(envs):
+        dx_norm = envs['dx_norm']
+        if len(dx_norm) > 0:
+            screening_tol[0] = min(max(tol0, tol0/max(dx_norm)),
+                                   max(tol0, MAX_SCREENING_TOL))
+
+    def vind_screened(xs):
+        log.debug1('direct_scf_tol for response = %g', screening_tol[0])
+        opt.direct_scf_tol = screening_tol[0]
+        try:
+            return vind(xs)
+        finally:
+            opt.direct_scf_tol = tol0
+    return vind_screened, callback
+
+def _davidson(tdobj, vind, x0, precond, pick, log):
+    '''Solve the Hermitian response eigenvalue problem with lib.davidson1, or
+    with lib.davidson_locking if tdobj.lock_roots is set.
+    '''
+    if tdobj.lock_roots:
+        vind, callback = _residual_screening(tdobj._scf, vind, log)
+        return lib.davidson_locking(vind, x0, precond,
+                                    tol=tdobj.conv_tol,
+                                    nroots=tdobj.nstates, lindep=tdobj.lindep,
+                                    max_cycle=tdobj.max_cycle,
+                                    max_space=tdobj.max_space, pick=pick,
+                                    callback=callback, verbose=log)
+    else:
+        return lib.davidson1(vind, x0, precond,
+                             tol=tdobj.conv_tol,
+                             nroots=tdobj.nstates, lindep=tdobj.lindep,
+                             max_space=tdobj.max_space, pick=pick,
+                             verbose=log)
+
 def as_scanner(td):
     '''Generating a scanner/solver for TDA/TDHF/TDDFT PES.
 
@@ -623,6 +674,16 @@ class TDA(lib.StreamObject):
             Diagonalization convergence tolerance.  Default is 1e-9.
         nstates : int
             Number of TD states to be computed. Default is 3.
+        lock_roots : bool
+            Whether to use the Davidson solver which locks (deflates) the
+            converged roots.  The subspace is restarted without recomputing
+            the response of the trial vectors, and the integral screening
+            threshold of direct-SCF is relaxed as the residuals decrease.  It
+            is recommended when many states are required.  It is available
+            for the Hermitian problems (TDA and TDDFT without hybrid
+            functionals) of molecules.  The TDHF and hybrid TDDFT kernels,
+            and the k-point solvers, raise NotImplementedError when it is
+            set.  Default is False.
 
     Saved results:
 
@@ -643,6 +704,7 @@ class TDA(lib.StreamObject):
     level_shift = getattr(__config__, 'tdscf_rhf_TDA_level_shift', 0)
     max_space = getattr(__config__, 'tdscf_rhf_TDA_max_space', 50)
     max_cycle = getattr(__config__, 'tdscf_rhf_TDA_max_cycle', 100)
+    lock_roots = getattr(__config__, 'tdscf_rhf_TDA_lock_roots', False)
 
     def __init__(self, mf):
         self.verbose = mf.verbose
@@ -661,7 +723,7 @@ class TDA(lib.StreamObject):
         self.xy = None
 
         keys = set(('conv_tol', 'nstates', 'singlet', 'lindep', 'level_shift',
-                    'max_space', 'max_cycle'))
+                    'max_space', 'max_cycle', 'lock_roots'))
         self._keys = set(self.__dict__.keys()).union(keys)
 
     @property
@@ -691,6 +753,8 @@ class TDA(lib.StreamObject):
         log.info('eigh level_shift = %g', self.level_shift)
         log.info('eigh max_space = %d', self.max_space)
         log.info('eigh max_cycle = %d', self.max_cycle)
+        if self.lock_roots:
+            log.info('eigh lock_roots = %s', self.lock_roots)
         log.info('chkfile = %s', self.chkfile)
         log.info('max_memory %d MB (current use %d MB)',
                  self.max_memory, lib.current_memory()[0])
@@ -762,11 +826,7 @@ class TDA(lib.StreamObject):
             return w[idx], v[:,idx], idx
 
         self.converged, self.e, x1 = \
-                lib.davidson1(vind, x0, precond,
-                              tol=self.conv_tol,
-                              nroots=nstates, lindep=self.lindep,
-                              max_space=self.max_space, pick=pickeig,
-                              verbose=log)
+                _davidson(self, vind, x0, precond, pickeig, log)
 
         nocc = (self._scf.mo_occ>0).sum()
         nmo = self._scf.mo_occ.size
@@ -913,6 +973,9 @@ class TDHF(TDA):
     def kernel(self, x0=None, nstates=None):
         '''TDHF diagonalization with non-Hermitian eigenvalue solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for the non-Hermitian '
+                                      'eigenvalue problem of %s' % self.__class__)
         self.check_sanity()
         self.dump_flags()
         if nstates is None:
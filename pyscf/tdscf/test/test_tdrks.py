@@ -307,6 +307,33 @@ class KnownValues(unittest.TestCase):
         self.assertAlmostEqual(lib.finger(es), 2.1856920990871753, 6)
         td.analyze()
 
+    def test_tda_lock_roots(self):
+        mf1 = scf.RHF(mol)
+        mf1.max_memory = 0  # direct SCF
+        mf1.run()
+        self.assertTrue(mf1._eri is None)
+        td = rhf.TDA(mf1)
+        e0 = td.kernel(nstates=10)[0]
+        td.lock_roots = True
+        e1 = td.kernel(nstates=10)[0]
+        self.assertTrue(all(td.converged))
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+
+    def test_hybrid_lock_roots(self):
+        td = rks.TDA(mf_b3lyp).set(conv_tol=1e-10)
+        e0 = td.kernel(nstates=5)[0]
+        td.lock_roots = True
+        e1 = td.kernel(nstates=5)[0]
+        self.assertTrue(all(td.converged))
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+
+    def test_hybrid_tddft_lock_roots(self):
+        td = tdscf.TDDFT(mf_b3lyp)
+        self.assertTrue(isinstance(td, rhf.TDHF))
+        td.lock_roots = True
+        self.assertRaises(NotImplementedError, td.kernel)
+        self.assertRaises(NotImplementedError, rhf.TDHF(mf).set(lock_roots=True).kernel)
+
     def test_scanner(self):
         td_scan = td_hf.as_scanner().as_scanner()
         td_scan.nroots = 3
@@ -72,6 +72,30 @@ def tearDownModule():
     del mol, mf, td_hf, mf_lda, mf_bp86, mf_b3lyp
 
 class KnownValues(unittest.TestCase):
+    def test_tda_lock_roots(self):
+        td = tdscf.uhf.TDA(mf).set(conv_tol=1e-10)
+        e0 = td.kernel(nstates=5)[0]
+        td.lock_roots = True
+        e1 = td.kernel(nstates=5)[0]
+        self.assertTrue(all(td.converged))
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+
+    def test_nohybrid_lock_roots(self):
+        td = tdscf.uks.TDDFTNoHybrid(mf_lda).set(conv_tol=1e-10)
+        e0 = td.kernel(nstates=5)[0]
+        td.lock_roots = True
+        e1 = td.kernel(nstates=5)[0]
+        self.assertTrue(all(td.converged))
+        self.assertAlmostEqual(abs(e1 - e0).max(), 0, 8)
+
+    def test_tddft_lock_roots(self):
+        td = tdscf.TDDFT(mf_b3lyp)
+        td.lock_roots = True
+        self.assertRaises(NotImplementedError, td.kernel)
+        td = tdscf.uhf.TDHF(mf)
+        td.lock_roots = True
+        self.assertRaises(NotImplementedError, td.kernel)
+
     def test_nohbrid_lda(self):
         td = tdscf.uks.TDDFTNoHybrid(mf_lda).set(conv_tol=1e-12)
         es = td.kernel(nstates=4)[0]
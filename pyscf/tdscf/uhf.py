@@ -677,11 +677,7 @@ class TDA(rhf.TDA):
             return w[idx], v[:,idx], idx
 
         self.converged, self.e, x1 = \
-                lib.davidson1(vind, x0, precond,
-                              tol=self.conv_tol,
-                              nroots=nstates, lindep=self.lindep,
-                              max_space=self.max_space, pick=pickeig,
-                              verbose=log)
+                rhf._davidson(self, vind, x0, precond, pickeig, log)
 
         nmo = self._scf.mo_occ[0].size
         nocca = (self._scf.mo_occ[0]>0).sum()
@@ -814,6 +810,9 @@ class TDHF(TDA):
     def kernel(self, x0=None, nstates=None):
         '''TDHF diagonalization with non-Hermitian eigenvalue solver
         '''
+        if self.lock_roots:
+            raise NotImplementedError('lock_roots for the non-Hermitian '
+                                      'eigenvalue problem of %s' % self.__class__)
         self.check_sanity()
         self.dump_flags()
         if nstates is None:
@@ -21,6 +21,7 @@ import numpy
 from pyscf import symm
 from pyscf import lib
 from pyscf.dft import numint
+from pyscf.tdscf import rhf
 from pyscf.tdscf import uhf
 from pyscf.scf import uhf_symm
 from pyscf.data import nist
@@ -145,11 +146,7 @@ class TDDFTNoHybrid(TDA):
             return w[idx], v[:,idx], idx
 
         self.converged, w2, x1 = \
-                lib.davidson1(vind, x0, precond,
-                              tol=self.conv_tol,
-                              nroots=nstates, lindep=self.lindep,
-                              max_space=self.max_space, pick=pickeig,
-                              verbose=log)
+                rhf._davidson(self, vind, x0, precond, pickeig, log)
 
         mo_energy = self._scf.mo_energy
         mo_occ = self._scf.mo_occ